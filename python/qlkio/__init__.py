@@ -0,0 +1,6 @@
+"""Python helpers for the QuaLiKiz standalone input and output files.
+
+The in-process binding lives in qlkio.binding, as it needs libqualikiz.so.
+"""
+from .inputs import build_inputs, validate, write_bins, write_bundle
+from .outputs import QLKRun, load_variable, open_run
@@ -0,0 +1,183 @@
+"""Run the qualikiz subroutine in-process, with NumPy arrays in and out.
+
+Calls ``qualikiz_c`` in ``src/qlk_capi.f90`` through ctypes, so a run costs
+only the compute time: no ``input/*.bin`` files, no ``mpirun`` and no text
+output to parse. Build the shared library first with ``-fPIC`` in FFLAGS::
+
+    make -C src libqualikiz.so
+
+The inputs are the dict made by :func:`qlkio.inputs.build_inputs`. Arrays
+that are already float64 (int32 for ``typei``) and in Fortran order are passed
+without a copy; the outputs are written by Fortran directly into the returned
+arrays, or into the arrays given in ``out``.
+
+Under ``mpirun`` with mpi4py imported, every rank of a communicator calls
+:func:`run` with the same inputs and ``comm``, and the work is shared over
+that communicator (MPI_COMM_WORLD by default); every rank gets the full
+outputs. Splitting MPI_COMM_WORLD runs independent scans side by side in one
+job. Without MPI the first call initializes it for a serial run. The library
+must be linked against the same MPI as mpi4py.
+
+qualikiz keeps its state in Fortran module variables, so calls must not
+overlap in one process. Within a call, ``nthreads`` OpenMP threads per rank
+share the (p,nu) tasks.
+"""
+import atexit
+import ctypes
+import os
+
+import numpy as np
+
+#: name -> (dims, dtype) in the order of the output table of qlk_capi.f90.
+#: Names are those of the standalone output files; the first five are always computed
+OUTPUTS = (
+    ('pfe_SI', ('dimx',), float), ('efe_SI', ('dimx',), float),
+    ('pfi_SI', ('dimx', 'nions'), float), ('efi_SI', ('dimx', 'nions'), float),
+    ('vfi_SI', ('dimx', 'nions'), float),
+    ('pfe_GB', ('dimx',), float), ('efe_GB', ('dimx',), float),
+    ('pfi_GB', ('dimx', 'nions'), float), ('efi_GB', ('dimx', 'nions'), float),
+    ('vfi_GB', ('dimx', 'nions'), float),
+    ('gam_SI', ('dimx', 'dimn', 'numsols'), float), ('gam_GB', ('dimx', 'dimn', 'numsols'), float),
+    ('ome_SI', ('dimx', 'dimn', 'numsols'), float), ('ome_GB', ('dimx', 'dimn', 'numsols'), float),
+) + tuple((name, ('dimx',), float) for name in
+          'dfe_SI vte_SI vce_SI dfe_GB vte_GB vce_GB'.split()) \
+  + tuple((name, ('dimx', 'nions'), float) for name in
+          'dfi_SI vti_SI vri_SI vci_SI dfi_GB vti_GB vri_GB vci_GB'.split()) \
+  + tuple((name, ('dimx',), float) for name in
+          'chiee_SI vene_SI vece_SI chiee_GB vene_GB vece_GB'.split()) \
+  + tuple((name, ('dimx', 'nions'), float) for name in
+          'chiei_SI veni_SI veri_SI veci_SI chiei_GB veni_GB veri_GB veci_GB'.split()) \
+  + tuple((name, ('dimx',), float) for name in
+          'efeETG_SI efeETG_GB modeflag Nustar Zeff'.split()) \
+  + (('sol', ('dimx', 'dimn', 'numsols'), complex), ('fdsol', ('dimx', 'dimn', 'numsols'), complex),
+     ('tasktime', ('dimx', 'dimn'), float), ('solflu', ('dimx', 'dimn'), complex))
+
+#: Outputs returned by default
+DEFAULT_OUTPUTS = ('pfe_SI', 'efe_SI', 'pfi_SI', 'efi_SI', 'vfi_SI',
+                   'pfe_GB', 'efe_GB', 'pfi_GB', 'efi_GB', 'vfi_GB',
+                   'gam_GB', 'ome_GB')
+
+#: Order of the array inputs of qualikiz_c, by build_inputs key
+_RADIAL_GEOMETRY = ('x', 'rho', 'Ro', 'Rmin')
+_RADIAL_B = ('Bo', 'q', 'smag', 'alpha')
+_ELECTRONS = ('Te', 'ne', 'Ate', 'Ane', 'anise', 'danisdre')
+_IONS = ('Ai', 'Zi', 'Ti', 'normni', 'Ati', 'Ani', 'anisi', 'danisdri')
+_ROTATION = ('Machtor', 'Autor', 'Machpar', 'Aupar', 'gammaE')
+
+_lib = None
+
+
+def load_library(path=None):
+    """Load libqualikiz.so from path, $QLK_LIBRARY or src/ of this checkout."""
+    global _lib
+    if _lib is not None and path is None:
+        return _lib
+    if path is None:
+        path = os.environ.get('QLK_LIBRARY') or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'libqualikiz.so')
+    lib = ctypes.CDLL(path, mode=ctypes.RTLD_GLOBAL)
+
+    cint, cdouble = ctypes.c_int, ctypes.c_double
+    real1 = np.ctypeslib.ndpointer(np.float64, ndim=1, flags='F_CONTIGUOUS')
+    real2 = np.ctypeslib.ndpointer(np.float64, ndim=2, flags='F_CONTIGUOUS')
+    int2 = np.ctypeslib.ndpointer(np.intc, ndim=2, flags='F_CONTIGUOUS')
+    lib.qualikiz_c.restype = None
+    lib.qualikiz_c.argtypes = (
+        [cint] * 9 + [real1] + [real1] * 4 + [cdouble] + [real1] * 4 +
+        [cint] + [real1] * 6 + [int2] + [real2] * 8 + [real1] * 5 +
+        [cint] * 2 + [cdouble] * 5 + [cint, ctypes.c_void_p, ctypes.c_void_p,
+                                      ctypes.c_void_p * len(OUTPUTS)] + [cint] * 9)
+    lib.qualikiz_c_numout.restype = cint
+    if lib.qualikiz_c_numout() != len(OUTPUTS):
+        raise RuntimeError('%s has %d outputs, expected %d'
+                           % (path, lib.qualikiz_c_numout(), len(OUTPUTS)))
+    atexit.register(lib.qualikiz_c_finalize)
+    _lib = lib
+    return lib
+
+
+def _farray(value, dtype=np.float64):
+    return np.asfortranarray(value, dtype=dtype)
+
+
+def run(inputs, outputs=DEFAULT_OUTPUTS, oldsol=None, oldfdsol=None, runcounter=0, out=None,
+        comm=None):
+    """Run qualikiz on an input dict from build_inputs.
+
+    Args:
+        inputs: dict as returned by qlkio.inputs.build_inputs.
+        outputs: Names from OUTPUTS to compute. The five SI fluxes are always
+            computed.
+        oldsol, oldfdsol: sol and fdsol of a previous call, shape
+            (dimx, dimn, numsols), with runcounter > 0 to restart from them.
+        out: Optional dict of preallocated Fortran ordered arrays to write
+            outputs into, e.g. the result of a previous call.
+        comm: mpi4py communicator to run on. Defaults to MPI_COMM_WORLD.
+
+    The number of OpenMP threads per rank is ``inputs['nthreads']``, default 1.
+    ``inputs['sched_meth']`` and ``inputs['sched_chunk']`` select the task
+    scheduler as in the standalone, default 0 (DistriTask).
+    ``inputs['contchain']`` enables the warm started chains along kthetarhos
+    for sched_meth 1 and 2, default 0 (off).
+    ``inputs['newtonderiv']`` = 1 integrates the Newton Jacobian with the
+    dispersion relation instead of finite differences, default 0.
+    ``inputs['localrefine']`` = 1 bisects only the under-resolved contour
+    segments and ``inputs['periodicquad']`` = 1 uses the periodic trapezoidal
+    rule for the argument principle, default 0 (doubling and davint).
+    ``inputs['solcache']`` = 1 reuses and stores the task outputs in the
+    solution cache directory ``solcache/``, which must exist in the working
+    directory, default 0.
+
+    Returns:
+        dict of output name -> ndarray in the Fortran dimension order.
+    """
+    lib = load_library()
+    dims = {name: int(inputs[name]) for name in ('dimx', 'dimn', 'nions', 'numsols')}
+    out = {} if out is None else out
+    unknown = set(outputs) - {name for name, _, _ in OUTPUTS}
+    if unknown:
+        raise ValueError('Unknown QuaLiKiz outputs: ' + ', '.join(sorted(unknown)))
+
+    wanted = set(outputs) | {name for name, _, _ in OUTPUTS[:5]}
+    results = {}
+    outptr = (ctypes.c_void_p * len(OUTPUTS))()
+    for i, (name, shape, dtype) in enumerate(OUTPUTS):
+        if name not in wanted:
+            continue
+        shape = tuple(dims[dim] for dim in shape)
+        array = out.get(name)
+        if (array is None or array.shape != shape or array.dtype != np.dtype(dtype)
+                or not array.flags.f_contiguous or not array.flags.writeable):
+            array = np.empty(shape, dtype=dtype, order='F')
+        results[name] = array
+        outptr[i] = array.ctypes.data
+
+    restart = []
+    for sol in (oldsol, oldfdsol):
+        if sol is None:
+            restart.append(None)
+        else:
+            sol = _farray(sol, np.complex128)
+            if sol.shape != (dims['dimx'], dims['dimn'], dims['numsols']):
+                raise ValueError('oldsol and oldfdsol must have shape (dimx, dimn, numsols)')
+            restart.append(sol)
+
+    flags = [int(inputs[name]) for name in
+             ('phys_meth', 'coll_flag', 'rot_flag', 'verbose', 'separateflux')]
+    lib.qualikiz_c(
+        dims['dimx'], dims['dimn'], dims['nions'], dims['numsols'], *flags,
+        _farray(inputs['kthetarhos']),
+        *(_farray(inputs[name]) for name in _RADIAL_GEOMETRY), float(inputs['R0']),
+        *(_farray(inputs[name]) for name in _RADIAL_B),
+        int(inputs['typee']), *(_farray(inputs[name]) for name in _ELECTRONS),
+        _farray(inputs['typei'], np.intc), *(_farray(inputs[name]) for name in _IONS),
+        *(_farray(inputs[name]) for name in _ROTATION),
+        int(inputs['maxruns']), int(inputs['maxpts']),
+        *(float(inputs[name]) for name in ('relacc1', 'relacc2', 'timeout', 'ETGmult', 'collmult')),
+        int(runcounter), *(None if sol is None else sol.ctypes.data for sol in restart),
+        outptr, int(inputs.get('nthreads', 1)), int(inputs.get('sched_meth', 0)),
+        int(inputs.get('sched_chunk', 0)), int(inputs.get('contchain', 0)),
+        int(inputs.get('newtonderiv', 0)), int(inputs.get('localrefine', 0)),
+        int(inputs.get('periodicquad', 0)), int(inputs.get('solcache', 0)),
+        -1 if comm is None else comm.py2f())
+    return results
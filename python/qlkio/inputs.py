@@ -0,0 +1,213 @@
+"""Build, validate and write the QuaLiKiz standalone input set.
+
+The inputs are kept in a plain dict keyed by the stems of the files that
+``data_init`` in ``src/qlk_standalone.f90`` reads (``'dimx'``, ``'Te'``,
+``'normni'``, ``'typei'``, ...). Radial quantities have shape ``(dimx,)``,
+ion quantities ``(dimx, nions)`` and ``kthetarhos`` ``(dimn,)``. Every array
+is built with NumPy broadcasting, so a scan of 10^6 radial points costs a few
+array operations rather than a Python loop per point.
+
+The dict can be written either as the classic one-file-per-parameter
+``input/*.bin`` set or as the single ``input/qlkinput.bin`` bundle.
+"""
+import os
+import struct
+
+import numpy as np
+
+#: Run settings and their defaults, as in testcases/*/parameters.m
+SCALARS = {
+    'phys_meth': 1,
+    'coll_flag': 1,
+    'write_primi': 1,
+    'rot_flag': 0,
+    'verbose': 1,
+    'separateflux': 0,
+    'numsols': 3,
+    'maxruns': 1,
+    'maxpts': 5e5,
+    'relacc1': 1e-3,
+    'relacc2': 2e-2,
+    'timeout': 60,
+    'ETGmult': 1,
+    'collmult': 1,
+    'R0': 3,
+    'typee': 1,
+}
+
+#: Optional run settings, only written when given
+OPTIONAL_SCALARS = ('sched_meth', 'sched_chunk', 'contchain', 'nthreads', 'newtonderiv',
+                    'localrefine', 'periodicquad', 'solcache', 'output_format')
+
+#: Quantities of shape (dimx,)
+RADIAL = ('x', 'rho', 'Ro', 'Rmin', 'Bo', 'q', 'smag', 'alpha',
+          'Machtor', 'Autor', 'Machpar', 'Aupar', 'gammaE',
+          'Te', 'ne', 'Ate', 'Ane', 'anise', 'danisdre')
+
+#: Quantities of shape (dimx, nions)
+IONS = ('Ti', 'normni', 'Ati', 'Ani', 'typei', 'anisi', 'danisdri', 'Ai', 'Zi')
+
+#: Radial quantities that may be omitted
+RADIAL_DEFAULTS = {'Machtor': 0, 'Autor': 0, 'Machpar': 0, 'Aupar': 0,
+                   'gammaE': 0, 'anise': 1, 'danisdre': 0}
+
+#: Ion quantities that may be omitted
+ION_DEFAULTS = {'typei': 1, 'anisi': 1, 'danisdri': 0}
+
+#: Ion types taking part in quasineutrality. 3 and 4 are tracers
+QN_TYPES = (1, 2)
+
+BUNDLE_MAGIC = b'QLKINPUT'
+BUNDLE_VERSION = 1
+
+
+def build_inputs(kthetarhos, set_ninorm1=True, set_Ani1=True, set_QN_grad=True,
+                 **params):
+    """Build the full input dict from scalars and arrays.
+
+    Args:
+        kthetarhos: Wave number grid, shape (dimn,).
+        set_ninorm1: Set the main ion (first ion) density for quasineutrality.
+        set_Ani1: With set_QN_grad, the main ion density gradient absorbs the
+            gradient quasineutrality. Otherwise the electron gradient Ane does.
+        set_QN_grad: Enforce quasineutrality of the density gradients.
+        **params: Any key of SCALARS, OPTIONAL_SCALARS, RADIAL and IONS.
+            Radial values broadcast to (dimx,), ion values to (dimx, nions);
+            a 1D ion value of length nions is taken per ion.
+
+    Returns:
+        dict of file stem -> float64 ndarray, ready for write_bins or write_bundle.
+    """
+    unknown = set(params) - set(SCALARS) - set(OPTIONAL_SCALARS) - set(RADIAL) - set(IONS)
+    if unknown:
+        raise ValueError('Unknown QuaLiKiz inputs: ' + ', '.join(sorted(unknown)))
+    missing = [name for name in RADIAL + IONS
+               if name not in params and name not in RADIAL_DEFAULTS
+               and name not in ION_DEFAULTS]
+    if missing:
+        raise ValueError('Missing QuaLiKiz inputs: ' + ', '.join(missing))
+
+    ions = {name: np.atleast_1d(np.asarray(params.get(name, ION_DEFAULTS.get(name)),
+                                           dtype=float))
+            for name in IONS}
+    nions = max(val.shape[-1] for val in ions.values())
+    radial = {name: np.asarray(params.get(name, RADIAL_DEFAULTS.get(name)), dtype=float)
+              for name in RADIAL}
+    dimx = np.broadcast_shapes(*(val.shape for val in radial.values()),
+                               *(val.shape[:-1] for val in ions.values()))
+    if len(dimx) > 1:
+        raise ValueError('Radial inputs must be scalars or 1D, got shape ' + str(dimx))
+    dimx = dimx[0] if dimx else 1
+
+    inputs = {name: float(params.get(name, default)) for name, default in SCALARS.items()}
+    inputs.update({name: float(params[name]) for name in OPTIONAL_SCALARS if name in params})
+    inputs['kthetarhos'] = np.atleast_1d(np.asarray(kthetarhos, dtype=float))
+    inputs.update({name: np.broadcast_to(val, (dimx,)).copy() for name, val in radial.items()})
+    inputs.update({name: np.broadcast_to(val, (dimx, nions)).copy() for name, val in ions.items()})
+    inputs['dimx'] = float(dimx)
+    inputs['dimn'] = float(inputs['kthetarhos'].size)
+    inputs['nions'] = float(nions)
+
+    if set_ninorm1:
+        set_main_ion_density(inputs)
+    if set_QN_grad:
+        set_gradient_qn(inputs, main_ion=set_Ani1)
+    return inputs
+
+
+def _impurities(inputs):
+    """Charge weighted density and gradient of the quasineutral impurities."""
+    zi, ni, ani = inputs['Zi'], inputs['normni'], inputs['Ani']
+    inqn = np.isin(inputs['typei'], QN_TYPES)
+    inqn[:, 0] = False
+    return (np.sum(np.where(inqn, zi * ni, 0), axis=1),
+            np.sum(np.where(inqn, zi * ni * ani, 0), axis=1))
+
+
+def set_main_ion_density(inputs):
+    """Set normni of the first ion so that sum(Zi*ni) = ne."""
+    zn, _ = _impurities(inputs)
+    inputs['normni'][:, 0] = (1 - zn) / inputs['Zi'][:, 0]
+
+
+def set_gradient_qn(inputs, main_ion=True):
+    """Enforce sum(Zi*ni*Ani) = ne*Ane, on the main ion Ani or on Ane."""
+    _, zna = _impurities(inputs)
+    zn1 = inputs['Zi'][:, 0] * inputs['normni'][:, 0]
+    if main_ion:
+        inputs['Ani'][:, 0] = (inputs['Ane'] - zna) / zn1
+    else:
+        inputs['Ane'] = zna + zn1 * inputs['Ani'][:, 0]
+
+
+def validate(inputs, rtol=1e-6):
+    """Check shapes, physical ranges and quasineutrality. Raises ValueError."""
+    dimx, dimn, nions = (int(inputs[name]) for name in ('dimx', 'dimn', 'nions'))
+    errors = []
+    if inputs['kthetarhos'].shape != (dimn,):
+        errors.append('kthetarhos must have shape (dimn,)')
+    errors += ['%s must have shape (dimx,)' % name for name in RADIAL
+               if np.shape(inputs[name]) != (dimx,)]
+    errors += ['%s must have shape (dimx, nions)' % name for name in IONS
+               if np.shape(inputs[name]) != (dimx, nions)]
+    if errors:
+        raise ValueError('; '.join(errors))
+
+    for name in ('Te', 'ne', 'Bo', 'Ro', 'Rmin', 'q', 'Ti', 'Ai', 'Zi', 'kthetarhos'):
+        bad = np.count_nonzero(~(inputs[name] > 0))
+        if bad:
+            errors.append('%s is not positive at %d points' % (name, bad))
+    bad = np.count_nonzero(~np.isin(inputs['typei'], (1, 2, 3, 4)))
+    if bad:
+        errors.append('typei is not 1, 2, 3 or 4 at %d points' % bad)
+    bad = np.count_nonzero(inputs['normni'] < 0)
+    if bad:
+        errors.append('normni is negative at %d points' % bad)
+
+    zn, zna = _impurities(inputs)
+    zn1 = inputs['Zi'][:, 0] * inputs['normni'][:, 0]
+    bad = np.count_nonzero(~np.isclose(zn + zn1, 1, rtol=rtol, atol=0))
+    if bad:
+        errors.append('quasineutrality violated at %d points' % bad)
+    bad = np.count_nonzero(~np.isclose(zna + zn1 * inputs['Ani'][:, 0], inputs['Ane'],
+                                       rtol=rtol, atol=rtol))
+    if bad:
+        errors.append('gradient quasineutrality violated at %d points' % bad)
+    if errors:
+        raise ValueError('; '.join(errors))
+
+
+def _ordered(inputs):
+    """(stem, float64 array in Fortran order) pairs of all inputs."""
+    for name, val in inputs.items():
+        yield name, np.asfortranarray(val, dtype=np.float64)
+
+
+def write_bins(inputs, inputdir='input'):
+    """Write the classic input/*.bin set, one raw float64 file per input."""
+    os.makedirs(inputdir, exist_ok=True)
+    for name, val in _ordered(inputs):
+        with open(os.path.join(inputdir, name + '.bin'), 'wb') as fh:
+            fh.write(val.tobytes(order='F'))
+
+
+def write_bundle(inputs, filename=os.path.join('input', 'qlkinput.bin')):
+    """Write all inputs to the single-file bundle read by readbundle in diskio.f90.
+
+    Layout in native byte order: b'QLKINPUT', int32 version, int32 nvars,
+    nvars entries of (16 byte name, int32 number of values), then the values
+    of all entries as contiguous float64 arrays.
+    """
+    entries = list(_ordered(inputs))
+    header = [BUNDLE_MAGIC, struct.pack('=ii', BUNDLE_VERSION, len(entries))]
+    for name, val in entries:
+        if len(name) > 16:
+            raise ValueError('Bundle names are limited to 16 characters: ' + name)
+        header.append(name.ljust(16).encode('ascii') + struct.pack('=i', val.size))
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(filename, 'wb') as fh:
+        fh.write(b''.join(header))
+        for _, val in entries:
+            fh.write(val.tobytes(order='F'))
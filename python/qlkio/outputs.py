@@ -0,0 +1,245 @@
+"""Load the output of a QuaLiKiz standalone run as NumPy arrays or an xarray Dataset.
+
+``outputascii`` in ``src/qlk_standalone.f90`` writes each variable to its own
+text file in ``output/``, ``output/primitive/`` or ``debug/``. Complex
+variables are split into ``r<name>.dat`` and ``i<name>.dat``. A 2D array is
+written with one row per first index. Higher dimensions are written as
+stacked 2D pages, with the last index varying slowest. With ``output_format``
+1 or 2 the same variables are also written to ``output/qlkrun.h5``.
+
+Every variable is parsed in one vectorized call and only when it is first
+accessed. The parsed array is kept in ``<rundir>/.qlkcache/`` as a ``.npy``
+file, so a run is re-opened by memory-mapping its cache. A cache entry is
+used only while it is newer than its source files.
+"""
+import os
+
+import numpy as np
+
+#: Sizes that are fixed in qlk_standalone.f90
+FIXED_DIMS = {'ntheta': 64, 'numecoefs': 13, 'numicoefs': 7}
+
+CACHE_DIR = '.qlkcache'
+H5_FILE = os.path.join('output', 'qlkrun.h5')
+
+
+def _group(dirname, dims, names):
+    return {name: (dirname, dims) for name in names.split()}
+
+
+#: name -> (directory, dims) of every variable written by outputascii
+VARIABLES = {}
+VARIABLES.update(_group('output/primitive/', ('dimx',), 'kymaxITG kymaxETG'))
+VARIABLES.update(_group('output/primitive/', ('dimx', 'dimn'),
+                        'solflu distan kperp2 modewidth modeshift ntor tasktime'))
+VARIABLES.update(_group('output/primitive/', ('dimx', 'dimn', 'numsols'), """
+    sol fdsol Lcirce Lpiege Lecirce Lepiege Lcircgne Lpieggne Lcircgte Lpieggte
+    Lcircce Lpiegce Lecircgne Lepieggne Lecircgte Lepieggte Lecircce Lepiegce"""))
+VARIABLES.update(_group('output/primitive/', ('dimx', 'dimn', 'nions', 'numsols'), """
+    Lcirci Lpiegi Lecirci Lepiegi Lvcirci Lvpiegi Lcircgni Lpieggni Lcircgui Lpieggui
+    Lcircgti Lpieggti Lcircci Lpiegci Lecircgni Lepieggni Lecircgui Lepieggui
+    Lecircgti Lepieggti Lecircci Lepiegci"""))
+VARIABLES.update(_group('debug/', ('dimx',), 'modeflag Nustar Zeff'))
+VARIABLES.update(_group('debug/', ('ntheta', 'dimx'), 'phi'))
+VARIABLES.update(_group('output/', ('dimx', 'ntheta', 'nions'), 'npol'))
+VARIABLES.update(_group('output/', ('dimx', 'nions1', 'numecoefs'), 'ecoefs'))
+VARIABLES.update(_group('output/', ('dimx', 'nions', 'numicoefs'), 'cftrans'))
+VARIABLES.update(_group('output/', ('dimx', 'dimn', 'numsols'), 'gam_GB ome_GB gam_SI ome_SI'))
+VARIABLES.update(_group('output/', ('dimx', 'dimn'), 'pfe_cm efe_cm'))
+VARIABLES.update(_group('output/', ('dimx', 'dimn', 'nions'), 'pfi_cm efi_cm vfi_cm'))
+VARIABLES.update(_group('output/', ('dimx',), """
+    cke ceke dfe_SI vte_SI vce_SI dfe_GB vte_GB vce_GB
+    vene_SI chiee_SI vece_SI vene_GB chiee_GB vece_GB
+    pfe_SI pfe_GB efe_SI efe_GB efeETG_SI efeETG_GB
+    chieeETG_SI veneETG_SI veceETG_SI chieeETG_GB veneETG_GB veceETG_GB
+    efeITG_SI pfeITG_SI dfeITG_SI vteITG_SI vceITG_SI chieeITG_SI veneITG_SI veceITG_SI
+    efeITG_GB pfeITG_GB dfeITG_GB vteITG_GB vceITG_GB chieeITG_GB veneITG_GB veceITG_GB
+    efeTEM_SI pfeTEM_SI dfeTEM_SI vteTEM_SI vceTEM_SI chieeTEM_SI veneTEM_SI veceTEM_SI
+    efeTEM_GB pfeTEM_GB dfeTEM_GB vteTEM_GB vceTEM_GB chieeTEM_GB veneTEM_GB veceTEM_GB"""))
+VARIABLES.update(_group('output/', ('dimx', 'nions'), """
+    cki ceki dfi_SI vti_SI vri_SI vci_SI dfi_GB vti_GB vri_GB vci_GB
+    veni_SI veri_SI chiei_SI veci_SI veni_GB veri_GB chiei_GB veci_GB
+    pfi_SI pfi_GB efi_SI efi_GB vfi_SI vfi_GB
+    efiITG_SI pfiITG_SI vfiITG_SI dfiITG_SI vtiITG_SI vciITG_SI vriITG_SI
+    chieiITG_SI veniITG_SI veciITG_SI veriITG_SI
+    efiITG_GB pfiITG_GB vfiITG_GB dfiITG_GB vtiITG_GB vciITG_GB vriITG_GB
+    chieiITG_GB veniITG_GB veciITG_GB veriITG_GB
+    efiTEM_SI pfiTEM_SI vfiTEM_SI dfiTEM_SI vtiTEM_SI vciTEM_SI vriTEM_SI
+    chieiTEM_SI veniTEM_SI veciTEM_SI veriTEM_SI
+    efiTEM_GB pfiTEM_GB vfiTEM_GB dfiTEM_GB vtiTEM_GB vciTEM_GB vriTEM_GB
+    chieiTEM_GB veniTEM_GB veciTEM_GB veriTEM_GB"""))
+
+#: Input echoes in debug/ used as coordinates
+COORDINATES = {'x': ('debug/', ('dimx',)), 'kthetarhos': ('debug/', ('dimn',))}
+
+
+def parse_dat(filename, shape):
+    """Parse a .dat file written by writevar into an array of the Fortran shape."""
+    with open(filename, 'rb') as fh:
+        values = np.fromstring(fh.read().decode('ascii'), sep=' ')
+    if values.size != int(np.prod(shape)):
+        raise ValueError('%s holds %d values, expected shape %s'
+                         % (filename, values.size, shape))
+    if len(shape) < 3:
+        return values.reshape(shape)
+    # Pages of (dim1, dim2) rows, the last index varying slowest
+    ndim = len(shape)
+    pages = values.reshape(shape[:1:-1] + shape[:2])
+    return pages.transpose((ndim - 2, ndim - 1) + tuple(range(ndim - 3, -1, -1)))
+
+
+class QLKRun:
+    """Lazy, cached access to the variables of one QuaLiKiz run directory."""
+
+    def __init__(self, rundir='.', cache=True):
+        self.rundir = rundir
+        self.cache = cache
+        self.dims = self._read_dims()
+        self._h5 = None
+        self._loaded = {}
+
+    def _path(self, *parts):
+        return os.path.join(self.rundir, *parts)
+
+    def _h5file(self):
+        if self._h5 is None and os.path.exists(self._path(H5_FILE)):
+            try:
+                import h5py
+            except ImportError:
+                self._h5 = False
+            else:
+                self._h5 = h5py.File(self._path(H5_FILE), 'r')
+        return self._h5 or None
+
+    def _read_dims(self):
+        dims = dict(FIXED_DIMS)
+        for name in ('dimx', 'dimn', 'nions', 'numsols'):
+            filename = self._path('debug', name + '.dat')
+            if os.path.exists(filename):
+                dims[name] = int(parse_dat(filename, (1,))[0])
+        if 'dimx' not in dims and os.path.exists(self._path(H5_FILE)):
+            import h5py
+            with h5py.File(self._path(H5_FILE), 'r') as fh:
+                dims.update({name: int(val) for name, val in fh.attrs.items()})
+        dims['nions1'] = dims['nions'] + 1
+        return dims
+
+    def _sources(self, name):
+        """Text files holding name: [file] or [real file, imaginary file]."""
+        dirname = self._spec(name)[0]
+        plain = self._path(dirname, name + '.dat')
+        if os.path.exists(plain):
+            return [plain]
+        parts = [self._path(dirname, part + name + '.dat') for part in 'ri']
+        return parts if all(os.path.exists(part) for part in parts) else []
+
+    def _h5sources(self, name):
+        """Datasets holding name in output/qlkrun.h5, if newer than the text files."""
+        h5 = self._h5file()
+        if h5 is None:
+            return []
+        dirname = self._spec(name)[0]
+        names = [dirname + name] if dirname + name in h5 else \
+            [dirname + part + name for part in 'ri' if dirname + part + name in h5]
+        sources = self._sources(name)
+        if sources and max(map(os.path.getmtime, sources)) > os.path.getmtime(self._path(H5_FILE)):
+            return []
+        return names
+
+    @staticmethod
+    def _spec(name):
+        return VARIABLES.get(name) or COORDINATES[name]
+
+    def shape(self, name):
+        return tuple(self.dims[dim] for dim in self._spec(name)[1])
+
+    def is_complex(self, name):
+        return len(self._h5sources(name) or self._sources(name)) == 2
+
+    def exists(self, name):
+        return bool(self._h5sources(name) or self._sources(name))
+
+    @property
+    def names(self):
+        """Variables present in this run."""
+        return [name for name in VARIABLES if self.exists(name)]
+
+    def _cachefile(self, name):
+        return self._path(CACHE_DIR, self._spec(name)[0].replace('/', '_') + name + '.npy')
+
+    def load(self, name):
+        """Array of variable name in its Fortran dimension order."""
+        if name in self._loaded:
+            return self._loaded[name]
+        h5names = self._h5sources(name)
+        if h5names:
+            h5 = self._h5file()
+            parts = [h5[dset][()].T for dset in h5names]
+        else:
+            sources = self._sources(name)
+            if not sources:
+                raise KeyError('%s not found in %s' % (name, self.rundir))
+            cachefile = self._cachefile(name)
+            if (self.cache and os.path.exists(cachefile) and
+                    os.path.getmtime(cachefile) >= max(map(os.path.getmtime, sources))):
+                parts = [np.load(cachefile, mmap_mode='r')]
+            else:
+                parts = [parse_dat(source, self.shape(name)) for source in sources]
+                if self.cache:
+                    os.makedirs(self._path(CACHE_DIR), exist_ok=True)
+                    value = parts[0] if len(parts) == 1 else parts[0] + 1j * parts[1]
+                    np.save(cachefile, np.ascontiguousarray(value))
+                    parts = [value]
+        value = parts[0] if len(parts) == 1 else parts[0] + 1j * parts[1]
+        self._loaded[name] = value
+        return value
+
+    def close(self):
+        if self._h5:
+            self._h5.close()
+        self._h5 = None
+
+
+def load_variable(rundir, name, cache=True):
+    """Load a single variable of a run directory as a NumPy array."""
+    run = QLKRun(rundir, cache=cache)
+    try:
+        return np.asarray(run.load(name))
+    finally:
+        run.close()
+
+
+def open_run(rundir='.', cache=True):
+    """Open a run directory as an xarray Dataset with lazily loaded variables.
+
+    Dimensions are named as in the Fortran code (dimx, dimn, nions, numsols,
+    ...), with ``x`` and ``kthetarhos`` as coordinates when present.
+    """
+    import xarray as xr
+    from xarray.backends import BackendArray
+    from xarray.core import indexing
+
+    run = QLKRun(rundir, cache=cache)
+
+    class LazyVariable(BackendArray):
+        def __init__(self, name):
+            self.name = name
+            self.shape = run.shape(name)
+            self.dtype = np.dtype(complex if run.is_complex(name) else float)
+
+        def __getitem__(self, key):
+            return indexing.explicit_indexing_adapter(
+                key, self.shape, indexing.IndexingSupport.BASIC, self._getitem)
+
+        def _getitem(self, key):
+            return np.asarray(run.load(self.name)[key])
+
+    def variable(name):
+        data = indexing.LazilyIndexedArray(LazyVariable(name))
+        return xr.Variable(run._spec(name)[1], data)
+
+    data_vars = {name: variable(name) for name in run.names}
+    coords = {name: variable(name) for name in COORDINATES if run.exists(name)}
+    dataset = xr.Dataset(data_vars, coords=coords)
+    dataset.set_close(run.close)
+    return dataset
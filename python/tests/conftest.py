@@ -0,0 +1,22 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def scan_params():
+    """Two ion scan over three radial points, as in testcases/*/parameters.m."""
+    return dict(x=np.linspace(0.3, 0.7, 3), rho=np.linspace(0.3, 0.7, 3), Ro=3, Rmin=1,
+                Bo=3, q=2, smag=np.linspace(-0.5, 1.5, 3), alpha=0,
+                Te=8, ne=5, Ate=9, Ane=3,
+                Ti=[8, 8], normni=[0.9, 0.01], Ati=[9, 6], Ani=[3, -1],
+                Ai=[2, 12], Zi=[1, 6], typei=[1, 1],
+                maxpts=2.5e4, timeout=600, verbose=0)
+
+
+@pytest.fixture
+def params():
+    return scan_params()
@@ -0,0 +1,188 @@
+"""Tests of the in-process binding.
+
+The ctypes signature is checked against src/qlk_capi.f90 without the library.
+The runs are skipped unless libqualikiz.so is built (``make -C src
+libqualikiz.so``) or given in $QLK_LIBRARY.
+"""
+import ctypes
+import os
+import re
+
+import numpy as np
+import pytest
+
+from conftest import scan_params
+from qlkio import binding, build_inputs
+
+KTHETARHOS = [0.2, 0.4, 0.8]
+
+CAPI = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'qlk_capi.f90')
+
+
+def capi_signature():
+    """numout and the (kind, by value, rank) of every qualikiz_c argument."""
+    with open(CAPI) as fh:
+        source = fh.read()
+    source = re.sub(r'!.*', '', source)
+    source = re.sub(r'&\s*\n\s*&?', ' ', source)
+    numout = int(re.search(r'numout\s*=\s*(\d+)', source).group(1))
+    body = re.search(r'SUBROUTINE qualikiz_c\((.*?)\)\s*BIND\(C(.*?)END SUBROUTINE qualikiz_c',
+                     source, re.S)
+    decls = {}
+    for line in body.group(2).splitlines():
+        decl = re.match(r'\s*(INTEGER\(C_INT\)|REAL\(C_DOUBLE\)|TYPE\(C_PTR\))(.*?)::(.*)', line)
+        if decl:
+            dims = re.search(r'DIMENSION\(([^)]*)\)', decl.group(2))
+            rank = len(dims.group(1).split(',')) if dims else 0
+            for name in decl.group(3).split(','):
+                decls[name.strip()] = (decl.group(1), 'VALUE' in decl.group(2), rank)
+    names = [name.strip() for name in body.group(1).split(',')]
+    return numout, [decls[name] for name in names]
+
+
+class FakeLibrary:
+    """Stands in for ctypes.CDLL to capture what load_library sets up."""
+
+    def __init__(self, path, mode=0):
+        numout = capi_signature()[0]
+        self.qualikiz_c = type('Function', (), {})()
+        self.qualikiz_c_numout = type('Function', (), {'__call__': lambda self: numout})()
+        self.qualikiz_c_finalize = lambda: None
+
+
+def test_signature(monkeypatch):
+    monkeypatch.setattr(binding.ctypes, 'CDLL', FakeLibrary)
+    monkeypatch.setattr(binding.atexit, 'register', lambda func: None)
+    monkeypatch.setattr(binding, '_lib', None)
+    argtypes = binding.load_library('libqualikiz.so').qualikiz_c.argtypes
+    numout, fortran = capi_signature()
+    assert numout == len(binding.OUTPUTS)
+    assert len(argtypes) == len(fortran)
+    for i, ((kind, value, rank), argtype) in enumerate(zip(fortran, argtypes)):
+        if kind == 'TYPE(C_PTR)' and value:
+            assert argtype is ctypes.c_void_p, i
+        elif kind == 'TYPE(C_PTR)':
+            assert issubclass(argtype, ctypes.Array), i
+            assert (argtype._type_, argtype._length_) == (ctypes.c_void_p, numout), i
+        elif value:
+            assert rank == 0, i
+            assert argtype is {'INTEGER(C_INT)': ctypes.c_int,
+                               'REAL(C_DOUBLE)': ctypes.c_double}[kind], i
+        else:
+            assert argtype._dtype_ == {'INTEGER(C_INT)': np.intc,
+                                       'REAL(C_DOUBLE)': np.float64}[kind], i
+            assert argtype._ndim_ == rank, i
+            assert argtype._flags_ == np.ctypeslib.ndpointer(flags='F_CONTIGUOUS')._flags_, i
+
+
+@pytest.fixture(scope='module')
+def lib():
+    try:
+        return binding.load_library()
+    except OSError as err:
+        pytest.skip('libqualikiz.so not available: %s' % err)
+
+
+@pytest.fixture(scope='module')
+def reference(lib):
+    """Serial run of the two ion scan."""
+    inputs = build_inputs(KTHETARHOS, **scan_params())
+    return inputs, binding.run(inputs, outputs=binding.DEFAULT_OUTPUTS + ('sol', 'fdsol'))
+
+
+def assert_fluxes_close(result, expected, rtol):
+    for name in binding.DEFAULT_OUTPUTS:
+        scale = np.max(np.abs(expected[name]))
+        np.testing.assert_allclose(result[name], expected[name], rtol=rtol, atol=rtol * scale,
+                                   err_msg=name)
+
+
+def test_outputs(reference):
+    inputs, result = reference
+    assert set(result) == set(binding.DEFAULT_OUTPUTS) | {'sol', 'fdsol'}
+    assert result['efi_SI'].shape == (3, 2)
+    assert result['gam_GB'].shape == (3, 3, int(inputs['numsols']))
+    assert result['sol'].dtype == complex
+    for name, val in result.items():
+        assert np.all(np.isfinite(val)), name
+    assert np.any(result['gam_GB'] > 0)
+    assert np.all(result['efe_SI'] > 0)
+
+
+def test_unknown_output(reference):
+    inputs, _ = reference
+    with pytest.raises(ValueError, match='Unknown QuaLiKiz outputs: efe'):
+        binding.run(inputs, outputs=('efe',))
+
+
+def test_out_reused(reference):
+    inputs, result = reference
+    out = {name: np.zeros_like(val, order='F') for name, val in result.items()}
+    again = binding.run(inputs, outputs=tuple(out), out=out)
+    for name in out:
+        assert again[name] is out[name]
+    assert_fluxes_close(again, result, 1e-10)
+
+
+@pytest.mark.parametrize('settings', [
+    dict(nthreads=2),
+    dict(nthreads=2, sched_meth=1),
+    dict(nthreads=2, sched_meth=2, sched_chunk=1),
+])
+def test_threads_and_schedulers(reference, settings):
+    inputs, result = reference
+    inputs = dict(inputs, **{name: float(val) for name, val in settings.items()})
+    assert_fluxes_close(binding.run(inputs), result, 1e-10)
+
+
+def test_contchain(reference):
+    inputs, result = reference
+    inputs = dict(inputs, sched_meth=1., contchain=1.)
+    assert_fluxes_close(binding.run(inputs), result, 1e-3)
+
+
+@pytest.mark.parametrize('settings', [
+    dict(localrefine=1),
+    dict(periodicquad=1),
+    dict(localrefine=1, periodicquad=1),
+])
+def test_contour_options(reference, settings):
+    inputs, result = reference
+    inputs = dict(inputs, **{name: float(val) for name, val in settings.items()})
+    assert_fluxes_close(binding.run(inputs), result, 5e-3)
+
+
+def test_newtonderiv(lib):
+    # With the integrals converged well below the Newton tolerance, the integrated
+    # Jacobian and the ndif differences refine the contour solutions to the same modes
+    inputs = build_inputs(KTHETARHOS, **dict(scan_params(), relacc1=1e-4, relacc2=1e-3))
+    outputs = binding.DEFAULT_OUTPUTS + ('sol',)
+    differences = binding.run(inputs, outputs=outputs)
+    integrated = binding.run(dict(inputs, newtonderiv=1.), outputs=outputs)
+    np.testing.assert_allclose(integrated['sol'], differences['sol'], rtol=2e-3)
+    assert_fluxes_close(integrated, differences, 5e-3)
+
+
+def test_solcache(reference, tmp_path, monkeypatch):
+    # Every task of the second run is read from the entries of the first: none is
+    # computed again, so none is written again
+    inputs, result = reference
+    inputs = dict(inputs, solcache=1.)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'solcache').mkdir()
+    first = binding.run(inputs)
+    entries = {path.name: path.stat().st_ino for path in (tmp_path / 'solcache').iterdir()}
+    assert len(entries) == result['gam_GB'].shape[0] * result['gam_GB'].shape[1]
+    assert all(name.endswith('.bin') for name in entries)
+    second = binding.run(inputs)
+    assert {path.name: path.stat().st_ino for path in (tmp_path / 'solcache').iterdir()} == entries
+    assert_fluxes_close(first, result, 1e-10)
+    assert_fluxes_close(second, first, 0)
+
+
+def test_restart(reference):
+    inputs, result = reference
+    again = binding.run(inputs, oldsol=result['sol'], oldfdsol=result['fdsol'], runcounter=1)
+    assert_fluxes_close(again, result, 1e-3)
+    with pytest.raises(ValueError, match='oldsol and oldfdsol'):
+        binding.run(inputs, oldsol=result['sol'][:1], oldfdsol=result['fdsol'], runcounter=1)
@@ -0,0 +1,124 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from qlkio import build_inputs, validate, write_bins, write_bundle
+from qlkio.inputs import BUNDLE_MAGIC, BUNDLE_VERSION, IONS, RADIAL, SCALARS
+
+KTHETARHOS = [0.1, 0.25, 0.4, 0.6, 1.0]
+
+
+def test_shapes(params):
+    inputs = build_inputs(KTHETARHOS, **params)
+    assert (inputs['dimx'], inputs['dimn'], inputs['nions']) == (3, 5, 2)
+    for name in RADIAL:
+        assert inputs[name].shape == (3,)
+    for name in IONS:
+        assert inputs[name].shape == (3, 2)
+    np.testing.assert_array_equal(inputs['smag'], [-0.5, 0.5, 1.5])
+    np.testing.assert_array_equal(inputs['Zi'], [[1, 6]] * 3)
+    assert inputs['maxpts'] == 2.5e4
+    assert inputs['numsols'] == SCALARS['numsols']
+    assert 'sched_meth' not in inputs
+
+
+def test_quasineutrality(params):
+    inputs = build_inputs(KTHETARHOS, **params)
+    validate(inputs)
+    zn = np.sum(inputs['Zi'] * inputs['normni'], axis=1)
+    zna = np.sum(inputs['Zi'] * inputs['normni'] * inputs['Ani'], axis=1)
+    np.testing.assert_allclose(zn, 1)
+    np.testing.assert_allclose(zna, inputs['Ane'])
+    np.testing.assert_allclose(inputs['normni'][:, 0], 0.94)
+
+
+def test_gradient_on_electrons(params):
+    inputs = build_inputs(KTHETARHOS, set_Ani1=False, **params)
+    validate(inputs)
+    np.testing.assert_array_equal(inputs['Ani'][:, 0], 3)
+    np.testing.assert_allclose(inputs['Ane'], 0.94 * 3 - 0.06)
+
+
+def test_tracers_excluded(params):
+    params['typei'] = [1, 3]
+    inputs = build_inputs(KTHETARHOS, **params)
+    validate(inputs)
+    np.testing.assert_allclose(inputs['normni'][:, 0], 1)
+
+
+def test_optional_scalars(params):
+    inputs = build_inputs(KTHETARHOS, sched_meth=2, sched_chunk=4, contchain=3,
+                          nthreads=2, newtonderiv=1, localrefine=1, periodicquad=0, solcache=1,
+                          **params)
+    assert (inputs['sched_meth'], inputs['sched_chunk'], inputs['contchain'],
+            inputs['nthreads'], inputs['newtonderiv']) == (2, 4, 3, 2, 1)
+    assert (inputs['localrefine'], inputs['periodicquad'], inputs['solcache']) == (1, 0, 1)
+
+
+def test_unknown_and_missing(params):
+    with pytest.raises(ValueError, match='Unknown QuaLiKiz inputs: contchan'):
+        build_inputs(KTHETARHOS, contchan=1, **params)
+    del params['Te']
+    with pytest.raises(ValueError, match='Missing QuaLiKiz inputs: Te'):
+        build_inputs(KTHETARHOS, **params)
+
+
+def test_radial_shape_mismatch(params):
+    params['q'] = [2, 3]
+    with pytest.raises(ValueError):
+        build_inputs(KTHETARHOS, **params)
+
+
+def test_validate_errors(params):
+    inputs = build_inputs(KTHETARHOS, **params)
+    inputs['Te'][1] = 0
+    inputs['typei'][0, 1] = 5
+    inputs['normni'][0, 1] += 0.01
+    with pytest.raises(ValueError) as err:
+        validate(inputs)
+    message = str(err.value)
+    assert 'Te is not positive at 1 points' in message
+    assert 'typei is not 1, 2, 3 or 4 at 1 points' in message
+    assert 'quasineutrality violated at 1 points' in message
+
+    inputs = build_inputs(KTHETARHOS, **params)
+    inputs['Ti'] = inputs['Ti'][:, :1]
+    with pytest.raises(ValueError, match='Ti must have shape'):
+        validate(inputs)
+
+
+def test_write_bins(params, tmp_path):
+    inputs = build_inputs(KTHETARHOS, **params)
+    write_bins(inputs, str(tmp_path))
+    assert sorted(os.listdir(str(tmp_path))) == sorted(name + '.bin' for name in inputs)
+    for name, val in inputs.items():
+        data = np.fromfile(str(tmp_path / (name + '.bin')), dtype=np.float64)
+        np.testing.assert_array_equal(data, np.ravel(val, order='F'))
+
+
+def test_write_bundle(params, tmp_path):
+    inputs = build_inputs(KTHETARHOS, sched_meth=1, **params)
+    filename = str(tmp_path / 'input' / 'qlkinput.bin')
+    write_bundle(inputs, filename)
+    with open(filename, 'rb') as fh:
+        raw = fh.read()
+    assert raw[:8] == BUNDLE_MAGIC
+    version, nvars = struct.unpack_from('=ii', raw, 8)
+    assert (version, nvars) == (BUNDLE_VERSION, len(inputs))
+    offset = 16 + 20 * nvars
+    for i in range(nvars):
+        name = raw[16 + 20 * i:32 + 20 * i].decode('ascii').rstrip()
+        count, = struct.unpack_from('=i', raw, 32 + 20 * i)
+        data = np.frombuffer(raw, dtype=np.float64, count=count, offset=offset)
+        np.testing.assert_array_equal(data, np.ravel(inputs[name], order='F'))
+        offset += 8 * count
+    assert offset == len(raw)
+
+
+def test_bundle_name_length(params, tmp_path):
+    inputs = build_inputs(KTHETARHOS, **params)
+    inputs['a_name_longer_than_16'] = 0.
+    with pytest.raises(ValueError, match='16 characters'):
+        write_bundle(inputs, str(tmp_path / 'qlkinput.bin'))
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pytest
+
+from qlkio import QLKRun, load_variable, open_run
+from qlkio.outputs import CACHE_DIR, H5_FILE, parse_dat
+
+DIMS = {'dimx': 3, 'dimn': 4, 'nions': 2, 'numsols': 2}
+
+
+def write_dat(filename, value):
+    """Write value as writevar in src/diskio.f90 does: rows of the first two
+    indices, in pages with the last index varying slowest."""
+    value = np.asarray(value, dtype=float)
+    if value.ndim < 2:
+        rows = value.reshape(-1, 1)
+    else:
+        ndim = value.ndim
+        pages = value.transpose(tuple(range(ndim - 1, 1, -1)) + (0, 1))
+        rows = pages.reshape(-1, value.shape[1])
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as fh:
+        for row in rows:
+            fh.write(''.join('%16.7E' % val for val in row) + '\n')
+
+
+@pytest.fixture
+def rundir(tmp_path):
+    """Synthetic run directory with a few variables of every rank."""
+    rng = np.random.default_rng(0)
+    rundir = str(tmp_path)
+    for name, val in DIMS.items():
+        write_dat(os.path.join(rundir, 'debug', name + '.dat'), [val])
+    values = {
+        'x': np.linspace(0.3, 0.7, 3),
+        'kthetarhos': np.array([0.1, 0.2, 0.4, 0.8]),
+        'efe_SI': rng.standard_normal(3),
+        'efi_SI': rng.standard_normal((3, 2)),
+        'gam_GB': rng.standard_normal((3, 4, 2)),
+        'Lcirci': rng.standard_normal((3, 4, 2, 2)),
+        'sol': rng.standard_normal((3, 4, 2)) + 1j * rng.standard_normal((3, 4, 2)),
+    }
+    dirs = {'x': 'debug', 'kthetarhos': 'debug', 'efe_SI': 'output', 'efi_SI': 'output',
+            'gam_GB': 'output', 'Lcirci': 'output/primitive', 'sol': 'output/primitive'}
+    for name, val in values.items():
+        if np.iscomplexobj(val):
+            write_dat(os.path.join(rundir, dirs[name], 'r' + name + '.dat'), val.real)
+            write_dat(os.path.join(rundir, dirs[name], 'i' + name + '.dat'), val.imag)
+        else:
+            write_dat(os.path.join(rundir, dirs[name], name + '.dat'), val)
+    return rundir, values
+
+
+def test_parse_dat(tmp_path):
+    value = np.arange(24.).reshape((2, 3, 4), order='F')
+    filename = str(tmp_path / 'var.dat')
+    write_dat(filename, value)
+    np.testing.assert_array_equal(parse_dat(filename, (2, 3, 4)), value)
+    with pytest.raises(ValueError, match='holds 24 values'):
+        parse_dat(filename, (2, 3, 5))
+
+
+def test_load(rundir):
+    rundir, values = rundir
+    run = QLKRun(rundir, cache=False)
+    assert run.dims['dimx'] == 3 and run.dims['nions1'] == 3
+    assert set(run.names) == {'efe_SI', 'efi_SI', 'gam_GB', 'Lcirci', 'sol'}
+    assert run.is_complex('sol') and not run.is_complex('gam_GB')
+    for name, val in values.items():
+        np.testing.assert_allclose(run.load(name), val, rtol=1e-7)
+    with pytest.raises(KeyError):
+        run.load('pfe_SI')
+    assert not os.path.exists(os.path.join(rundir, CACHE_DIR))
+
+
+def test_cache(rundir):
+    rundir, values = rundir
+    np.testing.assert_allclose(load_variable(rundir, 'Lcirci'), values['Lcirci'], rtol=1e-7)
+    cachefile = os.path.join(rundir, CACHE_DIR, 'output_primitive_Lcirci.npy')
+    assert os.path.exists(cachefile)
+    np.save(cachefile, np.zeros((3, 4, 2, 2)))
+    assert not load_variable(rundir, 'Lcirci').any()
+
+    # A rewritten source file invalidates the cache entry
+    source = os.path.join(rundir, 'output', 'primitive', 'Lcirci.dat')
+    mtime = os.path.getmtime(cachefile) + 10
+    os.utime(source, (mtime, mtime))
+    np.testing.assert_allclose(load_variable(rundir, 'Lcirci'), values['Lcirci'], rtol=1e-7)
+
+
+def test_h5(rundir):
+    h5py = pytest.importorskip('h5py')
+    rundir, values = rundir
+    os.remove(os.path.join(rundir, 'output', 'gam_GB.dat'))
+    with h5py.File(os.path.join(rundir, H5_FILE), 'w') as fh:
+        fh['output/gam_GB'] = 2 * values['gam_GB'].T
+        fh['output/efe_SI'] = 2 * values['efe_SI'].T
+    mtime = os.path.getmtime(os.path.join(rundir, H5_FILE)) - 10
+    os.utime(os.path.join(rundir, 'output', 'efe_SI.dat'), (mtime, mtime))
+
+    run = QLKRun(rundir, cache=False)
+    try:
+        np.testing.assert_array_equal(run.load('gam_GB'), 2 * values['gam_GB'])
+        np.testing.assert_array_equal(run.load('efe_SI'), 2 * values['efe_SI'])
+    finally:
+        run.close()
+
+    # The text files win when they are newer than qlkrun.h5
+    mtime += 20
+    os.utime(os.path.join(rundir, 'output', 'efe_SI.dat'), (mtime, mtime))
+    np.testing.assert_allclose(load_variable(rundir, 'efe_SI', cache=False),
+                               values['efe_SI'], rtol=1e-7)
+
+
+def test_open_run(rundir):
+    pytest.importorskip('xarray')
+    rundir, values = rundir
+    dataset = open_run(rundir)
+    try:
+        assert dataset['Lcirci'].dims == ('dimx', 'dimn', 'nions', 'numsols')
+        assert dataset['sol'].dtype == complex
+        np.testing.assert_allclose(dataset['kthetarhos'], values['kthetarhos'], rtol=1e-7)
+        np.testing.assert_allclose(dataset['gam_GB'][1, :, 0], values['gam_GB'][1, :, 0],
+                                   rtol=1e-7)
+        np.testing.assert_allclose(dataset['sol'].values, values['sol'], rtol=1e-7)
+    finally:
+        dataset.close()
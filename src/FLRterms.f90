@@ -2,6 +2,7 @@ MODULE FLRterms
   USE kind
   USE datmat
   USE datcal
+  USE mod_cubature
 
   IMPLICIT NONE
 
@@ -21,14 +22,14 @@ CONTAINS
 
     !Trapped electrons
     ifailloc = 1
-    Joe2p = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep,lw,ifailloc)
+    Joe2p = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of J0e2p FLR integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    J1e2p = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep1,lw,ifailloc)
+    J1e2p = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep1,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of J1e2p FLR integration at p=',p,', nu=',nu
@@ -36,14 +37,14 @@ CONTAINS
 
     DO ion = 1,nions
        ifailloc = 1
-       Joi2p(ion) = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip,lw,ifailloc)
+       Joi2p(ion) = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip,lw,ifailloc)
        IF (ifailloc /= 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
                &'. Abnormal termination of J0i2p FLR integration at p=',p,', nu=',nu
        ENDIF
 
        ifailloc = 1
-       J1i2p(ion) = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip1,lw,ifailloc)
+       J1i2p(ion) = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip1,lw,ifailloc)
        IF (ifailloc /= 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
                &'. Abnormal termination of J1i2p FLR integration at p=',p,', nu=',nu
@@ -67,13 +68,13 @@ CONTAINS
 
     !Trapped electrons
     ifailloc = 1
-    Joe2p = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLReprot,lw,ifailloc)
+    Joe2p = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLReprot,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of J0e2p FLR integration at p=',p,', nu=',nu
     ENDIF
     ifailloc = 1
-    J1e2p = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep1rot,lw,ifailloc)
+    J1e2p = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRep1rot,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of J0e2p FLR integration at p=',p,', nu=',nu
@@ -82,14 +83,14 @@ CONTAINS
     !Trapped ions
     DO ion = 1,nions
        ifailloc = 1
-       Joi2p(ion) = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRiprot,lw,ifailloc)
+       Joi2p(ion) = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRiprot,lw,ifailloc)
        IF (ifailloc /= 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
                &'. Abnormal termination of J0i2p FLR integration at p=',p,', nu=',nu
        ENDIF
 
        ifailloc = 1                                
-       J1i2p(ion) = d01ahf(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip1rot,lw,ifailloc)
+       J1i2p(ion) = quad1d(minFLR,maxFLR,epsFLR,npts,relerr,nFLRip1rot,lw,ifailloc)
        IF (ifailloc /= 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I0,A,I0)") 'ifailloc = ',ifailloc,&
                &'. Abnormal termination of J1i2p FLR integration at p=',p,', nu=',nu
@@ -2,6 +2,7 @@ MODULE asymmetry
   USE kind
   USE datmat
   USE datcal
+  USE mod_cubature
   IMPLICIT NONE
 
   !Module for calculating density poloidal asymmetries based on centrifugal force and temperature anisotropies (i.e. from heating)
@@ -273,35 +274,35 @@ CONTAINS
 
           !Calculate the flux surface averaged e0 coefficient. 
           ifailloc = 1
-          ecoefs(irad,ion,1) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e01,lw2,ifailloc)
+          ecoefs(irad,ion,1) = quad1d(thmin,thmax,epsFLR,npts,relerr,e01,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 1 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
           !Calculate the flux surface averaged e1 coefficient. 
 
           ifailloc = 1
-          ecoefs(irad,ion,2) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e11,lw2,ifailloc)
+          ecoefs(irad,ion,2) = quad1d(thmin,thmax,epsFLR,npts,relerr,e11,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 2 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
           !Calculate the flux surface averaged e2 coefficient. 
 
           ifailloc = 1
-          ecoefs(irad,ion,3) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e21,lw2,ifailloc)
+          ecoefs(irad,ion,3) = quad1d(thmin,thmax,epsFLR,npts,relerr,e21,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 3 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
           !Calculate the flux surface averaged e3 coefficient. PROBLEM HERE
 
           ifailloc = 1
-          ecoefs(irad,ion,4) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e31,lw2,ifailloc)
+          ecoefs(irad,ion,4) = quad1d(thmin,thmax,epsFLR,npts,relerr,e31,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 4 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
           !Calculate the flux surface averaged e4 coefficient. 
 
           ifailloc = 1
-          ecoefs(irad,ion,5) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e41,lw2,ifailloc)
+          ecoefs(irad,ion,5) = quad1d(thmin,thmax,epsFLR,npts,relerr,e41,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 5 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
@@ -310,26 +311,26 @@ CONTAINS
 
           !Calculate the flux surface averaged e6 coefficient (new coefficient not defined in GKW Manual) 
           ifailloc = 1
-          ecoefs(irad,ion,7) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e61,lw2,ifailloc)
+          ecoefs(irad,ion,7) = quad1d(thmin,thmax,epsFLR,npts,relerr,e61,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 7 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
 
           !e0-6, then <R/Ln>, <n>, and (nmax-nmin)/<n>
           ifailloc = 1
-          ecoefs(irad,ion,8) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e71,lw2,ifailloc)
+          ecoefs(irad,ion,8) = quad1d(thmin,thmax,epsFLR,npts,relerr,e71,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 8 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
 
           ifailloc = 1
-          ecoefs(irad,ion,9) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e81,lw2,ifailloc)
+          ecoefs(irad,ion,9) = quad1d(thmin,thmax,epsFLR,npts,relerr,e81,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 9 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
 
           ifailloc = 1
-          ecoefs(irad,ion,10) = d01ahf(thmin,thmax,epsFLR,npts,relerr,e91,lw2,ifailloc)
+          ecoefs(irad,ion,10) = quad1d(thmin,thmax,epsFLR,npts,relerr,e91,lw2,ifailloc)
           IF (ifailloc .NE. 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef failed for coef 10 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
           ENDIF
@@ -787,7 +788,7 @@ CONTAINS
 
     !Calculate integration norm
     ifailloc = 1
-    intnorm = d01ahf(thmin,thmax,relacc1,npts,relerr,FSAnorm,lw2,ifailloc)
+    intnorm = quad1d(thmin,thmax,relacc1,npts,relerr,FSAnorm,lw2,ifailloc)
     IF (ifailloc .NE. 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau normalization failed with ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
     ENDIF
@@ -798,31 +799,31 @@ CONTAINS
 
        !Calculate the flux surface averaged e0 coefficient. 
        ifailloc = 1
-       ecoefsgau(irad,inu,ion,0) = d01ahf(thmin,thmax,relacc1,npts,relerr,e01d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,0) = quad1d(thmin,thmax,relacc1,npts,relerr,e01d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 0 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        !Calculate the flux surface averaged e1 coefficient. 
        ifailloc = 1
-       ecoefsgau(irad,inu,ion,1) = d01ahf(thmin,thmax,relacc1,npts,relerr,e11d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,1) = quad1d(thmin,thmax,relacc1,npts,relerr,e11d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 1 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        !Calculate the flux surface averaged e2 coefficient. 
        ifailloc = 1
-       ecoefsgau(irad,inu,ion,2) = d01ahf(thmin,thmax,relacc1,npts,relerr,e21d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,2) = quad1d(thmin,thmax,relacc1,npts,relerr,e21d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 2 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        !Calculate the flux surface averaged e3 coefficient. 
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,3) = d01ahf(thmin,thmax,relacc1,npts,relerr,e31d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,3) = quad1d(thmin,thmax,relacc1,npts,relerr,e31d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 3 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        !Calculate the flux surface averaged e4 coefficient. 
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,4) = d01ahf(thmin,thmax,relacc1,npts,relerr,e41d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,4) = quad1d(thmin,thmax,relacc1,npts,relerr,e41d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 4 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
@@ -830,23 +831,23 @@ CONTAINS
 
        !Calculate the flux surface averaged e6 coefficient (new coefficient not defined in GKW Manual) 
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,6) = d01ahf(thmin,thmax,relacc1,npts,relerr,e61d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,6) = quad1d(thmin,thmax,relacc1,npts,relerr,e61d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 6 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        !e0-6, then <R/Ln>, <n>, and (nmax-nmin)/<n>
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,7) = d01ahf(thmin,thmax,relacc1,npts,relerr,e71d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,7) = quad1d(thmin,thmax,relacc1,npts,relerr,e71d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 7 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,8) = d01ahf(thmin,thmax,relacc1,npts,relerr,e81d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,8) = quad1d(thmin,thmax,relacc1,npts,relerr,e81d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 8 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
        ifailloc = 1 
-       ecoefsgau(irad,inu,ion,9) = d01ahf(thmin,thmax,relacc1,npts,relerr,e91d,lw2,ifailloc)
+       ecoefsgau(irad,inu,ion,9) = quad1d(thmin,thmax,relacc1,npts,relerr,e91d,lw2,ifailloc)
        IF (ifailloc .NE. 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stdout,*) 'e-coef gau failed for coef 9 in list. ifailloc=',ifailloc,'. irad=,',irad,'. ion=',ion
        ENDIF
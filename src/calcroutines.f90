@@ -2,6 +2,7 @@ MODULE calcroutines
   USE kind
   USE datcal
   USE datmat
+  USE mod_cubature
   USE FLRterms !module contain functions defining all the FLR terms 
   USE mod_fluidsol !module which calculates the fluid growth rate and frequencies
   USE mod_contour !module which contains contour routines
@@ -10,6 +11,7 @@ MODULE calcroutines
   USE QLflux
   USE asymmetry
   USE nanfilter
+  !$ USE omp_lib, ONLY : omp_init_lock, omp_destroy_lock, omp_set_lock, omp_unset_lock
 
   IMPLICIT NONE
 
@@ -32,14 +34,33 @@ CONTAINS
     REAL(kind=DBL),    DIMENSION(numsols) :: isol,rsol,ifdsol,rfdsol,tmpsol
     INTEGER :: NN, i,j,npts, ifailloc,minlocind
     INTEGER, DIMENSION(1) :: minloci
-    LOGICAL :: issol
+    LOGICAL :: issol, warm, hit
+    COMPLEX(kind=DBL), DIMENSION(numsols) :: seedsol
+
+    ! Variables for the contours searched concurrently
+    COMPLEX(kind=DBL), DIMENSION(:),   ALLOCATABLE :: Centres
+    REAL(kind=DBL),    DIMENSION(:),   ALLOCATABLE :: rints
+    COMPLEX(kind=DBL), DIMENSION(:,:), ALLOCATABLE :: solls, fdsolls
+    INTEGER,           DIMENSION(:),   ALLOCATABLE :: NNs
+    INTEGER :: ncont, pass, k, nthr
+    LOGICAL :: timedout, skip
     REAL(kind=DBL) :: kteta,maxdia
     REAL(KIND=DBL) :: maxklam,minklam,relerr
 
     CHARACTER(len=20) :: fmtn
     INTEGER :: myunit=700
+    INTEGER(KIND=8), DIMENSION(:), ALLOCATABLE :: cachekey
+    CHARACTER(len=LEN(solcachedir)+20) :: cachefile
 
 
+    !Output of a task with the same inputs from the solution cache (see solcache in datmat).
+    !The key is built once here, from the task inputs, and the entry is written under the same key
+    IF (solcache .AND. (runcounter == 0)) THEN
+       CALL solcachekey(p,nu,cachekey,cachefile)
+       CALL readsolcache(p,nu,cachekey,cachefile,hit)
+       IF (hit) RETURN
+    ENDIF
+
     !INITIALIZATION OF VARIABLES************************
 
     !IF ( ( p /= 1 ) .OR. ( nu /= 1)) THEN
@@ -73,6 +94,13 @@ CONTAINS
 
     normkr = normkrfac*ntor(p,nu) !sets boundary in kr integrations
 
+    !Start every task from the unmodified profiles. Machi, Aui and gammaE are threadprivate and swapped
+    !(and Machi clamped in the rotating QL integrands) inside a task, so without this the state seen
+    !by a task would depend on which tasks its thread ran before
+    IF (rot_flag == 2) THEN
+       Machi=Machiorig; Aui=Auiorig; gammaE=gammaEorig;
+    ENDIF
+
     !**************************************************
 
     !CALCULATION PHASE. TWO OPTIONS: calculate from scratch, or start directly from newton solver with inputs from a previous run
@@ -188,32 +216,32 @@ CONTAINS
 
     alamnorm = fc(p) !to be consistent with passing particle fraction
 
-    alam1=d01ahf(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam1int,lw,ifailloc)/alamnorm !pitch angle average of sqrt(1-lambda*b)
+    alam1=quad1d(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam1int,lw,ifailloc)/alamnorm !pitch angle average of sqrt(1-lambda*b)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I3)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of alam1 integration at p=',p,', nu=',nu
     ENDIF
 
     !pitch angle average of (1-lambda*b)
-    alam2=d01ahf(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam2int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)
+    alam2=quad1d(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam2int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I3)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of alam2 integration at p=',p,', nu=',nu
     ENDIF
 
-    alam3=d01ahf(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam3int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^3/2
+    alam3=quad1d(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam3int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^3/2
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I3)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of alam3 integration at p=',p,', nu=',nu
     ENDIF
 
-    alam4=d01ahf(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam4int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^2
+    alam4=quad1d(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam4int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^2
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I3)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of alam4 integration at p=',p,', nu=',nu
     ENDIF
 
-    alam5=d01ahf(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam5int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^5/2
+    alam5=quad1d(0.,1.-2.*epsilon(p),relacc1,npts,relerr,alam5int,lw,ifailloc)/alamnorm !pitch angle average of (1-lambda*b)^5/2
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I3)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of alam5 integration at p=',p,', nu=',nu
@@ -239,14 +267,32 @@ CONTAINS
 
     omegmax=ommax(p,nu) ! used in calculsol for maximum boundary of allowed solution
 
-    IF (runcounter /=0) THEN !launch newton solver from previous run
+    !Start an empty fonct cache for this task. Everything calcfonct reads is fixed from here on
+    CALL newfonctcache()
+
+    !Seeds for launching the Newton solver directly: the solutions of the previous run, or in a chain
+    !the solutions of the previous kthetarhos (normalized to nwg, they vary slowly with kthetarhos).
+    !A chain does the full contour search every contchain tasks, after a change of ETG_flag and
+    !when the previous task had no unstable solution, so that new modes are picked up
+    warm = .FALSE.
+    IF (runcounter /=0) THEN
+       seedsol(:) = oldsol(p,nu,:)
+       warm = .TRUE.
+    ELSEIF (chaining .AND. (nu > 1)) THEN
+       IF ( (MOD(nu-1,MAX(contchain,1)) /= 0) .AND. (ETG_flag(nu) .EQV. ETG_flag(nu-1)) .AND. ANY(AIMAG(sol(p,nu-1,:)) > epsD) ) THEN
+          seedsol(:) = sol(p,nu-1,:)
+          warm = .TRUE.
+       ENDIF
+    ENDIF
+
+    IF (warm) THEN !launch newton solver from the seeds
        DO j=1,numsols
-          IF ( ABS(AIMAG(oldsol(p,nu,j))) < epsD ) THEN !There was no solution before, so stay with 0
+          IF ( ABS(AIMAG(seedsol(j))) < epsD ) THEN !There was no solution before, so stay with 0
              soll(j)   = (0.,0.)
              fdsoll(j) = (0.,0.)
           ELSE
 
-             IF ( (gkw_is_nan(AIMAG(oldsol(p,nu,j)))) .OR. (gkw_is_nan(REAL(oldsol(p,nu,j))))) THEN
+             IF ( (gkw_is_nan(AIMAG(seedsol(j)))) .OR. (gkw_is_nan(REAL(seedsol(j))))) THEN
                 IF (verbose .EQV. .TRUE.) THEN 
                    WRITE(stderr,'(A,I7,A,I2,A)') 'Jump to Newton phase: old solution had a NaN (how did that happen)! Skipping solution. (p,nu)=(',p,',',nu,')'
                 ENDIF
@@ -255,7 +301,7 @@ CONTAINS
                 CYCLE
              ENDIF
 
-             IF ( (AIMAG(oldsol(p,nu,j)) < 0. ) .OR. (ABS(AIMAG(oldsol(p,nu,j))) > ABS(AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(oldsol(p,nu,j))) > ABS(REAL(ommax(p,nu))))  ) THEN
+             IF ( (AIMAG(seedsol(j)) < 0. ) .OR. (ABS(AIMAG(seedsol(j))) > ABS(AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(seedsol(j))) > ABS(REAL(ommax(p,nu))))  ) THEN
                 IF (verbose .EQV. .TRUE.) THEN
                    WRITE(stderr,'(A,I7,A,I2,A)') 'Jump to Newton phase: old solution outside of allowed contour range (how did that happen?) Skipping solution. (p,nu)=(',p,',',nu,')'
                 ENDIF
@@ -265,8 +311,8 @@ CONTAINS
              ENDIF
 
              IF ( ( rho(p) >= rhomin ) .AND. ( rho(p) <= rhomax) ) THEN !check if rho is within the defined range, otherwise return zero
-                CALL calcfonct(p, nu, oldsol(p,nu,j), fonout) !Get new distance from solution from old solution and new input parameters
-                CALL newton(p, nu, oldsol(p,nu,j), fonout, newsol, newfdsol) !Now refine the solution to the new solution
+                CALL calcfonct(p, nu, seedsol(j), fonout) !Get new distance from solution from old solution and new input parameters
+                CALL newton(p, nu, seedsol(j), fonout, newsol, newfdsol) !Now refine the solution to the new solution
              ELSE
                 newsol = 0.
                 newfdsol = 0.
@@ -291,7 +337,24 @@ CONTAINS
           ENDIF
        ENDDO
 
-    ELSE !launch contour solutions
+       IF (runcounter == 0) THEN
+          !Seeds of a chain converging to the same solution: only one is kept, as in calculsol
+          DO j = 1,numsols-1
+             DO k = j+1,numsols
+                IF (ABS(soll(j)) > epsD) THEN
+                   IF (ABS(soll(k)-soll(j))/ABS(soll(j)) < soldel) THEN
+                      soll(k) = (0.,0.)
+                      fdsoll(k) = (0.,0.)
+                   ENDIF
+                ENDIF
+             ENDDO
+          ENDDO
+          !Nothing could be tracked from the previous kthetarhos: fall back to the contour search
+          IF (ALL(soll == (0.,0.))) warm = .FALSE.
+       ENDIF
+    ENDIF
+
+    IF (.NOT. warm) THEN !launch contour solutions
 
        !CHOICE OF THE CENTER OF THE FIRST CONTOUR in which the kinetic solution is found.
        !The imaginary coordinate of the center is half the max fluid growth rate
@@ -332,98 +395,152 @@ CONTAINS
        IF ( d > Ro(p)/MAX( ABS( Ane(p)),ABS(Ate(p)) ) ) THEN 
           fdsoll = (-1.,-1.) !Flag that the local limit was not satisfied
        ELSE 
-          L = 1.0 !begin the calculation
           ! LAUNCH VARIOUS CONTOURS SCANNING THE REAL AXIS 
-          ! The loop exits when the contour center extends
-          ! beyond the defined maximum on the real axis
-
-          DO WHILE ((L+0.5)*rint < ABS(REAL(omegmax)))
-             !Loop over both positive and negative frequencies in solution search
-
-             IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
-                timeoutflag = .TRUE.
-                EXIT
+          ! The contours are independent until their solutions are merged. They are
+          ! first placed (counted in the first pass and recorded in the second), then
+          ! searched concurrently, and the solutions merged in the order of placement
+          DO pass=1,2
+             IF (pass == 2) THEN
+                ALLOCATE(Centres(ncont)); ALLOCATE(rints(ncont))
+                ALLOCATE(NNs(ncont)); ALLOCATE(solls(numsols,ncont)); ALLOCATE(fdsolls(numsols,ncont))
+                rint=ABS(REAL(solflu(p,nu)))/5.
              ENDIF
+             ncont = 0
+             L = 1.0 !begin the calculation
+             ! The loop exits when the contour center extends
+             ! beyond the defined maximum on the real axis
+
+             DO WHILE ((L+0.5)*rint < ABS(REAL(omegmax)))
+                !Loop over both positive and negative frequencies in solution search
 
-             !Flags are in place in case we are certain that solutions found only in one side
-             DO i = 0,2              
                 IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
                    timeoutflag = .TRUE.
                    EXIT
                 ENDIF
-                IF ( (i==0) .AND. (L>1.) ) CYCLE  !we only carry out a narrow small contour 
-                IF ( ( (onlyelec .EQV. .TRUE.) .OR. (kthetarhos(nu) > 2. ) ) .AND. (i == 1) ) CYCLE  !Skips ions also for ETG scales
-                IF ( (onlyion .EQV. .TRUE.) .AND. (i == 2) ) CYCLE
-                !Define center of this contour
-
-                IF (i==0) THEN !Set narrow center contour (numerically more difficult near real axis, so would rather avoid this region for a solution contour)
-                   Centre = C 
-                   rint= centerwidth*1.5
-                ELSE
-                   rint=ABS(REAL(solflu(p,nu)))/5.
-                   Centre = (-1.)**i * (L * rint + centerwidth*(1-centeroverlapfac))+ C !Set contour center, with slight overlap with center contour if L=1
-                ENDIF
-
-                !DEBUGGING CODE
-                !WRITE(stdout,'(2G13.5,A,I0,A,F7.3,A,F5.2)') Centre, ' i=', INT(i), ' L=',L,' Rint = ',rint
 
-                !Solutions are now saught inside this specific contour
-                !The vast bulk of QuaLiKiz computation is within this procedure
+                !Flags are in place in case we are certain that solutions found only in one side
+                DO i = 0,2              
+                   IF ( (i==0) .AND. (L>1.) ) CYCLE  !we only carry out a narrow small contour 
+                   IF ( ( (onlyelec .EQV. .TRUE.) .OR. (kthetarhos(nu) > 2. ) ) .AND. (i == 1) ) CYCLE  !Skips ions also for ETG scales
+                   IF ( (onlyion .EQV. .TRUE.) .AND. (i == 2) ) CYCLE
+                   !Define center of this contour
+
+                   IF (i==0) THEN !Set narrow center contour (numerically more difficult near real axis, so would rather avoid this region for a solution contour)
+                      Centre = C 
+                      rint= centerwidth*1.5
+                   ELSE
+                      rint=ABS(REAL(solflu(p,nu)))/5.
+                      Centre = (-1.)**i * (L * rint + centerwidth*(1-centeroverlapfac))+ C !Set contour center, with slight overlap with center contour if L=1
+                   ENDIF
 
-                IF ( ( rho(p) >= rhomin ) .AND. ( rho(p) <= rhomax) ) THEN !check if rho is within the defined range, otherwise return zero
-                   CALL calculsol(p, nu, Centre, NN, solltmp, fdsolltmp)
-                ELSE
-                   solltmp(:)=0.
-                   fdsolltmp(:)=0.
-                   NN=0
-                ENDIF
-!!$                solltmp(:)=0
-                !Solution cleanup: all solutions within soldel*100 percent. soldel found in datcal
-                !of a previously found solution (from another contour) is set to zero             
-                IF (NN > 0) THEN
-                   DO j = 1,numsols
-                      IF (ABS(soll(j)) > epsD) THEN !only compare to non-zero solutions in soll
-                         WHERE (ABS(solltmp-soll(j))/ABS(soll(j)) < soldel)                       
-                            solltmp = (0.,0.)
-                            fdsolltmp = (0.,0.)
-                         END WHERE
-                      ENDIF
-                   ENDDO
-                ENDIF
+                   !DEBUGGING CODE
+                   !WRITE(stdout,'(2G13.5,A,I0,A,F7.3,A,F5.2)') Centre, ' i=', INT(i), ' L=',L,' Rint = ',rint
 
-                DO j=1,numsols 
-                   IF ( (AIMAG(solltmp(j)) < 0. ) .OR. (ABS(AIMAG(solltmp(j))) > ABS(AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(solltmp(j))) > ABS(REAL(ommax(p,nu))))  ) THEN
-                      IF (verbose .EQV. .TRUE.) THEN 
-                         WRITE(stderr,'(A,I7,A,I2,A)') 'Solution found but outside of allowed contour range. Skipping solution. (p,nu)=(',p,',',nu,')'
-                      ENDIF
-                      solltmp(j) = (0.,0.)
-                      fdsolltmp(j) = (0.,0.)
+                   ncont = ncont+1
+                   IF (pass == 2) THEN
+                      Centres(ncont) = Centre
+                      rints(ncont) = rint
                    ENDIF
                 ENDDO
+                !Shift the contours for the next iteration
+                L = L+2. - overlapfac
 
-                ! If any solutions survive, they are saved together with any previous solutions
-                ! If numsols is not high enough to save all solutions, then the largest growth rates are saved first
-                DO j=1,numsols 
-                   IF ( ABS(solltmp(j)) > epsD ) THEN
-                      minloci = MINLOC(AIMAG(soll))
-                      minlocind = minloci(1)
-                      IF ( (ABS(soll(minlocind)) > epsD) .AND. (verbose .EQV. .TRUE.) ) THEN
-                         WRITE(stdout,'(A,I2,A,I2,A)') 'Valid instability discarded due to limited number of numsols at (p,nu)=(',p,',',nu,')'
-                      ENDIF
-                      IF (AIMAG(solltmp(j)) > AIMAG(soll(minlocind))) THEN
-                         soll(minlocind)   = solltmp(j)
-                         fdsoll(minlocind) = fdsolltmp(j)                        
-                      ENDIF
-                   ENDIF
-                ENDDO
              ENDDO
-             !Shift the contours for the next iteration
-             L = L+2. - overlapfac
+          ENDDO
 
+          !Solutions are now saught inside each contour
+          !The vast bulk of QuaLiKiz computation is within this procedure
+          !The threads borrowed from the idle threads of the rank (see contourthreads) search
+          !the contours side by side. Those beyond the number of contours go back to the pool
+          !at once, where the contour points in calculsol can take them
+          nthr = contourthreads()
+          ncontpar = MAX(1,MIN(nthr,ncont))
+          CALL freethreads(nthr-ncontpar)
+          timedout = .FALSE.
+          nthr = ncontpar
+          INCLUDE 'taskregion.inc'
+          !$OMP DO SCHEDULE(DYNAMIC) PRIVATE(skip)
+          DO k=1,ncont
+             !$OMP ATOMIC READ
+             skip = timedout
+             IF ( skip .OR. ((MPI_Wtime()-calltimeinit) > timeout) ) THEN
+                !$OMP ATOMIC WRITE
+                timedout = .TRUE.
+                NNs(k) = 0
+                solls(:,k) = 0.
+                fdsolls(:,k) = 0.
+                CYCLE
+             ENDIF
+             rint = rints(k)
+             IF ( ( rho(p) >= rhomin ) .AND. ( rho(p) <= rhomax) ) THEN !check if rho is within the defined range, otherwise return zero
+                CALL calculsol(p, nu, Centres(k), NNs(k), solls(:,k), fdsolls(:,k))
+             ELSE
+                solls(:,k)=0.
+                fdsolls(:,k)=0.
+                NNs(k)=0
+             ENDIF
+             IF (timeoutflag .EQV. .TRUE.) THEN
+                !$OMP ATOMIC WRITE
+                timedout = .TRUE.
+             ENDIF
+          ENDDO
+          !$OMP END DO
+          INCLUDE 'taskregion_end.inc'
+          CALL freethreads(nthr-1)
+          ncontpar = 1
+          IF (timedout) timeoutflag = .TRUE.
+
+          DO k=1,ncont
+            NN = NNs(k)
+            solltmp = solls(:,k)
+            fdsolltmp = fdsolls(:,k)
+!!$                solltmp(:)=0
+            !Solution cleanup: all solutions within soldel*100 percent. soldel found in datcal
+            !of a previously found solution (from another contour) is set to zero             
+            IF (NN > 0) THEN
+               DO j = 1,numsols
+                  IF (ABS(soll(j)) > epsD) THEN !only compare to non-zero solutions in soll
+                     WHERE (ABS(solltmp-soll(j))/ABS(soll(j)) < soldel)                       
+                        solltmp = (0.,0.)
+                        fdsolltmp = (0.,0.)
+                     END WHERE
+                  ENDIF
+               ENDDO
+            ENDIF
+
+            DO j=1,numsols 
+               IF ( (AIMAG(solltmp(j)) < 0. ) .OR. (ABS(AIMAG(solltmp(j))) > ABS(AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(solltmp(j))) > ABS(REAL(ommax(p,nu))))  ) THEN
+                  IF (verbose .EQV. .TRUE.) THEN 
+                     WRITE(stderr,'(A,I7,A,I2,A)') 'Solution found but outside of allowed contour range. Skipping solution. (p,nu)=(',p,',',nu,')'
+                  ENDIF
+                  solltmp(j) = (0.,0.)
+                  fdsolltmp(j) = (0.,0.)
+               ENDIF
+            ENDDO
+
+            ! If any solutions survive, they are saved together with any previous solutions
+            ! If numsols is not high enough to save all solutions, then the largest growth rates are saved first
+            DO j=1,numsols 
+               IF ( ABS(solltmp(j)) > epsD ) THEN
+                  minloci = MINLOC(AIMAG(soll))
+                  minlocind = minloci(1)
+                  IF ( (ABS(soll(minlocind)) > epsD) .AND. (verbose .EQV. .TRUE.) ) THEN
+                     WRITE(stdout,'(A,I2,A,I2,A)') 'Valid instability discarded due to limited number of numsols at (p,nu)=(',p,',',nu,')'
+                  ENDIF
+                  IF (AIMAG(solltmp(j)) > AIMAG(soll(minlocind))) THEN
+                     soll(minlocind)   = solltmp(j)
+                     fdsoll(minlocind) = fdsolltmp(j)                        
+                  ENDIF
+               ENDIF
+            ENDDO
           ENDDO
+          DEALLOCATE(Centres); DEALLOCATE(rints)
+          DEALLOCATE(NNs); DEALLOCATE(solls); DEALLOCATE(fdsolls)
        ENDIF
     ENDIF
 
+    CALL freefonctcache()
+
     ! The solution for this (p,nu) pair is now sorted and saved
 
     !Reorder (descending) the solutions
@@ -476,6 +593,9 @@ CONTAINS
     !Save growth rates to output array (normalized to nwg)
     gamma(p,nu,:) = sol(p,nu,:)
 
+    !Timed out tasks are incomplete and not kept
+    IF (solcache .AND. (runcounter == 0) .AND. (timeoutflag .EQV. .FALSE.)) CALL writesolcache(p,nu,cachekey,cachefile)
+
     !Check if in ETG regime. Commented out since replaced with simple ktheta limit
     !    CALL ETGcheck(ETG_flag,soll,kteta,p,nu)
 
@@ -502,23 +622,30 @@ CONTAINS
     COMPLEX(KIND=DBL) :: omega,omega2, solli, fdsolli, nsolli, nfdsolli
     COMPLEX(KIND=DBL) :: fonx, foncttemp, omtemp, varztemp
 
-    COMPLEX(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: fonct, fex, om, om2, varz 
-    COMPLEX(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: foncti, omi
+    COMPLEX(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: fonct, gex, om, om2, varz 
+    COMPLEX(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: foncti, omi, fonctnew, omnew
     COMPLEX(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: Sint, A, csolint
     COMPLEX(KIND=DBL), DIMENSION(:,:), ALLOCATABLE :: exprn
 
     REAL(KIND=DBL), DIMENSION(:,:), ALLOCATABLE :: solint
     REAL(KIND=DBL), DIMENSION(:,:), ALLOCATABLE :: Areal
-    REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: thetai
+    REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: thetai, thetanew, segjump, segind, segerr, segtol
     REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: ww, exprnreal, exprnimag
     REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: difalphan, imagrapfonct, realrapfonct
-    REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: theta, alpha, alphan, alphaex, alphanex
-    LOGICAL :: anomflag,exist
-    INTEGER :: ifailloc
+    REAL(KIND=DBL), DIMENSION(:),   ALLOCATABLE :: theta, alpha, alphan
+    LOGICAL :: anomflag,exist,timedout,skip,phaseres
+    LOGICAL, DIMENSION(:), ALLOCATABLE :: offcontour, bisect
+    INTEGER :: ifailloc, nthr, nseg
+    REAL(KIND=DBL) :: dthetamin, dthetaMM, quaderr, phasetol
 
     soll(:)=0.
     fdsoll(:)=0.
-    M=MM
+    !With the error estimate driving the local refinement, the contour starts coarser
+    IF (periodicquad .AND. localrefine) THEN
+       M=MMquad
+    ELSE
+       M=MM
+    ENDIF
 
     !Allocate arrays with dimension of the number of contour bits
     ALLOCATE (theta(M)) 
@@ -529,6 +656,7 @@ CONTAINS
     ALLOCATE (alpha(M)) !fonct angles
     ALLOCATE (alphan(M)) !unwrapped fonct angles
     ALLOCATE (difalphan(M-1)) !unwrapped fonct angle differences
+    ALLOCATE (offcontour(M)) !points outside of the allowed range
 
     ! DEBUGGING
 !!$    DO i=1,M
@@ -558,7 +686,17 @@ CONTAINS
 !!$       WRITE(701,'(17G15.7)') (AIMAG(om(i)),i=1,M) ; CLOSE(701)
 !!$    ENDIF
     fonct(:)=0.
+    offcontour(:)=.FALSE.
+    timedout=.FALSE.
+    !The contour points are independent. Threads of this rank not busy with other tasks
+    !compute them in parallel, each starting from a copy of the task state of this thread
+    nthr = contourthreads()
+    INCLUDE 'taskregion.inc'
+    !$OMP DO SCHEDULE(DYNAMIC) PRIVATE(omega,fonx,skip)
     DO i=1,M
+       !$OMP ATOMIC READ
+       skip = timedout
+       IF (skip) CYCLE
        ! We follow the contour defined by the variable "om"
        theta(i)    = 2.*pi*REAL(i-1)/REAL(M-1)
        varz(i)     = EXP(ci*theta(i))
@@ -573,22 +711,29 @@ CONTAINS
           IF (verbose .EQV. .TRUE.) THEN 
              WRITE(stderr,'(A,2G15.7,A,I7,A,I2,A)') 'In contours: omega outside of allowed contour range (how did that happen?) Skipping solution. Omega=,',omega,'. (p,nu)=(',p,',',nu,')'
           ENDIF
-          anomflag = .TRUE.
+          offcontour(i) = .TRUE.
           fonct(i) = 0. 
        ELSE
-          anomflag = .FALSE.
           CALL calcfonct(p, nu, omega, fonx)
           !test timeout
           IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
-             timeoutflag = .TRUE.
-             EXIT
+             !$OMP ATOMIC WRITE
+             timedout = .TRUE.
+             CYCLE
           ENDIF
 
           fonct(i) = fonx
        ENDIF
 
     END DO
+    !$OMP END DO
+    INCLUDE 'taskregion_end.inc'
+    CALL freethreads(nthr-1)
+    !As for the sequential loop, the flag follows the last point (the closing point of the contour)
+    IF (timedout) timeoutflag = .TRUE.
+    anomflag = offcontour(M) .AND. (.NOT. timedout)
     DEALLOCATE (varz)
+    DEALLOCATE (offcontour)
 
     ! The function angle is calculated at this point on the contour
     alpha(:) = ATAN2(AIMAG(fonct),REAL(fonct))
@@ -605,7 +750,174 @@ CONTAINS
     ! Refinement of the contour segmentation. 
     ! The refinement stops once the maximum angle is less than maxangle,
     ! or if the number of segments is above maxM (both defined parameters in datcal)
-    DO WHILE ( ( maxdifalphan > maxangle  ) .AND. ( M < maxM ) .AND. (anomflag .EQV. .FALSE.) )
+    quaderr = 0.
+    IF (localrefine) THEN
+       ! Only the segments with a phase jump above maxangle are bisected, largest jumps
+       ! first, until maxM points are used. Segments are not bisected below the finest
+       ! spacing of the global refinement, where a jump is a true phase discontinuity
+       ALLOCATE (segjump(maxM))
+       ALLOCATE (segind(maxM))
+       ALLOCATE (bisect(maxM))
+       ALLOCATE (segerr(maxM))
+       ALLOCATE (segtol(maxM))
+       dthetamin = 2.*pi/REAL(MM-1)/REAL(maxM/MM)
+       dthetaMM = 2.*pi/REAL(MM-1)
+       segerr(:) = 0.
+    ENDIF
+    DO WHILE ( localrefine .AND. ( M < maxM ) .AND. (anomflag .EQV. .FALSE.) )
+       ! Once the phase is resolved, the segments where the argument principle integrals are
+       ! under-resolved (estimated error above their share of quadtol) are bisected in the same way.
+       ! The error is that of the integrals for the zeros actually sought on this contour.
+       ! Once below quadtol, the phase jumps need only be below maxanglequad
+       phasetol = maxangle
+       IF (periodicquad) THEN
+          Nenv = ABS( (alphan(M) - alphan(1) ) / 2. / pi )
+          CALL countzeros(p, nu, Nenv, maxgradanglespi, NN)
+          CALL davquaderr(theta, fonct, M, NN, quaderr, segerr(1:M-1))
+          IF ( (NN > 0) .AND. (quaderr <= quadtol) ) phasetol = maxanglequad
+       ENDIF
+       ! Segments longer than those of the MM point contour (coarser start, see MMquad) are held
+       ! to the same phase change per unit length, so that they cannot hide a zero
+       DO i=1,(M-1)
+          segtol(i) = phasetol*MIN(1._DBL, dthetaMM/(theta(i+1)-theta(i)))
+       END DO
+       phaseres = ALL(difalphan(1:M-1) <= segtol(1:M-1))
+       IF ( phaseres .AND. (quaderr <= quadtol) ) EXIT
+
+       ! Leave loop if timed out
+       IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
+          timeoutflag = .TRUE.
+          EXIT
+       ENDIF
+
+       nseg = 0
+       DO i=1,(M-1)
+          IF (theta(i+1)-theta(i) <= 1.5*dthetamin) CYCLE
+          IF (.NOT. phaseres) THEN
+             IF (difalphan(i) <= segtol(i)) CYCLE
+             nseg = nseg+1
+             segjump(nseg) = difalphan(i)
+          ELSE
+             IF (segerr(i) <= quadtol*(theta(i+1)-theta(i))/(2.*pi)) CYCLE
+             nseg = nseg+1
+             segjump(nseg) = segerr(i)
+          ENDIF
+          segind(nseg) = REAL(i,DBL)
+       END DO
+       IF (nseg == 0) EXIT
+       !Sort by decreasing jump (or error). dsort (SLATEC) carries the segment numbers along
+       IF (nseg > 1) CALL dsort(segjump,segind,nseg,-2)
+       nseg = MIN(nseg,maxM-M)
+       bisect(:) = .FALSE.
+       bisect(NINT(segind(1:nseg))) = .TRUE.
+       !Segments to bisect, in contour order
+       nseg = 0
+       DO i=1,(M-1)
+          IF (bisect(i)) THEN
+             nseg = nseg+1
+             segind(nseg) = REAL(i,DBL)
+          ENDIF
+       END DO
+
+       ALLOCATE (thetai(nseg)) 
+       ALLOCATE (omi(nseg)) 
+       ALLOCATE (foncti(nseg)) 
+       !New midpoints, in parallel as above
+       nthr = contourthreads()
+       INCLUDE 'taskregion.inc'
+       !$OMP DO SCHEDULE(DYNAMIC) PRIVATE(thetatemp,varztemp,omtemp,foncttemp,ind) REDUCTION(.OR.:anomflag)
+       DO k = 1, nseg
+          ind = NINT(segind(k))
+          thetatemp = ( theta(ind) + theta(ind+1) ) / 2.
+          varztemp  = EXP(ci * thetatemp)
+          CALL squircle(Centre , varztemp, omtemp, rint)
+
+          IF ( (AIMAG(omtemp) < 0. ) .OR. (ABS(AIMAG(omtemp)) > ABS(2.*AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(omtemp)) > ABS(REAL(2.*ommax(p,nu))))  ) THEN
+             IF (verbose .EQV. .TRUE.) THEN 
+                WRITE(stderr,'(A,2G15.7,A,I7,A,I2,A)') 'In refined contours: omega outside of allowed contour range (how did that happen?) Skipping solution. Omega=,',omtemp,'. (p,nu)=(',p,',',nu,')'
+             ENDIF
+             anomflag = .TRUE.
+             foncttemp = 0. 
+          ELSE
+             CALL calcfonct (p, nu, omtemp, foncttemp)
+          ENDIF
+
+          thetai(k) = thetatemp
+          omi(k)    = omtemp
+          foncti(k) = foncttemp
+       END DO
+       !$OMP END DO
+       INCLUDE 'taskregion_end.inc'
+       CALL freethreads(nthr-1)
+
+       !Merge the midpoints into the contour arrays
+       ALLOCATE (thetanew(M+nseg)) 
+       ALLOCATE (omnew(M+nseg)) 
+       ALLOCATE (fonctnew(M+nseg)) 
+       ind = 0
+       k = 0
+       DO i = 1, M
+          ind = ind+1
+          thetanew(ind) = theta(i)
+          omnew(ind)    = om(i)
+          fonctnew(ind) = fonct(i)
+          IF (bisect(i)) THEN
+             k = k+1
+             ind = ind+1
+             thetanew(ind) = thetai(k)
+             omnew(ind)    = omi(k)
+             fonctnew(ind) = foncti(k)
+          ENDIF
+       END DO
+       M = M+nseg
+       CALL MOVE_ALLOC(thetanew,theta)
+       CALL MOVE_ALLOC(omnew,om)
+       CALL MOVE_ALLOC(fonctnew,fonct)
+
+       DEALLOCATE (thetai) 
+       DEALLOCATE (omi) 
+       DEALLOCATE (foncti) 
+
+       IF (M==maxM) THEN
+          IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A,I3,A,I7,A,I2)") 'Warning, maxM reached! M=',M,' for p=',p,' and nu=',nu
+       ENDIF
+
+       DEALLOCATE (alpha)
+       DEALLOCATE (alphan)
+       DEALLOCATE (difalphan)
+
+       ALLOCATE (alpha(M))
+       ALLOCATE (alphan(M)) 
+       ALLOCATE (difalphan(M-1)) 
+
+       !Test if the new contour is sufficiently refined
+       alpha(:) = ATAN2(AIMAG(fonct),REAL(fonct))
+       CALL unwrap( alpha, M, alphan) 
+
+       DO i=1,(M-1)
+          difalphan(i)    = ABS ( alphan(i+1) - alphan(i) )
+       END DO
+
+       maxdifalphan = MAXVAL ( difalphan )
+       maxgradanglespi = maxdifalphan / pi
+
+       Nenv = ABS( (alphan(M) - alphan(1) ) / 2. / pi )
+       !test timeout
+       IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
+          anomflag = .TRUE.
+       ENDIF
+
+       !As for the global refinement, a contour whose phase does not wind is abandoned
+       IF (Nenv < 0.5) anomflag=.TRUE.
+
+    END DO
+    IF (ALLOCATED(segjump)) DEALLOCATE(segjump)
+    IF (ALLOCATED(segtol)) DEALLOCATE(segtol)
+    IF (ALLOCATED(segerr)) DEALLOCATE(segerr)
+    IF (ALLOCATED(segind)) DEALLOCATE(segind)
+    IF (ALLOCATED(bisect)) DEALLOCATE(bisect)
+
+    DO WHILE ( (.NOT. localrefine) .AND. ( maxdifalphan > maxangle  ) .AND. ( M < maxM ) .AND. (anomflag .EQV. .FALSE.) )
        ! Leave loop if timed out
        IF ((MPI_Wtime()-calltimeinit) > timeout) THEN
           timeoutflag = .TRUE.
@@ -627,7 +939,10 @@ CONTAINS
        ALLOCATE (theta(2*M)) 
        ALLOCATE (om(2*M)) 
        ALLOCATE (fonct(2*M)) 
-       !Fill in new points in more refined array 
+       !Fill in new points in more refined array, in parallel as above
+       nthr = contourthreads()
+       INCLUDE 'taskregion.inc'
+       !$OMP DO SCHEDULE(DYNAMIC) PRIVATE(thetatemp,varztemp,omtemp,foncttemp,ind) REDUCTION(.OR.:anomflag)
        DO i = 1, M
           !Find new median values of theta and the frequency on the complex plane
           thetatemp = thetai(i) + ( thetai(2) - thetai(1) ) / 2.
@@ -638,7 +953,7 @@ CONTAINS
 
           IF ( (AIMAG(omtemp) < 0. ) .OR. (ABS(AIMAG(omtemp)) > ABS(2.*AIMAG(ommax(p,nu)))) .OR. (ABS(REAL(omtemp)) > ABS(REAL(2.*ommax(p,nu))))  ) THEN
              IF (verbose .EQV. .TRUE.) THEN 
-                WRITE(stderr,'(A,2G15.7,A,I7,A,I2,A)') 'In refined contours: omega outside of allowed contour range (how did that happen?) Skipping solution. Omega=,',omega,'. (p,nu)=(',p,',',nu,')'
+                WRITE(stderr,'(A,2G15.7,A,I7,A,I2,A)') 'In refined contours: omega outside of allowed contour range (how did that happen?) Skipping solution. Omega=,',omtemp,'. (p,nu)=(',p,',',nu,')'
              ENDIF
              anomflag = .TRUE.
              foncttemp = 0. 
@@ -655,6 +970,9 @@ CONTAINS
           om(ind-1)    = omi(i)
           om(ind)      = omtemp
        END DO
+       !$OMP END DO
+       INCLUDE 'taskregion_end.inc'
+       CALL freethreads(nthr-1)
 
        DEALLOCATE (thetai) 
        DEALLOCATE (omi) 
@@ -726,82 +1044,58 @@ CONTAINS
     ENDIF
 
     IF (anomflag .EQV. .TRUE.) Nenv = 0.
-    NN = NINT( Nenv ) 
 
     !DEBUG CODE********************
 !!$    WRITE(stdout,*) 'For p=',p,'and nu= ',nu,', final M = ', M
 !!$    WRITE(stdout,*) 'Nenv =', Nenv
     !******************************
 
-    !If, despite refining the segments, the angle jumps are too high,
-    !and also the phase is not close to an integer, then the contour was problematic
-    !and the exact solution is not sought out
-    IF ( (maxgradanglespi > maxangle) .AND. ( ABS(Nenv-NN) > 0.01 ) )  THEN 
-       Nsolrat = Nsolrat+NN; NN = 0
-    END IF
-
-    !If there is more than one solution but the phase is not close to an integer, drop the last solution
-    IF ( (NN > 1) .AND. (ABS(Nenv-NN)>0.1) ) THEN
-       NN=FLOOR(Nenv)
-       WRITE(stderr,'(A,I7,A,I2,A)') 'Main contour phase: solutions > 1 and partial integer found in single contour! Flooring solution down to lower integer. (p,nu)=(',p,',',nu,')'
-    ENDIF
-
-    !If somehow NN>numsols, floor NN to numsols
-    IF ( (NN > numsols) ) THEN
-       NN=numsols
-       WRITE(stderr,'(A,I7,A,I2,A)') 'Main contour phase: solutions > numsols in single contour! Flooring solutions down to numsols. (p,nu)=(',p,',',nu,')'       
-    ENDIF
+    CALL countzeros(p, nu, Nenv, maxgradanglespi, NN, final=.TRUE.)
     
     IF (NN == 0) THEN
        ! No solutions sought for!
     ELSE
        ! There are solutions and they will be found with the Davies method
-       ALLOCATE ( fex(M) )
-       ALLOCATE ( exprn(M,NN) )
-
-       !Modified dispersion relation function. This is done to remove the branch cut when taking
-       !the logarithm of fex. The values of the Sn 'argument principle' integrals are unchanged
-       !since the imposed roots are at z=0 (see Davies 1986)
-       DO i=1,M
-          fex(i) = fonct(i) * EXP( -ci * NN * theta(i) ) 
-       END DO
+       ALLOCATE ( gex(M) )
 
-       ALLOCATE ( alphaex(M) )
-       ALLOCATE ( alphanex(M) )
+       !Logarithm of the modified dispersion relation function. The imposed roots at z=0 remove
+       !the branch cut of the logarithm. The values of the Sn 'argument principle' integrals are
+       !unchanged since the imposed roots are at z=0 (see Davies 1986)
+       CALL davintegrand(theta, fonct, M, NN, gex)
 
-       !Find argument of modified dispersion relation
-       alphaex(:) = ATAN2(AIMAG(fex),REAL(fex))
-
-       !Unwrap the arguments to be in ascending order in pi
-       CALL unwrap( alphaex, M, alphanex)
+       !Argument principle integrals (Sn) are calculated
+       ALLOCATE ( Sint(NN) )
+       IF (periodicquad) THEN
+          CALL davmoments(theta, gex, M, NN, Sint, quaderr)
+          IF ( (quaderr > quadtol) .AND. (verbose .EQV. .TRUE.) ) THEN
+             WRITE(stderr,'(A,G15.7,A,I7,A,I2,A)') 'Main contour phase: estimated error of argument principle integrals ',quaderr,' above quadtol. (p,nu)=(',p,',',nu,')'
+          ENDIF
+       ELSE
+          !Integrand defined for 'argument principle' integrals (equation 3.3 in Davies 1986)
+          ALLOCATE ( exprn(M,NN) )
+          DO i=1,M       
+             DO j=1,NN
+                exprn(i,j) = -REAL(j)/(2.*pi) * EXP(ci*REAL(j)*theta(i)) * gex(i)
+             END DO
+          END DO
 
-       !Integrand defined for 'argument principle' integrals (equation 3.3 in Davies 1986)
-       DO i=1,M       
+          ALLOCATE ( exprnreal(M) )
+          ALLOCATE ( exprnimag(M) )
           DO j=1,NN
-             exprn(i,j) = -REAL(j)/(2.*pi) * EXP(ci*REAL(j)*theta(i)) &
-                  *  ( LOG ( ABS ( fex(i) ) ) + ci*alphanex(i) ) 
+             exprnreal = REAL(exprn(:,j))
+             exprnimag = AIMAG(exprn(:,j))
+             CALL davint(theta,exprnreal, M, 0._DBL, 2.*pi , realintans, ifailloc,1)
+             CALL davint(theta,exprnimag, M, 0._DBL, 2.*pi , imagintans, ifailloc,2)
+             Sint(j) = CMPLX(realintans,imagintans)
           END DO
-       END DO
 
-       DEALLOCATE ( fex )
-       DEALLOCATE ( alphanex )
-
-       !Argument principle integrals (Sn) are calculated
-       ALLOCATE ( Sint(NN) )
-       ALLOCATE ( exprnreal(M) )
-       ALLOCATE ( exprnimag(M) )
-       DO j=1,NN
-          exprnreal = REAL(exprn(:,j))
-          exprnimag = AIMAG(exprn(:,j))
-          CALL davint(theta,exprnreal, M, 0._DBL, 2.*pi , realintans, ifailloc,1)
-          CALL davint(theta,exprnimag, M, 0._DBL, 2.*pi , imagintans, ifailloc,2)
-          Sint(j) = CMPLX(realintans,imagintans)
-       END DO
+          DEALLOCATE ( exprnreal )
+          DEALLOCATE ( exprnimag )
+          DEALLOCATE ( exprn )
+       ENDIF
 
-       DEALLOCATE ( exprnreal )
-       DEALLOCATE ( exprnimag )
+       DEALLOCATE ( gex )
        DEALLOCATE ( theta )       
-       DEALLOCATE ( exprn )
 
        ALLOCATE ( A(0:NN) )
        !Setup the system of equations for the Davies method
@@ -945,7 +1239,6 @@ CONTAINS
        DEALLOCATE ( csolint )
        DEALLOCATE ( solint )
        DEALLOCATE ( ww )
-       DEALLOCATE ( alphaex )
        DEALLOCATE ( fonct )
        DEALLOCATE ( alphan )
        DEALLOCATE ( alpha )
@@ -967,11 +1260,54 @@ CONTAINS
 
   END SUBROUTINE calculsol
 
+  SUBROUTINE countzeros(p, nu, Nenv, maxgradanglespi, NN, final)
+    !Number of zeros NN sought with the Davies method on a contour enclosing Nenv zeros,
+    !with maximum phase jump maxgradanglespi (normalized by pi). Also used during the local
+    !refinement, so that the error estimate is that of the integrals finally computed.
+    !Only the final count reports the dropped solutions
+    INTEGER, INTENT(IN) :: p, nu
+    REAL(KIND=DBL), INTENT(IN) :: Nenv, maxgradanglespi
+    INTEGER, INTENT(OUT) :: NN
+    LOGICAL, INTENT(IN), OPTIONAL :: final
+    LOGICAL :: report
+
+    report = .FALSE.
+    IF (PRESENT(final)) report = final
+
+    NN = NINT( Nenv ) 
+
+    !If, despite refining the segments, the angle jumps are too high,
+    !and also the phase is not close to an integer, then the contour was problematic
+    !and the exact solution is not sought out
+    IF ( (maxgradanglespi > maxangle) .AND. ( ABS(Nenv-NN) > 0.01 ) )  THEN 
+       IF (report) THEN
+          !$OMP ATOMIC
+          Nsolrat = Nsolrat+NN
+       ENDIF
+       NN = 0
+    END IF
+
+    !If there is more than one solution but the phase is not close to an integer, drop the last solution
+    IF ( (NN > 1) .AND. (ABS(Nenv-NN)>0.1) ) THEN
+       NN=FLOOR(Nenv)
+       IF (report) WRITE(stderr,'(A,I7,A,I2,A)') 'Main contour phase: solutions > 1 and partial integer found in single contour! Flooring solution down to lower integer. (p,nu)=(',p,',',nu,')'
+    ENDIF
+
+    !If somehow NN>numsols, floor NN to numsols
+    IF ( (NN > numsols) ) THEN
+       NN=numsols
+       IF (report) WRITE(stderr,'(A,I7,A,I2,A)') 'Main contour phase: solutions > numsols in single contour! Flooring solutions down to numsols. (p,nu)=(',p,',',nu,')'       
+    ENDIF
+
+  END SUBROUTINE countzeros
+
   SUBROUTINE calcfonct(p, nu, omega, fonx)
     ! -------------------------------------------------------------------
     ! Calculates the integral function for which we search the roots
     ! This function is comprised of the adiabatic (Ac), passing (fonctc)
-    ! and trapped (fonctp) terms
+    ! and trapped (fonctp) terms. The values are kept in the fonct cache
+    ! of the task, so an omega met again (overlapping contours, Newton
+    ! steps, candidate roots) is not integrated twice
     ! -------------------------------------------------------------------
     INTEGER, INTENT(in)  :: p, nu
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
@@ -979,6 +1315,12 @@ CONTAINS
 
     COMPLEX(KIND=DBL) :: fonctc
     COMPLEX(KIND=DBL) :: fonctp
+    LOGICAL :: found
+
+    IF (ASSOCIATED(fonctcache)) THEN
+       CALL lookupfonct(omega, fonx, found)
+       IF (found) RETURN
+    ENDIF
 
     IF ( ( rotflagarray(p) == 1 ) .AND. ( ETG_flag(nu) .EQV. .FALSE. ) ) THEN
        ! replace mwidth by real(mwidth) in such comparaisons since now mwidth is complex. Warning: is it correct or should take module?
@@ -1016,12 +1358,219 @@ CONTAINS
 
     ENDIF
 
+    IF (ASSOCIATED(fonctcache)) CALL storefonct(omega, fonx)
+
   END SUBROUTINE calcfonct
 
+  SUBROUTINE calcfonctd(p, nu, omega, fonx, dfsurdx, dfsurdy)
+    ! -------------------------------------------------------------------
+    ! Calculates the integral function as in calcfonct (no rotation) together
+    ! with its partial derivatives in Re(omega) and Im(omega), integrated
+    ! on the same adaptive grids. The Krook collision term makes fonct
+    ! depend on |omega| too, so dF/dx and dF/dy are not simply related
+    ! -------------------------------------------------------------------
+    INTEGER, INTENT(in)  :: p, nu
+    COMPLEX(KIND=DBL), INTENT(IN)  :: omega
+    COMPLEX(KIND=DBL), INTENT(OUT) :: fonx, dfsurdx, dfsurdy
+
+    COMPLEX(KIND=DBL) :: fonctc, dfonctc
+    COMPLEX(KIND=DBL) :: fonctp
+    COMPLEX(KIND=DBL), DIMENSION(2) :: dfonctp
+    REAL(KIND=DBL) :: absom
+
+    IF ( ( fc(p)==0. ) .OR. ( REAL(mwidth)<d/4.) .OR. ( calccirc .EQV. .FALSE. ) ) THEN
+       fonctc = 0.
+       dfonctc = 0.
+    ELSE
+       CALL calcfonctcd ( p, nu, omega, fonctc, dfonctc ) 
+    END IF
+
+    IF (ft(p)==0. .OR. (calctrap .EQV. .FALSE.) ) THEN
+       fonctp = 0.    
+       dfonctp = 0.
+    ELSE      
+       CALL calcfonctpd ( p, nu, omega, fonctp, dfonctp )
+    END IF
+
+    fonx = CMPLX(Ac(p),0.) - fonctc - fonctp
+
+    absom = MAX(ABS(omega),epsD)
+    dfsurdx = -dfonctc - dfonctp(1) - dfonctp(2)*REAL(omega)/absom
+    dfsurdy = -ci*(dfonctc + dfonctp(1)) - dfonctp(2)*AIMAG(omega)/absom
+
+  END SUBROUTINE calcfonctd
+
+  SUBROUTINE newfonctcache()
+    ! -------------------------------------------------------------------
+    ! Starts an empty fonct cache for the task of this thread. The grid
+    ! cell is the largest cachetol*ABS(omega) on the contours (up to
+    ! 2*omegmax), so a match is at most one cell away from omega
+    ! -------------------------------------------------------------------
+    ALLOCATE(fonctcache)
+    ALLOCATE(fonctcache%entry(2,ncachemax))
+    ALLOCATE(fonctcache%head(ncachemax))
+    ALLOCATE(fonctcache%next(ncachemax))
+    ALLOCATE(fonctcache%bucket(ncachemax))
+    ALLOCATE(fonctcache%seq(ncachemax))
+    fonctcache%n = 0
+    fonctcache%head(:) = 0
+    fonctcache%cell = MAX(cachetol,epsD)*MAX(2.*ABS(omegmax),1._DBL)
+    !Only tasks with nested threads share the cache
+    fonctcache%locked = (nthreads > 1)
+    !$ IF (fonctcache%locked) CALL omp_init_lock(fonctcache%lock)
+
+  END SUBROUTINE newfonctcache
+
+  SUBROUTINE freefonctcache()
+    !$ IF (fonctcache%locked) CALL omp_destroy_lock(fonctcache%lock)
+    DEALLOCATE(fonctcache%entry)
+    DEALLOCATE(fonctcache%head)
+    DEALLOCATE(fonctcache%next)
+    DEALLOCATE(fonctcache%bucket)
+    DEALLOCATE(fonctcache%seq)
+    DEALLOCATE(fonctcache)
+
+  END SUBROUTINE freefonctcache
+
+  INTEGER FUNCTION cachebucket(qx, qy)
+    ! -------------------------------------------------------------------
+    ! Hash bucket of the grid cell (qx,qy), given as whole numbers in
+    ! REAL. The bits are mixed with shifts only, so huge cells (far off
+    ! contour Newton steps) cannot overflow. Cells that collide, or the
+    ! two signed zeros, only cost a longer chain or a missed hit
+    ! -------------------------------------------------------------------
+    REAL(KIND=DBL), INTENT(IN) :: qx, qy
+
+    INTEGER(KIND=8) :: h
+
+    h = IEOR(TRANSFER(qx,h),ISHFTC(TRANSFER(qy,h),29))
+    h = IEOR(h,ISHFT(h,-32))
+    h = IEOR(h,ISHFT(h,-12))
+    cachebucket = INT(MODULO(h,INT(ncachemax,8)))+1
+
+  END FUNCTION cachebucket
+
+  SUBROUTINE lookupfonct(omega, fonx, found)
+    ! -------------------------------------------------------------------
+    ! Looks omega up in the fonct cache of the task. An entry matches if
+    ! its real and imaginary parts are both within cachetol*ABS(omega) of
+    ! omega (exact match for cachetol=0). Only the buckets of the cell of
+    ! omega and, for cachetol>0, of its neighbours are searched. The
+    ! newest match is returned
+    ! -------------------------------------------------------------------
+    COMPLEX(KIND=DBL), INTENT(IN)  :: omega
+    COMPLEX(KIND=DBL), INTENT(OUT) :: fonx
+    LOGICAL, INTENT(OUT) :: found
+
+    INTEGER :: ix, iy, r, k, newest
+    REAL(KIND=DBL) :: tol, qx, qy
+    COMPLEX(KIND=DBL) :: dom
+
+    found = .FALSE.
+    tol = cachetol*ABS(omega)
+    qx = ANINT(REAL(omega)/fonctcache%cell)
+    qy = ANINT(AIMAG(omega)/fonctcache%cell)
+    !Matches further than one cell away (omega beyond the contours) are missed
+    r = MERGE(1,0,tol > 0.)
+    newest = 0
+    !$ IF (fonctcache%locked) CALL omp_set_lock(fonctcache%lock)
+    DO ix = -r, r
+       DO iy = -r, r
+          k = fonctcache%head(cachebucket(qx+ix+0.,qy+iy+0.))
+          DO WHILE (k > 0)
+             dom = fonctcache%entry(1,k)-omega
+             IF ( (ABS(REAL(dom)) <= tol) .AND. (ABS(AIMAG(dom)) <= tol) .AND. (fonctcache%seq(k) > newest) ) THEN
+                fonx = fonctcache%entry(2,k)
+                newest = fonctcache%seq(k)
+                found = .TRUE.
+             ENDIF
+             k = fonctcache%next(k)
+          ENDDO
+       ENDDO
+    ENDDO
+    !$ IF (fonctcache%locked) CALL omp_unset_lock(fonctcache%lock)
+
+    IF (found) THEN
+       !$OMP ATOMIC
+       ncachehit = ncachehit+1
+    ELSE
+       !$OMP ATOMIC
+       ncachemiss = ncachemiss+1
+    ENDIF
+
+  END SUBROUTINE lookupfonct
+
+  SUBROUTINE storefonct(omega, fonx)
+    ! -------------------------------------------------------------------
+    ! Adds fonx=fonct(omega) to the fonct cache of the task, overwriting
+    ! the oldest entry once ncachemax entries are stored
+    ! -------------------------------------------------------------------
+    COMPLEX(KIND=DBL), INTENT(IN) :: omega, fonx
+
+    INTEGER :: k, b, j
+
+    b = cachebucket(ANINT(REAL(omega)/fonctcache%cell)+0.,ANINT(AIMAG(omega)/fonctcache%cell)+0.)
+    !$ IF (fonctcache%locked) CALL omp_set_lock(fonctcache%lock)
+    fonctcache%n = fonctcache%n+1
+    k = MOD(fonctcache%n-1,ncachemax)+1
+    IF (fonctcache%n > ncachemax) THEN
+       !Unlink the oldest entry, which is the last of its bucket
+       j = fonctcache%head(fonctcache%bucket(k))
+       IF (j == k) THEN
+          fonctcache%head(fonctcache%bucket(k)) = fonctcache%next(k)
+       ELSE
+          DO WHILE (fonctcache%next(j) /= k)
+             j = fonctcache%next(j)
+          ENDDO
+          fonctcache%next(j) = fonctcache%next(k)
+       ENDIF
+    ENDIF
+    fonctcache%entry(1,k) = omega
+    fonctcache%entry(2,k) = fonx
+    fonctcache%seq(k) = fonctcache%n
+    fonctcache%bucket(k) = b
+    fonctcache%next(k) = fonctcache%head(b)
+    fonctcache%head(b) = k
+    !$ IF (fonctcache%locked) CALL omp_unset_lock(fonctcache%lock)
+
+  END SUBROUTINE storefonct
+
+  INTEGER FUNCTION contourthreads()
+    ! -------------------------------------------------------------------
+    ! Threads for the contours or contour points of one task: this thread and
+    ! a share of the nthrfree threads of the rank that have no task to compute.
+    ! The share is split between the ntaskbusy running tasks, and inside calc
+    ! further between its ncontpar contours. The extra threads are taken from
+    ! nthrfree until the team closes and freethreads gives them back, so the
+    ! rank never runs more than nthreads threads
+    ! -------------------------------------------------------------------
+    INTEGER :: nbusy, nextra
+
+    !$OMP CRITICAL(threadpool)
+    !$OMP ATOMIC READ
+    nbusy = ntaskbusy
+    nextra = nthrfree/MAX(nbusy*ncontpar,1)
+    nthrfree = nthrfree-nextra
+    !$OMP END CRITICAL(threadpool)
+    contourthreads = 1+nextra
+
+  END FUNCTION contourthreads
+
+  SUBROUTINE freethreads(nfree)
+    !Returns nfree threads to nthrfree, at the end of a contour team or of the tasks of a thread
+    INTEGER, INTENT(IN) :: nfree
+
+    !$OMP CRITICAL(threadpool)
+    nthrfree = nthrfree+nfree
+    !$OMP END CRITICAL(threadpool)
+
+  END SUBROUTINE freethreads
+
   SUBROUTINE newton( p, nu, sol, fsol, newsol, fnewsol)  
     !Newton method for refining the solutions found from the contour integrals
     !Basic 2D Newton method. Demands that both u(z) and v(z) go to zero, where F(z)=u(z)+i*v(z)
-    !Function derivative defined with ndif parmameter
+    !Function derivative defined with ndif parmameter, or integrated together
+    !with the function by calcfonctd when newtonderiv is set (no rotation)
     INTEGER, INTENT(IN) :: p, nu
     COMPLEX(KIND=DBL), INTENT(IN) :: sol, fsol
 
@@ -1034,6 +1583,7 @@ CONTAINS
     COMPLEX(KIND=DBL) :: fzo, fzpd, fzmd, fzpid, fzmid
     COMPLEX(KIND=DBL) :: dfsurdx, dfsurdy
     COMPLEX(KIND=DBL) :: zo, zpd, zmd, zpid, zmid, delom, delomi 
+    LOGICAL :: analytic, havejac
 
     delom  = (ndif,0.)
     delomi = (0.,ndif)
@@ -1048,24 +1598,35 @@ CONTAINS
        maxnerrint = maxnerr2
     ENDIF
 
+    analytic = newtonderiv .AND. ( ( rotflagarray(p) /= 1 ) .OR. ( ETG_flag(nu) .EQV. .TRUE. ) )
+    havejac = .FALSE.
+
     DO
        IF ( (err < maxnerrint) .OR. (niter > maxiter) ) EXIT
 
-       zpd = zo+delom
-       zmd = zo-delom
+       IF (analytic) THEN
+          IF (.NOT. havejac) THEN
+             CALL calcfonctd (p, nu, zo, fzo, dfsurdx, dfsurdy)
+             err = ABS(fzo)
+             IF (err < maxnerrint) EXIT
+          ENDIF
+       ELSE
+          zpd = zo+delom
+          zmd = zo-delom
 
-       CALL calcfonct (p, nu, zpd, fzpd)
-       CALL calcfonct (p, nu, zmd, fzmd)
+          CALL calcfonct (p, nu, zpd, fzpd)
+          CALL calcfonct (p, nu, zmd, fzmd)
 
-       dfsurdx = (fzpd-fzmd)/(2.*delom)
+          dfsurdx = (fzpd-fzmd)/(2.*delom)
 
-       zpid=zo+delomi
-       zmid=zo-delomi
+          zpid=zo+delomi
+          zmid=zo-delomi
 
-       CALL calcfonct (p, nu, zpid, fzpid)
-       CALL calcfonct (p, nu, zmid, fzmid)
+          CALL calcfonct (p, nu, zpid, fzpid)
+          CALL calcfonct (p, nu, zmid, fzmid)
 
-       dfsurdy = (fzpid-fzmid)/(2.*delom)
+          dfsurdy = (fzpid-fzmid)/(2.*delom)
+       ENDIF
 
        Ma(1,1) = REAL(dfsurdx)
        Ma(1,2) = REAL(dfsurdy)
@@ -1101,7 +1662,12 @@ CONTAINS
           EXIT
        ENDIF
 
-       CALL calcfonct (p, nu, zo, fzo)
+       IF (analytic) THEN
+          CALL calcfonctd (p, nu, zo, fzo, dfsurdx, dfsurdy)
+          havejac = .TRUE.
+       ELSE
+          CALL calcfonct (p, nu, zo, fzo)
+       ENDIF
 
        err = ABS(fzo)
 
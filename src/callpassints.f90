@@ -6,35 +6,94 @@ MODULE callpassints
 
 CONTAINS
 
-  FUNCTION Fkstarrstar_cub(nf, xy)
+  FUNCTION Fkstarrstar_cub(nd, xy, nv)
     !---------------------------------------------------------------------
-    ! Returns the total passing particle integrand
+    ! Returns the total passing particle integrand, real and imaginary parts,
+    ! for vector cubature
     !---------------------------------------------------------------------  
-    INTEGER, INTENT(IN) :: nf
+    INTEGER, INTENT(IN) :: nd, nv
     INTEGER :: i
-    REAL(KIND=DBL), DIMENSION(nf), INTENT(IN) :: xy
-    REAL(KIND=DBL), DIMENSION(nf) :: Fkstarrstar_cub
-    REAL(KIND=DBL) :: intsum(nf)
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: xy
+    REAL(KIND=DBL), DIMENSION(nv) :: Fkstarrstar_cub
+    COMPLEX(KIND=DBL) :: intsum
     !NOTE THE FACTOR 4 BECAUSE WE ASSUME HERE SYMMETRIC INTEGRALS
     !Only include electron integral if el_type == 1
 
-    intsum(:)=0
+    intsum = 0
     IF ( (el_type == 1) .OR. ( (el_type == 3) .AND. (ETG_flag(nuFkr) .EQV. .TRUE.) ) )  THEN
-       intsum(1) = 4.*REAL  ( Fkstarrstare(ndim,xy,1) )
-       intsum(2) = 4.*AIMAG ( Fkstarrstare(ndim,xy,1) )
+       intsum = 4.*Fkstarrstare(nd,xy,1)
     ENDIF
 
     DO i = 1,nions
        IF ( (ion_type(pFkr,i) == 1) .AND. (ETG_flag(nuFkr) .EQV. .FALSE.) ) THEN !only include active ions
-          intsum(1)=intsum(1)+4.*REAL ( Fkstarrstari(ndim,xy,1,i) )
-          intsum(2)=intsum(2)+4.*AIMAG ( Fkstarrstari(ndim,xy,1,i) )
+          intsum = intsum + 4.*Fkstarrstari(nd,xy,1,i)*ninorm(pFkr,i) !unnormalise coefi here
        ENDIF
     ENDDO
-    Fkstarrstar_cub(1) = intsum(1)
-    Fkstarrstar_cub(2) = intsum(2)
+    Fkstarrstar_cub(1) = REAL(intsum)
+    Fkstarrstar_cub(2) = AIMAG(intsum)
    
   END FUNCTION Fkstarrstar_cub
 
+  FUNCTION Fkstarrstard_cub(nd, xy, nv)
+    !---------------------------------------------------------------------
+    ! Returns the total passing particle integrand and its omega derivative,
+    ! real and imaginary parts, for vector cubature (nv = 4). The derivative
+    ! is multiplied by |omega| so that both are of similar magnitude for the
+    ! common error estimate. Divided out again in calcfonctcd
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    INTEGER :: i
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: xy
+    REAL(KIND=DBL), DIMENSION(nv) :: Fkstarrstard_cub
+    COMPLEX(KIND=DBL), DIMENSION(2) :: intsum
+    !NOTE THE FACTOR 4 BECAUSE WE ASSUME HERE SYMMETRIC INTEGRALS
+
+    intsum = 0
+    IF ( (el_type == 1) .OR. ( (el_type == 3) .AND. (ETG_flag(nuFkr) .EQV. .TRUE.) ) )  THEN
+       intsum = 4.*Fkstarrstare_d(nd,xy)
+    ENDIF
+
+    DO i = 1,nions
+       IF ( (ion_type(pFkr,i) == 1) .AND. (ETG_flag(nuFkr) .EQV. .FALSE.) ) THEN !only include active ions
+          intsum = intsum + 4.*Fkstarrstari_d(nd,xy,i)*ninorm(pFkr,i) !unnormalise coefi here
+       ENDIF
+    ENDDO
+    intsum(2) = intsum(2)*MAX(ABS(omFkr),epsD)
+    Fkstarrstard_cub(1) = REAL(intsum(1))
+    Fkstarrstard_cub(2) = AIMAG(intsum(1))
+    Fkstarrstard_cub(3) = REAL(intsum(2))
+    Fkstarrstard_cub(4) = AIMAG(intsum(2))
+
+  END FUNCTION Fkstarrstard_cub
+
+  FUNCTION FkstarrstarQL_cub(nd, xy, nv)
+    !---------------------------------------------------------------------
+    ! Returns the imaginary parts of all passing particle QL integrands, for batched
+    ! vector cubature. Layout: (caseflag 1-8) x (electrons, ion 1..nions), see QLcase.
+    ! Each species is divided by its prefactor (Nex or coefi) such that all components
+    ! are of similar magnitude for the common error estimate. Unnormalised in passQLints
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    INTEGER :: i
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: xy
+    REAL(KIND=DBL), DIMENSION(nv) :: FkstarrstarQL_cub
+    COMPLEX(KIND=DBL), DIMENSION(8) :: Fk
+
+    FkstarrstarQL_cub(:) = 0
+    IF ( (el_type == 1) .OR. ( (el_type == 3) .AND. (ETG_flag(nuFkr) .EQV. .FALSE.) ) )  THEN
+       Fk = Fkstarrstare_all(nd,xy)
+       FkstarrstarQL_cub(1:8) = AIMAG(Fk)/Nex(pFkr)
+    ENDIF
+
+    DO i = 1,nions
+       IF (ABS(coefi(pFkr,i)) < epsD) CYCLE
+       Fk = Fkstarrstari_all(nd,xy,i)
+       IF (ninorm(pFkr,i) <= min_ninorm) Fk(5:8) = 0. !energy integrals skipped for trace ions
+       FkstarrstarQL_cub(8*i+1:8*i+8) = AIMAG(Fk)/coefi(pFkr,i)
+    ENDDO
+
+  END FUNCTION FkstarrstarQL_cub
+
   FUNCTION rFkstarrstar(nf,xy)
     !---------------------------------------------------------------------
     ! Returns the total passing particle integrand
@@ -587,32 +646,31 @@ CONTAINS
 ! with rotation
 !****************************************************************************************************
 
-  FUNCTION Fkstarrstarrot_cub(nf, xy)
+  FUNCTION Fkstarrstarrot_cub(nd, xy, nv)
     !---------------------------------------------------------------------
-    ! Returns the total passing particle integrand
+    ! Returns the total passing particle integrand, real and imaginary parts,
+    ! for vector cubature
     !---------------------------------------------------------------------  
-    INTEGER, INTENT(IN) :: nf
+    INTEGER, INTENT(IN) :: nd, nv
     INTEGER :: i
-    REAL(KIND=DBL), DIMENSION(nf), INTENT(IN) :: xy
-    REAL(KIND=DBL), DIMENSION(nf) :: Fkstarrstarrot_cub
-    REAL(KIND=DBL) :: intsum(nf)
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: xy
+    REAL(KIND=DBL), DIMENSION(nv) :: Fkstarrstarrot_cub
+    COMPLEX(KIND=DBL) :: intsum
     !NOTE THE FACTOR 1 not 4 BECAUSE ASYMMETRIC INTEGRALS
     !Only include electron integral if el_type == 1
 
-    intsum(:)=0
+    intsum = 0
     IF ( (el_type == 1) .OR. ( (el_type == 3) .AND. (ETG_flag(nuFkr) .EQV. .TRUE.) ) )  THEN
-       intsum(1) = 1.*REAL  ( Fkstarrstarerot(ndim,xy,1) )
-       intsum(2) = 1.*AIMAG ( Fkstarrstarerot(ndim,xy,1) )
+       intsum = 1.*Fkstarrstarerot(nd,xy,1)
     ENDIF
 
     DO i = 1,nions
        IF ( (ion_type(pFkr,i) == 1) .AND. (ETG_flag(nuFkr) .EQV. .FALSE.) ) THEN !only include active ions
-          intsum(1)=intsum(1)+1.*REAL ( Fkstarrstarirot(ndim,xy,1,i) )
-          intsum(2)=intsum(2)+1.*AIMAG ( Fkstarrstarirot(ndim,xy,1,i) )
+          intsum = intsum + 1.*Fkstarrstarirot(nd,xy,1,i)*ninorm(pFkr,i) !unnormalise coefi here
        ENDIF
     ENDDO
-    Fkstarrstarrot_cub(1) = intsum(1)
-    Fkstarrstarrot_cub(2) = intsum(2)
+    Fkstarrstarrot_cub(1) = REAL(intsum)
+    Fkstarrstarrot_cub(2) = AIMAG(intsum)
    
   END FUNCTION Fkstarrstarrot_cub
 
@@ -4,6 +4,7 @@ MODULE calltrapQLints
   USE datcal
   USE datmat
   USE calltrapints
+  USE mod_cubature
 
   IMPLICIT NONE
 
@@ -16,6 +17,7 @@ CONTAINS
     ! Double integral done for trapped electrons due to collisions
     ! Integrals (with switch) in order to identify particle flux contributions due to An, At and curvature
     ! To save some computational time, only the imaginary component is kept - relevant for transport
+    ! All coefficients are integrated in batched vector cubatures
     !----------------------------------------------------------- 
     INTEGER, INTENT(IN)  :: p,nu
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
@@ -24,525 +26,78 @@ CONTAINS
     COMPLEX(KIND=DBL), DIMENSION(:), INTENT(OUT) :: fonctpi, fonctpgti, fonctpgni, fonctpci, fonctepi
     COMPLEX(KIND=DBL), DIMENSION(:), INTENT(OUT) :: fonctepgti, fonctepgni, fonctepci
 
-    INTEGER, PARAMETER :: lwloc=50000 !default 10000
-    INTEGER :: npts, minpts, neval
+    INTEGER :: minpts, nv, i
 
     REAL(KIND=DBL), DIMENSION(ndim) :: a,b
-    REAL(KIND=DBL) :: acc, cc, dd, relerr 
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
+    REAL(KIND=DBL) :: acc
 
-    REAL(KIND=DBL)    :: rfonctpe, rfonctpgte, rfonctpgne, rfonctpce, rfonctepe
-    REAL(KIND=DBL)    :: rfonctepgte, rfonctepgne, rfonctepce
-    REAL(KIND=DBL)    :: ifonctpe, ifonctpgte, ifonctpgne, ifonctpce, ifonctepe
-    REAL(KIND=DBL)    :: ifonctepgte, ifonctepgne, ifonctepce
-
-    REAL(KIND=DBL), DIMENSION(nions) :: rfonctpi, rfonctpgti, rfonctpgni, rfonctpci, rfonctepi
-    REAL(KIND=DBL), DIMENSION(nions) :: rfonctepgti, rfonctepgni, rfonctepci
-    REAL(KIND=DBL), DIMENSION(nions) :: ifonctpi, ifonctpgti, ifonctpgni, ifonctpci, ifonctepi
-    REAL(KIND=DBL), DIMENSION(nions) :: ifonctepgti, ifonctepgni, ifonctepci
-
-    REAL(KIND=DBL), DIMENSION(nf) :: intout
+    REAL(KIND=DBL), DIMENSION(16+8*nions) :: intout
     INTEGER :: ifailloc
 
     omFFk = omega
     pFFk = p
+    nuFFk = nu
 
     !! Integration bounds
-    !! a,b are for the 1D ions. 
+    !! a(1),b(1) are for the 1D integrals over kappa
     a(1) = 0.0d0
     b(1) = 1.0d0 - barelyavoid
     a(2) = 0.0d0
     b(2) = vuplim
 
-    cc = a(1)
-    dd = b(1)
-
-    DO ion=1,nions
-
-       !! ION PARTICLE FLUX 
-       !ifailloc=1
-       !rfonctpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFki,lw,ifailloc)
-       !IF (ifailloc /= 0) THEN
-       !   IF (verbose .EQV. .TRUE.) WRITE(stderr,*) 'Abnormal termination of rFFki integration at p= ',p,', ion=',ion
-       !ENDIF
-       ifailloc=1     
-       ifonctpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFki,lw,ifailloc)
-       IF (ifailloc /= 0) THEN
-          IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFki integration at p=',p,', nu=',nu,', ion=',ion
-       ENDIF
-       rfonctpi(ion) = 0.
-
-       ! ADDITIONAL ION INTEGRALS TO SEPARATE TRANSPORT COMPONENTS
-       IF (phys_meth .NE. 0.0) THEN
-
-          !ifailloc=1
-          !rfonctpgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgti,lw,ifailloc)
-          !IF (ifailloc /= 0) THEN
-          !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgti integration at p=',p,', nu=',nu,', ion=',ion
-          !ENDIF
-
-          ifailloc=1
-          ifonctpgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgti,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgti integration at p=',p,', nu=',nu,', ion=',ion
-          ENDIF
-          rfonctpgti(ion)=0.
-
-          !ifailloc=1
-          !rfonctpgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgni,lw,ifailloc)
-          !IF (ifailloc /= 0) THEN
-          !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgni integration at p=',p,', nu=',nu,', ion=',ion
-          !ENDIF
-
-          ifailloc=1
-          ifonctpgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgni,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgni integration at p=',p,', nu=',nu,', ion=',ion
-          ENDIF
-          rfonctpgni(ion)=0.
-
-          !ifailloc=1
-          !rfonctpci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkci,lw,ifailloc)
-          !IF (ifailloc /= 0) THEN
-          !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkci integration at p=',p,', nu=',nu,', ion=',ion
-          !ENDIF
-
-          ifailloc=1
-          ifonctpci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkci,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkci integration at p=',p,', nu=',nu,', ion=',ion
-          ENDIF
-          rfonctpci(ion)=0.
-!!!
-          IF (phys_meth == 2) THEN
-             !ifailloc=1
-             !rfonctepgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgti,lw,ifailloc)
-             !IF (ifailloc /= 0) THEN
-             !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgti integration at p=',p,', nu=',nu,', ion=',ion
-             !ENDIF
-
-             ifailloc=1
-             IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgti,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgti integration at p=',p,', nu=',nu,', ion=',ion
-                ENDIF
-             ELSE
-                ifonctepgti(ion) = 0.
-             ENDIF
-             rfonctepgti(ion)=0.
-
-             !ifailloc=1
-             !rfonctepgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgni,lw,ifailloc)
-             !IF (ifailloc /= 0) THEN
-             !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgni integration at p=',p,', nu=',nu,', ion=',ion
-             !ENDIF
-
-             ifailloc=1
-             IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgni,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgni integration at p=',p,', nu=',nu,', ion=',ion
-                ENDIF
-             ELSE
-                ifonctepgni(ion) = 0.
-             ENDIF
-             rfonctepgni(ion)=0.
-
-             !ifailloc=1
-             !rfonctepci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekci,lw,ifailloc)
-             !IF (ifailloc /= 0) THEN
-             !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekci integration at p=',p,', nu=',nu,', ion=',ion
-             !ENDIF
-
-             ifailloc=1
-             IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekci,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekci integration at p=',p,', nu=',nu,', ion=',ion
-                ENDIF
-             ELSE
-                ifonctepci(ion) = 0.
-             ENDIF
-             rfonctepci(ion)=0.
-          ELSE
-             rfonctepgti(ion) = 0.
-             ifonctepgti(ion) = 0.
-             rfonctepgni(ion) = 0.
-             ifonctepgni(ion) = 0.
-             rfonctepci(ion) = 0.
-             ifonctepci(ion) = 0.
-          ENDIF
-       ELSE
-          rfonctpgti(ion) = 0.
-          ifonctpgti(ion) = 0.
-          rfonctpgni(ion) = 0.
-          ifonctpgni(ion) = 0.
-          rfonctpci(ion) = 0.
-          ifonctpci(ion) = 0.
-          rfonctepgti(ion) = 0.
-          ifonctepgti(ion) = 0.
-          rfonctepgni(ion) = 0.
-          ifonctepgni(ion) = 0.
-          rfonctepci(ion) = 0.
-          ifonctepci(ion) = 0.
-
-       ENDIF
-
-       ! ION ENERGY FLUX
-
-       !ifailloc=1
-       !rfonctepi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFeki,lw,ifailloc)
-       !IF (ifailloc /= 0) THEN
-       !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFeki integration at p=',p,', nu=',nu,', ion=',ion
-       !ENDIF
-
-       ifailloc=1
-       IF (ninorm(p,ion) > min_ninorm) THEN
-          ifonctepi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFeki,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFeki integration at p=',p,', nu=',nu,', ion=',ion
-          ENDIF
-       ELSE
-          ifonctepi(ion) = 0.
-       ENDIF
-       rfonctepi(ion)=0.
-    ENDDO
-
-
-    ! 2D INTEGRALS FOR ELECTRONS
-
-    minpts = 0; ifailloc=1;
-    !Only calculate nonadiabatic part for electrons if el_type == 1
-    IF (el_type == 1) THEN 
-
-       IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-          minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFke,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFke integration at p=',p,' nu=',nu
-          ENDIF
-
-          minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFke,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFke integration at p=',p,' nu=',nu
-          ENDIF
-       ELSE ! Collisionless simulation, revert to faster single integral
-          ifailloc=1
-          intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFke_nocoll,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFke_nocoll integration at p=',p,' nu=',nu
-          ENDIF
-
-          ifailloc=1
-          intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFke_nocoll,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFke_nocoll integration at p=',p,' nu=',nu
-          ENDIF
-       ENDIF
-    ELSE
-       intout(1)=0
-       intout(2)=0
-    ENDIF
-    rfonctpe = intout(1)
-    ifonctpe = intout(2)
-
-    !   !!ADDITIONAL ELECTRON INTEGRALS TO SEPARATE TRANSPORT COMPONENTS
-    IF (phys_meth .NE. 0.0) THEN
-
-       minpts = 0; ifailloc=1;
-       !Only calculate nonadiabatic part for electrons if el_type == 1
-       IF (el_type == 1) THEN 
-          IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-             minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkgte,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkgte integration at p=',p,' nu=',nu
-             ENDIF
-
-             minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkgte,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkgte integration at p=',p,' nu=',nu
-             ENDIF
-
-          ELSE ! Collisionless simulation, revert to faster single integral
-             ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgte_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgte_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-             ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgte_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgte_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-
-          ENDIF
-       ELSE
-          intout(1)=0
-          intout(2)=0
-       ENDIF
-       rfonctpgte = intout(1)
-       ifonctpgte = intout(2)
-
-       minpts = 0; ifailloc=1;
-       !Only calculate nonadiabatic part for electrons if el_type == 1
-       IF (el_type == 1) THEN 
-          IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-             minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkgne,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkgne integration at p=',p,' nu=',nu
-             ENDIF
-             minpts=0;  ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkgne,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkgne integration at p=',p,' nu=',nu
-             ENDIF
-          ELSE ! Collisionless simulation, revert to faster single integral
-             ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgne_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgne_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-             ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgne_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgne_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-          ENDIF
-
-       ELSE
-          intout(1)=0
-          intout(2)=0
-       ENDIF
-       rfonctpgne = intout(1)
-       ifonctpgne = intout(2)
-
-       minpts = 0; ifailloc=1;
-       !Only calculate nonadiabatic part for electrons if el_type == 1
-       IF (el_type == 1) THEN
-          IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral 
-             minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkce,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkce integration at p=',p,' nu=',nu
-             ENDIF
-             minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkce,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkce integration at p=',p,' nu=',nu
-             ENDIF
-          ELSE ! Collisionless simulation, revert to faster single integral
-             ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkce_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkce_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-             ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkce_nocoll,lw,ifailloc)
-             IF (ifailloc /= 0) THEN
-                IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkce_nocoll integration at p=',p,' nu=',nu
-             ENDIF
-          ENDIF
-
-       ELSE
-          intout(1)=0
-          intout(2)=0
-       ENDIF
-       rfonctpce = intout(1)
-       ifonctpce = intout(2)
-!!!
-       IF (phys_meth == 2) THEN
-          minpts = 0; ifailloc=1;
-          !Only calculate nonadiabatic part for electrons if el_type == 1
-          IF (el_type == 1) THEN 
-             IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekgte,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekgte integration at p=',p,' nu=',nu
-                ENDIF
-
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekgte,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekgte integration at p=',p,' nu=',nu
-                ENDIF
-
-             ELSE ! Collisionless simulation, revert to faster single integral
-                ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgte_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgte_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-                ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgte_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgte_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-
-             ENDIF
-          ELSE
-             intout(1)=0
-             intout(2)=0
-          ENDIF
-          rfonctepgte = intout(1)
-          ifonctepgte = intout(2)
-
-          minpts = 0; ifailloc=1;
-          !Only calculate nonadiabatic part for electrons if el_type == 1
-          IF (el_type == 1) THEN 
-             IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekgne,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekgne integration at p=',p,' nu=',nu
-                ENDIF
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekgne,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekgne integration at p=',p,' nu=',nu
-                ENDIF
-             ELSE ! Collisionless simulation, revert to faster single integral
-                ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgne_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgne_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-                ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgne_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgne_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-             ENDIF
-
-          ELSE
-             intout(1)=0
-             intout(2)=0
-          ENDIF
-          rfonctepgne = intout(1)
-          ifonctepgne = intout(2)
-
-          minpts = 0; ifailloc=1;
-          !Only calculate nonadiabatic part for electrons if el_type == 1
-          IF (el_type == 1) THEN
-             IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral 
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekce,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekce integration at p=',p,' nu=',nu
-                ENDIF
-                minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekce,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekce integration at p=',p,' nu=',nu
-                ENDIF
-             ELSE ! Collisionless simulation, revert to faster single integral
-                ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekce_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekce_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-                ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekce_nocoll,lw,ifailloc)
-                IF (ifailloc /= 0) THEN
-                   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekce_nocoll integration at p=',p,' nu=',nu
-                ENDIF
-             ENDIF
-
-          ELSE
-             intout(1)=0
-             intout(2)=0
-          ENDIF
-          rfonctepce = intout(1)
-          ifonctepce = intout(2)
-       ELSE
-          rfonctepgte = 0.
-          ifonctepgte = 0.
-          rfonctepgne = 0.
-          ifonctepgne = 0.
-          rfonctepce = 0.
-          ifonctepce = 0.
-       ENDIF
-    ELSE
-       rfonctpgte = 0.
-       ifonctpgte = 0.
-       rfonctpgne = 0.
-       ifonctpgne = 0.
-       rfonctpce = 0.
-       ifonctpce = 0.
-       rfonctepgte = 0.
-       ifonctepgte = 0.
-       rfonctepgne = 0.
-       ifonctepgne = 0.
-       rfonctepce = 0.
-       ifonctepce = 0.
+    !Coefficients (caseflags) to calculate: particle (1) and energy (5) integrals,
+    !and the At, An and curvature contributions to the particle (2-4) and energy (6-8) integrals
+    QLcase(:) = .FALSE.
+    QLcase(1) = .TRUE.
+    QLcase(5) = .TRUE.
+    IF (phys_meth .NE. 0.0) QLcase(2:4) = .TRUE.
+    IF (phys_meth == 2) QLcase(6:8) = .TRUE.
+
+    !All 1D kappa integrals (all ions, and the electrons for collisionless simulations)
+    !are calculated together as one vector integrand on a shared grid
+    nv = 16+8*nions
+    minpts=0; ifailloc=1
+    CALL cubature(1,nv,a(1:1),b(1:1),minpts,maxpts,FFkQL_cub,relaccQL1,0.d0,intout,acc,ifailloc,QLfloor)
+    IF (ifailloc /= 0) THEN
+       IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1D cubature QL FFkQL integration at p=',p,', nu=',nu
     ENDIF
 
-    !ELECTRON ENERGY FLUX
-
-    minpts = 0; ifailloc=1;
     !Only calculate nonadiabatic part for electrons if el_type == 1
-    IF (el_type == 1) THEN 
-       IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
-          minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFeke,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFeke integration at p=',p,' nu=',nu
-          ENDIF
-          minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFeke,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFeke integration at p=',p,' nu=',nu
-          ENDIF
-
-       ELSE ! Collisionless simulation, revert to faster single integral
-          ifailloc=1
-          intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFeke_nocoll,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFeke_nocoll integration at p=',p,' nu=',nu
-          ENDIF
-          ifailloc=1
-          intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFeke_nocoll,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFeke_nocoll integration at p=',p,' nu=',nu
-          ENDIF
+    IF ( (el_type == 1) .AND. ( ABS(coll_flag) > epsD) ) THEN ! Collisional simulation, do double integral
+       minpts=0; ifailloc=1
+       CALL cubature(ndim,16,a,b,minpts,maxpts,FFkeQL_cub,relaccQL2,0.d0,intout(1:16),acc,ifailloc,QLfloor)
+       IF (ifailloc /= 0) THEN
+          IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2D cubature QL FFkeQL integration at p=',p,' nu=',nu
        ENDIF
-    ELSE
-       intout(1)=0
-       intout(2)=0
     ENDIF
-    rfonctepe = intout(1)
-    ifonctepe = intout(2)
 
-    !The complex forms are reconstructed
-    fonctpe = rfonctpe + ci * ifonctpe
-    fonctpi(:) = rfonctpi(:) + ci * ifonctpi(:)
-
-    fonctpgte = rfonctpgte + ci * ifonctpgte
-    fonctpgti(:) = rfonctpgti(:) + ci * ifonctpgti(:)
-
-    fonctpgne = rfonctpgne + ci * ifonctpgne
-    fonctpgni(:) = rfonctpgni(:) + ci * ifonctpgni(:)
-
-    fonctpce = rfonctpce + ci * ifonctpce
-    fonctpci(:) = rfonctpci(:) + ci * ifonctpci(:)
-
-    fonctepe = rfonctepe + ci * ifonctepe
-    fonctepi(:) = rfonctepi(:) + ci * ifonctepi(:)
-
-    fonctepgte = rfonctepgte + ci * ifonctepgte
-    fonctepgti(:) = rfonctepgti(:) + ci * ifonctepgti(:)
-
-    fonctepgne = rfonctepgne + ci * ifonctepgne
-    fonctepgni(:) = rfonctepgni(:) + ci * ifonctepgni(:)
-
-    fonctepce = rfonctepce + ci * ifonctepce
-    fonctepci(:) = rfonctepci(:) + ci * ifonctepci(:)
+    !Unnormalise the species prefactors
+    intout(1:16) = Nex(p)*intout(1:16)
+    DO i=1,nions
+       intout(8*i+9:8*i+16) = coefi(p,i)*intout(8*i+9:8*i+16)
+    ENDDO
 
+    !The complex forms are reconstructed. Only the imaginary component is kept for the ions
+    fonctpe = intout(1) + ci * intout(9)
+    fonctpgte = intout(2) + ci * intout(10)
+    fonctpgne = intout(3) + ci * intout(11)
+    fonctpce = intout(4) + ci * intout(12)
+
+    fonctepe = intout(5) + ci * intout(13)
+    fonctepgte = intout(6) + ci * intout(14)
+    fonctepgne = intout(7) + ci * intout(15)
+    fonctepce = intout(8) + ci * intout(16)
+
+    DO i=1,nions
+       fonctpi(i) = ci * intout(8*i+9)
+       fonctpgti(i) = ci * intout(8*i+10)
+       fonctpgni(i) = ci * intout(8*i+11)
+       fonctpci(i) = ci * intout(8*i+12)
+       fonctepi(i) = ci * intout(8*i+13)
+       fonctepgti(i) = ci * intout(8*i+14)
+       fonctepgni(i) = ci * intout(8*i+15)
+       fonctepci(i) = ci * intout(8*i+16)
+    ENDDO
 
   END SUBROUTINE trapQLints
 
@@ -571,7 +126,6 @@ CONTAINS
 
     REAL(KIND=DBL), DIMENSION(ndim) :: a,b
     REAL(KIND=DBL) :: acc, cc, dd, relerr 
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
 
     REAL(KIND=DBL)    :: rfonctpe, rfonctpgte, rfonctpgne, rfonctpce, rfonctepe
     REAL(KIND=DBL)    :: rfonctepgte, rfonctepgne, rfonctepce
@@ -603,12 +157,12 @@ CONTAINS
 
        !! ION PARTICLE FLUX 
        !ifailloc=1
-       !rfonctpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkirot,lw,ifailloc)
+       !rfonctpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkirot,lw,ifailloc)
        !IF (ifailloc /= 0) THEN
        !   IF (verbose .EQV. .TRUE.) WRITE(stderr,*) 'Abnormal termination of rFFkirot integration at p= ',p,', ion=',ion
        !ENDIF
        ifailloc=1     
-       ifonctpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkirot,lw,ifailloc)
+       ifonctpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkirot,lw,ifailloc)
        IF (ifailloc /= 0) THEN
           IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkirot integration at p=',p,', nu=',nu,', ion=',ion
        ENDIF
@@ -618,52 +172,52 @@ CONTAINS
        IF (phys_meth .NE. 0.0) THEN
 
           !ifailloc=1
-          !rfonctpgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgtirot,lw,ifailloc)
+          !rfonctpgti(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkgtirot,lw,ifailloc)
           !IF (ifailloc /= 0) THEN
           !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgtirot integration at p=',p,', nu=',nu,', ion=',ion
           !ENDIF
 
           ifailloc=1
-          ifonctpgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgtirot,lw,ifailloc)
+          ifonctpgti(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkgtirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgtirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
           rfonctpgti(ion)=0.
 
           !ifailloc=1
-          !rfonctpgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgnirot,lw,ifailloc)
+          !rfonctpgni(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkgnirot,lw,ifailloc)
           !IF (ifailloc /= 0) THEN
           !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgnirot integration at p=',p,', nu=',nu,', ion=',ion
           !ENDIF
 
           ifailloc=1
-          ifonctpgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgnirot,lw,ifailloc)
+          ifonctpgni(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkgnirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgnirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
           rfonctpgni(ion)=0.
 
           !ifailloc=1
-          !rfonctpgui(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkguirot,lw,ifailloc)
+          !rfonctpgui(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkguirot,lw,ifailloc)
           !IF (ifailloc /= 0) THEN
           !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkguirot integration at p=',p,', nu=',nu,', ion=',ion
           !ENDIF
 
           ifailloc=1
-          ifonctpgui(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkguirot,lw,ifailloc)
+          ifonctpgui(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkguirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkguirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
           rfonctpgui(ion)=0.
 
           !ifailloc=1
-          !rfonctpci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkcirot,lw,ifailloc)
+          !rfonctpci(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkcirot,lw,ifailloc)
           !IF (ifailloc /= 0) THEN
           !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkcirot integration at p=',p,', nu=',nu,', ion=',ion
           !ENDIF
 
           ifailloc=1
-          ifonctpci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkcirot,lw,ifailloc)
+          ifonctpci(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkcirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkcirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
@@ -671,14 +225,14 @@ CONTAINS
 !!!
           IF (phys_meth == 2) THEN
              !ifailloc=1
-             !rfonctepgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgtirot,lw,ifailloc)
+             !rfonctepgti(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekgtirot,lw,ifailloc)
              !IF (ifailloc /= 0) THEN
              !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgtirot integration at p=',p,', nu=',nu,', ion=',ion
              !ENDIF
 
              ifailloc=1
              IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepgti(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgtirot,lw,ifailloc)
+                ifonctepgti(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekgtirot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgtirot integration at p=',p,', nu=',nu,', ion=',ion
                 ENDIF
@@ -688,14 +242,14 @@ CONTAINS
              rfonctepgti(ion)=0.
 
              !ifailloc=1
-             !rfonctepgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgnirot,lw,ifailloc)
+             !rfonctepgni(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekgnirot,lw,ifailloc)
              !IF (ifailloc /= 0) THEN
              !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgnirot integration at p=',p,', nu=',nu,', ion=',ion
              !ENDIF
 
              ifailloc=1
              IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepgni(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgnirot,lw,ifailloc)
+                ifonctepgni(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekgnirot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgnirot integration at p=',p,', nu=',nu,', ion=',ion
                 ENDIF
@@ -705,14 +259,14 @@ CONTAINS
              rfonctepgni(ion)=0.
 
              !ifailloc=1
-             !rfonctepgui(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekguirot,lw,ifailloc)
+             !rfonctepgui(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekguirot,lw,ifailloc)
              !IF (ifailloc /= 0) THEN
              !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekguirot integration at p=',p,', nu=',nu,', ion=',ion
              !ENDIF
 
              ifailloc=1
              IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepgui(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekguirot,lw,ifailloc)
+                ifonctepgui(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekguirot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekguirot integration at p=',p,', nu=',nu,', ion=',ion
                 ENDIF
@@ -722,14 +276,14 @@ CONTAINS
              rfonctepgui(ion)=0.
 
              !ifailloc=1
-             !rfonctepci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekcirot,lw,ifailloc)
+             !rfonctepci(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekcirot,lw,ifailloc)
              !IF (ifailloc /= 0) THEN
              !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekcirot integration at p=',p,', nu=',nu,', ion=',ion
              !ENDIF
 
              ifailloc=1
              IF (ninorm(p,ion) > min_ninorm) THEN
-                ifonctepci(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekcirot,lw,ifailloc)
+                ifonctepci(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekcirot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekcirot integration at p=',p,', nu=',nu,', ion=',ion
                 ENDIF
@@ -769,14 +323,14 @@ CONTAINS
        ! ION ENERGY FLUX
 
        !ifailloc=1
-       !rfonctepi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekirot,lw,ifailloc)
+       !rfonctepi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekirot,lw,ifailloc)
        !IF (ifailloc /= 0) THEN
        !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekirot integration at p=',p,', nu=',nu,', ion=',ion
        !ENDIF
 
        ifailloc=1
        IF (ninorm(p,ion) > min_ninorm) THEN
-          ifonctepi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekirot,lw,ifailloc)
+          ifonctepi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
@@ -788,14 +342,14 @@ CONTAINS
        ! ION ang mom FLUX
 
        !ifailloc=1
-       !rfonctvpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFvkirot,lw,ifailloc)
+       !rfonctvpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFvkirot,lw,ifailloc)
        !IF (ifailloc /= 0) THEN
        !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFvkirot integration at p=',p,', nu=',nu,', ion=',ion
        !ENDIF
 
        ifailloc=1
        IF (ninorm(p,ion) > min_ninorm) THEN
-          ifonctvpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFvkirot,lw,ifailloc)
+          ifonctvpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFvkirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFvkirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
@@ -815,25 +369,25 @@ CONTAINS
 
        IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
           minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+          CALL cubnd(ndim,a,b,minpts,maxpts,rFFkerot,relaccQL2,acc,intout(1),ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkerot integration at p=',p,' nu=',nu
           ENDIF
 
           minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+          CALL cubnd(ndim,a,b,minpts,maxpts,iFFkerot,relaccQL2,acc,intout(2),ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkerot integration at p=',p,' nu=',nu
           ENDIF
        ELSE ! Collisionless simulation, revert to faster single integral
           ifailloc=1
-          intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFke_nocollrot,lw,ifailloc)
+          intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFke_nocollrot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFke_nocollrot integration at p=',p,' nu=',nu
           ENDIF
 
           ifailloc=1
-          intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFke_nocollrot,lw,ifailloc)
+          intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFke_nocollrot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFke_nocollrot integration at p=',p,' nu=',nu
           ENDIF
@@ -854,24 +408,24 @@ CONTAINS
        IF (el_type == 1) THEN 
           IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkgterot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,rFFkgterot,relaccQL2,acc,intout(1),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkgterot integration at p=',p,' nu=',nu
              ENDIF
 
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkgterot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,iFFkgterot,relaccQL2,acc,intout(2),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkgterot integration at p=',p,' nu=',nu
              ENDIF
           ELSE ! Collisionless simulation, revert to faster single integral
              ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgte_nocollrot,lw,ifailloc)
+             intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkgte_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgte_nocollrot integration at p=',p,' nu=',nu
              ENDIF
              ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgte_nocollrot,lw,ifailloc)
+             intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkgte_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgte_nocollrot integration at p=',p,' nu=',nu
              ENDIF
@@ -890,23 +444,23 @@ CONTAINS
        IF (el_type == 1) THEN 
           IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkgnerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,rFFkgnerot,relaccQL2,acc,intout(1),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkgnerot integration at p=',p,' nu=',nu
              ENDIF
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkgnerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,iFFkgnerot,relaccQL2,acc,intout(2),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkgnerot integration at p=',p,' nu=',nu
              ENDIF
           ELSE ! Collisionless simulation, revert to faster single integral
              ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkgne_nocollrot,lw,ifailloc)
+             intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkgne_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkgne_nocollrot integration at p=',p,' nu=',nu
              ENDIF
              ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkgne_nocollrot,lw,ifailloc)
+             intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkgne_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkgne_nocollrot integration at p=',p,' nu=',nu
              ENDIF
@@ -923,23 +477,23 @@ CONTAINS
        IF (el_type == 1) THEN
           IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral 
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkcerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,rFFkcerot,relaccQL2,acc,intout(1),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFkcerot integration at p=',p,' nu=',nu
              ENDIF
              minpts=0; ifailloc=1
-             CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkcerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+             CALL cubnd(ndim,a,b,minpts,maxpts,iFFkcerot,relaccQL2,acc,intout(2),ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFkcerot integration at p=',p,' nu=',nu
              ENDIF
           ELSE ! Collisionless simulation, revert to faster single integral
              ifailloc=1
-             intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFkce_nocollrot,lw,ifailloc)
+             intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFkce_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFkce_nocollrot integration at p=',p,' nu=',nu
              ENDIF
              ifailloc=1
-             intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFkce_nocollrot,lw,ifailloc)
+             intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFkce_nocollrot,lw,ifailloc)
              IF (ifailloc /= 0) THEN
                 IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFkce_nocollrot integration at p=',p,' nu=',nu
              ENDIF
@@ -958,24 +512,24 @@ CONTAINS
           IF (el_type == 1) THEN 
              IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekgterot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,rFFekgterot,relaccQL2,acc,intout(1),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekgterot integration at p=',p,' nu=',nu
                 ENDIF
 
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekgterot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,iFFekgterot,relaccQL2,acc,intout(2),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekgterot integration at p=',p,' nu=',nu
                 ENDIF
              ELSE ! Collisionless simulation, revert to faster single integral
                 ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgte_nocollrot,lw,ifailloc)
+                intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekgte_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgte_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
                 ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgte_nocollrot,lw,ifailloc)
+                intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekgte_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgte_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
@@ -994,23 +548,23 @@ CONTAINS
           IF (el_type == 1) THEN 
              IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekgnerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,rFFekgnerot,relaccQL2,acc,intout(1),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekgnerot integration at p=',p,' nu=',nu
                 ENDIF
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekgnerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,iFFekgnerot,relaccQL2,acc,intout(2),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekgnerot integration at p=',p,' nu=',nu
                 ENDIF
              ELSE ! Collisionless simulation, revert to faster single integral
                 ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekgne_nocollrot,lw,ifailloc)
+                intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekgne_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekgne_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
                 ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekgne_nocollrot,lw,ifailloc)
+                intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekgne_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekgne_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
@@ -1027,23 +581,23 @@ CONTAINS
           IF (el_type == 1) THEN
              IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral 
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekcerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,rFFekcerot,relaccQL2,acc,intout(1),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekcerot integration at p=',p,' nu=',nu
                 ENDIF
                 minpts=0; ifailloc=1
-                CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekcerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+                CALL cubnd(ndim,a,b,minpts,maxpts,iFFekcerot,relaccQL2,acc,intout(2),ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekcerot integration at p=',p,' nu=',nu
                 ENDIF
              ELSE ! Collisionless simulation, revert to faster single integral
                 ifailloc=1
-                intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFekce_nocollrot,lw,ifailloc)
+                intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFekce_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFekce_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
                 ifailloc=1
-                intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFekce_nocollrot,lw,ifailloc)
+                intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFekce_nocollrot,lw,ifailloc)
                 IF (ifailloc /= 0) THEN
                    IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFekce_nocollrot integration at p=',p,' nu=',nu
                 ENDIF
@@ -1085,23 +639,23 @@ CONTAINS
     IF (el_type == 1) THEN 
        IF ( ABS(coll_flag) > epsD) THEN ! Collisional simulation, do double integral
           minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFekerot,relaccQL2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+          CALL cubnd(ndim,a,b,minpts,maxpts,rFFekerot,relaccQL2,acc,intout(1),ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL rFFekerot integration at p=',p,' nu=',nu
           ENDIF
           minpts=0; ifailloc=1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFekerot,relaccQL2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+          CALL cubnd(ndim,a,b,minpts,maxpts,iFFekerot,relaccQL2,acc,intout(2),ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 2DNAG QL iFFekerot integration at p=',p,' nu=',nu
           ENDIF
        ELSE ! Collisionless simulation, revert to faster single integral
           ifailloc=1
-          intout(1) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFeke_nocollrot,lw,ifailloc)
+          intout(1) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFeke_nocollrot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFeke_nocollrot integration at p=',p,' nu=',nu
           ENDIF
           ifailloc=1
-          intout(2) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFeke_nocollrot,lw,ifailloc)
+          intout(2) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFeke_nocollrot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFeke_nocollrot integration at p=',p,' nu=',nu
           ENDIF
@@ -1164,7 +718,6 @@ CONTAINS
 
     REAL(KIND=DBL), DIMENSION(ndim) :: a,b
     REAL(KIND=DBL) :: cc, dd, relerr 
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
 
     REAL(KIND=DBL), DIMENSION(nions) :: rfonctvpi
     REAL(KIND=DBL), DIMENSION(nions) :: ifonctvpi
@@ -1190,14 +743,14 @@ CONTAINS
        ! ION ang mom FLUX
 
        !ifailloc=1
-       !rfonctvpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,rFFvkirot,lw,ifailloc)
+       !rfonctvpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,rFFvkirot,lw,ifailloc)
        !IF (ifailloc /= 0) THEN
        !   IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL rFFvkirot integration at p=',p,', nu=',nu,', ion=',ion
        !ENDIF
 
        ifailloc=1
        IF (ninorm(p,ion) > min_ninorm) THEN
-          ifonctvpi(ion) = d01ahf(cc,dd,relaccQL1,npts,relerr,iFFvkirot,lw,ifailloc)
+          ifonctvpi(ion) = quad1d(cc,dd,relaccQL1,npts,relerr,iFFvkirot,lw,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I3,A,I3,A,I3)") 'ifailloc = ',ifailloc,'. Abnormal termination of 1DNAG QL iFFvkirot integration at p=',p,', nu=',nu,', ion=',ion
           ENDIF
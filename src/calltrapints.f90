@@ -6,17 +6,35 @@ MODULE calltrapints
 
 CONTAINS
 
-  FUNCTION FFke_cub(nf, kv)
+  FUNCTION FFke_cub(nd, kv, nv)
     !---------------------------------------------------------------------
-    ! Calculates the real part of the trapped electron integrand
+    ! Calculates the real and imaginary parts of the trapped electron integrand
     !---------------------------------------------------------------------  
-    INTEGER, INTENT(IN) :: nf
-    REAL(KIND=DBL), DIMENSION(nf), INTENT(IN) :: kv
-    REAL(KIND=DBL), DIMENSION(nf) :: FFke_cub
-    FFke_cub(1) = REAL ( FFke(nf, kv, 1) )
-    FFke_cub(2) = AIMAG ( FFke(nf, kv, 1) )
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kv
+    REAL(KIND=DBL), DIMENSION(nv) :: FFke_cub
+    COMPLEX(KIND=DBL) :: fk
+    fk = FFke(nd, kv, 1)
+    FFke_cub(1) = REAL ( fk )
+    FFke_cub(2) = AIMAG ( fk )
   END FUNCTION FFke_cub
 
+  FUNCTION FFked_cub(nd, kv, nv)
+    !---------------------------------------------------------------------
+    ! Calculates the trapped electron integrand and its omega and |omega|
+    ! derivatives (nv = 6), the latter two multiplied by |omega| for the
+    ! common error estimate
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kv
+    REAL(KIND=DBL), DIMENSION(nv) :: FFked_cub
+    COMPLEX(KIND=DBL), DIMENSION(3) :: fk
+    fk = FFke_d(nd, kv)
+    fk(2:3) = fk(2:3)*MAX(ABS(omFFk),epsD)
+    FFked_cub(1:5:2) = REAL ( fk )
+    FFked_cub(2:6:2) = AIMAG ( fk )
+  END FUNCTION FFked_cub
+
   FUNCTION FFkgte_cub(nf, kv)
     !---------------------------------------------------------------------------
     ! Calculates the real part of the trapped electron integrand (Ate term only)
@@ -94,6 +112,92 @@ CONTAINS
     FFekce_cub(2) = AIMAG ( FFke(nf, kv, 8) )
   END FUNCTION FFekce_cub
 
+  FUNCTION FFkQL_cub(nd, kk, nv)
+    !---------------------------------------------------------------------
+    ! Returns all trapped particle QL integrands over kappa only, for batched vector cubature.
+    ! Layout: real (1:8) and imaginary (9:16) parts of the collisionless electron
+    ! integrand, then the imaginary parts of the 8 caseflags for each ion, see QLcase.
+    ! The electron part is only filled for collisionless simulations
+    ! Each species is divided by its prefactor (Nex or coefi) such that all components
+    ! are of similar magnitude for the common error estimate. Unnormalised in trapQLints
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkQL_cub
+    COMPLEX(KIND=DBL), DIMENSION(8) :: Fk
+    INTEGER :: i
+
+    FFkQL_cub(:) = 0
+    IF ( (el_type == 1) .AND. (ABS(coll_flag) <= epsD) ) THEN
+       Fk = FFke_nocoll_all(kk(1))
+       FFkQL_cub(1:8) = REAL(Fk)/Nex(pFFk)
+       FFkQL_cub(9:16) = AIMAG(Fk)/Nex(pFFk)
+    ENDIF
+
+    DO i = 1,nions
+       IF (ABS(coefi(pFFk,i)) < epsD) CYCLE
+       Fk = FFki_all(kk(1),i)
+       IF (ninorm(pFFk,i) <= min_ninorm) Fk(5:8) = 0. !energy integrals skipped for trace ions
+       FFkQL_cub(8*i+9:8*i+16) = AIMAG(Fk)/coefi(pFFk,i)
+    ENDDO
+  END FUNCTION FFkQL_cub
+
+  FUNCTION FFkeQL_cub(nd, kv, nv)
+    !---------------------------------------------------------------------
+    ! Returns the real (1:8) and imaginary (9:16) parts of all collisional trapped
+    ! electron QL integrands, for batched vector cubature. Normalised by Nex
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kv
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkeQL_cub
+    COMPLEX(KIND=DBL), DIMENSION(8) :: Fk
+
+    Fk = FFke_all(nd, kv)
+    FFkeQL_cub(1:8) = REAL(Fk)/Nex(pFFk)
+    FFkeQL_cub(9:16) = AIMAG(Fk)/Nex(pFFk)
+  END FUNCTION FFkeQL_cub
+
+  FUNCTION FFkiz_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns the real and imaginary components of the trapped ion (all ions) integrand
+    ! for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkiz_cub
+    COMPLEX(KIND=DBL) :: intsum
+    INTEGER :: i
+    intsum=0
+    DO i = 1,nions
+       IF ( (ion_type(pFFk,i) == 1) .AND. (ETG_flag(nuFFk) .EQV. .FALSE.) ) THEN !only include active ions
+          intsum = intsum+FFki(kk(1),1,i)*ninorm(pFFk,i) !unnormalise coefi here
+       ENDIF
+    ENDDO
+    FFkiz_cub(1) = REAL(intsum)
+    FFkiz_cub(2) = AIMAG(intsum)
+  END FUNCTION FFkiz_cub
+
+  FUNCTION FFkizd_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns the trapped ion (all ions) integrand and its omega derivative
+    ! multiplied by |omega|, real and imaginary parts, for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkizd_cub
+    COMPLEX(KIND=DBL), DIMENSION(2) :: intsum
+    INTEGER :: i
+    intsum=0
+    DO i = 1,nions
+       IF ( (ion_type(pFFk,i) == 1) .AND. (ETG_flag(nuFFk) .EQV. .FALSE.) ) THEN !only include active ions
+          intsum = intsum+FFki_d(kk(1),i)*ninorm(pFFk,i) !unnormalise coefi here
+       ENDIF
+    ENDDO
+    intsum(2) = intsum(2)*MAX(ABS(omFFk),epsD)
+    FFkizd_cub(1:3:2) = REAL(intsum)
+    FFkizd_cub(2:4:2) = AIMAG(intsum)
+  END FUNCTION FFkizd_cub
+
   REAL(KIND=DBL) FUNCTION rFFkiz(kk)
     !-------------------------------------------------------------
     ! Returns the real component of the trapped ion (all ions) integrand
@@ -289,6 +393,35 @@ CONTAINS
   END FUNCTION iFFekci
 
 
+  FUNCTION FFke_nocoll_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns the real and imaginary components of FFke_nocoll, full form
+    ! for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFke_nocoll_cub
+    COMPLEX(KIND=DBL) :: fk
+    fk = FFke_nocoll(kk(1),1)
+    FFke_nocoll_cub(1) = REAL ( fk )
+    FFke_nocoll_cub(2) = AIMAG ( fk )
+  END FUNCTION FFke_nocoll_cub
+
+  FUNCTION FFke_nocolld_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns FFke_nocoll and its omega derivative multiplied by |omega|,
+    ! real and imaginary parts, for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFke_nocolld_cub
+    COMPLEX(KIND=DBL), DIMENSION(2) :: fk
+    fk = FFke_nocoll_d(kk(1))
+    fk(2) = fk(2)*MAX(ABS(omFFk),epsD)
+    FFke_nocolld_cub(1:3:2) = REAL ( fk )
+    FFke_nocolld_cub(2:4:2) = AIMAG ( fk )
+  END FUNCTION FFke_nocolld_cub
+
   REAL(KIND=DBL) FUNCTION rFFke_nocoll(kk)
     !-------------------------------------------------------------
     ! Returns the real component of FFke_nocoll, full form
@@ -601,15 +734,17 @@ CONTAINS
   ! with rotation flag on
   !*******************************************************************************************************
 
-  FUNCTION FFkerot_cub(nf, kv)
+  FUNCTION FFkerot_cub(nd, kv, nv)
     !---------------------------------------------------------------------
-    ! Calculates the real part of the trapped electron integrand
+    ! Calculates the real and imaginary parts of the trapped electron integrand
     !---------------------------------------------------------------------  
-    INTEGER, INTENT(IN) :: nf
-    REAL(KIND=DBL), DIMENSION(nf), INTENT(IN) :: kv
-    REAL(KIND=DBL), DIMENSION(nf) :: FFkerot_cub
-    FFkerot_cub(1) = REAL ( FFkerot(nf, kv, 1) )
-    FFkerot_cub(2) = AIMAG ( FFkerot(nf, kv, 1) )
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kv
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkerot_cub
+    COMPLEX(KIND=DBL) :: fk
+    fk = FFkerot(nd, kv, 1)
+    FFkerot_cub(1) = REAL ( fk )
+    FFkerot_cub(2) = AIMAG ( fk )
   END FUNCTION FFkerot_cub
 
   FUNCTION FFkgterot_cub(nf, kv)
@@ -689,6 +824,26 @@ CONTAINS
     FFekcerot_cub(2) = AIMAG ( FFkerot(nf, kv, 8) )
   END FUNCTION FFekcerot_cub
 
+  FUNCTION FFkizrot_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns the real and imaginary components of the trapped ion (all ions) integrand
+    ! for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFkizrot_cub
+    COMPLEX(KIND=DBL) :: intsum
+    INTEGER :: i
+    intsum=0
+    DO i = 1,nions
+       IF ( (ion_type(pFFk,i) == 1) .AND. (ETG_flag(nuFFk) .EQV. .FALSE.) ) THEN !only include active ions
+          intsum = intsum+FFkirot(kk(1),1,i)*ninorm(pFFk,i) !unnormalise coefi here
+       ENDIF
+    ENDDO
+    FFkizrot_cub(1) = REAL(intsum)
+    FFkizrot_cub(2) = AIMAG(intsum)
+  END FUNCTION FFkizrot_cub
+
   REAL(KIND=DBL) FUNCTION rFFkizrot(kk)
     !-------------------------------------------------------------
     ! Returns the real component of the trapped ion (all ions) integrand
@@ -1110,6 +1265,20 @@ CONTAINS
     iFFekcerot = AIMAG ( FFkerot(nf, kv, 8) )
   END FUNCTION iFFekcerot
 
+  FUNCTION FFke_nocollrot_cub(nd, kk, nv)
+    !-------------------------------------------------------------
+    ! Returns the real and imaginary components of FFke_nocollrot, full form
+    ! for vector cubature
+    !-------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: nd, nv
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: kk
+    REAL(KIND=DBL), DIMENSION(nv) :: FFke_nocollrot_cub
+    COMPLEX(KIND=DBL) :: fk
+    fk = FFke_nocollrot(kk(1),1)
+    FFke_nocollrot_cub(1) = REAL ( fk )
+    FFke_nocollrot_cub(2) = AIMAG ( fk )
+  END FUNCTION FFke_nocollrot_cub
+
   REAL(KIND=DBL) FUNCTION rFFke_nocollrot(kk)
     !---------------------------------------------------------------------
     ! Calculates the real part of the trapped electron integrand
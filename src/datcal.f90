@@ -43,6 +43,9 @@ MODULE datcal
   !Contour parameters
   INTEGER, PARAMETER :: MM=17 ! Initial number of segments the contour is split into. Captures rectangle corners
   INTEGER, PARAMETER :: maxM=MM*(2**4) !Highest allowed  number of segments in the contour
+  REAL(KIND=DBL), PARAMETER :: quadtol = 1.d-2 !Tolerance on the estimated error of the argument principle integrals. Contour refined above it
+  INTEGER, PARAMETER :: MMquad=MM ! Initial number of contour points with periodicquad and localrefine (see datmat) (4n+1 to capture the rectangle corners). Below MM, zeros close to the contour can be missed
+  REAL(KIND=DBL), PARAMETER :: maxanglequad = pi/2. !Maximum phase jump between contour points once the estimated error is below quadtol (periodicquad)
 
   REAL(KIND=DBL), PARAMETER :: maxangle = pi/3. !Maximum angle above when neighbouring fonct points cannot go above 
   REAL(KIND=DBL), PARAMETER :: mincont = 0.05 !Minimum imaginary value in contour
@@ -68,9 +71,15 @@ MODULE datcal
 !  REAL(KIND=DBL), PARAMETER :: barelyavoid = 0.04 ! Cutoff value below 1 to remove barely trapped singularity
   REAL(KIND=DBL), PARAMETER :: minfki = 1d-3 ! Minimum allowed absolute vertical drift frequency
   REAL(KIND=DBL), PARAMETER :: min_ninorm = 1d-2 ! ni/ne below which the energy QL integral isn't carried out
+  REAL(KIND=DBL), PARAMETER :: QLfloor = 1d-3 ! Batched QL integrals: each coefficient is converged relative to itself, down to QLfloor times the batch norm
 
   LOGICAL, PARAMETER :: traporder1 = .FALSE.
 
+  !Lookup table for the complete elliptic integrals in the trapped particle integrands
+  INTEGER, PARAMETER :: nelltab = 2048 !Number of kappa intervals in the table
+  REAL(KIND=DBL), PARAMETER :: kkelltab = 0.98d0 !Upper kappa of the table. Direct evaluation above (log singularity at kappa=1)
+  REAL(KIND=DBL), SAVE, DIMENSION(0:nelltab) :: Kgtab, Egtab, dKgtab, dEgtab !K, E and kappa derivatives. Set in init_elltab (trapints)
+
   !  relative accuracies for integrations
   !  REAL(KIND=DBL) , PARAMETER :: relacc1 = 1.0d-3 !default for 1D integrals
   !  REAL(KIND=DBL) , PARAMETER :: relacc2 = 1.0d-2 !default for 2D integrals
@@ -96,6 +105,10 @@ MODULE datcal
   REAL(KIND=DBL) , PARAMETER :: maxiter = 20
   REAL(KIND=DBL) , PARAMETER :: ndif = 5.d-2  !2.5d-2 is default. For function differentiation
 
+  !Cache of fonct values within a (p,nu) task
+  INTEGER, PARAMETER :: ncachemax = 4096 !Number of entries kept, the oldest are overwritten
+  REAL(KIND=DBL), PARAMETER :: cachetol = 0. !Relative distance in omega within which a cached value is reused. 0 reuses exact matches only
+
   !Used in dispfuncs
   INTEGER, PARAMETER :: nerr=10 !Number of terms in Z# asymptotic limit expansion
   REAL(KIND=DBL), PARAMETER :: abslim = 50. !Value above which asymptotic limit is carried out
@@ -105,6 +118,14 @@ MODULE datcal
   INTEGER, PARAMETER :: ndegpoly = 3
   INTEGER, PARAMETER :: ndegx0 = 2
 
+  !Task scheduler (DistriTask in qualikiz)
+  REAL(KIND=DBL), PARAMETER :: grantime = 1. !Target wall time [s] of work handed out in one adaptive task grant
+
+  !Persistent solution cache (calc, turned on with solcache in datmat)
+  CHARACTER(len=*), PARAMETER :: solcachedir = 'solcache/' !Directory of the cache entries. Must exist when the cache is on
+  INTEGER, PARAMETER :: solcachever = 3 !Increase when a code change alters the task results, to invalidate the older entries
+  INTEGER, PARAMETER :: solcachebits = 40 !Mantissa bits of the inputs compared. Closer inputs are treated as identical
+
 CONTAINS  
   SUBROUTINE init_asym()
     INTEGER :: j
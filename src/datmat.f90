@@ -1,5 +1,6 @@
 MODULE datmat
   USE kind
+  !$ USE omp_lib, ONLY : omp_lock_kind
   ! Argument declaration 
 
   ! List of input variables
@@ -18,7 +19,6 @@ MODULE datmat
   !Parameters for deciding how often to jump to full solution searching in integrated modelling applications
   INTEGER, SAVE :: maxruns !default is 50
   INTEGER, SAVE :: maxpts !Max number of integrand evaluations in 2D integrals. Default = 1.d5
-  INTEGER, SAVE :: lenwrk !Work array size for 2D integral routine
 
   REAL(KIND=DBL), SAVE :: relacc1 !  !1D integral relative error demanded. Default = 1.0d-3
   REAL(KIND=DBL), SAVE :: relacc2 !2D integral relative error demanded. Default = 2.0d-2
@@ -58,6 +58,12 @@ MODULE datmat
   REAL(KIND=DBL), SAVE, DIMENSION(:), ALLOCATABLE :: veneETG_SI,chieeETG_SI,veceETG_SI,veneETG_GB,chieeETG_GB,veceETG_GB
   REAL(KIND=DBL), SAVE, DIMENSION(:,:), ALLOCATABLE :: veni_SI,chiei_SI,veci_SI,veri_SI,veni_GB,chiei_GB,veci_GB,veri_GB,ceki
 
+  ! ITG-only and TEM-only fluxes saved by the saturation rule when separateflux=T
+  REAL(KIND=DBL), SAVE, DIMENSION(:), ALLOCATABLE :: eefITG_SI,epfITG_SI,dfeITG_SI,vteITG_SI,vceITG_SI,chieeITG_SI,veneITG_SI,veceITG_SI,eefITG_GB,epfITG_GB,dfeITG_GB,vteITG_GB,vceITG_GB,chieeITG_GB,veneITG_GB,veceITG_GB
+  REAL(KIND=DBL), SAVE, DIMENSION(:,:), ALLOCATABLE :: iefITG_SI,ipfITG_SI,ivfITG_SI,dfiITG_SI,vtiITG_SI,vciITG_SI,vriITG_SI,chieiITG_SI,veniITG_SI,veciITG_SI,veriITG_SI,iefITG_GB,ipfITG_GB,ivfITG_GB,dfiITG_GB,vtiITG_GB,vciITG_GB,vriITG_GB,chieiITG_GB,veniITG_GB,veciITG_GB,veriITG_GB
+  REAL(KIND=DBL), SAVE, DIMENSION(:), ALLOCATABLE :: eefTEM_SI,epfTEM_SI,dfeTEM_SI,vteTEM_SI,vceTEM_SI,chieeTEM_SI,veneTEM_SI,veceTEM_SI,eefTEM_GB,epfTEM_GB,dfeTEM_GB,vteTEM_GB,vceTEM_GB,chieeTEM_GB,veneTEM_GB,veceTEM_GB
+  REAL(KIND=DBL), SAVE, DIMENSION(:,:), ALLOCATABLE :: iefTEM_SI,ipfTEM_SI,ivfTEM_SI,dfiTEM_SI,vtiTEM_SI,vciTEM_SI,vriTEM_SI,chieiTEM_SI,veniTEM_SI,veciTEM_SI,veriTEM_SI,iefTEM_GB,ipfTEM_GB,ivfTEM_GB,dfiTEM_GB,vtiTEM_GB,vciTEM_GB,vriTEM_GB,chieiTEM_GB,veniTEM_GB,veciTEM_GB,veriTEM_GB
+
   REAL(KIND=DBL), SAVE, DIMENSION(:,:,:), ALLOCATABLE :: ipf_cm,ief_cm,ivf_cm
 
   ! Poloidal asymmetry variables
@@ -79,7 +85,7 @@ MODULE datmat
   INTEGER, SAVE :: ion ! current ion index used in integrals and asymmetry functions
   INTEGER, SAVE :: runcounter ! used for counting runs inside integrated modelling applications for deciding to recalculate all or just jump to newton based on old solutions
   REAL(KIND=DBL), SAVE :: Joe2, Jobane2, Joe2p, J1e2p
-  REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: Joi2, Jobani2, Joi2p, J1i2p
+  REAL(KIND=DBL), SAVE, DIMENSION(:), ALLOCATABLE :: Joi2, Jobani2, Joi2p, J1i2p
   REAL(KIND=DBL), SAVE :: ktetaRhoe
   REAL(KIND=DBL), SAVE :: d, normkr
   REAL(KIND=DBL), SAVE :: Athe
@@ -112,10 +118,12 @@ MODULE datmat
   INTEGER, SAVE :: pFkr !radial coordinate used in passing particle integrals
   INTEGER, SAVE :: nuFkr !wavenumber coordinate used in passing particle integrals
   INTEGER, SAVE :: nuFFk !wavenumber coordinate used in trapped particle integrals
-  REAL(KIND=DBL) :: sin2th,alamnorm,alam1,alam2,alam3,alam4,alam5 !pitch angle averages of vpar^m used in passints
+  LOGICAL, SAVE, DIMENSION(8) :: QLcase !caseflags calculated together in the batched QL integrals
+  REAL(KIND=DBL), SAVE :: sin2th,alamnorm,alam1,alam2,alam3,alam4,alam5 !pitch angle averages of vpar^m used in passints
   INTEGER, SAVE :: plam,nulam !radial and wavenumber coordinates used to pass around in Vpar averaging routines in passints
 
-  INTEGER, SAVE :: weidcount !count the dispersion function calls
+  INTEGER, SAVE :: weidcount !count the dispersion function calls of this thread
+  INTEGER(KIND=8), SAVE :: weidtotal !dispersion function calls of all threads of this rank, summed at the end of each parallel region
   INTEGER, SAVE :: ccount !count the integrand calls
   INTEGER, SAVE :: Nsolrat, last
 
@@ -128,9 +136,74 @@ MODULE datmat
   REAL(KIND=DBL), SAVE :: calltimeinit,timeout
   LOGICAL, SAVE :: timeoutflag
 
+  !State of the (p,nu) task being computed: set in calc and read by the integrands, FLR and
+  !asymmetry routines. It is private to each OpenMP thread, so the threads of one rank can
+  !compute different tasks. Machi, Aui and gammaE are included since calc swaps them for the
+  !modified profiles with rot_flag=2. The allocatable ones are only allocated in the master
+  !thread by mod_make_io, and are handed to the other threads with COPYIN (see taskregion.inc)
+  !$OMP THREADPRIVATE(ion, irad, inu, Joe2, Jobane2, Joe2p, J1e2p, Joi2, Jobani2, Joi2p, J1i2p)
+  !$OMP THREADPRIVATE(ktetaRhoe, d, normkr, Athe, Athi, ktetaRhoi, nwg, qRd, omega2bar, fonxad)
+  !$OMP THREADPRIVATE(mwidth, mshift, mshift2, omeflu, mwidth_rot, mshift_rot, widthhat, widthtuneITG, widthtuneETG)
+  !$OMP THREADPRIVATE(fonxcirce, fonxpiege, fonxcircgte, fonxpieggte, fonxcircgne, fonxpieggne, fonxcircce, fonxpiegce)
+  !$OMP THREADPRIVATE(fonxecirce, fonxepiege, fonxecircgte, fonxepieggte, fonxecircgne, fonxepieggne, fonxecircce, fonxepiegce)
+  !$OMP THREADPRIVATE(fonxcirci, fonxpiegi, fonxcircgti, fonxpieggti, fonxcircgni, fonxcircgui, fonxpieggni, fonxpieggui)
+  !$OMP THREADPRIVATE(fonxcircci, fonxpiegci, fonxecirci, fonxepiegi, fonxvcirci, fonxvpiegi, fonxecircgti, fonxepieggti)
+  !$OMP THREADPRIVATE(fonxecircgni, fonxecircgui, fonxepieggni, fonxepieggui, fonxecircci, fonxepiegci)
+  !$OMP THREADPRIVATE(rint, pnFLR, omegmax, omFFk, pFFk, omFkr, pFkr, nuFkr, nuFFk, QLcase)
+  !$OMP THREADPRIVATE(sin2th, alamnorm, alam1, alam2, alam3, alam4, alam5, plam, nulam)
+  !$OMP THREADPRIVATE(weidcount, ccount, calltimeinit, timeoutflag, Machi, Aui, gammaE)
+
   !min and max radius for calculation
   REAL(KIND=DBL), SAVE :: rhomin,rhomax
 
+  !MPI communicator shared by the ranks of this QuaLiKiz call. mpi_comm_world unless set with commin
+  INTEGER, SAVE :: qlkcomm
+
+  !Contour settings. Off by default, for the davint quadrature and the doubling of the whole contour
+  LOGICAL, SAVE :: localrefine !Bisect only the contour segments with too large phase jumps instead of doubling the whole contour
+  LOGICAL, SAVE :: periodicquad !Trapezoidal rule with error estimate for the argument principle integrals instead of davint
+
+  !Persistent solution cache (calc). The output of a task is kept on disk in solcachedir, and reused by tasks of later runs,
+  !or of other ranks, with the same local inputs, kthetarhos and code settings. Not used when restarting from old solutions
+  !(runcounter /= 0). Off by default
+  LOGICAL, SAVE :: solcache
+
+  !Newton solver setting. If true, the fonct derivative is integrated with fonct for the Newton Jacobian
+  !(no rotation only) instead of using ndif differences. Off by default
+  LOGICAL, SAVE :: newtonderiv
+
+  !Task scheduler settings
+  INTEGER, SAVE :: sched_meth !0: single task master/slave loop, 1: chunked self-scheduling from one shared queue, 2: one queue per rank with work stealing
+  INTEGER, SAVE :: sched_chunk !Number of tasks per grant. 0 adapts the grant size to the measured task cost
+  INTEGER, SAVE :: nthreads !Number of OpenMP threads per rank computing the tasks of a grant (sched_meth 1 and 2)
+  !If >0, the tasks of a radial point run as one chain along kthetarhos (sched_meth 1 and 2). The Newton solver of a task is
+  !started from the solutions of the previous kthetarhos, and the full contour search is only done for every contchain-th task
+  !of the chain, or when no solution was tracked. 0 (default) disables the chains
+  INTEGER, SAVE :: contchain
+  LOGICAL, SAVE :: chaining !Tasks handed out as chains along kthetarhos (contchain)
+  INTEGER, SAVE :: ntaskbusy !Number of tasks of this rank being computed. They share nthrfree for their contours
+  INTEGER, SAVE :: nthrfree !Threads of this rank with no task to compute, lent to the contour teams of the running tasks
+  INTEGER, SAVE :: ncontpar = 1 !Number of contours of the task of this thread searched at the same time
+  !$OMP THREADPRIVATE(ncontpar)
+
+  !Cache of the fonct values of the task being computed (see calcfonct). Allocated in calc,
+  !and shared with the nested threads of the task by COPYIN of the pointer. The entries are
+  !a ring of ncachemax, chained in hash buckets by the cell of a grid in omega holding them
+  TYPE fonctcachetype
+     INTEGER :: n !Number of entries stored so far
+     REAL(KIND=DBL) :: cell !Grid spacing in omega
+     LOGICAL :: locked !Shared by several threads, so accesses take the lock
+     !$ INTEGER(KIND=omp_lock_kind) :: lock
+     COMPLEX(KIND=DBL), DIMENSION(:,:), ALLOCATABLE :: entry !omega and fonct of each entry
+     INTEGER, DIMENSION(:), ALLOCATABLE :: head !First entry of each bucket, 0 if empty
+     INTEGER, DIMENSION(:), ALLOCATABLE :: next, bucket, seq !Next entry in the bucket, bucket and insertion number of each entry
+  END TYPE fonctcachetype
+  TYPE(fonctcachetype), SAVE, POINTER :: fonctcache => NULL()
+  !$OMP THREADPRIVATE(fonctcache)
+  INTEGER, SAVE :: ncachehit, ncachemiss !fonct cache hits and misses on this rank
+  REAL(KIND=DBL), SAVE, DIMENSION(:,:), ALLOCATABLE :: tasktime !Measured wall time [s] of each (p,nu) task
+  LOGICAL, SAVE, DIMENSION(:,:), ALLOCATABLE :: taskdone !(p,nu) tasks computed on this rank
+
   !EXTERNAL FUNCTION AND SUBROUTINE DECLARATIONS
 
   !Elliptic integrals (from SLATEC)
@@ -141,10 +214,6 @@ MODULE datmat
   REAL(KIND=DBL) :: BESEI0, BESEI1
   EXTERNAL BESEI0, BESEI1
 
-  !NAG proxies
-  REAL(KIND=DBL) :: d01ahf
-  EXTERNAL d01ahf, d01fcf
-
   !Used for DFZERO
   !  EXTERNAL phieq
 
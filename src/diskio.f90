@@ -2,9 +2,20 @@ MODULE diskio
 
   USE kind
   USE mpi
+  USE mod_hdf5out
 
   IMPLICIT NONE
 
+  ! Set to .FALSE. to skip the .dat files, e.g. when only the HDF5 container is wanted
+  LOGICAL, SAVE :: write_ascii = .TRUE.
+
+  ! Input bundle loaded by readbundle. readvar takes its entries from here instead of input/*.bin
+  LOGICAL, SAVE :: bundle_loaded = .FALSE.
+  CHARACTER(len=16), DIMENSION(:), ALLOCATABLE, SAVE :: bundlenames
+  INTEGER(KIND=8), DIMENSION(:), ALLOCATABLE, SAVE :: bundlestart !64 bit offsets, bundles can exceed 2 GB
+  INTEGER, DIMENSION(:), ALLOCATABLE, SAVE :: bundlecount
+  REAL(kind=DBL), DIMENSION(:), ALLOCATABLE, SAVE :: bundledata
+
   INTERFACE writevar
      MODULE PROCEDURE &
           writevar_0d, &
@@ -78,13 +89,15 @@ CONTAINS
          iostat=rc)
   END SUBROUTINE open_file_out_txt
 
-  SUBROUTINE writevar_0d(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_0d(filename, mold, varformat, fileno, force_write, comm)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     REAL, INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -92,9 +105,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         !IF (.NOT. force_write_local) THEN
         !    WRITE(stdout, *) MOD(fileno, nproc) == myrank
         !    WRITE(stdout, '(A,I5,A,I5,A,F15.0)') 'rank: ', myrank, ' fileno: ', fileno, ' time: ', omp_get_wtime()
@@ -104,15 +123,18 @@ CONTAINS
         WRITE(unit=myunit,fmt='(' // varformat // ')') mold
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold)
   END SUBROUTINE writevar_0d
 
-  SUBROUTINE writevar_0d_integer(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_0d_integer(filename, mold, varformat, fileno, force_write, comm)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     INTEGER, INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -120,17 +142,24 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         CALL open_file_out_txt(filename,myunit)
         WRITE(unit=myunit,fmt='(' // varformat // ')') mold
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold)
   END SUBROUTINE writevar_0d_integer
 
-  SUBROUTINE writevar_1d(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_1d(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     REAL, DIMENSION(:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -139,6 +168,9 @@ CONTAINS
     CHARACTER(LEN=30) :: rowfmt
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -146,9 +178,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         numcols = 1 !Write out 1D array as a single column
         CALL open_file_out_txt(filename,myunit)
@@ -156,9 +194,10 @@ CONTAINS
         WRITE(unit=myunit,fmt=rowfmt) mold
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold, dimnames)
   END SUBROUTINE writevar_1d
 
-  SUBROUTINE writevar_2d(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_2d(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     REAL, DIMENSION(:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -167,6 +206,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -174,9 +216,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         numcols = SIZE(mold,2)
         numrows = SIZE(mold,1)
@@ -185,9 +233,10 @@ CONTAINS
         WRITE(myunit,rowfmt) ((mold(i,j),j=1,numcols),i=1,numrows)
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold, dimnames)
   END SUBROUTINE writevar_2d
 
-  SUBROUTINE writevar_2d_integer(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_2d_integer(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     INTEGER, DIMENSION(:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -196,6 +245,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -203,9 +255,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         numcols = SIZE(mold,2)
         numrows = SIZE(mold,1)
@@ -214,9 +272,10 @@ CONTAINS
         WRITE(myunit,rowfmt) ((mold(i,j),j=1,numcols),i=1,numrows)
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold, dimnames)
   END SUBROUTINE writevar_2d_integer
 
-  SUBROUTINE writevar_2d_complex(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_2d_complex(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     COMPLEX(kind=DBL), DIMENSION(:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -229,6 +288,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -236,9 +298,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         dirsep=index(filename, '/', BACK=.TRUE.)
         sufsep=index(filename, '.', BACK=.TRUE.)
@@ -252,9 +320,13 @@ CONTAINS
         CALL writevar_2d(dirname // 'i' // basename // '.' // suffix, &
              AIMAG(mold),varformat,myrank,force_write=.TRUE.)
      ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) THEN
+        CALL h5out_write(complexname(filename, 'r'), REAL(mold), dimnames)
+        CALL h5out_write(complexname(filename, 'i'), AIMAG(mold), dimnames)
+    ENDIF
   END SUBROUTINE writevar_2d_complex
 
-  SUBROUTINE writevar_3d(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_3d(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     REAL, DIMENSION(:,:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -263,6 +335,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -270,9 +345,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         numpages = SIZE(mold,3)
         numcols = SIZE(mold,2)
@@ -282,9 +363,10 @@ CONTAINS
         WRITE(myunit,rowfmt) (((mold(i,j,k),j=1,numcols),i=1,numrows),k=1,numpages)
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold, dimnames)
   END SUBROUTINE writevar_3d
 
-  SUBROUTINE writevar_3d_complex(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_3d_complex(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     COMPLEX(kind=DBL), DIMENSION(:,:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -296,6 +378,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -303,9 +388,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         dirsep=index(filename, '/', BACK=.TRUE.)
         sufsep=index(filename, '.', BACK=.TRUE.)
@@ -319,9 +410,13 @@ CONTAINS
         CALL writevar_3d(dirname // 'i' // basename // '.' // suffix, &
              AIMAG(mold),varformat,myrank,force_write=.TRUE.)
      ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) THEN
+        CALL h5out_write(complexname(filename, 'r'), REAL(mold), dimnames)
+        CALL h5out_write(complexname(filename, 'i'), AIMAG(mold), dimnames)
+    ENDIF
   END SUBROUTINE writevar_3d_complex
 
-  SUBROUTINE writevar_4d(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_4d(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     REAL, DIMENSION(:,:,:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -330,6 +425,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -337,9 +435,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         numhpages = SIZE(mold,4)
         numpages = SIZE(mold,3)
@@ -351,9 +455,10 @@ CONTAINS
             k=1,numpages),l=1,numhpages)
         CLOSE(unit=myunit)
     ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) CALL h5out_write(filename, mold, dimnames)
   END SUBROUTINE writevar_4d
 
-  SUBROUTINE writevar_4d_complex(filename, mold, varformat, fileno, force_write)
+  SUBROUTINE writevar_4d_complex(filename, mold, varformat, fileno, force_write, comm, dimnames)
     CHARACTER(len=*), INTENT(IN) :: filename, varformat
     COMPLEX(kind=DBL), DIMENSION(:,:,:,:), INTENT(IN) :: mold
     INTEGER, INTENT(IN) :: fileno
@@ -365,6 +470,9 @@ CONTAINS
     INTEGER :: myunit, nproc, myrank, ierror
     LOGICAL, OPTIONAL :: force_write
     LOGICAL :: force_write_local
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames !comma separated extent names for the HDF5 container, e.g. 'dimx,dimn'
+    INTEGER :: mycomm
 
     IF (.NOT. PRESENT(force_write)) THEN
         force_write_local = .FALSE.
@@ -372,9 +480,15 @@ CONTAINS
         force_write_local = force_write
     ENDIF
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
-    IF ((MOD(fileno, nproc) == myrank) .OR. force_write_local) THEN
+    IF (.NOT. PRESENT(comm)) THEN
+        mycomm = mpi_comm_world
+    ELSE
+        mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_size(mycomm,nproc,ierror)
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    IF (write_ascii .AND. ((MOD(fileno, nproc) == myrank) .OR. force_write_local)) THEN
         myunit = 700 + myrank
         dirsep=index(filename, '/', BACK=.TRUE.)
         sufsep=index(filename, '.', BACK=.TRUE.)
@@ -388,13 +502,157 @@ CONTAINS
         CALL writevar_4d(dirname // 'i' // basename // '.' // suffix, &
              AIMAG(mold),varformat,myrank,force_write=.TRUE.)
      ENDIF
+    IF (h5out_isopen() .AND. (.NOT. force_write_local)) THEN
+        CALL h5out_write(complexname(filename, 'r'), REAL(mold), dimnames)
+        CALL h5out_write(complexname(filename, 'i'), AIMAG(mold), dimnames)
+    ENDIF
   END SUBROUTINE writevar_4d_complex
 
+  FUNCTION complexname(filename, part)
+    ! Name of the real ('r') or imaginary ('i') part of a complex variable
+    CHARACTER(len=*), INTENT(IN) :: filename, part
+    CHARACTER(len=LEN(filename)+LEN(part)) :: complexname
+    INTEGER :: dirsep
+
+    dirsep=index(filename, '/', BACK=.TRUE.)
+    complexname = filename(1:dirsep) // part // filename(dirsep+1:)
+  END FUNCTION complexname
+
+  SUBROUTINE readbundle(filename, myunit, comm)
+    ! Single-file input bundle replacing the one-file-per-parameter input/*.bin set.
+    ! Layout in native byte order: 8 characters 'QLKINPUT', int32 version (1), int32 nvars,
+    ! nvars entries of (16 character name, int32 number of values), then the values of
+    ! all entries as contiguous float64 arrays in entry order (Fortran order for 2D).
+    ! Names are the .bin file stems, e.g. 'dimx', 'Te', 'typei'.
+    ! Collective over comm (default mpi_comm_world): rank 0 reads the file at once and
+    ! broadcasts it, all ranks parse it
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: myunit
+    INTEGER, OPTIONAL, INTENT(IN) :: comm
+    CHARACTER(len=1), DIMENSION(:), ALLOCATABLE :: buf
+    CHARACTER(len=8) :: magic
+    INTEGER(KIND=8), PARAMETER :: bcastblock = 2_8**30 !MPI counts are default integers: the bytes are broadcast in blocks
+    INTEGER(KIND=8) :: nbytes, pos, off
+    INTEGER :: version, nvars, i, myrank, ierror, mycomm
+    LOGICAL :: exist1
+
+    IF (.NOT. PRESENT(comm)) THEN
+       mycomm = mpi_comm_world
+    ELSE
+       mycomm = comm
+    ENDIF
+
+    CALL mpi_comm_rank(mycomm,myrank,ierror)
+    nbytes = 0
+    IF (myrank == 0) THEN
+       INQUIRE(file=filename, EXIST=exist1, SIZE=nbytes)
+       IF (.NOT. exist1) nbytes = 0
+    ENDIF
+    CALL MPI_Bcast(nbytes,1,MPI_INTEGER8,0,mycomm,ierror)
+    IF (nbytes <= 0) RETURN
+
+    ALLOCATE(buf(nbytes))
+    IF (myrank == 0) THEN
+       OPEN(unit=myunit, file=filename, access='stream', form='unformatted', status='old')
+       READ(myunit) buf
+       CLOSE(unit=myunit)
+    ENDIF
+    DO off=1,nbytes,bcastblock
+       CALL MPI_Bcast(buf(off:MIN(off+bcastblock-1,nbytes)),INT(MIN(bcastblock,nbytes-off+1)),MPI_CHARACTER,0,mycomm,ierror)
+    ENDDO
+
+    magic = TRANSFER(buf(1:8), magic)
+    version = TRANSFER(buf(9:12), version)
+    nvars = TRANSFER(buf(13:16), nvars)
+    IF ((magic /= 'QLKINPUT') .OR. (version /= 1)) THEN
+       WRITE(stderr,'(A,A)') 'Not a version 1 QuaLiKiz input bundle: ', filename
+       CALL mpi_abort(mycomm,-1,ierror)
+    ENDIF
+
+    ALLOCATE(bundlenames(nvars), bundlestart(nvars), bundlecount(nvars))
+    pos = 17
+    DO i=1,nvars
+       bundlenames(i) = TRANSFER(buf(pos:pos+15), bundlenames(i))
+       bundlecount(i) = TRANSFER(buf(pos+16:pos+19), bundlecount(i))
+       pos = pos+20
+    ENDDO
+    bundlestart(1) = 1
+    DO i=2,nvars
+       bundlestart(i) = bundlestart(i-1)+bundlecount(i-1)
+    ENDDO
+    IF (pos-1+8*SUM(INT(bundlecount,8)) /= nbytes) THEN
+       WRITE(stderr,'(A,A)') 'Truncated QuaLiKiz input bundle: ', filename
+       CALL mpi_abort(mycomm,-1,ierror)
+    ENDIF
+    ALLOCATE(bundledata(SUM(INT(bundlecount,8))))
+    bundledata = TRANSFER(buf(pos:nbytes), bundledata, SIZE(bundledata))
+    DEALLOCATE(buf)
+    bundle_loaded = .TRUE.
+  END SUBROUTINE readbundle
+
+  SUBROUTINE freebundle()
+    IF (.NOT. bundle_loaded) RETURN
+    DEALLOCATE(bundlenames, bundlestart, bundlecount, bundledata)
+    bundle_loaded = .FALSE.
+  END SUBROUTINE freebundle
+
+  LOGICAL FUNCTION inbundle(filename, ivar)
+    ! Is input file filename an entry ivar of the loaded bundle
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(OUT) :: ivar
+    INTEGER :: dirsep, sufsep
+
+    inbundle = .FALSE.
+    ivar = 0
+    IF (.NOT. bundle_loaded) RETURN
+    dirsep=index(filename, '/', BACK=.TRUE.)
+    sufsep=index(filename, '.', BACK=.TRUE.)
+    IF (sufsep <= dirsep) sufsep = LEN(filename)+1
+    DO ivar=1,SIZE(bundlenames)
+       IF (TRIM(bundlenames(ivar)) == filename(dirsep+1:sufsep-1)) THEN
+          inbundle = .TRUE.
+          RETURN
+       ENDIF
+    ENDDO
+    ivar = 0
+  END FUNCTION inbundle
+
+  FUNCTION bundleslice(filename, ivar, n)
+    ! Values of bundle entry ivar, which must hold n values
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: ivar, n
+    REAL(kind=DBL), DIMENSION(n) :: bundleslice
+    INTEGER :: ierror
+
+    IF (bundlecount(ivar) /= n) THEN
+       WRITE(stderr,'(A,A,A,I0,A,I0)') 'Input bundle entry ', TRIM(bundlenames(ivar)), ' of ', filename, &
+            & ' has ', bundlecount(ivar), ' values, expected ', n
+       CALL mpi_abort(mpi_comm_world,-1,ierror)
+    ENDIF
+    bundleslice = bundledata(bundlestart(ivar):bundlestart(ivar)+n-1)
+  END FUNCTION bundleslice
+
+  LOGICAL FUNCTION input_exists(filename)
+    ! Optional inputs can come from the bundle or from their own file
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER :: ivar
+
+    input_exists = inbundle(filename, ivar)
+    IF (.NOT. input_exists) INQUIRE(file=filename, EXIST=input_exists)
+  END FUNCTION input_exists
+
   REAL(kind=DBL) FUNCTION readvar_0d(filename, dummy, ktype,myunit)
     CHARACTER(len=*), INTENT(IN) :: filename
     INTEGER, INTENT(IN) :: ktype, myunit
     REAL(kind=DBL), INTENT(IN) ::dummy
-    INTEGER :: lengthin,istat
+    INTEGER :: lengthin,istat,ivar
+    REAL(kind=DBL), DIMENSION(1) :: val
+
+    IF (inbundle(filename, ivar)) THEN
+       val = bundleslice(filename, ivar, 1)
+       readvar_0d = val(1)
+       RETURN
+    ENDIF
     INQUIRE(iolength=lengthin) dummy
     CALL open_file_in_bin(filename,lengthin,myunit)
     READ(unit=myunit,rec=1,iostat=istat) readvar_0d
@@ -410,9 +668,13 @@ CONTAINS
     CHARACTER(len=*), INTENT(IN) :: filename
     INTEGER, INTENT(IN) :: ktype, myunit
     REAL(kind=DBL), DIMENSION(:), INTENT(IN) ::dummy
-    INTEGER :: lengthin,istat
+    INTEGER :: lengthin,istat,ivar
     REAL(KIND=DBL), DIMENSION(SIZE(dummy,1)) :: readvar_1d
 
+    IF (inbundle(filename, ivar)) THEN
+       readvar_1d = bundleslice(filename, ivar, SIZE(dummy))
+       RETURN
+    ENDIF
     INQUIRE(iolength=lengthin) dummy
     CALL open_file_in_bin(filename,lengthin,myunit)
     READ(unit=myunit,rec=1,IOSTAT=istat) readvar_1d
@@ -428,9 +690,13 @@ CONTAINS
     CHARACTER(len=*), INTENT(IN) :: filename
     INTEGER, INTENT(IN) :: ktype, myunit
     REAL(kind=DBL), DIMENSION(:,:), INTENT(IN) ::dummy
-    INTEGER :: lengthin,istat
+    INTEGER :: lengthin,istat,ivar
     REAL(KIND=DBL), DIMENSION(SIZE(dummy,1), SIZE(dummy,2)) :: readvar_2d
 
+    IF (inbundle(filename, ivar)) THEN
+       readvar_2d = RESHAPE(bundleslice(filename, ivar, SIZE(dummy)), SHAPE(dummy))
+       RETURN
+    ENDIF
     INQUIRE(iolength=lengthin) dummy
     CALL open_file_in_bin(filename,lengthin,myunit)
     READ(unit=myunit,rec=1,IOSTAT=istat) readvar_2d
@@ -460,4 +726,52 @@ CONTAINS
        !CALL mpi_abort(mpi_comm_world,-1)
     ENDIF
   END FUNCTION readvar_3d_txt
+  FUNCTION readvar_2d_txt(filename,dummy,ktype,myunit)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: ktype, myunit
+    REAL(kind=DBL), DIMENSION(:,:), INTENT(IN) ::dummy
+    INTEGER :: lengthin,istat, i, j
+    REAL(KIND=DBL), DIMENSION(SIZE(dummy,1), SIZE(dummy,2)) :: readvar_2d_txt
+    !numrows, numcols. Not in the readvar interface: same signature as readvar_2d
+
+    INQUIRE(iolength=lengthin) dummy
+    CALL open_file_in_txt(filename,lengthin,myunit)
+    READ(unit=myunit, IOSTAT=istat, fmt=*) ((readvar_2d_txt(i,j),j=1, SIZE(dummy, 2)),i=1, SIZE(dummy, 1))
+    CLOSE(unit=myunit)
+    IF ( istat /= 0) THEN
+       WRITE(stderr,100) filename, istat
+100    FORMAT('PROBLEM IN READING INPUT FILE ',A,'. IOSTAT = ',I6)
+       !CALL mpi_abort(mpi_comm_world,-1)
+    ENDIF
+  END FUNCTION readvar_2d_txt
+
+  SUBROUTINE txtshape(filename,myunit,nrows,ncols)
+    !Number of lines, and of values on the first line, of a text file written by writevar. 0 if it cannot be opened
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: myunit
+    INTEGER, INTENT(OUT) :: nrows, ncols
+    CHARACTER(len=256) :: buf
+    INTEGER :: istat, nread, i
+    LOGICAL :: invalue
+
+    nrows = 0; ncols = 0; invalue = .FALSE.
+    OPEN(unit=myunit, file=filename, status='old', action='read', form='formatted', iostat=istat)
+    IF (istat /= 0) RETURN
+    DO
+       READ(myunit, '(A)', ADVANCE='NO', SIZE=nread, IOSTAT=istat) buf
+       IF ((istat /= 0) .AND. (.NOT. IS_IOSTAT_EOR(istat))) EXIT
+       IF (nrows == 0) THEN !the first line is read in chunks of LEN(buf)
+          DO i=1,nread
+             IF (buf(i:i) /= ' ') THEN
+                IF (.NOT. invalue) ncols = ncols+1
+                invalue = .TRUE.
+             ELSE
+                invalue = .FALSE.
+             ENDIF
+          ENDDO
+       ENDIF
+       IF (IS_IOSTAT_EOR(istat)) nrows = nrows+1
+    ENDDO
+    CLOSE(unit=myunit)
+  END SUBROUTINE txtshape
 END MODULE diskio
@@ -3,42 +3,32 @@ MODULE dispfuncs
   USE datcal
   USE datmat, ONLY : weidcount 
   IMPLICIT NONE
+
+  !Weideman coefficients for N=16, and the corresponding L = 2**(-1/4)*SQRT(N)
+  INTEGER, PARAMETER :: Nweid=16
+  REAL(KIND=DBL), PARAMETER :: Lweid = 3.363585661014858_DBL
+  REAL(KIND=DBL), PARAMETER, DIMENSION(Nweid) :: CFFT = (/ &
+       &  9.939322535568174d-07,  3.981287575088865d-06, -5.584233411098927d-06, -2.734640462448423d-05, &
+       &  2.170986793223473d-05,  2.107105639653287d-04,  8.703158428458035d-05, -0.001527659740122_DBL, &
+       & -0.003881015189023_DBL,  0.003682567317092_DBL,  0.051822402431612_DBL,  0.191241726746695_DBL, &
+       &  0.469290900903604_DBL,  0.886447830205055_DBL,  1.362240822271959_DBL,  1.748395886081962_DBL /)
  
 CONTAINS
 
   COMPLEX(KIND=DBL) FUNCTION wofzweid(Z)
     IMPLICIT NONE
-    REAL(KIND=DBL), DIMENSION(16) :: CFFT(16)
-    REAL(KIND=DBL) :: L,Y
-    INTEGER, PARAMETER :: N=16
+    REAL(KIND=DBL) :: Y
     COMPLEX(KIND=DBL), INTENT(IN) :: Z
-    COMPLEX(KIND=DBL) :: Zloc, i, Zout, A, B, P, RES
-    !COEFFICIENTS TO USE FOR N=16
-    CFFT(1) =  9.939322535568174d-07 
-    CFFT(2) = 3.981287575088865d-06 
-    CFFT(3) = -5.584233411098927d-06 
-    CFFT(4) = -2.734640462448423d-05 
-    CFFT(5) = 2.170986793223473d-05 
-    CFFT(6) = 2.107105639653287d-04 
-    CFFT(7) = 8.703158428458035d-05 
-    CFFT(8) = -0.001527659740122_DBL 
-    CFFT(9) = -0.003881015189023_DBL
-    CFFT(10)=  0.003682567317092_DBL 
-    CFFT(11)=  0.051822402431612_DBL 
-    CFFT(12)=  0.191241726746695_DBL 
-    CFFT(13)=  0.469290900903604_DBL 
-    CFFT(14)=  0.886447830205055_DBL 
-    CFFT(15)=  1.362240822271959_DBL 
-    CFFT(16)=  1.748395886081962_DBL 
-
-    L = 2.**(-0.25_DBL)*SQRT(N*1.0d0)
+    COMPLEX(KIND=DBL) :: Zloc, Zout, A, B, P, LmZ
+
     Zloc=Z
     Y=AIMAG(Zloc)
     IF (Y<0) Zloc=-Zloc
-    Zout = (L+ci*Zloc)/(L-ci*Zloc)
-    A = (1/SQRT(pi))/(L-ci*Zloc)
-    B = 2./((L-ci*Zloc)**2.)
-    CALL cpolyev(N,Zout,CFFT,P)
+    LmZ = Lweid-ci*Zloc
+    Zout = (Lweid+ci*Zloc)/LmZ
+    A = (1/SQRT(pi))/LmZ
+    B = 2./(LmZ*LmZ)
+    CALL cpolyev(Nweid,Zout,CFFT,P)
     Zout = A+B*P
     IF (Y<0) Zout=-Zout
     wofzweid=Zout
@@ -47,6 +37,163 @@ CONTAINS
 
   END FUNCTION wofzweid
 
+  SUBROUTINE wofzweidv(n,Z,W)
+    !--------------------------------------------------------------
+    ! Faddeeva function (Weideman algorithm) for a block of n arguments.
+    ! The Horner recurrence runs over the block in the inner loop,
+    ! such that the compiler can vectorize it
+    !--------------------------------------------------------------
+    IMPLICIT NONE
+    INTEGER, INTENT(IN) :: n
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(IN) :: Z
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(OUT) :: W
+    COMPLEX(KIND=DBL), DIMENSION(n) :: Zloc, LmZ, S
+    REAL(KIND=DBL), DIMENSION(n) :: sgn
+    INTEGER :: j
+
+    sgn = MERGE(-1._DBL,1._DBL,AIMAG(Z)<0)
+    Zloc = sgn*Z
+    LmZ = Lweid-ci*Zloc
+    S = (Lweid+ci*Zloc)/LmZ
+    W = CFFT(1)
+    DO j = 2,Nweid
+       W = W*S+CFFT(j)
+    ENDDO
+    W = sgn*((1/SQRT(pi))/LmZ + 2./(LmZ*LmZ)*W)
+
+    weidcount=weidcount+n
+
+  END SUBROUTINE wofzweidv
+
+  SUBROUTINE Zfriedv(n,zz,Z1v,Z2v,Z3v)
+    !--------------------------------------------------------------
+    ! Z1, Z2 and (optionally) Z3 Fried-Conte functions for a block
+    ! of n arguments. Same limits as Z1, Z2, Z3, but the Fadeeva
+    ! function is calculated only once per argument, for all
+    ! arguments below abslim together with wofzweidv
+    !--------------------------------------------------------------
+    IMPLICIT NONE
+    INTEGER, INTENT(IN) :: n
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(IN) :: zz
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(OUT) :: Z1v, Z2v
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(OUT), OPTIONAL :: Z3v
+    COMPLEX(KIND=DBL), DIMENSION(n) :: zin, win
+    COMPLEX(KIND=DBL) :: Z, zz2, zpuiss, som1, som2, som3
+    REAL(KIND=DBL) :: abz
+    INTEGER, DIMENSION(n) :: idx
+    INTEGER :: i, j, nin
+
+    nin = 0
+    DO j = 1,n
+       IF (ABS(zz(j))<abslim) THEN
+          nin = nin+1
+          idx(nin) = j
+          zin(nin) = zz(j)
+       ENDIF
+    ENDDO
+    IF (nin > 0) CALL wofzweidv(nin,zin(1:nin),win(1:nin))
+
+    DO i = 1,nin
+       j = idx(i)
+       zz2 = zz(j)*zz(j)
+       Z = ci * sqrtpi * win(i)
+       Z1v(j) = zz(j) + zz2 * Z
+       Z2v(j) = zz(j)*(0.5 + zz2 * (1.0 + zz(j)*Z))
+       IF (PRESENT(Z3v)) Z3v(j) = 0.75*zz(j) + zz2 * (0.5*zz(j) + zz2 * (zz(j) + zz2 * Z))
+    ENDDO
+
+    DO j = 1,n
+       abz = ABS(zz(j))
+       IF (abz<abslim) CYCLE
+       IF (abz>1.e4) THEN
+          Z1v(j) = 0.
+          Z2v(j) = 0.
+          IF (PRESENT(Z3v)) Z3v(j) = 0.
+          CYCLE
+       ENDIF
+       ! Asymptotic expansions, as in Z1, Z2 and Z3
+       zz2 = zz(j)*zz(j)
+       som1 = 0.; som2 = 0.; som3 = 0.
+       zpuiss=CMPLX(1._DBL,0._DBL)
+       DO i = 1,nerr
+          zpuiss = zpuiss*zz2
+          som1 = som1 + pduittab(i) / zpuiss
+          IF (i >= 2) som2 = som2 + pduittab(i) / zpuiss
+          IF (i >= 3) som3 = som3 + pduittab(i) / zpuiss
+       ENDDO
+       Z1v(j) = -zz(j) * som1
+       Z2v(j) = -zz2*zz(j) * som2
+       IF (PRESENT(Z3v)) Z3v(j) = -zz2*zz2*zz(j) * som3
+    ENDDO
+
+  END SUBROUTINE Zfriedv
+
+  SUBROUTINE Zfrieddv(n,zz,Z1v,Z2v,dZ1v,dZ2v)
+    !--------------------------------------------------------------
+    ! Z1 and Z2 Fried-Conte functions and their derivatives for a
+    ! block of n arguments, with the same limits as Zfriedv.
+    ! Below abslim the derivatives follow from Z' = -2(1+zZ),
+    ! above it the asymptotic expansions are differentiated termwise
+    !--------------------------------------------------------------
+    IMPLICIT NONE
+    INTEGER, INTENT(IN) :: n
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(IN) :: zz
+    COMPLEX(KIND=DBL), DIMENSION(n), INTENT(OUT) :: Z1v, Z2v, dZ1v, dZ2v
+    COMPLEX(KIND=DBL), DIMENSION(n) :: zin, win
+    COMPLEX(KIND=DBL) :: Z, Aa, zz2, zpuiss, som1, som2, dsom1, dsom2
+    REAL(KIND=DBL) :: abz
+    INTEGER, DIMENSION(n) :: idx
+    INTEGER :: i, j, nin
+
+    nin = 0
+    DO j = 1,n
+       IF (ABS(zz(j))<abslim) THEN
+          nin = nin+1
+          idx(nin) = j
+          zin(nin) = zz(j)
+       ENDIF
+    ENDDO
+    IF (nin > 0) CALL wofzweidv(nin,zin(1:nin),win(1:nin))
+
+    DO i = 1,nin
+       j = idx(i)
+       zz2 = zz(j)*zz(j)
+       Z = ci * sqrtpi * win(i)
+       Aa = 1.0 + zz(j)*Z
+       Z1v(j) = zz(j) + zz2 * Z
+       Z2v(j) = zz(j)*(0.5 + zz2 * Aa)
+       dZ1v(j) = 1.0 + 2.*zz(j)*Z - 2.*zz2*Aa
+       dZ2v(j) = 0.5 + 3.*zz2*Aa + zz2*zz(j)*(Z - 2.*zz(j)*Aa)
+    ENDDO
+
+    DO j = 1,n
+       abz = ABS(zz(j))
+       IF (abz<abslim) CYCLE
+       IF (abz>1.e4) THEN
+          Z1v(j) = 0.; Z2v(j) = 0.
+          dZ1v(j) = 0.; dZ2v(j) = 0.
+          CYCLE
+       ENDIF
+       zz2 = zz(j)*zz(j)
+       som1 = 0.; som2 = 0.; dsom1 = 0.; dsom2 = 0.
+       zpuiss=CMPLX(1._DBL,0._DBL)
+       DO i = 1,nerr
+          zpuiss = zpuiss*zz2
+          som1 = som1 + pduittab(i) / zpuiss
+          dsom1 = dsom1 + (1.-2.*i) * pduittab(i) / zpuiss
+          IF (i >= 2) THEN
+             som2 = som2 + pduittab(i) / zpuiss
+             dsom2 = dsom2 + (3.-2.*i) * pduittab(i) / zpuiss
+          ENDIF
+       ENDDO
+       Z1v(j) = -zz(j) * som1
+       Z2v(j) = -zz2*zz(j) * som2
+       dZ1v(j) = -dsom1
+       dZ2v(j) = -zz2 * dsom2
+    ENDDO
+
+  END SUBROUTINE Zfrieddv
+
   SUBROUTINE cpolyev(NN,S,P,PV)
     ! EVALUATES A COMPLEX POLYNOMIAL  P  AT  S  BY THE HORNER RECURRENCE
     ! PLACING THE PARTIAL SUMS IN Q AND THE COMPUTED VALUE IN PV.
@@ -150,6 +150,122 @@ CONTAINS
 
   END SUBROUTINE unwrap
 
+  SUBROUTINE davintegrand(theta,fonct,M,NN,g)
+    ! -------------------------------------------------------------------
+    ! Logarithm of the modified dispersion relation fonct*exp(-i*NN*theta)
+    ! along the contour, used in the 'argument principle' integrals. The
+    ! imposed roots at z=0 remove the branch cut of the logarithm, so g is
+    ! periodic in theta when NN is the number of zeros inside the contour
+    ! (see Davies 1986)
+    ! -------------------------------------------------------------------
+    INTEGER, INTENT(IN) :: M, NN
+    REAL(KIND=DBL), DIMENSION(M), INTENT(IN) :: theta
+    COMPLEX(KIND=DBL), DIMENSION(M), INTENT(IN) :: fonct
+    COMPLEX(KIND=DBL), DIMENSION(M), INTENT(OUT) :: g
+    COMPLEX(KIND=DBL), DIMENSION(M) :: fex
+    REAL(KIND=DBL), DIMENSION(M) :: alphaex, alphanex
+
+    fex = fonct * EXP( -ci * NN * theta )
+    alphaex = ATAN2(AIMAG(fex),REAL(fex))
+    CALL unwrap( alphaex, M, alphanex)
+    g = LOG( ABS( fex ) ) + ci*alphanex
+
+  END SUBROUTINE davintegrand
+
+  SUBROUTINE davmoments(theta,g,M,NN,Sint,quaderr,segerr)
+    ! -------------------------------------------------------------------
+    ! Argument principle integrals Sint(j) = -j/(2pi) * int_0^2pi exp(i*j*theta) g dtheta
+    ! for all j=1..NN in one pass over the contour, with the trapezoidal rule.
+    ! The integrands are periodic in theta, for which the trapezoidal rule
+    ! converges exponentially on the uniform contour grids.
+    ! The error is estimated from the difference with the same rule on every other
+    ! point, divided by 3 as in Richardson extrapolation of a second order rule (the
+    ! locally refined grids are not uniform). segerr holds the estimate of the pair of
+    ! segments each segment belongs to, shared in proportion to the segment lengths.
+    ! Its sum bounds quaderr, so comparing it with the share of quadtol of the segment
+    ! length locates where the contour is under-resolved on nonuniform grids
+    ! -------------------------------------------------------------------
+    INTEGER, INTENT(IN) :: M, NN
+    REAL(KIND=DBL), DIMENSION(M), INTENT(IN) :: theta
+    COMPLEX(KIND=DBL), DIMENSION(M), INTENT(IN) :: g
+    COMPLEX(KIND=DBL), DIMENSION(NN), INTENT(OUT) :: Sint
+    REAL(KIND=DBL), INTENT(OUT) :: quaderr
+    REAL(KIND=DBL), DIMENSION(M-1), INTENT(OUT), OPTIONAL :: segerr
+
+    COMPLEX(KIND=DBL), DIMENSION(M,NN) :: hh
+    COMPLEX(KIND=DBL), DIMENSION(NN) :: Scoarse, fine, coarse
+    COMPLEX(KIND=DBL) :: ez, ej
+    REAL(KIND=DBL), DIMENSION(NN) :: fac
+    INTEGER :: i, j, ia, im, ib
+
+    DO j=1,NN
+       fac(j) = REAL(j)/(2.*pi)
+    END DO
+
+    !exp(i*j*theta)*g for all moments, the phase factors by recurrence
+    DO i=1,M
+       ez = EXP(ci*theta(i))
+       ej = ez
+       DO j=1,NN
+          hh(i,j) = ej*g(i)
+          ej = ej*ez
+       END DO
+    END DO
+
+    Sint(:) = 0.
+    Scoarse(:) = 0.
+    ia = 1
+    DO WHILE (ia < M)
+       IF (ia+2 <= M) THEN
+          im = ia+1
+          ib = ia+2
+          fine(:) = 0.5*(theta(im)-theta(ia))*(hh(ia,:)+hh(im,:)) + 0.5*(theta(ib)-theta(im))*(hh(im,:)+hh(ib,:))
+          coarse(:) = 0.5*(theta(ib)-theta(ia))*(hh(ia,:)+hh(ib,:))
+          IF (PRESENT(segerr)) THEN
+             segerr(ia) = MAXVAL(fac*ABS(fine-coarse))/3.
+             segerr(im) = segerr(ia)*(theta(ib)-theta(im))/(theta(ib)-theta(ia))
+             segerr(ia) = segerr(ia)-segerr(im)
+          ENDIF
+       ELSE !single last segment when M is even: both rules coincide
+          ib = ia+1
+          fine(:) = 0.5*(theta(ib)-theta(ia))*(hh(ia,:)+hh(ib,:))
+          coarse(:) = fine(:)
+          IF (PRESENT(segerr)) segerr(ia) = 0.
+       ENDIF
+       Sint = Sint + fine
+       Scoarse = Scoarse + coarse
+       ia = ib
+    END DO
+
+    quaderr = MAXVAL(fac*ABS(Sint-Scoarse))/3.
+    Sint = -fac*Sint
+
+  END SUBROUTINE davmoments
+
+  SUBROUTINE davquaderr(theta,fonct,M,NN,quaderr,segerr)
+    ! -------------------------------------------------------------------
+    ! Estimated error of the argument principle integrals for NN zeros on
+    ! the current contour, and its distribution over the segments (see davmoments).
+    ! Zero when there are no integrals to compute
+    ! -------------------------------------------------------------------
+    INTEGER, INTENT(IN) :: M, NN
+    REAL(KIND=DBL), DIMENSION(M), INTENT(IN) :: theta
+    COMPLEX(KIND=DBL), DIMENSION(M), INTENT(IN) :: fonct
+    REAL(KIND=DBL), INTENT(OUT) :: quaderr
+    REAL(KIND=DBL), DIMENSION(M-1), INTENT(OUT) :: segerr
+    COMPLEX(KIND=DBL), DIMENSION(M) :: g
+    COMPLEX(KIND=DBL), DIMENSION(MAX(NN,1)) :: Sint
+
+    IF ( (NN < 1) .OR. ANY(ABS(fonct)<epsD) ) THEN
+       quaderr = 0.
+       segerr(:) = 0.
+    ELSE
+       CALL davintegrand(theta, fonct, M, NN, g)
+       CALL davmoments(theta, g, M, NN, Sint, quaderr, segerr)
+    ENDIF
+
+  END SUBROUTINE davquaderr
+
   COMPLEX(KIND=DBL) FUNCTION casin(z)
     ! -----------------------------------------------------------------
     ! Calculates the arcsin for complex input according to the formula:
@@ -0,0 +1,399 @@
+!Adaptive cubature of vector-valued integrands
+MODULE mod_cubature
+  !-------------------------------------------------------------------------------
+  ! Globally adaptive h-cubature for vector-valued integrands over a hyperrectangle.
+  ! Uses the Genz-Malik degree 7 rule (embedded degree 5 for the error) for ndim>=2,
+  ! and the (7,15) Gauss-Kronrod pair for ndim=1.
+  ! All components share the same subdivision: the region with the largest
+  ! component error is bisected along the dimension with the largest fourth difference.
+  ! Convergence when every component error < MAX(absacc, relacc*|result|), with |result|
+  ! the Euclidean norm of the result vector. The real and imaginary parts of the
+  ! complex integrands, summed over all species, are thus integrated in one pass.
+  ! With the optional relfloor, every component is instead converged relative to its own
+  ! size, floored at relfloor times the norm, and regions are ranked by their largest
+  ! error relative to that size. Used for batches of coefficients of different size.
+  !
+  ! The integrand interface is FUNCTION func(nd,x,nv) returning DIMENSION(nv),
+  ! as for the *_cub functions in callpassints and calltrapints
+  !
+  ! quad1d and cubnd integrate a single scalar integrand, with the arguments of the
+  ! NAG d01ahf and d01fcf calls they replace. All routines keep their state on the
+  ! stack, so the (p,nu) tasks on OpenMP threads call them concurrently
+  !-------------------------------------------------------------------------------
+  USE kind
+
+  IMPLICIT NONE
+
+  !Genz-Malik abscissae
+  REAL(KIND=DBL), PARAMETER :: lambda2 = 0.35856858280031809199d0 !sqrt(9/70)
+  REAL(KIND=DBL), PARAMETER :: lambda4 = 0.94868329805051379960d0 !sqrt(9/10)
+  REAL(KIND=DBL), PARAMETER :: lambda5 = 0.68824720161168529772d0 !sqrt(9/19)
+  REAL(KIND=DBL), PARAMETER :: ratio4 = 1.d0/7.d0 !(lambda2/lambda4)**2 for the fourth difference
+
+  !Gauss-Kronrod (7,15) abscissae and weights (as QUADPACK qk15)
+  REAL(KIND=DBL), DIMENSION(8), PARAMETER :: xgk = (/ 0.991455371120812639206854697526329d0, &
+       & 0.949107912342758524526189684047851d0, 0.864864423359769072789712788640926d0, &
+       & 0.741531185599394439863864773280788d0, 0.586087235467691130294144845693013d0, &
+       & 0.405845151377397166906606412076961d0, 0.207784955007898467600689403773245d0, 0.d0 /)
+  REAL(KIND=DBL), DIMENSION(8), PARAMETER :: wgk = (/ 0.022935322010529224963732008058970d0, &
+       & 0.063092092629978553290700663189204d0, 0.104790010322250183839876322541518d0, &
+       & 0.140653259715525918745189590510238d0, 0.169004726639267902826583426598550d0, &
+       & 0.190350578064785409913256402421014d0, 0.204432940075298892414161999234649d0, &
+       & 0.209482141084727828012999174891714d0 /)
+  REAL(KIND=DBL), DIMENSION(4), PARAMETER :: wg = (/ 0.129484966168869693270611432679082d0, &
+       & 0.279705391489276667901467771423780d0, 0.381830050505118944950369775488975d0, &
+       & 0.417959183673469387755102040816327d0 /)
+
+  PRIVATE :: lambda2, lambda4, lambda5, ratio4, xgk, wgk, wg, cubcore
+
+CONTAINS
+
+  SUBROUTINE cubature(nd, nv, a, b, minpts, maxpts, func, relacc, absacc, result, acc, ifail, relfloor)
+    !-----------------------------------------------------------
+    ! Integrates the nv components of func over [a,b] (nd dimensions)
+    ! minpts: in, minimum number of integrand evaluations. out, number used
+    ! maxpts: maximum number of integrand evaluations
+    ! acc: estimated relative error of the result vector
+    ! ifail: 0 success, 1 maxpts reached before convergence (best estimate returned),
+    !        2 invalid input
+    ! relfloor: optional, per-component convergence (see module header)
+    !-----------------------------------------------------------
+    INTEGER, INTENT(IN) :: nd, nv, maxpts
+    INTEGER, INTENT(INOUT) :: minpts
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: a, b
+    REAL(KIND=DBL), INTENT(IN) :: relacc, absacc
+    REAL(KIND=DBL), DIMENSION(nv), INTENT(OUT) :: result
+    REAL(KIND=DBL), INTENT(OUT) :: acc
+    INTEGER, INTENT(OUT) :: ifail
+    REAL(KIND=DBL), OPTIONAL, INTENT(IN) :: relfloor
+
+    INTERFACE
+       FUNCTION func(nd, x, nv)
+         USE kind
+         INTEGER, INTENT(IN) :: nd, nv
+         REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: x
+         REAL(KIND=DBL), DIMENSION(nv) :: func
+       END FUNCTION func
+    END INTERFACE
+
+    CALL cubcore(nd, nv, a, b, minpts, maxpts, relacc, absacc, result, acc, ifail, relfloor, func=func)
+  END SUBROUTINE cubature
+
+  REAL(KIND=DBL) FUNCTION quad1d(a, b, relacc, npts, relerr, f, maxpts, ifail)
+    !-----------------------------------------------------------
+    ! Integral of the scalar f over [a,b], replacing d01ahf
+    ! npts: out, number of integrand evaluations used
+    ! relerr: out, estimated relative error
+    ! maxpts: maximum number of integrand evaluations
+    ! ifail: out, as for cubature
+    !-----------------------------------------------------------
+    REAL(KIND=DBL), INTENT(IN) :: a, b, relacc
+    INTEGER, INTENT(OUT) :: npts
+    REAL(KIND=DBL), INTENT(OUT) :: relerr
+    INTEGER, INTENT(IN) :: maxpts
+    INTEGER, INTENT(INOUT) :: ifail
+    REAL(KIND=DBL), DIMENSION(1) :: result
+
+    INTERFACE
+       REAL(KIND=DBL) FUNCTION f(x)
+         USE kind
+         REAL(KIND=DBL), INTENT(IN) :: x
+       END FUNCTION f
+    END INTERFACE
+
+    npts = 0
+    CALL cubcore(1, 1, (/ a /), (/ b /), npts, maxpts, relacc, 0.d0, result, relerr, ifail, f1=f)
+    quad1d = result(1)
+  END FUNCTION quad1d
+
+  SUBROUTINE cubnd(nd, a, b, minpts, maxpts, f, relacc, acc, result, ifail)
+    !-----------------------------------------------------------
+    ! Integral of the scalar f over [a,b] (nd dimensions), replacing d01fcf
+    ! Arguments as for cubature
+    !-----------------------------------------------------------
+    INTEGER, INTENT(IN) :: nd, maxpts
+    INTEGER, INTENT(INOUT) :: minpts
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: a, b
+    REAL(KIND=DBL), INTENT(IN) :: relacc
+    REAL(KIND=DBL), INTENT(OUT) :: acc, result
+    INTEGER, INTENT(INOUT) :: ifail
+    REAL(KIND=DBL), DIMENSION(1) :: resvec
+
+    INTERFACE
+       REAL(KIND=DBL) FUNCTION f(nd, x)
+         USE kind
+         INTEGER, INTENT(IN) :: nd
+         REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: x
+       END FUNCTION f
+    END INTERFACE
+
+    CALL cubcore(nd, 1, a, b, minpts, maxpts, relacc, 0.d0, resvec, acc, ifail, fn=f)
+    result = resvec(1)
+  END SUBROUTINE cubnd
+
+  SUBROUTINE cubcore(nd, nv, a, b, minpts, maxpts, relacc, absacc, result, acc, ifail, relfloor, func, f1, fn)
+    !Adaptive cubature of cubature, quad1d and cubnd. Exactly one of func, f1 and fn is given
+    INTEGER, INTENT(IN) :: nd, nv, maxpts
+    INTEGER, INTENT(INOUT) :: minpts
+    REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: a, b
+    REAL(KIND=DBL), INTENT(IN) :: relacc, absacc
+    REAL(KIND=DBL), DIMENSION(nv), INTENT(OUT) :: result
+    REAL(KIND=DBL), INTENT(OUT) :: acc
+    INTEGER, INTENT(OUT) :: ifail
+    REAL(KIND=DBL), OPTIONAL, INTENT(IN) :: relfloor
+    OPTIONAL :: func, f1, fn
+
+    INTERFACE
+       FUNCTION func(nd, x, nv)
+         USE kind
+         INTEGER, INTENT(IN) :: nd, nv
+         REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: x
+         REAL(KIND=DBL), DIMENSION(nv) :: func
+       END FUNCTION func
+    END INTERFACE
+    INTERFACE
+       REAL(KIND=DBL) FUNCTION f1(x)
+         USE kind
+         REAL(KIND=DBL), INTENT(IN) :: x
+       END FUNCTION f1
+    END INTERFACE
+    INTERFACE
+       REAL(KIND=DBL) FUNCTION fn(nd, x)
+         USE kind
+         INTEGER, INTENT(IN) :: nd
+         REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: x
+       END FUNCTION fn
+    END INTERFACE
+
+    REAL(KIND=DBL), DIMENSION(:,:), ALLOCATABLE :: center, halfw, rint, rerr
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: prio
+    INTEGER, DIMENSION(:), ALLOCATABLE :: splitdim, heap
+    REAL(KIND=DBL), DIMENSION(nv) :: errvec, wvec
+    INTEGER :: nrule, maxreg, nreg, nheap, neval, ir, inew, id
+
+    result(:) = 0.
+    acc = 0.
+    ifail = 0
+
+    IF (nd == 1) THEN
+       nrule = 15
+    ELSE
+       nrule = 1 + 4*nd + 2*nd*(nd-1) + 2**nd
+    ENDIF
+
+    IF ( (nd < 1) .OR. (nv < 1) .OR. (maxpts < nrule) .OR. (minpts > maxpts) ) THEN
+       ifail = 2
+       RETURN
+    ENDIF
+
+    maxreg = maxpts/nrule + 1
+    ALLOCATE(center(nd,maxreg)); ALLOCATE(halfw(nd,maxreg))
+    ALLOCATE(rint(nv,maxreg)); ALLOCATE(rerr(nv,maxreg))
+    ALLOCATE(prio(maxreg)); ALLOCATE(splitdim(maxreg)); ALLOCATE(heap(maxreg))
+
+    nreg = 1; nheap = 0
+    center(:,1) = 0.5*(a+b)
+    halfw(:,1) = 0.5*(b-a)
+    wvec = 1.
+    CALL applyrule(1)
+    neval = nrule
+    result = rint(:,1)
+    errvec = rerr(:,1)
+    IF (PRESENT(relfloor)) THEN
+       !Region priorities relative to the size of each component, from the first estimate
+       wvec = 1./MAX(ABS(result), relfloor*SQRT(SUM(result**2)), TINY(1.d0))
+       prio(1) = MAXVAL(rerr(:,1)*wvec)
+    ENDIF
+    CALL heappush(1)
+
+    DO
+       IF (PRESENT(relfloor)) THEN
+          IF ( (neval >= minpts) .AND. ALL( errvec <= MAX(absacc, relacc*MAX(ABS(result), relfloor*SQRT(SUM(result**2))))) ) EXIT
+       ELSE
+          IF ( (neval >= minpts) .AND. ALL( errvec <= MAX(absacc, relacc*SQRT(SUM(result**2))) ) ) EXIT
+       ENDIF
+       IF (neval + 2*nrule > maxpts) THEN
+          ifail = 1
+          EXIT
+       ENDIF
+
+       !Bisect the region with largest error and replace it by its two halves
+       ir = heappop()
+       result = result - rint(:,ir)
+       errvec = errvec - rerr(:,ir)
+       id = splitdim(ir)
+       halfw(id,ir) = 0.5*halfw(id,ir)
+       nreg = nreg + 1
+       inew = nreg
+       center(:,inew) = center(:,ir)
+       halfw(:,inew) = halfw(:,ir)
+       center(id,ir) = center(id,ir) - halfw(id,ir)
+       center(id,inew) = center(id,inew) + halfw(id,inew)
+
+       CALL applyrule(ir)
+       CALL applyrule(inew)
+       neval = neval + 2*nrule
+       result = result + rint(:,ir) + rint(:,inew)
+       errvec = MAX(errvec + rerr(:,ir) + rerr(:,inew), 0.d0)
+       CALL heappush(ir)
+       CALL heappush(inew)
+    ENDDO
+
+    !Final sums directly from the regions to avoid accumulated round-off
+    result = SUM(rint(:,1:nreg),2)
+    errvec = SUM(rerr(:,1:nreg),2)
+    IF (SUM(result**2) > 0.) acc = SQRT(SUM(errvec**2)/SUM(result**2))
+    minpts = neval
+
+    DEALLOCATE(center, halfw, rint, rerr, prio, splitdim, heap)
+
+  CONTAINS
+
+    FUNCTION evalf(x)
+      REAL(KIND=DBL), DIMENSION(nd), INTENT(IN) :: x
+      REAL(KIND=DBL), DIMENSION(nv) :: evalf
+
+      IF (PRESENT(func)) THEN
+         evalf = func(nd, x, nv)
+      ELSEIF (PRESENT(f1)) THEN
+         evalf = f1(x(1))
+      ELSE
+         evalf = fn(nd, x)
+      ENDIF
+    END FUNCTION evalf
+
+    SUBROUTINE applyrule(ireg)
+      !Integral, error and preferred split dimension of region ireg
+      INTEGER, INTENT(IN) :: ireg
+      REAL(KIND=DBL), DIMENSION(nd) :: c, h, x, diff
+      REAL(KIND=DBL), DIMENSION(nv) :: f0, fp2, fm2, fp3, fm3, sum2, sum3, sum4, sum5, res5, resg
+      REAL(KIND=DBL) :: vol, w1, w2, w3, w4, w5, we1, we2, we3, we4, dn
+      INTEGER :: i, j, k, si, sj
+
+      c = center(:,ireg)
+      h = halfw(:,ireg)
+
+      IF (nd == 1) THEN
+         f0 = evalf(c)
+         rint(:,ireg) = wgk(8)*f0
+         resg = wg(4)*f0
+         DO i = 1,7
+            x(1) = c(1) + h(1)*xgk(i)
+            fp2 = evalf(x)
+            x(1) = c(1) - h(1)*xgk(i)
+            fm2 = evalf(x)
+            rint(:,ireg) = rint(:,ireg) + wgk(i)*(fp2+fm2)
+            IF (MOD(i,2) == 0) resg = resg + wg(i/2)*(fp2+fm2)
+         ENDDO
+         rint(:,ireg) = h(1)*rint(:,ireg)
+         rerr(:,ireg) = ABS(rint(:,ireg) - h(1)*resg)
+         splitdim(ireg) = 1
+         prio(ireg) = MAXVAL(rerr(:,ireg)*wvec)
+         RETURN
+      ENDIF
+
+      dn = REAL(nd,DBL)
+      w1 = (12824.d0 - 9120.d0*dn + 400.d0*dn**2)/19683.d0
+      w2 = 980.d0/6561.d0
+      w3 = (1820.d0 - 400.d0*dn)/19683.d0
+      w4 = 200.d0/19683.d0
+      w5 = 6859.d0/19683.d0/2.d0**nd
+      we1 = (729.d0 - 950.d0*dn + 50.d0*dn**2)/729.d0
+      we2 = 245.d0/486.d0
+      we3 = (265.d0 - 100.d0*dn)/1458.d0
+      we4 = 25.d0/729.d0
+
+      vol = PRODUCT(2.*h)
+      x = c
+      f0 = evalf(x)
+
+      sum2 = 0.; sum3 = 0.; sum4 = 0.; sum5 = 0.
+      DO i = 1,nd
+         x(i) = c(i) + lambda2*h(i); fp2 = evalf(x)
+         x(i) = c(i) - lambda2*h(i); fm2 = evalf(x)
+         x(i) = c(i) + lambda4*h(i); fp3 = evalf(x)
+         x(i) = c(i) - lambda4*h(i); fm3 = evalf(x)
+         x(i) = c(i)
+         sum2 = sum2 + fp2 + fm2
+         sum3 = sum3 + fp3 + fm3
+         diff(i) = SUM( ABS( fp2 + fm2 - 2.*f0 - ratio4*(fp3 + fm3 - 2.*f0) ) )
+      ENDDO
+
+      DO i = 1,nd-1
+         DO j = i+1,nd
+            DO si = -1,1,2
+               DO sj = -1,1,2
+                  x(i) = c(i) + si*lambda4*h(i)
+                  x(j) = c(j) + sj*lambda4*h(j)
+                  sum4 = sum4 + evalf(x)
+               ENDDO
+            ENDDO
+            x(i) = c(i); x(j) = c(j)
+         ENDDO
+      ENDDO
+
+      DO k = 0,2**nd-1
+         DO i = 1,nd
+            IF (BTEST(k,i-1)) THEN
+               x(i) = c(i) - lambda5*h(i)
+            ELSE
+               x(i) = c(i) + lambda5*h(i)
+            ENDIF
+         ENDDO
+         sum5 = sum5 + evalf(x)
+      ENDDO
+
+      rint(:,ireg) = vol*(w1*f0 + w2*sum2 + w3*sum3 + w4*sum4 + w5*sum5)
+      res5 = vol*(we1*f0 + we2*sum2 + we3*sum3 + we4*sum4)
+      rerr(:,ireg) = ABS(rint(:,ireg) - res5)
+      prio(ireg) = MAXVAL(rerr(:,ireg)*wvec)
+
+      !Split along the largest fourth difference. If the integrand is flat, split the widest side
+      IF (MAXVAL(diff) > 0.) THEN
+         splitdim(ireg) = MAXLOC(diff,1)
+      ELSE
+         splitdim(ireg) = MAXLOC(h,1)
+      ENDIF
+
+    END SUBROUTINE applyrule
+
+    SUBROUTINE heappush(ireg)
+      !Insert region ireg in the max-heap ordered by prio
+      INTEGER, INTENT(IN) :: ireg
+      INTEGER :: i, ip
+
+      nheap = nheap + 1
+      i = nheap
+      DO WHILE (i > 1)
+         ip = i/2
+         IF (prio(heap(ip)) >= prio(ireg)) EXIT
+         heap(i) = heap(ip)
+         i = ip
+      ENDDO
+      heap(i) = ireg
+    END SUBROUTINE heappush
+
+    INTEGER FUNCTION heappop()
+      !Remove and return the region with the largest error
+      INTEGER :: i, ic, ilast
+
+      heappop = heap(1)
+      ilast = heap(nheap)
+      nheap = nheap - 1
+      i = 1
+      DO
+         ic = 2*i
+         IF (ic > nheap) EXIT
+         IF (ic < nheap) THEN
+            IF (prio(heap(ic+1)) > prio(heap(ic))) ic = ic + 1
+         ENDIF
+         IF (prio(ilast) >= prio(heap(ic))) EXIT
+         heap(i) = heap(ic)
+         i = ic
+      ENDDO
+      IF (nheap > 0) heap(i) = ilast
+    END FUNCTION heappop
+
+  END SUBROUTINE cubcore
+
+END MODULE mod_cubature
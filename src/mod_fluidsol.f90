@@ -8,6 +8,7 @@ MODULE mod_fluidsol
   USE kind
   USE datmat
   USE datcal
+  USE mod_cubature
   IMPLICIT NONE
 
 CONTAINS
@@ -48,28 +49,28 @@ CONTAINS
     pFFk=p !to pass radial coordinate into integrand functions which can only have one argument
 
     ifailloc = 1
-    fk = d01ahf(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
+    fk = quad1d(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution fk integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    fk2 = d01ahf(a,b,relacc1,npts,relerr,fk2int,lw,ifailloc)
+    fk2 = quad1d(a,b,relacc1,npts,relerr,fk2int,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution fk2 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    VT = d01ahf(a,b,relacc1,npts,relerr,VTint,lw,ifailloc)
+    VT = quad1d(a,b,relacc1,npts,relerr,VTint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution VT integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    norm = d01ahf(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
+    norm = quad1d(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution norm integration at p=',p,', nu=',nu
@@ -81,21 +82,21 @@ CONTAINS
     ft2 = 1-norm
 
     ifailloc = 1
-    lam = d01ahf(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
+    lam = quad1d(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution lambda integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    V1 = d01ahf(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
+    V1 = quad1d(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V1 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    V2 = d01ahf(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
+    V2 = quad1d(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V2 integration at p=',p,', nu=',nu
@@ -104,42 +105,42 @@ CONTAINS
 !!$    WRITE(*,*) 'p=',p,'norm,lam,V1,V2,eps=',norm,lam,V1,V2,epsilon(p)
 
     ifailloc = 1
-    V3 = d01ahf(a,c,relacc1,npts,relerr,V3int,lw,ifailloc)!*fc(p)/norm
+    V3 = quad1d(a,c,relacc1,npts,relerr,V3int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V3 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    V4 = d01ahf(a,c,relacc1,npts,relerr,V4int,lw,ifailloc)!*fc(p)/norm
+    V4 = quad1d(a,c,relacc1,npts,relerr,V4int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V4 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    Wv3 = d01ahf(a,c,relacc1,npts,relerr,Wv3int,lw,ifailloc)!*fc(p)/norm
+    Wv3 = quad1d(a,c,relacc1,npts,relerr,Wv3int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv3 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    Wv4 = d01ahf(a,c,relacc1,npts,relerr,Wv4int,lw,ifailloc)!*fc(p)/norm
+    Wv4 = quad1d(a,c,relacc1,npts,relerr,Wv4int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv4 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    Wv5 = d01ahf(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
+    Wv5 = quad1d(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv5 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc = 1
-    Wv6 = d01ahf(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
+    Wv6 = quad1d(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv6 integration at p=',p,', nu=',nu
@@ -339,13 +340,13 @@ CONTAINS
 
     pFFk=p !to pass rdadial coordinate into integrand functions which can only have one argument
 
-    fk = d01ahf(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
+    fk = quad1d(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution fk integration at p=',p,', nu=',nu
     ENDIF
 
-    norm = d01ahf(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
+    norm = quad1d(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution norm integration at p=',p,', nu=',nu
@@ -355,31 +356,31 @@ CONTAINS
     fc2 = norm
     ft2 = 1-fc2
 
-    lam = d01ahf(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
+    lam = quad1d(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution lambda integration at p=',p,', nu=',nu
     ENDIF
 
-    V1 = d01ahf(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
+    V1 = quad1d(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution V1 integration at p=',p,', nu=',nu
     ENDIF
 
-    V2 = d01ahf(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
+    V2 = quad1d(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution V2 integration at p=',p,', nu=',nu
     ENDIF
 
-    Wv5 = d01ahf(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
+    Wv5 = quad1d(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution Wv5 integration at p=',p,', nu=',nu
     ENDIF
 
-    Wv6 = d01ahf(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
+    Wv6 = quad1d(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of ele fluid solution Wv6 integration at p=',p,', nu=',nu
@@ -510,30 +511,30 @@ CONTAINS
 
     pFFk=p !to pass radial coordinate into integrand functions which can only have one argument
 
-!!$    fk = ft2*d01ahf(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
+!!$    fk = ft2*quad1d(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
     ifailloc=1
-    fk = d01ahf(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
+    fk = quad1d(a,b,relacc1,npts,relerr,fkint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution fk integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    fk2 = d01ahf(a,b,relacc1,npts,relerr,fk2int,lw,ifailloc)
+    fk2 = quad1d(a,b,relacc1,npts,relerr,fk2int,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution fk2 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    VT = d01ahf(a,b,relacc1,npts,relerr,VTint,lw,ifailloc)
+    VT = quad1d(a,b,relacc1,npts,relerr,VTint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution VT integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    norm = d01ahf(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
+    norm = quad1d(a,c,relacc1,npts,relerr,normint,lw,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution norm integration at p=',p,', nu=',nu
@@ -544,63 +545,63 @@ CONTAINS
     ft2 = 1-fc2
 
     ifailloc=1
-    lam = d01ahf(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
+    lam = quad1d(a,c,relacc1,npts,relerr,lamint,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution lambda integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    V1 = d01ahf(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
+    V1 = quad1d(a,c,relacc1,npts,relerr,V1int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V1 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    V2 = d01ahf(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
+    V2 = quad1d(a,c,relacc1,npts,relerr,V2int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V2 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    V3 = d01ahf(a,c,relacc1,npts,relerr,V3int,lw,ifailloc)!*fc(p)/norm
+    V3 = quad1d(a,c,relacc1,npts,relerr,V3int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V3 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    V4 = d01ahf(a,c,relacc1,npts,relerr,V4int,lw,ifailloc)!*fc(p)/norm
+    V4 = quad1d(a,c,relacc1,npts,relerr,V4int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution V4 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    Wv3 = d01ahf(a,c,relacc1,npts,relerr,Wv3int,lw,ifailloc)!*fc(p)/norm
+    Wv3 = quad1d(a,c,relacc1,npts,relerr,Wv3int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv3 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    Wv4 = d01ahf(a,c,relacc1,npts,relerr,Wv4int,lw,ifailloc)!*fc(p)/norm
+    Wv4 = quad1d(a,c,relacc1,npts,relerr,Wv4int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv4 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    Wv5 = d01ahf(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
+    Wv5 = quad1d(a,c,relacc1,npts,relerr,Wv5int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv5 integration at p=',p,', nu=',nu
     ENDIF
 
     ifailloc=1
-    Wv6 = d01ahf(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
+    Wv6 = quad1d(a,c,relacc1,npts,relerr,Wv6int,lw,ifailloc)!*fc(p)/norm
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I0,A,I7,A,I0)") 'ifailloc = ',ifailloc,&
             &'. Abnormal termination of fluid solution Wv6 integration at p=',p,', nu=',nu
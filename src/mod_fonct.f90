@@ -6,6 +6,7 @@ MODULE mod_fonct
   USE dispfuncs
   USE calltrapints
   USE callpassints
+  USE mod_cubature
 
   IMPLICIT NONE
 
@@ -20,14 +21,12 @@ CONTAINS
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
     COMPLEX(KIND=DBL), INTENT(OUT) :: fonctp
 
-    REAL(KIND=DBL)     :: acc, relerr, cc, dd
+    REAL(KIND=DBL)     :: acc
     REAL(KIND=DBL), DIMENSION(2) :: a,b
-    INTEGER            :: minpts, neval, npts  !output number of integrand evaluations
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
+    INTEGER            :: minpts  !output number of integrand evaluations
     INTEGER :: ifailloc
-    REAL(KIND=DBL)    :: rfonctpe, ifonctpe, rfonctpiz, ifonctpiz
 
-    REAL(KIND=DBL), DIMENSION(nf) :: intout
+    REAL(KIND=DBL), DIMENSION(nf) :: intout, fonctpiz
 
     !set the omega and p to be seen by all integration subroutines
     omFFk = omega
@@ -40,63 +39,102 @@ CONTAINS
     a(2) = 0.0d0
     b(2) = vuplim
 
-    cc = a(1)
-    dd = b(1)
-
-    ! The kappa integral is calculated. The real component with rFFkiz,
-    ! and the imaginary component with iFFkiz, for all ions
+    ! The kappa integral is calculated for all ions. The real and imaginary
+    ! components are integrated together on the same adaptive grid
 
-    ifailloc = 1
-    rfonctpiz = d01ahf(cc,dd,relacc1,npts,relerr,rFFkiz,lw,ifailloc)
-    IF (ifailloc /= 0) THEN
-       IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 1DNAG rFFkiz integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-    ENDIF
-    ifailloc = 1
-    ifonctpiz = d01ahf(cc,dd,relacc1,npts,relerr,iFFkiz,lw,ifailloc)
+    minpts=0; ifailloc = 1
+    CALL cubature(1,nf,a(1:1),b(1:1),minpts,maxpts,FFkiz_cub,relacc1,0.d0,fonctpiz,acc,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 1DNAG iFFkiz integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+            &'. Abnormal termination of 1D cubature FFkiz integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
     ENDIF
 
-    minpts = 0; ifailloc=-1;
     !Only calculate nonadiabatic part for electrons if el_type == 1
     IF (el_type == 1) THEN 
        IF ( ABS(coll_flag) > epsD) THEN !Collisional simulation, do double integral
           minpts=0; ifailloc = 1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFke,relacc2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+          CALL cubature(ndim,nf,a,b,minpts,maxpts,FFke_cub,relacc2,0.d0,intout,acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 2DNAG rFFke integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 2D cubature FFke integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
+       ELSE !Collisionless simulation, revert to faster single integral
           minpts=0; ifailloc = 1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFke,relacc2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+          CALL cubature(1,nf,a(1:1),b(1:1),minpts,maxpts,FFke_nocoll_cub,relacc1,0.d0,intout,acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 2DNAG iFFke integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 1D cubature FFke_nocoll integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
-       ELSE !Collisionless simulation, revert to faster single integral
-          ifailloc = 1
-          intout(1) = d01ahf(cc,dd,relacc1,npts,relerr,rFFke_nocoll,lw,ifailloc)
+       ENDIF
+    ELSE
+       intout(1)=0
+       intout(2)=0
+    ENDIF
+
+    fonctp = intout(1) + fonctpiz(1) + ci * intout(2) + ci * fonctpiz(2)
+
+  END SUBROUTINE calcfonctp
+
+  SUBROUTINE calcfonctpd( p, nu, omega, fonctp, dfonctp )
+    !-----------------------------------------------------------
+    ! Trapped particle integrals as in calcfonctp, together with
+    ! their derivatives on the same adaptive grids.
+    ! dfonctp(1) is d/domega, dfonctp(2) is d/d|omega| (Krook term)
+    !-----------------------------------------------------------   
+    INTEGER, INTENT(IN)  :: p, nu
+    COMPLEX(KIND=DBL), INTENT(IN)  :: omega
+    COMPLEX(KIND=DBL), INTENT(OUT) :: fonctp
+    COMPLEX(KIND=DBL), DIMENSION(2), INTENT(OUT) :: dfonctp
+
+    REAL(KIND=DBL)     :: acc
+    REAL(KIND=DBL), DIMENSION(2) :: a,b
+    INTEGER            :: minpts
+    INTEGER :: ifailloc
+
+    REAL(KIND=DBL), DIMENSION(3*nf) :: intout
+    REAL(KIND=DBL), DIMENSION(2*nf) :: fonctpiz
+
+    omFFk = omega
+    pFFk = p
+    nuFFk = nu
+
+    a(1) = 0.0d0
+    b(1) = 1.0d0 - barelyavoid
+    a(2) = 0.0d0
+    b(2) = vuplim
+
+    minpts=0; ifailloc = 1
+    CALL cubature(1,2*nf,a(1:1),b(1:1),minpts,maxpts,FFkizd_cub,relacc1,0.d0,fonctpiz,acc,ifailloc)
+    IF (ifailloc /= 0) THEN
+       IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
+            &'. Abnormal termination of 1D cubature FFkizd integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+    ENDIF
+
+    intout(:)=0
+    IF (el_type == 1) THEN 
+       IF ( ABS(coll_flag) > epsD) THEN
+          minpts=0; ifailloc = 1
+          CALL cubature(ndim,3*nf,a,b,minpts,maxpts,FFked_cub,relacc2,0.d0,intout,acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 1DNAG rFFke_nocoll integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 2D cubature FFked integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
-          ifailloc = 1
-          intout(2) = d01ahf(cc,dd,relacc1,npts,relerr,iFFke_nocoll,lw,ifailloc)
+       ELSE
+          minpts=0; ifailloc = 1
+          CALL cubature(1,2*nf,a(1:1),b(1:1),minpts,maxpts,FFke_nocolld_cub,relacc1,0.d0,intout(1:2*nf),acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 1DNAG iFFke_nocoll integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 1D cubature FFke_nocolld integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
        ENDIF
-    ELSE
-       intout(1)=0
-       intout(2)=0
     ENDIF
 
-    fonctp = intout(1) + rfonctpiz + ci * intout(2) + ci * ifonctpiz
+    fonctp = intout(1) + fonctpiz(1) + ci * intout(2) + ci * fonctpiz(2)
+    !undo the |omega| weighting of the derivative components
+    dfonctp(1) = (intout(3) + fonctpiz(3) + ci * intout(4) + ci * fonctpiz(4)) / MAX(ABS(omega),epsD)
+    dfonctp(2) = (intout(5) + ci * intout(6)) / MAX(ABS(omega),epsD)
 
-  END SUBROUTINE calcfonctp
+  END SUBROUTINE calcfonctpd
 
   SUBROUTINE calcfonctc( p, nu, omega, fonctc )
     !-----------------------------------------------------------
@@ -106,16 +144,13 @@ CONTAINS
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
     COMPLEX(KIND=DBL), INTENT(OUT) :: fonctc
 
-    REAL(KIND=DBL), DIMENSION(ndim) :: a, b, c, dd , xy
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
+    REAL(KIND=DBL), DIMENSION(ndim) :: a, b
     REAL(KIND=DBL), DIMENSION(nf) :: intout
 
     REAL(KIND=DBL)     :: acc
-    INTEGER            :: npts, minpts, neval, iii,jjj,rc !, lims=100
+    INTEGER            :: minpts
     INTEGER :: ifailloc
 
-    REAL(KIND=DBL)     :: rfonctc, ifonctc !outputs of integrals
-
     omFkr = omega
     pFkr = p
     nuFkr = nu
@@ -127,31 +162,55 @@ CONTAINS
     b(:) = rkuplim
 
     !The k* and rho* double integral is calculated
-    !The real and imaginary parts are calculated separately due to NAG function limitations
+    !The real and imaginary parts are integrated together on the same adaptive grid
     ccount=0
-    minpts = 0
 
     minpts=0; ifailloc = 1
-    CALL d01fcf(ndim,a,b,minpts,maxpts,rFkstarrstar,relacc2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+    CALL cubature(ndim,nf,a,b,minpts,maxpts,Fkstarrstar_cub,relacc2,0.d0,intout,acc,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 2DNAG rFkstarrstar integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-       IF (ifailloc == -399) THEN
-          WRITE(stderr,"(A)") 'NAG license error! Exiting'
-          STOP
-       ENDIF
+            &'. Abnormal termination of 2D cubature Fkstarrstar integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
     ENDIF
 
+    fonctc = intout(1) + ci * intout(2)
+
+  END SUBROUTINE calcfonctc
+
+  SUBROUTINE calcfonctcd( p, nu, omega, fonctc, dfonctc )
+    !-----------------------------------------------------------
+    ! Passing particle integrals as in calcfonctc, together with
+    ! their omega derivative on the same adaptive grid
+    !-----------------------------------------------------------   
+    INTEGER, INTENT(IN)  :: p, nu
+    COMPLEX(KIND=DBL), INTENT(IN)  :: omega
+    COMPLEX(KIND=DBL), INTENT(OUT) :: fonctc, dfonctc
+
+    REAL(KIND=DBL), DIMENSION(ndim) :: a, b
+    REAL(KIND=DBL), DIMENSION(2*nf) :: intout
+
+    REAL(KIND=DBL)     :: acc
+    INTEGER            :: minpts
+    INTEGER :: ifailloc
+
+    omFkr = omega
+    pFkr = p
+    nuFkr = nu
+
+    a(1) = 0.0d0 
+    a(2) = 0.0d0 
+    b(:) = rkuplim
+
     minpts=0; ifailloc = 1
-    CALL d01fcf(ndim,a,b,minpts,maxpts,iFkstarrstar,relacc2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+    CALL cubature(ndim,2*nf,a,b,minpts,maxpts,Fkstarrstard_cub,relacc2,0.d0,intout,acc,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 2DNAG iFkstarrstar integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+            &'. Abnormal termination of 2D cubature Fkstarrstard integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
     ENDIF
 
     fonctc = intout(1) + ci * intout(2)
+    dfonctc = (intout(3) + ci * intout(4)) / MAX(ABS(omega),epsD)
 
-  END SUBROUTINE calcfonctc
+  END SUBROUTINE calcfonctcd
 
   !*********************************************************************************************************************************************
   ! same functional calculations but with rotation
@@ -166,14 +225,12 @@ CONTAINS
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
     COMPLEX(KIND=DBL), INTENT(OUT) :: fonctp
 
-    REAL(KIND=DBL)     :: acc, relerr, cc, dd
+    REAL(KIND=DBL)     :: acc
     REAL(KIND=DBL), DIMENSION(2) :: a,b
-    INTEGER            :: minpts, neval, npts !output number of integrand evaluations
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
+    INTEGER            :: minpts  !output number of integrand evaluations
     INTEGER :: ifailloc
-    REAL(KIND=DBL)    :: rfonctpe, ifonctpe, rfonctpiz, ifonctpiz
 
-    REAL(KIND=DBL), DIMENSION(nf) :: intout
+    REAL(KIND=DBL), DIMENSION(nf) :: intout, fonctpiz
 
     !set the omega and p to be seen by all integration subroutines
     omFFk = omega
@@ -186,52 +243,31 @@ CONTAINS
     a(2) = 0.0d0
     b(2) = vuplim
 
-    cc = a(1)
-    dd = b(1)
-
-    ! The kappa integral is calculated. The real component with rFFkizrot,
-    ! and the imaginary component with iFFkizrot, for all ions
+    ! The kappa integral is calculated for all ions. The real and imaginary
+    ! components are integrated together on the same adaptive grid
 
-    ifailloc = 1
-    rfonctpiz = d01ahf(cc,dd,relacc1,npts,relerr,rFFkizrot,lw,ifailloc)
-    IF (ifailloc /= 0) THEN
-       IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 1DNAG rFFkizrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-    ENDIF
-    ifailloc = 1
-    ifonctpiz = d01ahf(cc,dd,relacc1,npts,relerr,iFFkizrot,lw,ifailloc)
+    minpts=0; ifailloc = 1
+    CALL cubature(1,nf,a(1:1),b(1:1),minpts,maxpts,FFkizrot_cub,relacc1,0.d0,fonctpiz,acc,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 1DNAG iFFkizrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+            &'. Abnormal termination of 1D cubature FFkizrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
     ENDIF
 
     !Only calculate nonadiabatic part for electrons if el_type == 1
     IF (el_type == 1) THEN 
        IF ( ABS(coll_flag) > epsD) THEN !Collisional simulation, do double integral
           minpts=0; ifailloc = 1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,rFFkerot,relacc2,acc,lenwrk,wrkstr,intout(1),ifailloc)
+          CALL cubature(ndim,nf,a,b,minpts,maxpts,FFkerot_cub,relacc2,0.d0,intout,acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 2DNAG rFFkerot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 2D cubature FFkerot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
+       ELSE !Collisionless simulation, revert to faster single integral
           minpts=0; ifailloc = 1
-          CALL d01fcf(ndim,a,b,minpts,maxpts,iFFkerot,relacc2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+          CALL cubature(1,nf,a(1:1),b(1:1),minpts,maxpts,FFke_nocollrot_cub,relacc1,0.d0,intout,acc,ifailloc)
           IF (ifailloc /= 0) THEN
              IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 2DNAG iFFkerot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-          ENDIF
-       ELSE !collisionless integral, do single integral
-          ifailloc = 1
-          intout(1) = d01ahf(cc,dd,relacc1,npts,relerr,rFFke_nocollrot,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 1DNAG rFFke_nocollrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-          ENDIF
-          ifailloc = 1
-          intout(2) = d01ahf(cc,dd,relacc1,npts,relerr,iFFke_nocollrot,lw,ifailloc)
-          IF (ifailloc /= 0) THEN
-             IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-                  &'. Abnormal termination of 1DNAG iFFke_nocollrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+                  &'. Abnormal termination of 1D cubature FFke_nocollrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
           ENDIF
        ENDIF
     ELSE
@@ -239,7 +275,7 @@ CONTAINS
        intout(2)=0
     ENDIF
 
-    fonctp = intout(1) + rfonctpiz + ci * intout(2) + ci * ifonctpiz
+    fonctp = intout(1) + fonctpiz(1) + ci * intout(2) + ci * fonctpiz(2)
 
   END SUBROUTINE calcfonctrotp
 
@@ -254,13 +290,13 @@ CONTAINS
     INTEGER, INTENT(IN)  :: p, nu
     COMPLEX(KIND=DBL), INTENT(IN)  :: omega
     COMPLEX(KIND=DBL), INTENT(OUT) :: fonctc
-    REAL(KIND=DBL), DIMENSION(ndim) :: a, b, c, dd , xy 
-    REAL(KIND=DBL), DIMENSION(lenwrk) :: wrkstr
+
+    REAL(KIND=DBL), DIMENSION(ndim) :: a, b
     REAL(KIND=DBL), DIMENSION(nf) :: intout
+
     REAL(KIND=DBL)     :: acc
-    INTEGER            :: maxpts2, npts, minpts, neval, iii,jjj,rc,lenwrk2 
+    INTEGER            :: minpts
     INTEGER :: ifailloc
-    REAL(KIND=DBL)     :: rfonctc, ifonctc !outputs of integrals
 
     omFkr = omega
     pFkr = p
@@ -271,26 +307,14 @@ CONTAINS
     b(:) = rkuplim
 
     !The k* and rho* double integral is calculated
-    !The real and imaginary parts are calculated separately due to NAG function limitations
+    !The real and imaginary parts are integrated together on the same adaptive grid
     ccount=0
-    minpts = 0
 
     minpts=0; ifailloc = 1
-    CALL d01fcf(ndim,a,b,minpts,maxpts,rFkstarrstarrot,relacc2,acc,lenwrk,wrkstr,intout(1),ifailloc)
-    IF (ifailloc /= 0) THEN
-       IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 2DNAG rFkstarrstarrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
-       IF (ifailloc == -399) THEN
-          WRITE(stderr,"(A)") 'NAG license error! Exiting'
-          STOP
-       ENDIF
-    ENDIF
-
-    minpts=0; ifailloc = 1  
-    CALL d01fcf(ndim,a,b,minpts,maxpts,iFkstarrstarrot,relacc2,acc,lenwrk,wrkstr,intout(2),ifailloc)
+    CALL cubature(ndim,nf,a,b,minpts,maxpts,Fkstarrstarrot_cub,relacc2,0.d0,intout,acc,ifailloc)
     IF (ifailloc /= 0) THEN
        IF (verbose .EQV. .TRUE.) WRITE(stderr,"(A,I3,A,I7,A,I3,A,G10.3,A,G10.3,A)") 'ifailloc = ',ifailloc,&
-            &'. Abnormal termination of 2DNAG iFkstarrstarrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
+            &'. Abnormal termination of 2D cubature Fkstarrstarrot integration in mod_fonct at p=',p,', nu=',nu,' omega=(',REAL(omega),',',AIMAG(omega),')'
     ENDIF
 
     fonctc = intout(1) + ci * intout(2)
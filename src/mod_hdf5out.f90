@@ -0,0 +1,297 @@
+MODULE mod_hdf5out
+  !Single-file HDF5 container for the standalone output. While the container is open,
+  !every variable passed to writevar is also stored as a chunked, deflated dataset at the
+  !path of its .dat file, e.g. output/primitive/rsol.dat -> /output/primitive/rsol
+  !Complex variables keep the r/i split of the ASCII layout.
+  !Built when HDF5_FLAGS is set in Makefile.inc, otherwise mod_hdf5outvoid.f90 is used
+  !The container is written by rank 0 alone through the serial HDF5 API, with no MPI-IO
+  !file access (h5pset_fapl_mpio_f) or collective writes. This is deliberate: the output is
+  !collected on every rank before it is written, so a parallel write would only split the
+  !deflate work of one copy. Any HDF5 build, serial or parallel, can therefore be linked
+  USE kind
+  USE hdf5
+
+  IMPLICIT NONE
+
+  PRIVATE
+  PUBLIC :: h5out_available, h5out_open, h5out_close, h5out_isopen, h5out_setdim, h5out_write
+
+  LOGICAL, PARAMETER :: h5out_available = .TRUE.
+  INTEGER, PARAMETER :: maxdimnames = 16
+  INTEGER, PARAMETER :: deflatelevel = 4
+  INTEGER(KIND=8), PARAMETER :: chunkbytes = 1048576 !Upper bound of the chunk size. Chunks are blocks of rows along the first (dimx) extent
+
+  INTEGER(HID_T), SAVE :: fileid
+  LOGICAL, SAVE :: fileopen = .FALSE.
+
+  !Named run dimensions, stored as root attributes
+  INTEGER, SAVE :: ndimnames = 0
+  CHARACTER(len=16), DIMENSION(maxdimnames), SAVE :: dimnames
+  INTEGER, DIMENSION(maxdimnames), SAVE :: dimsizes
+
+  INTERFACE h5out_write
+     MODULE PROCEDURE &
+          h5out_write_0d, &
+          h5out_write_0d_integer, &
+          h5out_write_1d, &
+          h5out_write_2d, &
+          h5out_write_2d_integer, &
+          h5out_write_3d, &
+          h5out_write_4d
+  END INTERFACE
+
+CONTAINS
+
+  SUBROUTINE h5out_setdim(dimname, dimsize)
+    !Register a named dimension. Must be called before h5out_open
+    CHARACTER(len=*), INTENT(IN) :: dimname
+    INTEGER, INTENT(IN) :: dimsize
+    INTEGER :: i
+
+    DO i=1,ndimnames
+       IF (TRIM(dimnames(i)) == dimname) THEN
+          dimsizes(i) = dimsize
+          RETURN
+       ENDIF
+    ENDDO
+    IF (ndimnames == maxdimnames) RETURN
+    ndimnames = ndimnames+1
+    dimnames(ndimnames) = dimname
+    dimsizes(ndimnames) = dimsize
+  END SUBROUTINE h5out_setdim
+
+  SUBROUTINE h5out_open(filename)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER(HID_T) :: spaceid, attrid
+    INTEGER(HSIZE_T), DIMENSION(1) :: adims = (/ 1 /)
+    INTEGER :: hdferr, i
+
+    IF (fileopen) CALL h5out_close()
+    CALL h5open_f(hdferr)
+    CALL h5fcreate_f(filename, H5F_ACC_TRUNC_F, fileid, hdferr)
+    IF (hdferr /= 0) THEN
+       WRITE(stderr,*) 'Could not create HDF5 output file ', filename
+       CALL h5close_f(hdferr)
+       RETURN
+    ENDIF
+    fileopen = .TRUE.
+
+    CALL h5screate_f(H5S_SCALAR_F, spaceid, hdferr)
+    DO i=1,ndimnames
+       CALL h5acreate_f(fileid, TRIM(dimnames(i)), H5T_NATIVE_INTEGER, spaceid, attrid, hdferr)
+       CALL h5awrite_f(attrid, H5T_NATIVE_INTEGER, dimsizes(i), adims, hdferr)
+       CALL h5aclose_f(attrid, hdferr)
+    ENDDO
+    CALL h5sclose_f(spaceid, hdferr)
+  END SUBROUTINE h5out_open
+
+  SUBROUTINE h5out_close()
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    CALL h5fclose_f(fileid, hdferr)
+    CALL h5close_f(hdferr)
+    fileopen = .FALSE.
+  END SUBROUTINE h5out_close
+
+  LOGICAL FUNCTION h5out_isopen()
+    h5out_isopen = fileopen
+  END FUNCTION h5out_isopen
+
+  SUBROUTINE createdset(filename, shp, dtype, dsetid, dimnames)
+    !Create the dataset for filename with Fortran extents shp. Arrays are chunked in
+    !blocks of at most chunkbytes and deflated, the extents are labelled in a 'dimensions' attribute
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, DIMENSION(:), INTENT(IN) :: shp
+    INTEGER(HID_T), INTENT(IN) :: dtype
+    INTEGER(HID_T), INTENT(OUT) :: dsetid
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    INTEGER(HSIZE_T), DIMENSION(SIZE(shp)) :: dims, chunk
+    INTEGER(HID_T) :: spaceid, dcplid, lcplid
+    CHARACTER(len=:), ALLOCATABLE :: dsetname
+    INTEGER(KIND=8) :: nbytes
+    INTEGER :: hdferr, sufsep, i
+    LOGICAL :: exists
+
+    sufsep = INDEX(filename, '.', BACK=.TRUE.)
+    IF (sufsep == 0) sufsep = LEN(filename)+1
+    dsetname = '/' // filename(1:sufsep-1)
+    dims = shp
+
+    !A variable written twice replaces the earlier dataset, as for the .dat files
+    !(h5lexists_f fails, quietly, while the parent groups do not exist yet)
+    CALL h5eset_auto_f(0, hdferr)
+    CALL h5lexists_f(fileid, dsetname, exists, hdferr)
+    CALL h5eset_auto_f(1, hdferr)
+    IF (exists .AND. (hdferr == 0)) CALL h5ldelete_f(fileid, dsetname, hdferr)
+
+    CALL h5pcreate_f(H5P_LINK_CREATE_F, lcplid, hdferr)
+    CALL h5pset_create_inter_group_f(lcplid, 1, hdferr)
+    CALL h5pcreate_f(H5P_DATASET_CREATE_F, dcplid, hdferr)
+    IF (SIZE(shp) == 0) THEN
+       CALL h5screate_f(H5S_SCALAR_F, spaceid, hdferr)
+    ELSE
+       CALL h5screate_simple_f(SIZE(shp), dims, spaceid, hdferr)
+       IF (ALL(shp > 0)) THEN
+          !Shrink the leading extents until a chunk fits in chunkbytes (HDF5 limits chunks to 4 GB)
+          chunk = dims
+          DO i=1,SIZE(shp)
+             nbytes = 8*PRODUCT(INT(chunk,8))
+             IF (nbytes <= chunkbytes) EXIT
+             chunk(i) = MAX(1_8, INT(chunk(i),8)*chunkbytes/nbytes)
+          ENDDO
+          CALL h5pset_chunk_f(dcplid, SIZE(shp), chunk, hdferr)
+          CALL h5pset_shuffle_f(dcplid, hdferr)
+          CALL h5pset_deflate_f(dcplid, deflatelevel, hdferr)
+       ENDIF
+    ENDIF
+
+    CALL h5dcreate_f(fileid, dsetname, dtype, spaceid, dsetid, hdferr, dcplid, lcplid)
+    IF (SIZE(shp) > 0) CALL labeldims(dsetid, shp, dimnames)
+
+    CALL h5sclose_f(spaceid, hdferr)
+    CALL h5pclose_f(dcplid, hdferr)
+    CALL h5pclose_f(lcplid, hdferr)
+  END SUBROUTINE createdset
+
+  SUBROUTINE labeldims(dsetid, shp, dimnames)
+    !Comma separated dimension names in Fortran order, as given by the writevar caller.
+    !Without them, or if their number does not match the rank, the extents are labelled n<size>
+    INTEGER(HID_T), INTENT(IN) :: dsetid
+    INTEGER, DIMENSION(:), INTENT(IN) :: shp
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    CHARACTER(len=256) :: label
+    CHARACTER(len=16) :: dimlabel
+    INTEGER(HID_T) :: spaceid, typeid, attrid
+    INTEGER(HSIZE_T), DIMENSION(1) :: adims = (/ 1 /)
+    INTEGER :: hdferr, i
+
+    label = ''
+    IF (PRESENT(dimnames)) THEN
+       IF (COUNT((/ (dimnames(i:i) == ',', i=1,LEN(dimnames)) /)) == SIZE(shp)-1) label = dimnames
+    ENDIF
+    IF (LEN_TRIM(label) == 0) THEN
+       DO i=1,SIZE(shp)
+          WRITE(dimlabel,'(A,I0)') 'n', shp(i)
+          IF (i == 1) THEN
+             label = TRIM(dimlabel)
+          ELSE
+             label = TRIM(label) // ',' // TRIM(dimlabel)
+          ENDIF
+       ENDDO
+    ENDIF
+
+    CALL h5tcopy_f(H5T_NATIVE_CHARACTER, typeid, hdferr)
+    CALL h5tset_size_f(typeid, INT(LEN_TRIM(label),SIZE_T), hdferr)
+    CALL h5screate_f(H5S_SCALAR_F, spaceid, hdferr)
+    CALL h5acreate_f(dsetid, 'dimensions', typeid, spaceid, attrid, hdferr)
+    CALL h5awrite_f(attrid, typeid, TRIM(label), adims, hdferr)
+    CALL h5aclose_f(attrid, hdferr)
+    CALL h5sclose_f(spaceid, hdferr)
+    CALL h5tclose_f(typeid, hdferr)
+  END SUBROUTINE labeldims
+
+  SUBROUTINE h5out_write_0d(filename, mold)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    REAL, INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(1) :: dims = (/ 1 /)
+    INTEGER, DIMENSION(0) :: shp
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    CALL createdset(filename, shp, H5T_NATIVE_DOUBLE, dsetid)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_DOUBLE, REAL(mold,DBL), dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_0d
+
+  SUBROUTINE h5out_write_0d_integer(filename, mold)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(1) :: dims = (/ 1 /)
+    INTEGER, DIMENSION(0) :: shp
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    CALL createdset(filename, shp, H5T_NATIVE_INTEGER, dsetid)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_INTEGER, mold, dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_0d_integer
+
+  SUBROUTINE h5out_write_1d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:), INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(1) :: dims
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    dims = SHAPE(mold)
+    CALL createdset(filename, SHAPE(mold), H5T_NATIVE_DOUBLE, dsetid, dimnames)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_DOUBLE, REAL(mold,DBL), dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_1d
+
+  SUBROUTINE h5out_write_2d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:), INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(2) :: dims
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    dims = SHAPE(mold)
+    CALL createdset(filename, SHAPE(mold), H5T_NATIVE_DOUBLE, dsetid, dimnames)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_DOUBLE, REAL(mold,DBL), dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_2d
+
+  SUBROUTINE h5out_write_2d_integer(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    INTEGER, DIMENSION(:,:), INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(2) :: dims
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    dims = SHAPE(mold)
+    CALL createdset(filename, SHAPE(mold), H5T_NATIVE_INTEGER, dsetid, dimnames)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_INTEGER, mold, dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_2d_integer
+
+  SUBROUTINE h5out_write_3d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:,:), INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(3) :: dims
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    dims = SHAPE(mold)
+    CALL createdset(filename, SHAPE(mold), H5T_NATIVE_DOUBLE, dsetid, dimnames)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_DOUBLE, REAL(mold,DBL), dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_3d
+
+  SUBROUTINE h5out_write_4d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:,:,:), INTENT(IN) :: mold
+    INTEGER(HID_T) :: dsetid
+    INTEGER(HSIZE_T), DIMENSION(4) :: dims
+    INTEGER :: hdferr
+
+    IF (.NOT. fileopen) RETURN
+    dims = SHAPE(mold)
+    CALL createdset(filename, SHAPE(mold), H5T_NATIVE_DOUBLE, dsetid, dimnames)
+    CALL h5dwrite_f(dsetid, H5T_NATIVE_DOUBLE, REAL(mold,DBL), dims, hdferr)
+    CALL h5dclose_f(dsetid, hdferr)
+  END SUBROUTINE h5out_write_4d
+
+END MODULE mod_hdf5out
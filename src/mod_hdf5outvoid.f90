@@ -0,0 +1,83 @@
+MODULE mod_hdf5out
+  !Stand-in for mod_hdf5out.f90 when QuaLiKiz is built without HDF5 (HDF5_FLAGS unset).
+  !h5out_open leaves the container closed, so writevar only produces the ASCII layout
+  USE kind
+
+  IMPLICIT NONE
+
+  PRIVATE
+  PUBLIC :: h5out_available, h5out_open, h5out_close, h5out_isopen, h5out_setdim, h5out_write
+
+  LOGICAL, PARAMETER :: h5out_available = .FALSE.
+
+  INTERFACE h5out_write
+     MODULE PROCEDURE &
+          h5out_write_0d, &
+          h5out_write_0d_integer, &
+          h5out_write_1d, &
+          h5out_write_2d, &
+          h5out_write_2d_integer, &
+          h5out_write_3d, &
+          h5out_write_4d
+  END INTERFACE
+
+CONTAINS
+
+  SUBROUTINE h5out_setdim(dimname, dimsize)
+    CHARACTER(len=*), INTENT(IN) :: dimname
+    INTEGER, INTENT(IN) :: dimsize
+  END SUBROUTINE h5out_setdim
+
+  SUBROUTINE h5out_open(filename)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    WRITE(stderr,*) 'QuaLiKiz was built without HDF5, not writing ', filename
+  END SUBROUTINE h5out_open
+
+  SUBROUTINE h5out_close()
+  END SUBROUTINE h5out_close
+
+  LOGICAL FUNCTION h5out_isopen()
+    h5out_isopen = .FALSE.
+  END FUNCTION h5out_isopen
+
+  SUBROUTINE h5out_write_0d(filename, mold)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    REAL, INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_0d
+
+  SUBROUTINE h5out_write_0d_integer(filename, mold)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    INTEGER, INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_0d_integer
+
+  SUBROUTINE h5out_write_1d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:), INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_1d
+
+  SUBROUTINE h5out_write_2d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:), INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_2d
+
+  SUBROUTINE h5out_write_2d_integer(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    INTEGER, DIMENSION(:,:), INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_2d_integer
+
+  SUBROUTINE h5out_write_3d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:,:), INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_3d
+
+  SUBROUTINE h5out_write_4d(filename, mold, dimnames)
+    CHARACTER(len=*), INTENT(IN) :: filename
+    CHARACTER(len=*), OPTIONAL, INTENT(IN) :: dimnames
+    REAL, DIMENSION(:,:,:,:), INTENT(IN) :: mold
+  END SUBROUTINE h5out_write_4d
+
+END MODULE mod_hdf5out
@@ -10,6 +10,16 @@ MODULE mod_make_io
   IMPLICIT NONE
   INCLUDE 'mpif.h'
 
+  !Packs/unpacks output slices into a contiguous buffer for single-message MPI collection
+  INTERFACE moveslice
+     MODULE PROCEDURE &
+          moveslice_0d, &
+          moveslice_1d, &
+          moveslice_2d, &
+          moveslice_0d_complex, &
+          moveslice_1d_complex
+  END INTERFACE
+
 CONTAINS
 
   SUBROUTINE make_input(dimxin, dimnin, nionsin, numsolsin, phys_methin, coll_flagin, rot_flagin, verbosein, separatefluxin, kthetarhosin, & !general param
@@ -61,9 +71,6 @@ CONTAINS
 
     R0=R0in
 
-    !lenwrk=(ndim+2+1)*(1+maxptsin/(2**ndim+2*ndim*ndim+2*ndim+1)) !Set array size for 2D integration routine
-    lenwrk = 1e5
-
     !Input array allocation
     ALLOCATE(kthetarhos(dimn)); kthetarhos = kthetarhosin
     ALLOCATE(x(dimx)); x = xin
@@ -367,6 +374,8 @@ CONTAINS
     ALLOCATE( modeshift (dimx, dimn) ); modeshift=0.
     ALLOCATE( modeshift2 (dimx, dimn) ); modeshift2=0.
     ALLOCATE( distan (dimx, dimn) ); distan=0.
+    ALLOCATE( tasktime (dimx, dimn) ); tasktime=0.
+    ALLOCATE( taskdone (dimx, dimn) ); taskdone=.FALSE.
     ALLOCATE( FLRep (dimx, dimn) ); FLRep=0.
     !Real 3D arrays with 3rd dimension equal to number of ions
     ALLOCATE( FLRip (dimx, dimn,nions) ); FLRip=0.
@@ -556,6 +565,8 @@ CONTAINS
     DEALLOCATE( modeshift )
     DEALLOCATE( modeshift2 )
     DEALLOCATE( distan )
+    DEALLOCATE( tasktime )
+    DEALLOCATE( taskdone )
     DEALLOCATE( Athi )
     DEALLOCATE( FLRip )
     DEALLOCATE( FLRep )
@@ -747,162 +758,307 @@ CONTAINS
   END SUBROUTINE save_qlfunc
 
   SUBROUTINE collectarrays()
-    ! Collect all output into all cores
-    INTEGER :: ierr,myrank, i, nproc
+    ! Collect all output into all cores. Each rank packs the (p,nu) slices of the tasks it calculated
+    ! into one contiguous buffer, and a single MPI_Allgatherv spreads all slices to all cores
+    INTEGER :: ierr,myrank, i, nproc, p, nu, nloc, nslice, pos
+    INTEGER, DIMENSION(:), ALLOCATABLE :: counts, displs
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: sendbuf, recvbuf
+
+    CALL mpi_comm_rank(qlkcomm,myrank,ierr)
+    CALL mpi_comm_size(qlkcomm,nproc,ierr)
+
+    !Length of one (p,nu) slice: task indices, followed by all arrays in collectslice
+    nslice = 2 + slicelength()
+
+    nloc = COUNT(taskdone)
+    ALLOCATE(counts(0:nproc-1))
+    ALLOCATE(displs(0:nproc-1))
+    CALL MPI_Allgather(nloc*nslice,1,MPI_INTEGER,counts,1,MPI_INTEGER,qlkcomm,ierr)
+    displs(0) = 0
+    DO i = 1,nproc-1
+       displs(i) = displs(i-1) + counts(i-1)
+    ENDDO
 
-    REAL(KIND=DBL), DIMENSION(dimx,dimn) :: distantmp,FLReptmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: gammatmp, Ladiatmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,nions) :: FLRiptmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,0:nions,0:9) :: ecoefsgautmp
-    COMPLEX(KIND=DBL), DIMENSION(dimx,dimn) :: modewidthtmp, modeshifttmp,jon_modewidthtmp, jon_modeshifttmp,cot_modewidthtmp, cot_modeshifttmp,old_modewidthtmp, old_modeshifttmp
-    COMPLEX(KIND=DBL), DIMENSION(dimx,dimn) :: ommaxtmp, solflutmp,jon_solflutmp,ana_solflutmp,cot_solflutmp
-    COMPLEX(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: soltmp, fdsoltmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: Lcircetmp, Lpiegetmp, Lecircetmp, Lepiegetmp, Lcircgtetmp, Lpieggtetmp,  Lcircgnetmp, Lpieggnetmp,  Lcirccetmp, Lpiegcetmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: Lecircgtetmp, Lepieggtetmp, Lecircgnetmp, Lepieggnetmp, Lecirccetmp, Lepiegcetmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,nions,numsols) :: Lcircitmp, Lpiegitmp, Lecircitmp, Lepiegitmp, Lvcircitmp, Lvpiegitmp, Lcircgtitmp, Lpieggtitmp, Lcircgnitmp, Lpieggnitmp, Lcircguitmp, Lpiegguitmp, Lcirccitmp, Lpiegcitmp
-    REAL(KIND=DBL), DIMENSION(dimx,dimn,nions,numsols) :: Lecircgtitmp, Lepieggtitmp, Lecircgnitmp, Lepieggnitmp, Lecircguitmp, Lepiegguitmp, Lecirccitmp, Lepiegcitmp
-
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierr)
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierr)
-
-    CALL MPI_AllReduce(distan,distantmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(modewidth,modewidthtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(modeshift,modeshifttmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(jon_modewidth,jon_modewidthtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(jon_modeshift,jon_modeshifttmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(cot_modewidth,cot_modewidthtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(cot_modeshift,cot_modeshifttmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(old_modewidth,old_modewidthtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(old_modeshift,old_modeshifttmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(FLRep,FLReptmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(gamma,gammatmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ladia,Ladiatmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(FLRip,FLRiptmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ommax,ommaxtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(solflu,solflutmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(jon_solflu,jon_solflutmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(cot_solflu,cot_solflutmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ana_solflu,ana_solflutmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(sol,soltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(fdsol,fdsoltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(Lcirce,Lcircetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lpiege,Lpiegetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lecirce,Lecircetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lepiege,Lepiegetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lcirci,Lcircitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lpiegi,Lpiegitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lecirci,Lecircitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lepiegi,Lepiegitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lvcirci,Lvcircitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Lvpiegi,Lvpiegitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(ecoefsgau,ecoefsgautmp,dimx*dimn*(nions+1)*10,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+    ALLOCATE(sendbuf(MAX(nloc*nslice,1)))
+    ALLOCATE(recvbuf(MAX(SUM(counts),1)))
+
+    pos = 0
+    DO p = 1,dimx
+       DO nu = 1,dimn
+          IF (taskdone(p,nu) .EQV. .FALSE.) CYCLE
+          sendbuf(pos+1) = REAL(p,DBL)
+          sendbuf(pos+2) = REAL(nu,DBL)
+          pos = pos+2
+          CALL collectslice(p,nu,sendbuf,pos,.TRUE.)
+       ENDDO
+    ENDDO
 
-    IF (phys_meth /= 0) THEN
-       CALL MPI_AllReduce(Lcircgte,Lcircgtetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpieggte,Lpieggtetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lcircgne,Lcircgnetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpieggne,Lpieggnetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lcircce,Lcirccetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpiegce,Lpiegcetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-       CALL MPI_AllReduce(Lcircgti,Lcircgtitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpieggti,Lpieggtitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lcircgni,Lcircgnitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpieggni,Lpieggnitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lcircgui,Lcircguitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpieggui,Lpiegguitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lcircci,Lcirccitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(Lpiegci,Lpiegcitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-!!!
-       IF (phys_meth == 2) THEN
-          CALL MPI_AllReduce(Lecircgte,Lecircgtetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepieggte,Lepieggtetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lecircgne,Lecircgnetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepieggne,Lepieggnetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lecircce,Lecirccetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepiegce,Lepiegcetmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-          CALL MPI_AllReduce(Lecircgti,Lecircgtitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepieggti,Lepieggtitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lecircgni,Lecircgnitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepieggni,Lepieggnitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lecircgui,Lecircguitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepieggui,Lepiegguitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lecircci,Lecirccitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(Lepiegci,Lepiegcitmp,dimx*dimn*nions*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       ENDIF
+    IF (pos /= nloc*nslice) THEN
+       WRITE(stderr,"(A,I0,A,I0)") 'collectarrays: packed ',pos,' values, expected ',nloc*nslice
+       CALL mpi_abort(qlkcomm,-1,ierr)
     ENDIF
 
-    modewidth=modewidthtmp
-    modeshift=modeshifttmp
-    jon_modewidth=jon_modewidthtmp
-    jon_modeshift=jon_modeshifttmp
-    cot_modewidth=cot_modewidthtmp
-    cot_modeshift=cot_modeshifttmp
-    old_modewidth=old_modewidthtmp
-    old_modeshift=old_modeshifttmp
-
-    distan=distantmp
-    FLRep=FLReptmp
-    gamma=gammatmp
-    Ladia=Ladiatmp
-    FLRip=FLRiptmp
-    ommax=ommaxtmp
-    solflu=solflutmp
-    jon_solflu=jon_solflutmp
-    cot_solflu=cot_solflutmp
-    ana_solflu=ana_solflutmp
-    sol=soltmp
-    fdsol=fdsoltmp
-    Lcirce=Lcircetmp
-    Lpiege=Lpiegetmp
-    Lecirce=Lecircetmp
-    Lepiege=Lepiegetmp
-    Lcirci=Lcircitmp
-    Lpiegi=Lpiegitmp
-    Lecirci=Lecircitmp
-    Lepiegi=Lepiegitmp
-    Lvcirci=Lvcircitmp
-    Lvpiegi=Lvpiegitmp
-    ecoefsgau=ecoefsgautmp
+    CALL MPI_Allgatherv(sendbuf,nloc*nslice,MPI_DOUBLE_PRECISION,recvbuf,counts,displs,MPI_DOUBLE_PRECISION,qlkcomm,ierr)
+
+    !Unpack all slices. Slices of other ranks are zero locally, so this matches the former MPI_SUM reduction
+    pos = 0
+    DO WHILE (pos < SUM(counts))
+       p = NINT(recvbuf(pos+1))
+       nu = NINT(recvbuf(pos+2))
+       pos = pos+2
+       CALL collectslice(p,nu,recvbuf,pos,.FALSE.)
+    ENDDO
+
+    DEALLOCATE(counts)
+    DEALLOCATE(displs)
+    DEALLOCATE(sendbuf)
+    DEALLOCATE(recvbuf)
+
+  END SUBROUTINE collectarrays
+
+  SUBROUTINE collectslice(p,nu,buf,pos,topack)
+    ! Packs (topack=T) or unpacks (topack=F) all collected output of task (p,nu) at buf(pos+1:). Advances pos
+    INTEGER, INTENT(IN) :: p, nu
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+
+    CALL moveslice(distan(p,nu),buf,pos,topack)
+    CALL moveslice(tasktime(p,nu),buf,pos,topack)
+    CALL moveslice(FLRep(p,nu),buf,pos,topack)
+    CALL moveslice(modewidth(p,nu),buf,pos,topack)
+    CALL moveslice(modeshift(p,nu),buf,pos,topack)
+    CALL moveslice(modeshift2(p,nu),buf,pos,topack)
+    CALL moveslice(jon_modewidth(p,nu),buf,pos,topack)
+    CALL moveslice(jon_modeshift(p,nu),buf,pos,topack)
+    CALL moveslice(cot_modewidth(p,nu),buf,pos,topack)
+    CALL moveslice(cot_modeshift(p,nu),buf,pos,topack)
+    CALL moveslice(old_modewidth(p,nu),buf,pos,topack)
+    CALL moveslice(old_modeshift(p,nu),buf,pos,topack)
+    CALL moveslice(ommax(p,nu),buf,pos,topack)
+    CALL moveslice(solflu(p,nu),buf,pos,topack)
+    CALL moveslice(jon_solflu(p,nu),buf,pos,topack)
+    CALL moveslice(cot_solflu(p,nu),buf,pos,topack)
+    CALL moveslice(ana_solflu(p,nu),buf,pos,topack)
+
+    CALL moveslice(gamma(p,nu,:),buf,pos,topack)
+    CALL moveslice(Ladia(p,nu,:),buf,pos,topack)
+    CALL moveslice(FLRip(p,nu,:),buf,pos,topack)
+    CALL moveslice(sol(p,nu,:),buf,pos,topack)
+    CALL moveslice(fdsol(p,nu,:),buf,pos,topack)
+
+    CALL moveslice(Lcirce(p,nu,:),buf,pos,topack)
+    CALL moveslice(Lpiege(p,nu,:),buf,pos,topack)
+    CALL moveslice(Lecirce(p,nu,:),buf,pos,topack)
+    CALL moveslice(Lepiege(p,nu,:),buf,pos,topack)
+    CALL moveslice(Lcirci(p,nu,:,:),buf,pos,topack)
+    CALL moveslice(Lpiegi(p,nu,:,:),buf,pos,topack)
+    CALL moveslice(Lecirci(p,nu,:,:),buf,pos,topack)
+    CALL moveslice(Lepiegi(p,nu,:,:),buf,pos,topack)
+    CALL moveslice(Lvcirci(p,nu,:,:),buf,pos,topack)
+    CALL moveslice(Lvpiegi(p,nu,:,:),buf,pos,topack)
+
+    CALL moveslice(ecoefsgau(p,nu,:,:),buf,pos,topack)
 
     IF (phys_meth /= 0) THEN
-       Lcircgte=Lcircgtetmp
-       Lpieggte=Lpieggtetmp
-       Lcircgne=Lcircgnetmp
-       Lpieggne=Lpieggnetmp
-       Lcircce=Lcirccetmp
-       Lpiegce=Lpiegcetmp
-       Lcircgti=Lcircgtitmp
-       Lpieggti=Lpieggtitmp
-       Lcircgni=Lcircgnitmp
-       Lpieggni=Lpieggnitmp
-       Lcircgui=Lcircguitmp
-       Lpieggui=Lpiegguitmp
-       Lcircci=Lcirccitmp
-       Lpiegci=Lpiegcitmp   
+       CALL moveslice(Lcircgte(p,nu,:),buf,pos,topack)
+       CALL moveslice(Lpieggte(p,nu,:),buf,pos,topack)
+       CALL moveslice(Lcircgne(p,nu,:),buf,pos,topack)
+       CALL moveslice(Lpieggne(p,nu,:),buf,pos,topack)
+       CALL moveslice(Lcircce(p,nu,:),buf,pos,topack)
+       CALL moveslice(Lpiegce(p,nu,:),buf,pos,topack)
+
+       CALL moveslice(Lcircgti(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lpieggti(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lcircgni(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lpieggni(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lcircgui(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lpieggui(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lcircci(p,nu,:,:),buf,pos,topack)
+       CALL moveslice(Lpiegci(p,nu,:,:),buf,pos,topack)
        IF (phys_meth == 2) THEN
-          Lecircgte=Lecircgtetmp
-          Lepieggte=Lepieggtetmp
-          Lecircgne=Lecircgnetmp
-          Lepieggne=Lepieggnetmp
-          Lecircce=Lecirccetmp
-          Lepiegce=Lepiegcetmp
-          Lecircgti=Lecircgtitmp
-          Lepieggti=Lepieggtitmp
-          Lecircgni=Lecircgnitmp
-          Lepieggni=Lepieggnitmp
-          Lecircgui=Lecircguitmp
-          Lepieggui=Lepiegguitmp
-          Lecircci=Lecirccitmp
-          Lepiegci=Lepiegcitmp   
+          CALL moveslice(Lecircgte(p,nu,:),buf,pos,topack)
+          CALL moveslice(Lepieggte(p,nu,:),buf,pos,topack)
+          CALL moveslice(Lecircgne(p,nu,:),buf,pos,topack)
+          CALL moveslice(Lepieggne(p,nu,:),buf,pos,topack)
+          CALL moveslice(Lecircce(p,nu,:),buf,pos,topack)
+          CALL moveslice(Lepiegce(p,nu,:),buf,pos,topack)
+
+          CALL moveslice(Lecircgti(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lepieggti(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lecircgni(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lepieggni(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lecircgui(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lepieggui(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lecircci(p,nu,:,:),buf,pos,topack)
+          CALL moveslice(Lepiegci(p,nu,:,:),buf,pos,topack)
        ENDIF
     ENDIF
 
-  END SUBROUTINE collectarrays
+  END SUBROUTINE collectslice
+
+  INTEGER FUNCTION slicelength()
+    ! Number of values packed by collectslice for one task
+    slicelength = 3 + 2*14 + 10*numsols + nions + 6*nions*numsols + 10*(nions+1)
+    IF (phys_meth /= 0) slicelength = slicelength + 6*numsols + 8*nions*numsols
+    IF (phys_meth == 2) slicelength = slicelength + 6*numsols + 8*nions*numsols
+  END FUNCTION slicelength
+
+  SUBROUTINE solcachekey(p,nu,key,fname)
+    ! Key of the solution cache entry of task (p,nu): everything the task output depends on,
+    ! that is the local inputs at p (after the filters of make_input), kthetarhos(nu), the
+    ! run settings and the datcal settings of the solver. gammaE is threadprivate and swapped
+    ! to gammaEmod inside a task with rot_flag=2, so the input profile is taken from gammaEorig.
+    ! A task of a chain (contchain) is started from the previous kthetarhos of its chain, which
+    ! are then part of the key. Each value is stored as its exponent
+    ! and its mantissa rounded to solcachebits bits. fname is the entry file, named after
+    ! two 31 bit polynomial hashes of the key. The key itself is kept in the entry,
+    ! so that a hash collision is detected
+    INTEGER, INTENT(IN) :: p, nu
+    INTEGER(KIND=8), DIMENSION(:), ALLOCATABLE, INTENT(OUT) :: key
+    CHARACTER(len=*), INTENT(OUT) :: fname
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: v
+    INTEGER(KIND=8), PARAMETER :: hashmod = 2147483647_8
+    INTEGER(KIND=8) :: h1, h2, piece
+    INTEGER :: i, k
+    REAL(KIND=DBL) :: inrange, ETGnu, sep, gammaEin
+    INTEGER :: nchain
+
+    inrange = MERGE(1._DBL,0._DBL,(rho(p) >= rhomin) .AND. (rho(p) <= rhomax))
+    ETGnu = MERGE(1._DBL,0._DBL,ETG_flag(nu))
+    sep = MERGE(1._DBL,0._DBL,separateflux)
+    IF (rot_flag == 2) THEN
+       gammaEin = gammaEorig(p)
+    ELSE
+       gammaEin = gammaE(p)
+    ENDIF
+    nchain = 0
+    IF (chaining) nchain = contchain
+
+    ALLOCATE(v(69+9*nions+MERGE(nu-1,0,chaining)))
+    v = (/ REAL(solcachever,DBL), REAL(nions,DBL), REAL(numsols,DBL), REAL(phys_meth,DBL), REAL(coll_flag,DBL), &
+         & REAL(rot_flag,DBL), REAL(el_type,DBL), sep, REAL(maxpts,DBL), relacc1, relacc2, ETGmult, collmult, R0, &
+         & REAL(MM,DBL), REAL(maxM,DBL), maxangle, quadtol, MERGE(1._DBL,0._DBL,localrefine), &
+         & MERGE(1._DBL,0._DBL,periodicquad), REAL(MMquad,DBL), maxanglequad, mincont, Elli, soldel, nearlysol, &
+         & overlapfac, squirclecoef, centeroverlapfac, centerwidth, &
+         & MERGE(1._DBL,0._DBL,newtonderiv), maxnerr, maxnerr2, maxiter, ndif, REAL(ncachemax,DBL), cachetol, &
+         & epsFLR, normkrfac, QLfloor, REAL(nelltab,DBL), kkelltab, MERGE(1._DBL,0._DBL,traporder1), ETGk, &
+         & REAL(nchain,DBL), &
+         & REAL(rotflagarray(p),DBL), REAL(rotflagarray(dimx),DBL), inrange, kthetarhos(nu), ETGnu, &
+         & x(p), rho(p), Ro(p), Rmin(p), Bo(p), qx(p), smag(p), alphax(p), &
+         & Machtor(p), Autor(p), Machpar(p), Aupar(p), gammaEin, &
+         & Tex(p), Nex(p), Ate(p), Ane(p), anise(p), danisedr(p), &
+         & Ai(p,:), Zi(p,:), Tix(p,:), ninorm(p,:), Ati(p,:), Ani(p,:), REAL(ion_type(p,:),DBL), anis(p,:), danisdr(p,:), &
+         & kthetarhos(1:MERGE(nu-1,0,chaining)) /)
+
+    ALLOCATE(key(2*SIZE(v)))
+    h1 = 0
+    h2 = 0
+    DO i=1,SIZE(v)
+       IF (v(i) == 0.) THEN
+          key(2*i-1) = 0
+          key(2*i) = 0
+       ELSE
+          key(2*i-1) = EXPONENT(v(i))
+          key(2*i) = NINT(FRACTION(v(i))*2._DBL**solcachebits,8)
+       ENDIF
+       DO k=2*i-1,2*i
+          piece = IBITS(key(k),0,30)
+          h1 = MOD(h1*1000003_8 + piece,hashmod) ; h2 = MOD(h2*999983_8 + piece,hashmod)
+          piece = IBITS(key(k),30,30)
+          h1 = MOD(h1*1000003_8 + piece,hashmod) ; h2 = MOD(h2*999983_8 + piece,hashmod)
+          piece = IBITS(key(k),60,4)
+          h1 = MOD(h1*1000003_8 + piece,hashmod) ; h2 = MOD(h2*999983_8 + piece,hashmod)
+       ENDDO
+    ENDDO
+    DEALLOCATE(v)
+
+    WRITE(fname,'(A,Z8.8,Z8.8,A)') solcachedir, h1, h2, '.bin'
+
+  END SUBROUTINE solcachekey
+
+  SUBROUTINE readsolcache(p,nu,key,fname,hit)
+    ! Sets the output of task (p,nu) from its solution cache entry, if there is one (hit=T)
+    ! Missing entries, entries of another version or length, and colliding entries are a miss.
+    ! key and fname from solcachekey
+    INTEGER, INTENT(IN) :: p, nu
+    INTEGER(KIND=8), DIMENSION(:), INTENT(IN) :: key
+    CHARACTER(len=*), INTENT(IN) :: fname
+    LOGICAL, INTENT(OUT) :: hit
+    INTEGER(KIND=8), DIMENSION(:), ALLOCATABLE :: keyin
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: buf
+    INTEGER :: myunit, ios, ver, nkey, nslice, pos
+    INTEGER(KIND=8) :: fsize, entrysize
+    LOGICAL :: exist
+
+    hit = .FALSE.
+    INQUIRE(file=fname, EXIST=exist, SIZE=fsize)
+    IF (.NOT. exist) RETURN
+
+    !Bytes of an entry written by writesolcache for the current key and slice lengths
+    nslice = slicelength()
+    entrysize = (3*STORAGE_SIZE(nslice) + SIZE(key)*STORAGE_SIZE(key(1)) + nslice*STORAGE_SIZE(1._DBL))/8
+    IF (fsize /= entrysize) RETURN
+
+    OPEN(NEWUNIT=myunit, file=fname, access='stream', form='unformatted', status='old', action='read', iostat=ios)
+    IF (ios /= 0) RETURN
+    READ(myunit,iostat=ios) ver, nkey
+    IF ( (ios == 0) .AND. (ver == solcachever) .AND. (nkey == SIZE(key)) ) THEN
+       ALLOCATE(keyin(nkey))
+       READ(myunit,iostat=ios) keyin, nslice
+       IF ( (ios == 0) .AND. ALL(keyin == key) .AND. (nslice == slicelength()) ) THEN
+          ALLOCATE(buf(nslice))
+          READ(myunit,iostat=ios) buf
+          IF (ios == 0) THEN
+             pos = 0
+             CALL collectslice(p,nu,buf,pos,.FALSE.)
+             hit = .TRUE.
+          ENDIF
+          DEALLOCATE(buf)
+       ENDIF
+       DEALLOCATE(keyin)
+    ENDIF
+    CLOSE(myunit)
+
+  END SUBROUTINE readsolcache
+
+  SUBROUTINE writesolcache(p,nu,key,fname)
+    ! Writes the output of task (p,nu) to its solution cache entry. The entry is written to a
+    ! temporary file of this rank and thread, then renamed, so that other ranks, and later runs,
+    ! never read a partially written entry. key and fname as read by readsolcache at the start of the task
+    !$ USE omp_lib, ONLY : omp_get_thread_num
+    INTEGER, INTENT(IN) :: p, nu
+    INTEGER(KIND=8), DIMENSION(:), INTENT(IN) :: key
+    CHARACTER(len=*), INTENT(IN) :: fname
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: buf
+    CHARACTER(len=LEN(fname)+30) :: tmpname
+    INTEGER :: myunit, ios, nslice, pos, myrank, mythread, ierr
+
+    nslice = slicelength()
+    ALLOCATE(buf(nslice))
+    pos = 0
+    CALL collectslice(p,nu,buf,pos,.TRUE.)
+
+    CALL mpi_comm_rank(qlkcomm,myrank,ierr)
+    mythread = 0
+    !$ mythread = omp_get_thread_num()
+    WRITE(tmpname,'(A,A,I0,A,I0)') TRIM(fname), '.tmp.', myrank, '.', mythread
+
+    OPEN(NEWUNIT=myunit, file=tmpname, access='stream', form='unformatted', status='replace', action='write', iostat=ios)
+    IF (ios == 0) THEN
+       WRITE(myunit,iostat=ios) solcachever, SIZE(key), key, nslice, buf
+       IF (ios == 0) THEN
+          CLOSE(myunit)
+          CALL RENAME(TRIM(tmpname),TRIM(fname),ios)
+       ELSE
+          CLOSE(myunit,status='delete')
+       ENDIF
+    ENDIF
+    IF ( (ios /= 0) .AND. (verbose .EQV. .TRUE.) ) WRITE(stderr,"(A,A)") 'Could not write solution cache entry ',TRIM(fname)
+
+    DEALLOCATE(buf)
+
+  END SUBROUTINE writesolcache
 
   SUBROUTINE reduceoutput()
     ! collect all output into all cores for parallel writing
@@ -927,88 +1083,88 @@ CONTAINS
     REAL(KIND=DBL), DIMENSION(dimx,0:nions,numecoefs) :: ecoefstmp
     REAL(KIND=DBL), DIMENSION(dimx,nions,numicoefs) :: cftranstmp
 
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierr)
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierr)
-
-    CALL MPI_AllReduce(epf_SI,epf_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(eef_SI,eef_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(epf_GB,epf_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(eef_GB,eef_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(modeflag,modeflagtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(krmmuITG,krmmuITGtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(krmmuETG,krmmuETGtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(epf_cm,epf_cmtmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(eef_cm,eef_cmtmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(kperp2,kperp2tmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(solflu_SI,solflu_SItmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(solflu_GB,solflu_GBtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(ipf_SI,ipf_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ief_SI,ief_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ivf_SI,ivf_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ipf_GB,ipf_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ivf_GB,ivf_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ief_GB,ief_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(ipf_cm,ipf_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ief_cm,ief_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ivf_cm,ivf_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(gam_SI,gam_SItmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(gam_GB,gam_GBtmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ome_SI,ome_SItmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ome_GB,ome_GBtmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(phi,phitmp,dimx*ntheta,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(npol,npoltmp,dimx*ntheta*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ecoefs,ecoefstmp,dimx*(1+nions)*numecoefs,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(cftrans,cftranstmp,dimx*nions*numicoefs,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+    CALL mpi_comm_rank(qlkcomm,myrank,ierr)
+    CALL mpi_comm_size(qlkcomm,nproc,ierr)
+
+    CALL MPI_AllReduce(epf_SI,epf_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(eef_SI,eef_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(epf_GB,epf_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(eef_GB,eef_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(modeflag,modeflagtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(krmmuITG,krmmuITGtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(krmmuETG,krmmuETGtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(epf_cm,epf_cmtmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(eef_cm,eef_cmtmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(kperp2,kperp2tmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(solflu_SI,solflu_SItmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(solflu_GB,solflu_GBtmp,dimx*dimn,MPI_DOUBLE_COMPLEX,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(ipf_SI,ipf_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ief_SI,ief_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ivf_SI,ivf_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ipf_GB,ipf_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ivf_GB,ivf_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ief_GB,ief_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(ipf_cm,ipf_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ief_cm,ief_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ivf_cm,ivf_cmtmp,dimx*dimn*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(gam_SI,gam_SItmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(gam_GB,gam_GBtmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ome_SI,ome_SItmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ome_GB,ome_GBtmp,dimx*dimn*numsols,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+    CALL MPI_AllReduce(phi,phitmp,dimx*ntheta,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(npol,npoltmp,dimx*ntheta*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(ecoefs,ecoefstmp,dimx*(1+nions)*numecoefs,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+    CALL MPI_AllReduce(cftrans,cftranstmp,dimx*nions*numicoefs,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
 
     IF (phys_meth /= 0.0) THEN
-       CALL MPI_AllReduce(dfe_SI,dfe_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vte_SI,vte_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vce_SI,vce_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(dfe_GB,dfe_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vte_GB,vte_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vce_GB,vce_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-
-       CALL MPI_AllReduce(cke,cketmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(dfi_SI,dfi_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vti_SI,vti_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vri_SI,vri_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vci_SI,vci_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(dfi_GB,dfi_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vti_GB,vti_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vri_GB,vri_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(vci_GB,vci_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(cki,ckitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(dfe_SI,dfe_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vte_SI,vte_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vce_SI,vce_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(dfe_GB,dfe_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vte_GB,vte_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vce_GB,vce_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+
+       CALL MPI_AllReduce(cke,cketmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(dfi_SI,dfi_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vti_SI,vti_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vri_SI,vri_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vci_SI,vci_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(dfi_GB,dfi_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vti_GB,vti_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vri_GB,vri_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(vci_GB,vci_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+       CALL MPI_AllReduce(cki,ckitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
 
        IF (phys_meth == 2) THEN
-          CALL MPI_AllReduce(chiee_SI,chiee_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(vene_SI,vene_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(vece_SI,vece_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(ceke,ceketmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(chiei_SI,chiei_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veni_SI,veni_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veri_SI,veri_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veci_SI,veci_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(ceki,cekitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(chiee_GB,chiee_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(vene_GB,vene_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(vece_GB,vece_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(chiei_GB,chiei_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veni_GB,veni_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veri_GB,veri_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-          CALL MPI_AllReduce(veci_GB,veci_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+          CALL MPI_AllReduce(chiee_SI,chiee_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(vene_SI,vene_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(vece_SI,vece_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(ceke,ceketmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(chiei_SI,chiei_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veni_SI,veni_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veri_SI,veri_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veci_SI,veci_SItmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(ceki,cekitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(chiee_GB,chiee_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(vene_GB,vene_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(vece_GB,vece_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(chiei_GB,chiei_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veni_GB,veni_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veri_GB,veri_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+          CALL MPI_AllReduce(veci_GB,veci_GBtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
           IF (separateflux .EQV. .TRUE.) THEN
-             CALL MPI_AllReduce(chieeETG_SI,chieeETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-             CALL MPI_AllReduce(veneETG_SI,veneETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-             CALL MPI_AllReduce(veceETG_SI,veceETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-             CALL MPI_AllReduce(chieeETG_GB,chieeETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-             CALL MPI_AllReduce(veneETG_GB,veneETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-             CALL MPI_AllReduce(veceETG_GB,veceETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)          
+             CALL MPI_AllReduce(chieeETG_SI,chieeETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+             CALL MPI_AllReduce(veneETG_SI,veneETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+             CALL MPI_AllReduce(veceETG_SI,veceETG_SItmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+             CALL MPI_AllReduce(chieeETG_GB,chieeETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+             CALL MPI_AllReduce(veneETG_GB,veneETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)
+             CALL MPI_AllReduce(veceETG_GB,veceETG_GBtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierr)          
           ENDIF
        ENDIF
     ENDIF
@@ -1101,4 +1257,82 @@ CONTAINS
   END SUBROUTINE reduceoutput
 
 
+  SUBROUTINE moveslice_0d(x,buf,pos,topack)
+    REAL(KIND=DBL), INTENT(INOUT) :: x
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+
+    IF (topack) THEN
+       buf(pos+1) = x
+    ELSE
+       x = buf(pos+1)
+    ENDIF
+    pos = pos+1
+  END SUBROUTINE moveslice_0d
+
+  SUBROUTINE moveslice_1d(x,buf,pos,topack)
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: x
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+    INTEGER :: n
+
+    n = SIZE(x)
+    IF (topack) THEN
+       buf(pos+1:pos+n) = x
+    ELSE
+       x = buf(pos+1:pos+n)
+    ENDIF
+    pos = pos+n
+  END SUBROUTINE moveslice_1d
+
+  SUBROUTINE moveslice_2d(x,buf,pos,topack)
+    REAL(KIND=DBL), DIMENSION(:,:), INTENT(INOUT) :: x
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+    INTEGER :: n
+
+    n = SIZE(x)
+    IF (topack) THEN
+       buf(pos+1:pos+n) = RESHAPE(x,(/n/))
+    ELSE
+       x = RESHAPE(buf(pos+1:pos+n),SHAPE(x))
+    ENDIF
+    pos = pos+n
+  END SUBROUTINE moveslice_2d
+
+  SUBROUTINE moveslice_0d_complex(x,buf,pos,topack)
+    COMPLEX(KIND=DBL), INTENT(INOUT) :: x
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+
+    IF (topack) THEN
+       buf(pos+1) = REAL(x)
+       buf(pos+2) = AIMAG(x)
+    ELSE
+       x = CMPLX(buf(pos+1),buf(pos+2),DBL)
+    ENDIF
+    pos = pos+2
+  END SUBROUTINE moveslice_0d_complex
+
+  SUBROUTINE moveslice_1d_complex(x,buf,pos,topack)
+    COMPLEX(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: x
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+    INTEGER :: n
+
+    n = SIZE(x)
+    IF (topack) THEN
+       buf(pos+1:pos+n) = REAL(x)
+       buf(pos+n+1:pos+2*n) = AIMAG(x)
+    ELSE
+       x = CMPLX(buf(pos+1:pos+n),buf(pos+n+1:pos+2*n),DBL)
+    ENDIF
+    pos = pos+2*n
+  END SUBROUTINE moveslice_1d_complex
+
 END MODULE mod_make_io
@@ -89,6 +89,89 @@ CONTAINS
     ALLOCATE(ief_cm(dimx,dimn,nions)); ief_cm=0
     ALLOCATE(ivf_cm(dimx,dimn,nions)); ivf_cm=0
 
+    IF (separateflux .EQV. .TRUE.) THEN
+       ALLOCATE(eefITG_SI(dimx)); eefITG_SI=0
+       ALLOCATE(epfITG_SI(dimx)); epfITG_SI=0
+       ALLOCATE(iefITG_SI(dimx,nions)); iefITG_SI=0
+       ALLOCATE(ipfITG_SI(dimx,nions)); ipfITG_SI=0
+       ALLOCATE(ivfITG_SI(dimx,nions)); ivfITG_SI=0
+       ALLOCATE(eefITG_GB(dimx)); eefITG_GB=0
+       ALLOCATE(epfITG_GB(dimx)); epfITG_GB=0
+       ALLOCATE(iefITG_GB(dimx,nions)); iefITG_GB=0
+       ALLOCATE(ipfITG_GB(dimx,nions)); ipfITG_GB=0
+       ALLOCATE(ivfITG_GB(dimx,nions)); ivfITG_GB=0
+       ALLOCATE(eefTEM_SI(dimx)); eefTEM_SI=0
+       ALLOCATE(epfTEM_SI(dimx)); epfTEM_SI=0
+       ALLOCATE(iefTEM_SI(dimx,nions)); iefTEM_SI=0
+       ALLOCATE(ipfTEM_SI(dimx,nions)); ipfTEM_SI=0
+       ALLOCATE(ivfTEM_SI(dimx,nions)); ivfTEM_SI=0
+       ALLOCATE(eefTEM_GB(dimx)); eefTEM_GB=0
+       ALLOCATE(epfTEM_GB(dimx)); epfTEM_GB=0
+       ALLOCATE(iefTEM_GB(dimx,nions)); iefTEM_GB=0
+       ALLOCATE(ipfTEM_GB(dimx,nions)); ipfTEM_GB=0
+       ALLOCATE(ivfTEM_GB(dimx,nions)); ivfTEM_GB=0
+       IF (phys_meth /= 0) THEN
+          ALLOCATE(dfeITG_SI(dimx)); dfeITG_SI=0
+          ALLOCATE(vteITG_SI(dimx)); vteITG_SI=0
+          ALLOCATE(vceITG_SI(dimx)); vceITG_SI=0
+          ALLOCATE(dfiITG_SI(dimx,nions)); dfiITG_SI=0
+          ALLOCATE(vtiITG_SI(dimx,nions)); vtiITG_SI=0
+          ALLOCATE(vciITG_SI(dimx,nions)); vciITG_SI=0
+          ALLOCATE(vriITG_SI(dimx,nions)); vriITG_SI=0
+          ALLOCATE(dfeITG_GB(dimx)); dfeITG_GB=0
+          ALLOCATE(vteITG_GB(dimx)); vteITG_GB=0
+          ALLOCATE(vceITG_GB(dimx)); vceITG_GB=0
+          ALLOCATE(dfiITG_GB(dimx,nions)); dfiITG_GB=0
+          ALLOCATE(vtiITG_GB(dimx,nions)); vtiITG_GB=0
+          ALLOCATE(vciITG_GB(dimx,nions)); vciITG_GB=0
+          ALLOCATE(vriITG_GB(dimx,nions)); vriITG_GB=0
+          ALLOCATE(dfeTEM_SI(dimx)); dfeTEM_SI=0
+          ALLOCATE(vteTEM_SI(dimx)); vteTEM_SI=0
+          ALLOCATE(vceTEM_SI(dimx)); vceTEM_SI=0
+          ALLOCATE(dfiTEM_SI(dimx,nions)); dfiTEM_SI=0
+          ALLOCATE(vtiTEM_SI(dimx,nions)); vtiTEM_SI=0
+          ALLOCATE(vciTEM_SI(dimx,nions)); vciTEM_SI=0
+          ALLOCATE(vriTEM_SI(dimx,nions)); vriTEM_SI=0
+          ALLOCATE(dfeTEM_GB(dimx)); dfeTEM_GB=0
+          ALLOCATE(vteTEM_GB(dimx)); vteTEM_GB=0
+          ALLOCATE(vceTEM_GB(dimx)); vceTEM_GB=0
+          ALLOCATE(dfiTEM_GB(dimx,nions)); dfiTEM_GB=0
+          ALLOCATE(vtiTEM_GB(dimx,nions)); vtiTEM_GB=0
+          ALLOCATE(vciTEM_GB(dimx,nions)); vciTEM_GB=0
+          ALLOCATE(vriTEM_GB(dimx,nions)); vriTEM_GB=0
+          IF (phys_meth == 2) THEN
+             ALLOCATE(chieeITG_SI(dimx)); chieeITG_SI=0
+             ALLOCATE(veneITG_SI(dimx)); veneITG_SI=0
+             ALLOCATE(veceITG_SI(dimx)); veceITG_SI=0
+             ALLOCATE(chieiITG_SI(dimx,nions)); chieiITG_SI=0
+             ALLOCATE(veniITG_SI(dimx,nions)); veniITG_SI=0
+             ALLOCATE(veciITG_SI(dimx,nions)); veciITG_SI=0
+             ALLOCATE(veriITG_SI(dimx,nions)); veriITG_SI=0
+             ALLOCATE(chieeITG_GB(dimx)); chieeITG_GB=0
+             ALLOCATE(veneITG_GB(dimx)); veneITG_GB=0
+             ALLOCATE(veceITG_GB(dimx)); veceITG_GB=0
+             ALLOCATE(chieiITG_GB(dimx,nions)); chieiITG_GB=0
+             ALLOCATE(veniITG_GB(dimx,nions)); veniITG_GB=0
+             ALLOCATE(veciITG_GB(dimx,nions)); veciITG_GB=0
+             ALLOCATE(veriITG_GB(dimx,nions)); veriITG_GB=0
+             ALLOCATE(chieeTEM_SI(dimx)); chieeTEM_SI=0
+             ALLOCATE(veneTEM_SI(dimx)); veneTEM_SI=0
+             ALLOCATE(veceTEM_SI(dimx)); veceTEM_SI=0
+             ALLOCATE(chieiTEM_SI(dimx,nions)); chieiTEM_SI=0
+             ALLOCATE(veniTEM_SI(dimx,nions)); veniTEM_SI=0
+             ALLOCATE(veciTEM_SI(dimx,nions)); veciTEM_SI=0
+             ALLOCATE(veriTEM_SI(dimx,nions)); veriTEM_SI=0
+             ALLOCATE(chieeTEM_GB(dimx)); chieeTEM_GB=0
+             ALLOCATE(veneTEM_GB(dimx)); veneTEM_GB=0
+             ALLOCATE(veceTEM_GB(dimx)); veceTEM_GB=0
+             ALLOCATE(chieiTEM_GB(dimx,nions)); chieiTEM_GB=0
+             ALLOCATE(veniTEM_GB(dimx,nions)); veniTEM_GB=0
+             ALLOCATE(veciTEM_GB(dimx,nions)); veciTEM_GB=0
+             ALLOCATE(veriTEM_GB(dimx,nions)); veriTEM_GB=0
+          ENDIF
+       ENDIF
+    ENDIF
+
   END SUBROUTINE allocate_endoutput
 
   SUBROUTINE deallocate_endoutput()
@@ -168,15 +251,192 @@ CONTAINS
     DEALLOCATE(ief_cm)
     DEALLOCATE(ivf_cm)
 
+    IF (separateflux .EQV. .TRUE.) THEN
+       DEALLOCATE(eefITG_SI)
+       DEALLOCATE(epfITG_SI)
+       DEALLOCATE(iefITG_SI)
+       DEALLOCATE(ipfITG_SI)
+       DEALLOCATE(ivfITG_SI)
+       DEALLOCATE(eefITG_GB)
+       DEALLOCATE(epfITG_GB)
+       DEALLOCATE(iefITG_GB)
+       DEALLOCATE(ipfITG_GB)
+       DEALLOCATE(ivfITG_GB)
+       DEALLOCATE(eefTEM_SI)
+       DEALLOCATE(epfTEM_SI)
+       DEALLOCATE(iefTEM_SI)
+       DEALLOCATE(ipfTEM_SI)
+       DEALLOCATE(ivfTEM_SI)
+       DEALLOCATE(eefTEM_GB)
+       DEALLOCATE(epfTEM_GB)
+       DEALLOCATE(iefTEM_GB)
+       DEALLOCATE(ipfTEM_GB)
+       DEALLOCATE(ivfTEM_GB)
+       IF (phys_meth /= 0) THEN
+          DEALLOCATE(dfeITG_SI)
+          DEALLOCATE(vteITG_SI)
+          DEALLOCATE(vceITG_SI)
+          DEALLOCATE(dfiITG_SI)
+          DEALLOCATE(vtiITG_SI)
+          DEALLOCATE(vciITG_SI)
+          DEALLOCATE(vriITG_SI)
+          DEALLOCATE(dfeITG_GB)
+          DEALLOCATE(vteITG_GB)
+          DEALLOCATE(vceITG_GB)
+          DEALLOCATE(dfiITG_GB)
+          DEALLOCATE(vtiITG_GB)
+          DEALLOCATE(vciITG_GB)
+          DEALLOCATE(vriITG_GB)
+          DEALLOCATE(dfeTEM_SI)
+          DEALLOCATE(vteTEM_SI)
+          DEALLOCATE(vceTEM_SI)
+          DEALLOCATE(dfiTEM_SI)
+          DEALLOCATE(vtiTEM_SI)
+          DEALLOCATE(vciTEM_SI)
+          DEALLOCATE(vriTEM_SI)
+          DEALLOCATE(dfeTEM_GB)
+          DEALLOCATE(vteTEM_GB)
+          DEALLOCATE(vceTEM_GB)
+          DEALLOCATE(dfiTEM_GB)
+          DEALLOCATE(vtiTEM_GB)
+          DEALLOCATE(vciTEM_GB)
+          DEALLOCATE(vriTEM_GB)
+          IF (phys_meth == 2) THEN
+             DEALLOCATE(chieeITG_SI)
+             DEALLOCATE(veneITG_SI)
+             DEALLOCATE(veceITG_SI)
+             DEALLOCATE(chieiITG_SI)
+             DEALLOCATE(veniITG_SI)
+             DEALLOCATE(veciITG_SI)
+             DEALLOCATE(veriITG_SI)
+             DEALLOCATE(chieeITG_GB)
+             DEALLOCATE(veneITG_GB)
+             DEALLOCATE(veceITG_GB)
+             DEALLOCATE(chieiITG_GB)
+             DEALLOCATE(veniITG_GB)
+             DEALLOCATE(veciITG_GB)
+             DEALLOCATE(veriITG_GB)
+             DEALLOCATE(chieeTEM_SI)
+             DEALLOCATE(veneTEM_SI)
+             DEALLOCATE(veceTEM_SI)
+             DEALLOCATE(chieiTEM_SI)
+             DEALLOCATE(veniTEM_SI)
+             DEALLOCATE(veciTEM_SI)
+             DEALLOCATE(veriTEM_SI)
+             DEALLOCATE(chieeTEM_GB)
+             DEALLOCATE(veneTEM_GB)
+             DEALLOCATE(veceTEM_GB)
+             DEALLOCATE(chieiTEM_GB)
+             DEALLOCATE(veniTEM_GB)
+             DEALLOCATE(veciTEM_GB)
+             DEALLOCATE(veriTEM_GB)
+          ENDIF
+       ENDIF
+    ENDIF
 
   END SUBROUTINE deallocate_endoutput
 
+  SUBROUTINE savesepflux(ir,modeclass)
+    ! Copies the fluxes of the current saturation pass at radius ir to the ITG-only (modeclass=1) or TEM-only (modeclass=2) arrays
+    INTEGER, INTENT(IN) :: ir, modeclass
+
+    IF (modeclass == 1) THEN
+       eefITG_SI(ir) = eef_SI(ir)
+       epfITG_SI(ir) = epf_SI(ir)
+       iefITG_SI(ir,:) = ief_SI(ir,:)
+       ipfITG_SI(ir,:) = ipf_SI(ir,:)
+       ivfITG_SI(ir,:) = ivf_SI(ir,:)
+       eefITG_GB(ir) = eef_GB(ir)
+       epfITG_GB(ir) = epf_GB(ir)
+       iefITG_GB(ir,:) = ief_GB(ir,:)
+       ipfITG_GB(ir,:) = ipf_GB(ir,:)
+       ivfITG_GB(ir,:) = ivf_GB(ir,:)
+       IF (phys_meth /= 0) THEN
+          dfeITG_SI(ir) = dfe_SI(ir)
+          vteITG_SI(ir) = vte_SI(ir)
+          vceITG_SI(ir) = vce_SI(ir)
+          dfiITG_SI(ir,:) = dfi_SI(ir,:)
+          vtiITG_SI(ir,:) = vti_SI(ir,:)
+          vciITG_SI(ir,:) = vci_SI(ir,:)
+          vriITG_SI(ir,:) = vri_SI(ir,:)
+          dfeITG_GB(ir) = dfe_GB(ir)
+          vteITG_GB(ir) = vte_GB(ir)
+          vceITG_GB(ir) = vce_GB(ir)
+          dfiITG_GB(ir,:) = dfi_GB(ir,:)
+          vtiITG_GB(ir,:) = vti_GB(ir,:)
+          vciITG_GB(ir,:) = vci_GB(ir,:)
+          vriITG_GB(ir,:) = vri_GB(ir,:)
+          IF (phys_meth == 2) THEN
+             chieeITG_SI(ir) = chiee_SI(ir)
+             veneITG_SI(ir) = vene_SI(ir)
+             veceITG_SI(ir) = vece_SI(ir)
+             chieiITG_SI(ir,:) = chiei_SI(ir,:)
+             veniITG_SI(ir,:) = veni_SI(ir,:)
+             veciITG_SI(ir,:) = veci_SI(ir,:)
+             veriITG_SI(ir,:) = veri_SI(ir,:)
+             chieeITG_GB(ir) = chiee_GB(ir)
+             veneITG_GB(ir) = vene_GB(ir)
+             veceITG_GB(ir) = vece_GB(ir)
+             chieiITG_GB(ir,:) = chiei_GB(ir,:)
+             veniITG_GB(ir,:) = veni_GB(ir,:)
+             veciITG_GB(ir,:) = veci_GB(ir,:)
+             veriITG_GB(ir,:) = veri_GB(ir,:)
+          ENDIF
+       ENDIF
+    ELSE
+       eefTEM_SI(ir) = eef_SI(ir)
+       epfTEM_SI(ir) = epf_SI(ir)
+       iefTEM_SI(ir,:) = ief_SI(ir,:)
+       ipfTEM_SI(ir,:) = ipf_SI(ir,:)
+       ivfTEM_SI(ir,:) = ivf_SI(ir,:)
+       eefTEM_GB(ir) = eef_GB(ir)
+       epfTEM_GB(ir) = epf_GB(ir)
+       iefTEM_GB(ir,:) = ief_GB(ir,:)
+       ipfTEM_GB(ir,:) = ipf_GB(ir,:)
+       ivfTEM_GB(ir,:) = ivf_GB(ir,:)
+       IF (phys_meth /= 0) THEN
+          dfeTEM_SI(ir) = dfe_SI(ir)
+          vteTEM_SI(ir) = vte_SI(ir)
+          vceTEM_SI(ir) = vce_SI(ir)
+          dfiTEM_SI(ir,:) = dfi_SI(ir,:)
+          vtiTEM_SI(ir,:) = vti_SI(ir,:)
+          vciTEM_SI(ir,:) = vci_SI(ir,:)
+          vriTEM_SI(ir,:) = vri_SI(ir,:)
+          dfeTEM_GB(ir) = dfe_GB(ir)
+          vteTEM_GB(ir) = vte_GB(ir)
+          vceTEM_GB(ir) = vce_GB(ir)
+          dfiTEM_GB(ir,:) = dfi_GB(ir,:)
+          vtiTEM_GB(ir,:) = vti_GB(ir,:)
+          vciTEM_GB(ir,:) = vci_GB(ir,:)
+          vriTEM_GB(ir,:) = vri_GB(ir,:)
+          IF (phys_meth == 2) THEN
+             chieeTEM_SI(ir) = chiee_SI(ir)
+             veneTEM_SI(ir) = vene_SI(ir)
+             veceTEM_SI(ir) = vece_SI(ir)
+             chieiTEM_SI(ir,:) = chiei_SI(ir,:)
+             veniTEM_SI(ir,:) = veni_SI(ir,:)
+             veciTEM_SI(ir,:) = veci_SI(ir,:)
+             veriTEM_SI(ir,:) = veri_SI(ir,:)
+             chieeTEM_GB(ir) = chiee_GB(ir)
+             veneTEM_GB(ir) = vene_GB(ir)
+             veceTEM_GB(ir) = vece_GB(ir)
+             chieiTEM_GB(ir,:) = chiei_GB(ir,:)
+             veniTEM_GB(ir,:) = veni_GB(ir,:)
+             veciTEM_GB(ir,:) = veci_GB(ir,:)
+             veriTEM_GB(ir,:) = veri_GB(ir,:)
+          ENDIF
+       ENDIF
+    ENDIF
+
+  END SUBROUTINE savesepflux
+
   SUBROUTINE saturation(outputcase)
     INTEGER, INTENT(IN) :: outputcase !0 for all modes, 1 for ITG only, 2 for TEM only. ETG-only is calculated anyway for outputcase==0
-    INTEGER :: ir,j,k,gg,ifailloc
+    INTEGER :: ir,j,k,gg,gg0,ifailloc
     REAL(KIND=DBL), DIMENSION(dimx,dimn) :: kteta,kthr,kxshift,nwgmat,smagn,qxn,dw
     REAL(KIND=DBL), DIMENSION(dimx,dimn) :: kx2shear,kxadd,kxnl
-    REAL(KIND=DBL), DIMENSION(dimx,dimn) :: maxgmsp,maxgmsptmp
+    REAL(KIND=DBL), DIMENSION(dimx,dimn) :: maxgmsp
+    REAL(KIND=DBL), DIMENSION(dimn) :: maxgmsprow !single-scale row of maxgmsp
     REAL(KIND=DBL), DIMENSION(dimx) :: gamGB, mdmlmu, mdml, krm, chi_GB,nathanfac
     REAL(KIND=DBL), DIMENSION(dimn+1) :: xint,yint
     INTEGER, DIMENSION(dimx) :: inddmlmu,inddml
@@ -186,7 +446,8 @@ CONTAINS
     REAL(KIND=DBL),DIMENSION(dimn) :: normETG
     REAL(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: fi, constp, conste, constv, cmpfe_k, cmefe_k, cmpfgne_k, cmpfgte_k, cmpfce_k, cmefgne_k, cmefgte_k, cmefce_k
     REAL(KIND=DBL), DIMENSION(dimx,dimn,nions,numsols) :: cmpfi_k, cmefi_k, cmvfi_k, cmpfgni_k, cmpfgti_k, cmpfgui_k, cmpfci_k, cmefgni_k, cmefgti_k, cmefgui_k, cmefci_k
-    COMPLEX(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: solbck,solbcktmp
+    COMPLEX(KIND=DBL), DIMENSION(dimx,dimn,numsols) :: solbck
+    COMPLEX(KIND=DBL), DIMENSION(dimn,numsols) :: solbckrow !single-scale row of solbck
     REAL(KIND=DBL), DIMENSION(dimx,dimn) :: cmpfe, cmefe, cmpfgne, cmpfgte, cmpfce, cmefgne, cmefgte, cmefce
     REAL(KIND=DBL), DIMENSION(dimx,dimn,nions) :: cmpfi, cmefi, cmvfi, cmpfgni, cmpfgti, cmpfgui, cmpfci, cmefgni, cmefgti, cmefgui, cmefci
     REAL(KIND=DBL), DIMENSION(dimx) :: pfe, dpfe,efe, efeETG, defe,defeETG, dffte, vthte, vcpte, deffte, vethte, vecpte, deffteETG, vethteETG, vecpteETG, ion_epf_GB, ion_eef_GB, ele_epf_GB, ele_eef_GB
@@ -195,10 +456,10 @@ CONTAINS
     CHARACTER(len=7) :: fmtx,fmtn,fmtion !for debugging
     INTEGER :: kk,i,myunit=700,ETGind
     !MPI variables:
-    INTEGER :: doit,ierror,myrank,nproc
+    INTEGER :: ierror,myrank,nproc
 
-    CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-    CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
+    CALL mpi_comm_size(qlkcomm,nproc,ierror)
+    CALL mpi_comm_rank(qlkcomm,myrank,ierror)
 
     Machi=Machitemp ! Reinstate impurity Mach numbers. Ordering is valid here (for cftrans asymmetry terms)
     IF (rot_flag == 2) Aui=Auimod !modify gradients for rotodiffusion
@@ -258,14 +519,36 @@ CONTAINS
        ENDDO
     ENDIF
 
+    ! dw=distan**2/(ABS(modewidth)**2 / SQRT(REAL(modewidth**2)))**2*DGAMMA2(0.75)/DGAMMA2(0.25) 
+
+    kxshift = (distan*AIMAG(modeshift2)/REAL(modewidth**2))**2 !kx contribution from modeshift
+    dw=0.5*distan**2/(REAL(modewidth**2)) + kxshift
+
+    alphp   = -3.0 !used for spectrum shape above kymax
+    alphm   = 1.0 !used for spectrum shape below kymax
+
+    ! With separateflux, the TEM-only fluxes are calculated in an extra pass gg=0 of the same call, and the ITG-only
+    ! fluxes are saved from the ion mode pass gg=1. The rule is not linear in the retained modes, so each class needs its own pass
+    gg0 = 1
+    IF ((outputcase == 0) .AND. (separateflux .EQV. .TRUE.)) gg0 = 0
+
     ! 	QUASILINEAR FLUX CALCULATIONS
-    DO gg=1,3
+    DO gg=gg0,3
        solbck=sol
+       IF (gg == 1) fi(:,:,:) = 0. !the ion mode pass starts from a clean spectrum, also after the TEM pass
 
        ! If outputcase=0 (all modes included) then we go through 3 iterations of calculation in order to 
        ! test whether ion or electron modes are negligible. 
        ! An output array for each radius signifying 'all ion modes', 'all electron modes', or 'stable' is returned
        IF (outputcase == 0) THEN
+          IF (gg == 0) THEN !TEM only: kill all ion modes and electron-scale modes
+             WHERE (REAL(solbck) < 0.) solbck=0.  
+             DO ir=1,dimx
+                DO k=1,numsols
+                   WHERE (kthetarhos > ETGk) solbck(ir,:,k) = 0
+                ENDDO
+             ENDDO
+          ENDIF
           IF (gg == 1) THEN
              WHERE (REAL(solbck) > 0.) solbck=0.  !kill all electron modes
           ENDIF
@@ -287,16 +570,12 @@ CONTAINS
           ENDIF
        ENDIF
 
-       ! dw=distan**2/(ABS(modewidth)**2 / SQRT(REAL(modewidth**2)))**2*DGAMMA2(0.75)/DGAMMA2(0.25) 
-
-       kxshift = (distan*AIMAG(modeshift2)/REAL(modewidth**2))**2 !kx contribution from modeshift
-       dw=0.5*distan**2/(REAL(modewidth**2)) + kxshift
-
-       alphp   = -3.0 !used for spectrum shape above kymax
-       alphm   = 1.0 !used for spectrum shape below kymax
-
-       doit = 0 !initialize counter for distributing tasks
-
+       !Radial positions are distributed round-robin over the ranks, and over the OpenMP threads within each rank.
+       !All per-radius work arrays are indexed by ir, so only the scalars and single-row temporaries are private.
+       !ion, Machi and Aui are thread private task state in datmat
+       !$OMP PARALLEL DO NUM_THREADS(nthreads) DEFAULT(SHARED) SCHEDULE(DYNAMIC) &
+       !$OMP PRIVATE(j,k,kk,ifailloc,rhos,cfaca,cfacb,cfacc,cfacd,qfac,sfac,locmaxgamma,lowlim) &
+       !$OMP PRIVATE(xint,yint,maxloci,normETG,maxgmsprow,solbckrow) COPYIN(Machi,Aui)
        DO ir = 1,dimx !big cycle on scan (or radial) parameter
 
           !additional normalization factor for ETG transport
@@ -305,14 +584,7 @@ CONTAINS
 
           chi_GB(ir)=SQRT(Ai(ir,1)*mp)/(qe**2*Bo(ir)**2)*((Tex(ir)*1e3*qe)**1.5)/Rmin(ir)  !GyroBohm normalisation in m^2/s based on main ion
 
-          IF (myrank == doit) THEN ! distribute independent loop indices to tasks
-             doit=doit+1; 
-             IF (doit==nproc) doit=0 
-          ELSE
-             doit=doit+1; 
-             IF (doit==nproc) doit=0 
-             CYCLE
-          ENDIF
+          IF (MOD(ir-1,nproc) /= myrank) CYCLE ! distribute independent loop indices to tasks
 
           !CALCULATE NEW NON-LINEAR CONTRIBUTION TO Kx (JC 12.2011)
           rhos=SQRT(Tex(ir)*1d3*qe*mi(ir,1))/(qe*Bo(ir)) !Larmor radius with respect to sound speed (no sqrt(2))
@@ -322,7 +594,7 @@ CONTAINS
 
           kxadd(ir,:)=kteta(ir,:)*rhos
           kxadd(ir,:)=(kxadd(ir,:)-cfacd)*cfacc
-          WHERE (kxadd<0) kxadd=0. !'isotropic part' of kx at higher ky
+          WHERE (kxadd(ir,:)<0) kxadd(ir,:)=0. !'isotropic part' of kx at higher ky
 
           kxnl(ir,:)=(cfaca*(EXP(-cfacb*ABS(smagn(ir,:))) )*(1./qxn(ir,:)**qfac)+kxadd(ir,:))/rhos !nonlinear contribution to kx
 
@@ -370,7 +642,7 @@ CONTAINS
                 !Some of the above is actually repeated here. Have to look deeper to see if code can be slightly reduced
                 mdml(ir) = MAXVAL(AIMAG(solbck(ir,:,k))*nwgmat(ir,:)/kperp2(ir,:))
                 maxloci = MAXLOC(AIMAG(solbck(ir,:,k))*nwgmat(ir,:)/kperp2(ir,:))
-                inddml=maxloci(1)
+                inddml(ir)=maxloci(1)
                 IF ( kthetarhos(inddml(ir)) <= 0.05) THEN 
                    inddml(ir)=inddml(ir)+1 
                    ! Not a rigorous fix. Used to avoid some unphysical cases was first instability in k-spectrum gives max gam/kperp^2
@@ -389,20 +661,20 @@ CONTAINS
           ELSE !separate the scales for fi calculation
 
              DO kk=1,2 ! 1 for ion scales, 2 for electron scales
-                maxgmsptmp = 0.
-                solbcktmp = 0.
+                maxgmsprow = 0.
+                solbckrow = 0.
                 IF (kk == 1) THEN !ion scales
-                   maxgmsptmp(ir,1:ETGind-1)=maxgmsp(ir,1:ETGind-1)
-                   solbcktmp(ir,1:ETGind-1,:)=solbck(ir,1:ETGind-1,:)
+                   maxgmsprow(1:ETGind-1)=maxgmsp(ir,1:ETGind-1)
+                   solbckrow(1:ETGind-1,:)=solbck(ir,1:ETGind-1,:)
                 ELSE !electron scales
-                   maxgmsptmp(ir,ETGind:dimn)=maxgmsp(ir,ETGind:dimn)
-                   solbcktmp(ir,ETGind:dimn,:)=solbck(ir,ETGind:dimn,:)
+                   maxgmsprow(ETGind:dimn)=maxgmsp(ir,ETGind:dimn)
+                   solbckrow(ETGind:dimn,:)=solbck(ir,ETGind:dimn,:)
                 ENDIF
-                mdmlmu(ir) = MAXVAL(maxgmsptmp(ir,:)/kperp2(ir,:))
+                mdmlmu(ir) = MAXVAL(maxgmsprow(:)/kperp2(ir,:))
 
                 IF (ABS(mdmlmu(ir)) < epsD) CYCLE !The current scale is stable, so leave fi in that scale as 0 and cycle 
 
-                maxloci=MAXLOC(maxgmsptmp(ir,:)/kperp2(ir,:))
+                maxloci=MAXLOC(maxgmsprow(:)/kperp2(ir,:))
                 inddmlmu(ir)=maxloci(1)
 
 
@@ -421,9 +693,9 @@ CONTAINS
                 !Saturation rules for each unstable root
                 DO k=1,numsols
                    !Some of the above is actually repeated here. Have to look deeper to see if code can be slightly reduced
-                   mdml(ir) = MAXVAL(AIMAG(solbcktmp(ir,:,k))*nwgmat(ir,:)/kperp2(ir,:))
-                   maxloci = MAXLOC(AIMAG(solbcktmp(ir,:,k))*nwgmat(ir,:)/kperp2(ir,:))
-                   inddml=maxloci(1)
+                   mdml(ir) = MAXVAL(AIMAG(solbckrow(:,k))*nwgmat(ir,:)/kperp2(ir,:))
+                   maxloci = MAXLOC(AIMAG(solbckrow(:,k))*nwgmat(ir,:)/kperp2(ir,:))
+                   inddml(ir)=maxloci(1)
                    IF ( kthetarhos(inddml(ir)) <= 0.05) THEN 
                       inddml(ir)=inddml(ir)+1 
                       ! Not a rigorous fix. Used to avoid some unphysical cases was first instability in k-spectrum gives max gam/kperp^2
@@ -872,6 +1144,7 @@ CONTAINS
           ENDIF ! end of statement on additional calculation
 
        END DO  !end big cycle on radial position
+       !$OMP END PARALLEL DO
 
        ! NORMALISATION CONSTANT, BENCHMARK WITH GYRO
 
@@ -890,17 +1163,9 @@ CONTAINS
 
        ! CREATE ADDITIONAL FINAL OUTPUT ARRAYS
        !      IF (gg == 3) THEN
-       doit=0
        DO ir=1,dimx
 
-          IF (myrank == doit) THEN ! distribute independent loop indices to tasks
-             doit=doit+1; 
-             IF (doit==nproc) doit=0 
-          ELSE
-             doit=doit+1; 
-             IF (doit==nproc) doit=0 
-             CYCLE
-          ENDIF
+          IF (MOD(ir-1,nproc) /= myrank) CYCLE ! distribute independent loop indices to tasks
 
           ipf_SI(ir,:) = pfi(ir,:)*normNL
           epf_SI(ir) = pfe(ir)*normNL
@@ -1040,6 +1305,11 @@ CONTAINS
                 ENDIF
              ENDIF
           ENDIF
+
+          IF (gg0 == 0) THEN !separated fluxes
+             IF (gg == 0) CALL savesepflux(ir,2)
+             IF (gg == 1) CALL savesepflux(ir,1)
+          ENDIF
        END DO !end of radial cycle
 
     ENDDO !end do on gg
@@ -40,6 +40,7 @@ CONTAINS
     REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
     REAL(KIND=DBL)    :: var2,var3,bessm2 !new terms for Bessel directly inside passints
     COMPLEX(KIND=DBL) :: inti3, inti5
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
     COMPLEX(KIND=DBL) :: Fikstarrstar
 
     kstar = xx(1)
@@ -89,11 +90,13 @@ CONTAINS
        faci = 2. / (fkstar * (Vpi-Vmi))
 
        IF (caseflag < 5) THEN !differentiate between particle or energy integrals
-          inti3 = faci * (Z1(Vpi) - Z1(Vmi))
-          inti5 = faci * (Z2(Vpi) - Z2(Vmi))
+          CALL Zfriedv(2,(/Vpi,Vmi/),Z1v,Z2v)
+          inti3 = faci * (Z1v(1) - Z1v(2))
+          inti5 = faci * (Z2v(1) - Z2v(2))
        ELSE
-          inti3 = faci * (Z2(Vpi) - Z2(Vmi))
-          inti5 = faci * (Z3(Vpi) - Z3(Vmi))
+          CALL Zfriedv(2,(/Vpi,Vmi/),Z1v,Z2v,Z3v)
+          inti3 = faci * (Z2v(1) - Z2v(2))
+          inti5 = faci * (Z3v(1) - Z3v(2))
        ENDIF
 
     END IF
@@ -131,6 +134,213 @@ CONTAINS
 
   END FUNCTION Fkstarrstari
 
+  FUNCTION Fkstarrstari_all(ndim, xx, nion)
+    !---------------------------------------------------------------------
+    ! Calculates the passing ion k*, r* integrands for all caseflags of Fkstarrstari
+    ! in one pass, for the batched QL integrals. Only the cases set in QLcase are calculated,
+    ! the others are returned as 0. The Bessel function and Fried-Conte functions
+    ! are shared between the cases
+    !---------------------------------------------------------------------  
+    ! Arguments
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL)   , INTENT(IN) :: xx(ndim)
+    INTEGER , INTENT(IN) :: nion
+    COMPLEX(KIND=DBL), DIMENSION(8) :: Fkstarrstari_all
+
+    REAL(KIND=DBL)    :: Athir 
+    COMPLEX(KIND=DBL) :: aai, bbi, cci, ddi, sqrtdi, Vmi, Vpi, Zai
+    COMPLEX(KIND=DBL) :: faci, Z1d, Z2d, Z3d
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
+    REAL(KIND=DBL)    :: nwgi, prefac
+    REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
+    REAL(KIND=DBL)    :: var2,var3,bessm2
+    COMPLEX(KIND=DBL) :: inti3p, inti5p, inti3e, inti5e, inti3, inti5
+    COMPLEX(KIND=DBL) :: Fikstarrstar
+    INTEGER :: caseflag
+
+    Fkstarrstari_all(:) = 0.
+
+    kstar = xx(1)
+    rstar = xx(2)
+
+    teta = kstar*d/REAL(mwidth) / SQRT(2._DBL)
+    !Vertical drift term
+    fkstar = 4./3.*(COS(teta) + (smag(pFkr) * teta - alphax(pFkr) * SIN(teta))*SIN(teta))
+    IF (ABS(fkstar)<minfki) fkstar=SIGN(minfki,fkstar)
+
+    nwgi = nwg*(-Tix(pFkr,nion)/Zi(pFkr,nion))
+
+    var2 = (teta/d*Rhoi(pFkr,nion))**2.  !!1st argument of Bessel fun
+    var3 = (ktetaRhoi(nion))**2.               !!2nd argument of Bessel fun
+    bessm2 = BESEI0(var2+var3)
+
+    !Transit frequency        
+    Athir = Athi(nion)*rstar / SQRT(2._DBL)
+    !Simplified calculation for zero vertical drift
+    IF (ABS(fkstar)<minfki) THEN 
+       !Further simplication if transit freq is zero
+       IF (rstar<epsD) THEN 
+          inti3p = -1./omFkr*(-Tix(pFkr,nion)/Zi(pFkr,nion))
+          inti5p = 1.5*inti3p
+       ELSE   
+          aai = omFkr*nwg/Athir
+          !Fried-Conte functions
+          Zai=Z1(aai)
+          inti3p = nwgi / Athir *2. *Zai
+          inti5p = nwgi / Athir *aai + inti3p*aai*aai
+       END IF
+       inti3e = inti3p
+       inti5e = inti5p
+       !GENERAL CASE
+    ELSE  
+       bbi = CMPLX(Athir/(nwgi*fkstar),0.) 
+       cci = omFkr*(Zi(pFkr,nion)/Tix(pFkr,nion))/fkstar
+
+       ddi = bbi**2 - 4.*cci
+       sqrtdi = SQRT(ddi)
+
+       Vmi = (-bbi-sqrtdi)/2.
+       Vpi = (-bbi+sqrtdi)/2.
+
+       faci = 2. / (fkstar * (Vpi-Vmi))
+
+       IF (ANY(QLcase(5:8))) THEN
+          CALL Zfriedv(2,(/Vpi,Vmi/),Z1v,Z2v,Z3v)
+       ELSE
+          CALL Zfriedv(2,(/Vpi,Vmi/),Z1v,Z2v)
+       ENDIF
+       Z2d = Z2v(1) - Z2v(2)
+       IF (ANY(QLcase(1:4))) THEN
+          Z1d = Z1v(1) - Z1v(2)
+          inti3p = faci * Z1d
+          inti5p = faci * Z2d
+       ENDIF
+       IF (ANY(QLcase(5:8))) THEN
+          Z3d = Z3v(1) - Z3v(2)
+          inti3e = faci * Z2d
+          inti5e = faci * Z3d
+       ENDIF
+    END IF
+
+    prefac = 1. * fc(pFkr) * coefi(pFkr,nion) * bessm2 * EXP( -(kstar**2 + rstar**2)/2 )/twopi
+
+    DO caseflag = 1,8
+       IF (QLcase(caseflag) .EQV. .FALSE.) CYCLE
+       IF (caseflag < 5) THEN
+          inti3 = inti3p; inti5 = inti5p
+       ELSE
+          inti3 = inti3e; inti5 = inti5e
+       ENDIF
+       SELECT CASE (MOD(caseflag-1,4)+1)
+       CASE (1) !full term for particle or energy
+          Fikstarrstar = inti3 * (omFkr*(Zi(pFkr,nion)/Tix(pFkr,nion))+Ani(pFkr,nion)-1.5*Ati(pFkr,nion)) + inti5 * Ati(pFkr,nion)
+       CASE (2) !At factor
+          Fikstarrstar = inti3 * (-1.5) + inti5 
+       CASE (3) !An factor
+          Fikstarrstar = inti3 
+       CASE (4) !Curvature term
+          Fikstarrstar = inti3 * omFkr*(Zi(pFkr,nion)/Tix(pFkr,nion))
+       END SELECT
+
+       IF (caseflag < 5) THEN
+          Fkstarrstari_all(caseflag) = prefac * Fikstarrstar
+       ELSE
+          Fkstarrstari_all(caseflag) = prefac * Tix(pFkr,nion) * Fikstarrstar
+       ENDIF
+       IF (ABS(Fkstarrstari_all(caseflag)) < SQRT(epsD)) Fkstarrstari_all(caseflag)=0.
+    ENDDO
+
+  END FUNCTION Fkstarrstari_all
+
+  FUNCTION Fkstarrstari_d(ndim, xx, nion)
+    !---------------------------------------------------------------------
+    ! Passing ion k*, r* integrand of fonct (caseflag 1 of Fkstarrstari) and
+    ! its derivative with respect to omega, for the Newton solver.
+    ! Vp and Vm move with omega as dVp = -dVm = -dc/sqrt(b^2-4c)
+    !---------------------------------------------------------------------  
+    ! Arguments
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL)   , INTENT(IN) :: xx(ndim)
+    INTEGER , INTENT(IN) :: nion
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Fkstarrstari_d
+
+    REAL(KIND=DBL)    :: Athir, daai
+    COMPLEX(KIND=DBL) :: aai, bbi, cci, dcci, ddi, sqrtdi, Vmi, Vpi, dVpi
+    COMPLEX(KIND=DBL) :: alphai, faci, dfaci
+    REAL(KIND=DBL)    :: nwgi, prefac
+    REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
+    REAL(KIND=DBL)    :: var2,var3,bessm2
+    COMPLEX(KIND=DBL) :: inti3, inti5, dinti3, dinti5
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, dZ1v, dZ2v
+    COMPLEX(KIND=DBL) :: Fikstarrstar, dFikstarrstar
+
+    kstar = xx(1)
+    rstar = xx(2)
+
+    teta = kstar*d/REAL(mwidth) / SQRT(2._DBL)
+    !Vertical drift term
+    fkstar = 4./3.*(COS(teta) + (smag(pFkr) * teta - alphax(pFkr) * SIN(teta))*SIN(teta))
+    IF (ABS(fkstar)<minfki) fkstar=SIGN(minfki,fkstar)
+
+    nwgi = nwg*(-Tix(pFkr,nion)/Zi(pFkr,nion))
+
+    var2 = (teta/d*Rhoi(pFkr,nion))**2.  !!1st argument of Bessel fun
+    var3 = (ktetaRhoi(nion))**2.               !!2nd argument of Bessel fun
+    bessm2 = BESEI0(var2+var3)
+
+    !Transit frequency        
+    Athir = Athi(nion)*rstar / SQRT(2._DBL)
+    !Simplified calculation for zero vertical drift
+    IF (ABS(fkstar)<minfki) THEN 
+       !Further simplication if transit freq is zero
+       IF (rstar<epsD) THEN 
+          inti3 = -1./omFkr*(-Tix(pFkr,nion)/Zi(pFkr,nion))
+          inti5 = 1.5*inti3
+          dinti3 = -inti3/omFkr
+          dinti5 = 1.5*dinti3
+       ELSE   
+          aai = omFkr*nwg/Athir
+          daai = nwg/Athir
+          CALL Zfrieddv(1,(/aai/),Z1v(1:1),Z2v(1:1),dZ1v(1:1),dZ2v(1:1))
+          inti3 = nwgi / Athir *2. *Z1v(1)
+          inti5 = nwgi / Athir *aai + inti3*aai*aai
+          dinti3 = nwgi / Athir *2. *dZ1v(1)*daai
+          dinti5 = nwgi / Athir *daai + dinti3*aai*aai + 2.*inti3*aai*daai
+       END IF
+       !GENERAL CASE
+    ELSE  
+       bbi = CMPLX(Athir/(nwgi*fkstar),0.) 
+       cci = omFkr*(Zi(pFkr,nion)/Tix(pFkr,nion))/fkstar
+       dcci = (Zi(pFkr,nion)/Tix(pFkr,nion))/fkstar
+
+       ddi = bbi**2 - 4.*cci
+       sqrtdi = SQRT(ddi)
+
+       Vmi = (-bbi-sqrtdi)/2.
+       Vpi = (-bbi+sqrtdi)/2.
+       dVpi = -dcci/sqrtdi
+
+       faci = 2. / (fkstar * (Vpi-Vmi))
+       dfaci = faci * 2.*dcci/ddi
+
+       CALL Zfrieddv(2,(/Vpi,Vmi/),Z1v,Z2v,dZ1v,dZ2v)
+       inti3 = faci * (Z1v(1) - Z1v(2))
+       inti5 = faci * (Z2v(1) - Z2v(2))
+       dinti3 = dfaci * (Z1v(1) - Z1v(2)) + faci * dVpi * (dZ1v(1) + dZ1v(2))
+       dinti5 = dfaci * (Z2v(1) - Z2v(2)) + faci * dVpi * (dZ2v(1) + dZ2v(2))
+    END IF
+
+    alphai = omFkr*(Zi(pFkr,nion)/Tix(pFkr,nion))+Ani(pFkr,nion)-1.5*Ati(pFkr,nion)
+    Fikstarrstar = inti3 * alphai + inti5 * Ati(pFkr,nion)
+    dFikstarrstar = dinti3 * alphai + inti3 * (Zi(pFkr,nion)/Tix(pFkr,nion)) + dinti5 * Ati(pFkr,nion)
+
+    prefac = 1. * fc(pFkr) * coefi(pFkr,nion) * bessm2 * EXP( -(kstar**2 + rstar**2)/2 )/twopi
+    Fkstarrstari_d(1) = prefac * Fikstarrstar
+    Fkstarrstari_d(2) = prefac * dFikstarrstar
+    IF (ABS(Fkstarrstari_d(1)) < SQRT(epsD)) Fkstarrstari_d(:)=0.
+
+  END FUNCTION Fkstarrstari_d
+
 !*************************************************************************************
 ! add Fkstarrstari with finite rotation Fkstarrstarirot, C. Bourdelle, from P. Cottier's QLK version
 !***********************************************************************************
@@ -362,6 +572,7 @@ CONTAINS
     REAL(KIND=DBL)    :: nwge,var2,var3,bessm2
     REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
     COMPLEX(KIND=DBL) :: inte3, inte5
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
     COMPLEX(KIND=DBL) :: Fekstarrstar
     COMPLEX(KIND=DBL) :: Febkstarrstar
 
@@ -414,11 +625,13 @@ CONTAINS
 
        face = 2. / (fkstar * (Vpe-Vme)+epsD)
        IF (caseflag < 5) THEN !differentiate between particle or energy integrals
-          inte3 = face * (Z1(Vpe) - Z1(Vme))
-          inte5 = face * (Z2(Vpe) - Z2(Vme))
+          CALL Zfriedv(2,(/Vpe,Vme/),Z1v,Z2v)
+          inte3 = face * (Z1v(1) - Z1v(2))
+          inte5 = face * (Z2v(1) - Z2v(2))
        ELSE
-          inte3 = face * (Z2(Vpe) - Z2(Vme))
-          inte5 = face * (Z3(Vpe) - Z3(Vme))
+          CALL Zfriedv(2,(/Vpe,Vme/),Z1v,Z2v,Z3v)
+          inte3 = face * (Z2v(1) - Z2v(2))
+          inte5 = face * (Z3v(1) - Z3v(2))
        ENDIF
 
     END IF
@@ -453,6 +666,211 @@ CONTAINS
 
   END FUNCTION Fkstarrstare
 
+  FUNCTION Fkstarrstare_all(ndim, xx)
+    !---------------------------------------------------------------------
+    ! Calculate the f*, k* integrand for passing electrons for all caseflags
+    ! of Fkstarrstare in one pass, for the batched QL integrals. Only the cases set
+    ! in QLcase are calculated, the others are returned as 0
+    !---------------------------------------------------------------------  
+    ! Arguments
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL)   , INTENT(IN) :: xx(ndim)
+    COMPLEX(KIND=DBL), DIMENSION(8) :: Fkstarrstare_all
+
+    REAL(KIND=DBL)    :: Ather 
+    COMPLEX(KIND=DBL) :: aae, bbe, cce, dde, sqrtde, Vme, Vpe, Zae
+    COMPLEX(KIND=DBL) :: face, Z1d, Z2d, Z3d
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
+    REAL(KIND=DBL)    :: nwge,var2,var3,bessm2,prefac
+    REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
+    COMPLEX(KIND=DBL) :: inte3p, inte5p, inte3e, inte5e, inte3, inte5
+    COMPLEX(KIND=DBL) :: Fekstarrstar
+    INTEGER :: caseflag
+
+    Fkstarrstare_all(:) = 0.
+
+    kstar = xx(1)
+    rstar = xx(2)
+
+    teta = kstar*d/REAL(mwidth)/SQRT(2._DBL)
+    !Weighting term for vertical drift freq
+    fkstar = 4./3.*(COS(teta) + (smag(pFkr) * teta - alphax(pFkr) * SIN(teta)) &
+         * SIN(teta))
+    IF (ABS(fkstar)<minfki) fkstar=SIGN(minfki,fkstar)
+
+    !Vertical drift freq
+    nwge = nwg*(-Tex(pFkr)/Ze)
+
+    var2 = (teta/d*Rhoe(pFkr))**2  !!1st argument of Bessel fun
+    var3 = ktetaRhoe**2               !!2nd argument of Bessel fun
+    bessm2 = BESEI0(var2+var3)
+
+    !Transit freq
+    Ather = Athe*rstar/SQRT(2._DBL)
+
+    !Simplified calc for zero vertical freq
+    IF (ABS(fkstar)<minfki) THEN 
+       !Further simplification for zero transit freq
+       IF (rstar<epsD) THEN 
+          inte3p = -1./omFkr*(-Tex(pFkr)/Ze)
+          inte5p = 1.5*inte3p
+       ELSE   
+          aae = omFkr*nwg/Ather
+          Zae=Z1(aae)
+          inte3p = nwge / Ather *2. *Zae
+          inte5p = nwge / Ather *aae + inte3p*aae*aae
+       END IF
+       inte3e = inte3p
+       inte5e = inte5p
+       !GENERAL CASE
+    ELSE  
+       bbe = CMPLX(Ather/(nwge*fkstar),0.) 
+       cce = omFkr*(Ze/Tex(pFkr))/fkstar
+
+       dde = bbe**2 - 4.*cce
+       sqrtde = SQRT(dde)
+
+       Vme = (-bbe-sqrtde)/2.
+       Vpe = (-bbe+sqrtde)/2.
+
+       face = 2. / (fkstar * (Vpe-Vme)+epsD)
+       IF (ANY(QLcase(5:8))) THEN
+          CALL Zfriedv(2,(/Vpe,Vme/),Z1v,Z2v,Z3v)
+       ELSE
+          CALL Zfriedv(2,(/Vpe,Vme/),Z1v,Z2v)
+       ENDIF
+       Z2d = Z2v(1) - Z2v(2)
+       IF (ANY(QLcase(1:4))) THEN
+          Z1d = Z1v(1) - Z1v(2)
+          inte3p = face * Z1d
+          inte5p = face * Z2d
+       ENDIF
+       IF (ANY(QLcase(5:8))) THEN
+          Z3d = Z3v(1) - Z3v(2)
+          inte3e = face * Z2d
+          inte5e = face * Z3d
+       ENDIF
+    END IF
+
+    prefac = 1. * fc(pFkr) * Nex(pFkr) * bessm2 * EXP( -(kstar**2+rstar**2)/2 )/twopi
+
+    DO caseflag = 1,8
+       IF (QLcase(caseflag) .EQV. .FALSE.) CYCLE
+       IF (caseflag < 5) THEN
+          inte3 = inte3p; inte5 = inte5p
+       ELSE
+          inte3 = inte3e; inte5 = inte5e
+       ENDIF
+       SELECT CASE (MOD(caseflag-1,4)+1)
+       CASE (1) !full term for particle or energy
+          Fekstarrstar = inte3 * (omFkr*(Ze/Tex(pFkr))+Ane(pFkr)-1.5*Ate(pFkr)) + inte5 * Ate(pFkr)
+       CASE (2)
+          Fekstarrstar = inte3 * (-1.5) + inte5 
+       CASE (3)
+          Fekstarrstar = inte3 
+       CASE (4)
+          Fekstarrstar = inte3 * omFkr*(Ze/Tex(pFkr))
+       END SELECT
+
+       IF (caseflag < 5) THEN
+          Fkstarrstare_all(caseflag) = prefac * Fekstarrstar
+       ELSE
+          Fkstarrstare_all(caseflag) = prefac * Tex(pFkr) * Fekstarrstar
+       ENDIF
+       IF (ABS(Fkstarrstare_all(caseflag)) < SQRT(epsD)) Fkstarrstare_all(caseflag)=0.
+    ENDDO
+
+  END FUNCTION Fkstarrstare_all
+
+  FUNCTION Fkstarrstare_d(ndim, xx)
+    !---------------------------------------------------------------------
+    ! Passing electron k*, r* integrand of fonct (caseflag 1 of Fkstarrstare)
+    ! and its derivative with respect to omega, for the Newton solver
+    !---------------------------------------------------------------------  
+    ! Arguments
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL)   , INTENT(IN) :: xx(ndim)
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Fkstarrstare_d
+
+    REAL(KIND=DBL)    :: Ather, daae
+    COMPLEX(KIND=DBL) :: aae, bbe, cce, dcce, dde, sqrtde, Vme, Vpe, dVpe
+    COMPLEX(KIND=DBL) :: alphae, face, dface
+    REAL(KIND=DBL)    :: nwge,var2,var3,bessm2,prefac
+    REAL(KIND=DBL)    :: rstar, kstar, teta, fkstar
+    COMPLEX(KIND=DBL) :: inte3, inte5, dinte3, dinte5
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, dZ1v, dZ2v
+    COMPLEX(KIND=DBL) :: Fekstarrstar, dFekstarrstar
+
+    kstar = xx(1)
+    rstar = xx(2)
+
+    teta = kstar*d/REAL(mwidth)/SQRT(2._DBL)
+    !Weighting term for vertical drift freq
+    fkstar = 4./3.*(COS(teta) + (smag(pFkr) * teta - alphax(pFkr) * SIN(teta)) &
+         * SIN(teta))
+    IF (ABS(fkstar)<minfki) fkstar=SIGN(minfki,fkstar)
+
+    !Vertical drift freq
+    nwge = nwg*(-Tex(pFkr)/Ze)
+
+    var2 = (teta/d*Rhoe(pFkr))**2  !!1st argument of Bessel fun
+    var3 = ktetaRhoe**2               !!2nd argument of Bessel fun
+    bessm2 = BESEI0(var2+var3)
+
+    !Transit freq
+    Ather = Athe*rstar/SQRT(2._DBL)
+
+    !Simplified calc for zero vertical freq
+    IF (ABS(fkstar)<minfki) THEN 
+       !Further simplification for zero transit freq
+       IF (rstar<epsD) THEN 
+          inte3 = -1./omFkr*(-Tex(pFkr)/Ze)
+          inte5 = 1.5*inte3
+          dinte3 = -inte3/omFkr
+          dinte5 = 1.5*dinte3
+       ELSE   
+          aae = omFkr*nwg/Ather
+          daae = nwg/Ather
+          CALL Zfrieddv(1,(/aae/),Z1v(1:1),Z2v(1:1),dZ1v(1:1),dZ2v(1:1))
+          inte3 = nwge / Ather *2. *Z1v(1)
+          inte5 = nwge / Ather *aae + inte3*aae*aae
+          dinte3 = nwge / Ather *2. *dZ1v(1)*daae
+          dinte5 = nwge / Ather *daae + dinte3*aae*aae + 2.*inte3*aae*daae
+       END IF
+       !GENERAL CASE
+    ELSE  
+       bbe = CMPLX(Ather/(nwge*fkstar),0.) 
+       cce = omFkr*(Ze/Tex(pFkr))/fkstar
+       dcce = (Ze/Tex(pFkr))/fkstar
+
+       dde = bbe**2 - 4.*cce
+       sqrtde = SQRT(dde)
+
+       Vme = (-bbe-sqrtde)/2.
+       Vpe = (-bbe+sqrtde)/2.
+       dVpe = -dcce/sqrtde
+
+       face = 2. / (fkstar * (Vpe-Vme)+epsD)
+       dface = face**2 * fkstar * dcce/sqrtde
+
+       CALL Zfrieddv(2,(/Vpe,Vme/),Z1v,Z2v,dZ1v,dZ2v)
+       inte3 = face * (Z1v(1) - Z1v(2))
+       inte5 = face * (Z2v(1) - Z2v(2))
+       dinte3 = dface * (Z1v(1) - Z1v(2)) + face * dVpe * (dZ1v(1) + dZ1v(2))
+       dinte5 = dface * (Z2v(1) - Z2v(2)) + face * dVpe * (dZ2v(1) + dZ2v(2))
+    END IF
+
+    alphae = omFkr*(Ze/Tex(pFkr))+Ane(pFkr)-1.5*Ate(pFkr)
+    Fekstarrstar = inte3 * alphae + inte5 * Ate(pFkr)
+    dFekstarrstar = dinte3 * alphae + inte3 * (Ze/Tex(pFkr)) + dinte5 * Ate(pFkr)
+
+    prefac = 1. * fc(pFkr) * Nex(pFkr) * bessm2 * EXP( -(kstar**2+rstar**2)/2 )/twopi
+    Fkstarrstare_d(1) = prefac * Fekstarrstar
+    Fkstarrstare_d(2) = prefac * dFekstarrstar
+    IF (ABS(Fkstarrstare_d(1)) < SQRT(epsD)) Fkstarrstare_d(:)=0.
+
+  END FUNCTION Fkstarrstare_d
+
 !*************************************************************************************
 ! add Fkstarrstare with finite rotation Fkstarrstarerot, C. Bourdelle, from P. Cottier's QLK version
 !***********************************************************************************
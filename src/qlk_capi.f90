@@ -0,0 +1,196 @@
+MODULE qlk_capi
+  !C interface to the qualikiz subroutine, used by python/qlkio/binding.py to run QuaLiKiz in-process.
+  !All arrays are passed by address in Fortran (column major) order, so NumPy arrays in Fortran
+  !order are used without copies. Outputs are passed as a table of addresses (see numout), where
+  !a NULL address leaves that optional output out of the qualikiz call.
+  !qualikiz keeps its state in module variables, so only one call may run at a time in a process
+  USE kind
+  USE mpi
+  USE ISO_C_BINDING
+  USE qlk_tci_module
+
+  IMPLICIT NONE
+
+  PRIVATE
+  PUBLIC :: qualikiz_c, qualikiz_c_finalize, qualikiz_c_numout
+
+  !Number of entries in the output table. Entry i is the output assigned in the CALL outNd(i, ...)
+  !of qualikiz_c, in the same order as OUTPUTS in python/qlkio/binding.py. Entries 1-5 are required
+  INTEGER, PARAMETER :: numout = 51
+
+  !Set when qualikiz_c had to initialize MPI itself, i.e. for serial use from Python
+  LOGICAL, SAVE :: own_mpi = .FALSE.
+
+CONTAINS
+
+  INTEGER(C_INT) FUNCTION qualikiz_c_numout() BIND(C, name='qualikiz_c_numout')
+    qualikiz_c_numout = numout
+  END FUNCTION qualikiz_c_numout
+
+  SUBROUTINE qualikiz_c(dimx, dimn, nions, numsols, phys_meth, coll_flag, rot_flag, verbose, separateflux, kthetarhos, & !general param
+       & x, rho, Ro, Rmin, R0, Bo, qx, smag, alphax, & !geometry input
+       & el_type, Tex, Nex, Ate, Ane, anise, danisedr, & !electron input
+       & ion_type, Ai, Zi, Tix, ninorm, Ati, Ani, anis, danisdr, & !ion input
+       & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
+       & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific input
+       & runcounter, oldsolptr, oldfdsolptr, outptr, nthreads, sched_meth, sched_chunk, contchain, newtonderiv, &
+       & localrefine, periodicquad, solcache, comm) BIND(C, name='qualikiz_c')
+
+    INTEGER(C_INT), VALUE, INTENT(IN) :: dimx, dimn, nions, numsols, phys_meth, coll_flag, rot_flag, verbose, separateflux, el_type
+    INTEGER(C_INT), DIMENSION(dimx,nions), INTENT(IN) :: ion_type
+    REAL(C_DOUBLE), VALUE, INTENT(IN) :: R0
+    REAL(C_DOUBLE), DIMENSION(dimx), INTENT(IN) :: x, rho, Ro, Rmin, Bo, qx, smag, alphax
+    REAL(C_DOUBLE), DIMENSION(dimn), INTENT(IN) :: kthetarhos
+    REAL(C_DOUBLE), DIMENSION(dimx), INTENT(IN) :: Tex, Nex, Ate, Ane, anise, danisedr
+    REAL(C_DOUBLE), DIMENSION(dimx,nions), INTENT(IN) :: Tix, ninorm, Ati, Ani, anis, danisdr, Ai, Zi
+    REAL(C_DOUBLE), DIMENSION(dimx), INTENT(IN) :: Aupar, gammaE, Machtor, Machpar, Autor
+    INTEGER(C_INT), VALUE, INTENT(IN) :: maxruns, maxpts
+    REAL(C_DOUBLE), VALUE, INTENT(IN) :: relacc1, relacc2, timeout, ETGmult, collmult
+    !Newton solver restart: runcounter > 0 with the sol and fdsol of a previous call
+    INTEGER(C_INT), VALUE, INTENT(IN) :: runcounter
+    TYPE(C_PTR), VALUE, INTENT(IN) :: oldsolptr, oldfdsolptr
+    TYPE(C_PTR), DIMENSION(numout), INTENT(IN) :: outptr
+    !OpenMP threads per rank for the (p,nu) tasks
+    INTEGER(C_INT), VALUE, INTENT(IN) :: nthreads
+    !Task scheduler and chunk size, as sched_methin and sched_chunkin of qualikiz (0 for the defaults)
+    INTEGER(C_INT), VALUE, INTENT(IN) :: sched_meth, sched_chunk
+    !Warm started chains along kthetarhos, as contchainin of qualikiz (0 for off)
+    INTEGER(C_INT), VALUE, INTENT(IN) :: contchain
+    !Integrated Newton Jacobian, as newtonderivin of qualikiz (0 for ndif differences)
+    INTEGER(C_INT), VALUE, INTENT(IN) :: newtonderiv
+    !Local contour refinement and periodic quadrature, as localrefinein and periodicquadin of qualikiz (0 for off)
+    INTEGER(C_INT), VALUE, INTENT(IN) :: localrefine, periodicquad
+    !Persistent solution cache in solcache/ of the working directory, as solcachein of qualikiz (0 for off)
+    INTEGER(C_INT), VALUE, INTENT(IN) :: solcache
+    !Fortran handle of the MPI communicator to run on (e.g. from mpi4py Comm.py2f), or < 0 for mpi_comm_world
+    INTEGER(C_INT), VALUE, INTENT(IN) :: comm
+
+    COMPLEX(C_DOUBLE_COMPLEX), DIMENSION(:,:,:), POINTER :: oldsol, oldfdsol
+    REAL(C_DOUBLE), DIMENSION(:), POINTER :: epf_SI, eef_SI, epf_GB, eef_GB
+    REAL(C_DOUBLE), DIMENSION(:), POINTER :: dfe_SI, vte_SI, vce_SI, dfe_GB, vte_GB, vce_GB
+    REAL(C_DOUBLE), DIMENSION(:), POINTER :: chiee_SI, vene_SI, vece_SI, chiee_GB, vene_GB, vece_GB
+    REAL(C_DOUBLE), DIMENSION(:), POINTER :: eefETG_SI, eefETG_GB, modeflag, Nustar, Zeffx
+    REAL(C_DOUBLE), DIMENSION(:,:), POINTER :: ipf_SI, ief_SI, ivf_SI, ipf_GB, ief_GB, ivf_GB
+    REAL(C_DOUBLE), DIMENSION(:,:), POINTER :: dfi_SI, vti_SI, vri_SI, vci_SI, dfi_GB, vti_GB, vri_GB, vci_GB
+    REAL(C_DOUBLE), DIMENSION(:,:), POINTER :: chiei_SI, veni_SI, veri_SI, veci_SI, chiei_GB, veni_GB, veri_GB, veci_GB
+    REAL(C_DOUBLE), DIMENSION(:,:), POINTER :: tasktime
+    REAL(C_DOUBLE), DIMENSION(:,:,:), POINTER :: gam_SI, gam_GB, ome_SI, ome_GB
+    COMPLEX(C_DOUBLE_COMPLEX), DIMENSION(:,:), POINTER :: solflu
+    COMPLEX(C_DOUBLE_COMPLEX), DIMENSION(:,:,:), POINTER :: sol, fdsol
+    LOGICAL :: mpi_started
+    INTEGER :: i, ierror, mycomm, provided
+
+    CALL mpi_initialized(mpi_started, ierror)
+    IF (.NOT. mpi_started) THEN
+       CALL mpi_init_thread(MPI_THREAD_FUNNELED, provided, ierror)
+       own_mpi = .TRUE.
+    ENDIF
+    IF (comm < 0) THEN
+       mycomm = mpi_comm_world
+    ELSE
+       mycomm = comm
+    ENDIF
+
+    !The non optional outputs must always be given
+    DO i=1,5
+       IF (.NOT. C_ASSOCIATED(outptr(i))) THEN
+          WRITE(stderr,*) 'qualikiz_c: epf_SI, eef_SI, ipf_SI, ief_SI and ivf_SI are required outputs! Abandon ship...'
+          CALL mpi_abort(mycomm,-1,ierror)
+       ENDIF
+    ENDDO
+
+    !Disassociated pointers are passed on as absent optional arguments
+    CALL out1d(1, epf_SI) ; CALL out1d(2, eef_SI)
+    CALL out2d(3, ipf_SI) ; CALL out2d(4, ief_SI) ; CALL out2d(5, ivf_SI)
+    CALL out1d(6, epf_GB) ; CALL out1d(7, eef_GB)
+    CALL out2d(8, ipf_GB) ; CALL out2d(9, ief_GB) ; CALL out2d(10, ivf_GB)
+    CALL out3d(11, gam_SI) ; CALL out3d(12, gam_GB) ; CALL out3d(13, ome_SI) ; CALL out3d(14, ome_GB)
+    CALL out1d(15, dfe_SI) ; CALL out1d(16, vte_SI) ; CALL out1d(17, vce_SI)
+    CALL out1d(18, dfe_GB) ; CALL out1d(19, vte_GB) ; CALL out1d(20, vce_GB)
+    CALL out2d(21, dfi_SI) ; CALL out2d(22, vti_SI) ; CALL out2d(23, vri_SI) ; CALL out2d(24, vci_SI)
+    CALL out2d(25, dfi_GB) ; CALL out2d(26, vti_GB) ; CALL out2d(27, vri_GB) ; CALL out2d(28, vci_GB)
+    CALL out1d(29, chiee_SI) ; CALL out1d(30, vene_SI) ; CALL out1d(31, vece_SI)
+    CALL out1d(32, chiee_GB) ; CALL out1d(33, vene_GB) ; CALL out1d(34, vece_GB)
+    CALL out2d(35, chiei_SI) ; CALL out2d(36, veni_SI) ; CALL out2d(37, veri_SI) ; CALL out2d(38, veci_SI)
+    CALL out2d(39, chiei_GB) ; CALL out2d(40, veni_GB) ; CALL out2d(41, veri_GB) ; CALL out2d(42, veci_GB)
+    CALL out1d(43, eefETG_SI) ; CALL out1d(44, eefETG_GB)
+    CALL out1d(45, modeflag) ; CALL out1d(46, Nustar) ; CALL out1d(47, Zeffx)
+    CALL out3d_complex(48, sol) ; CALL out3d_complex(49, fdsol)
+    tasktime => NULL()
+    IF (C_ASSOCIATED(outptr(50))) CALL C_F_POINTER(outptr(50), tasktime, [dimx,dimn])
+    solflu => NULL()
+    IF (C_ASSOCIATED(outptr(51))) CALL C_F_POINTER(outptr(51), solflu, [dimx,dimn])
+
+    oldsol => NULL() ; oldfdsol => NULL()
+    IF (C_ASSOCIATED(oldsolptr)) CALL C_F_POINTER(oldsolptr, oldsol, [dimx,dimn,numsols])
+    IF (C_ASSOCIATED(oldfdsolptr)) CALL C_F_POINTER(oldfdsolptr, oldfdsol, [dimx,dimn,numsols])
+
+    CALL qualikiz(dimx, rho, dimn, nions, numsols, phys_meth, coll_flag, rot_flag, verbose, separateflux, kthetarhos, & !general param
+         & x, Ro, Rmin, R0, Bo, qx, smag, alphax, & !geometry
+         & el_type, Tex, Nex, Ate, Ane, anise, danisedr, & !electrons
+         & ion_type, Ai, Zi, Tix, ninorm, Ati, Ani, anis, danisdr, & !ions
+         & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
+         & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific inputs
+         & epf_SI, eef_SI, ipf_SI, ief_SI, ivf_SI, & ! Non optional outputs
+         & solfluout=solflu, gam_SIout=gam_SI, gam_GBout=gam_GB, ome_SIout=ome_SI, ome_GBout=ome_GB, &
+         & epf_GBout=epf_GB, eef_GBout=eef_GB, dfe_SIout=dfe_SI, vte_SIout=vte_SI, vce_SIout=vce_SI, &
+         & ipf_GBout=ipf_GB, ief_GBout=ief_GB, ivf_GBout=ivf_GB, &
+         & dfi_SIout=dfi_SI, vti_SIout=vti_SI, vri_SIout=vri_SI, vci_SIout=vci_SI, &
+         & dfe_GBout=dfe_GB, vte_GBout=vte_GB, vce_GBout=vce_GB, &
+         & dfi_GBout=dfi_GB, vti_GBout=vti_GB, vri_GBout=vri_GB, vci_GBout=vci_GB, &
+         & vene_SIout=vene_SI, chiee_SIout=chiee_SI, vece_SIout=vece_SI, &
+         & vene_GBout=vene_GB, chiee_GBout=chiee_GB, vece_GBout=vece_GB, &
+         & veni_SIout=veni_SI, chiei_SIout=chiei_SI, veci_SIout=veci_SI, veri_SIout=veri_SI, &
+         & veni_GBout=veni_GB, chiei_GBout=chiei_GB, veci_GBout=veci_GB, veri_GBout=veri_GB, &
+         & eefETG_SIout=eefETG_SI, eefETG_GBout=eefETG_GB, &
+         & modeflagout=modeflag, Nustarout=Nustar, Zeffxout=Zeffx, &
+         & solout=sol, fdsolout=fdsol, tasktimeout=tasktime, &
+         & oldsolin=oldsol, oldfdsolin=oldfdsol, runcounterin=runcounter, &
+         & nthreadsin=nthreads, sched_methin=sched_meth, sched_chunkin=sched_chunk, &
+         & contchainin=contchain, newtonderivin=newtonderiv, &
+         & localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, commin=mycomm)
+
+  CONTAINS
+
+    SUBROUTINE out1d(i, p)
+      INTEGER, INTENT(IN) :: i
+      REAL(C_DOUBLE), DIMENSION(:), POINTER, INTENT(OUT) :: p
+      p => NULL()
+      IF (C_ASSOCIATED(outptr(i))) CALL C_F_POINTER(outptr(i), p, [dimx])
+    END SUBROUTINE out1d
+
+    SUBROUTINE out2d(i, p)
+      INTEGER, INTENT(IN) :: i
+      REAL(C_DOUBLE), DIMENSION(:,:), POINTER, INTENT(OUT) :: p
+      p => NULL()
+      IF (C_ASSOCIATED(outptr(i))) CALL C_F_POINTER(outptr(i), p, [dimx,nions])
+    END SUBROUTINE out2d
+
+    SUBROUTINE out3d(i, p)
+      INTEGER, INTENT(IN) :: i
+      REAL(C_DOUBLE), DIMENSION(:,:,:), POINTER, INTENT(OUT) :: p
+      p => NULL()
+      IF (C_ASSOCIATED(outptr(i))) CALL C_F_POINTER(outptr(i), p, [dimx,dimn,numsols])
+    END SUBROUTINE out3d
+
+    SUBROUTINE out3d_complex(i, p)
+      INTEGER, INTENT(IN) :: i
+      COMPLEX(C_DOUBLE_COMPLEX), DIMENSION(:,:,:), POINTER, INTENT(OUT) :: p
+      p => NULL()
+      IF (C_ASSOCIATED(outptr(i))) CALL C_F_POINTER(outptr(i), p, [dimx,dimn,numsols])
+    END SUBROUTINE out3d_complex
+
+  END SUBROUTINE qualikiz_c
+
+  SUBROUTINE qualikiz_c_finalize() BIND(C, name='qualikiz_c_finalize')
+    !Finalize MPI if qualikiz_c initialized it
+    INTEGER :: ierror
+    LOGICAL :: mpi_done
+
+    IF (.NOT. own_mpi) RETURN
+    CALL mpi_finalized(mpi_done, ierror)
+    IF (.NOT. mpi_done) CALL mpi_finalize(ierror)
+    own_mpi = .FALSE.
+  END SUBROUTINE qualikiz_c_finalize
+
+END MODULE qlk_capi
@@ -36,6 +36,7 @@ PROGRAM qlk_standalone
           & Lecircgteout, Lepieggteout, Lecircgneout, Lepieggneout, Lecircceout, Lepiegceout, Lecircgtiout, Lepieggtiout, Lecircgniout, Lepieggniout, Lecircguiout, Lepiegguiout, Lecircciout, Lepiegciout,&
           & oldsolin, oldfdsolin, runcounterin,&
           & rhominin,rhomaxin,&
+          & sched_methin,sched_chunkin,contchainin,nthreadsin,tasktimein,tasktimeout,newtonderivin,localrefinein,periodicquadin,solcachein,&
           & eefTEM_SIout,epfTEM_SIout,dfeTEM_SIout,vteTEM_SIout,vceTEM_SIout,& !optional outputs from separation of fluxes
           & eefTEM_GBout,epfTEM_GBout,dfeTEM_GBout,vteTEM_GBout,vceTEM_GBout,&
           & eefITG_SIout,epfITG_SIout,dfeITG_SIout,vteITG_SIout,vceITG_SIout,&
@@ -48,7 +49,8 @@ PROGRAM qlk_standalone
           & veneITG_SIout,chieeITG_SIout,veceITG_SIout,veneITG_GBout,chieeITG_GBout,veceITG_GBout, &
           & veneTEM_SIout,chieeTEM_SIout,veceTEM_SIout,veneTEM_GBout,chieeTEM_GBout,veceTEM_GBout, &
           & veniITG_SIout,chieiITG_SIout,veriITG_SIout,veciITG_SIout,veniITG_GBout,chieiITG_GBout,veriITG_GBout,veciITG_GBout, &
-          & veniTEM_SIout,chieiTEM_SIout,veriTEM_SIout,veciTEM_SIout,veniTEM_GBout,chieiTEM_GBout,veriTEM_GBout,veciTEM_GBout)
+          & veniTEM_SIout,chieiTEM_SIout,veriTEM_SIout,veciTEM_SIout,veniTEM_GBout,chieiTEM_GBout,veriTEM_GBout,veciTEM_GBout, &
+          & commin)
 
 
        INTEGER, INTENT(IN) :: dimxin, dimnin, nionsin, numsolsin, phys_methin, coll_flagin, rot_flagin, verbosein, separatefluxin, el_typein
@@ -62,6 +64,9 @@ PROGRAM qlk_standalone
        INTEGER, INTENT(IN) :: maxrunsin, maxptsin
        REAL, INTENT(IN) :: relacc1in, relacc2in, timeoutin, ETGmultin, collmultin, R0in
        REAL, OPTIONAL, INTENT(IN) :: rhominin,rhomaxin
+       INTEGER, OPTIONAL, INTENT(IN) :: sched_methin,sched_chunkin,contchainin,nthreadsin,newtonderivin,localrefinein,periodicquadin,solcachein,commin
+       REAL, DIMENSION(dimxin,dimnin), OPTIONAL, INTENT(IN)  :: tasktimein
+       REAL, DIMENSION(dimxin,dimnin), OPTIONAL, INTENT(OUT)  :: tasktimeout
 
        ! List of output variables: 
        INTEGER, PARAMETER :: ntheta = 64
@@ -139,6 +144,13 @@ PROGRAM qlk_standalone
   REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: Machtor, Autor, Machpar, Aupar, gammaE
   REAL(KIND=DBL) :: relacc1, relacc2, ETGmult, collmult, timeout, R0
   INTEGER :: maxpts,maxruns
+  INTEGER :: sched_meth, sched_chunk, contchain !task scheduler settings
+  INTEGER :: nthreads !OpenMP threads per rank for the (p,nu) tasks
+  INTEGER :: newtonderiv !1: integrated Newton Jacobian, 0: ndif differences
+  INTEGER :: localrefine, periodicquad !1: local contour refinement and periodic quadrature, 0: doubling and davint
+  INTEGER :: solcache !1: persistent solution cache in solcache/, 0: off
+  INTEGER :: output_format !0: ASCII .dat files, 1: single HDF5 file output/qlkrun.h5, 2: both
+  REAL(KIND=DBL) , DIMENSION(:,:), ALLOCATABLE :: tasktime, tasktimeprev !task wall times of this and the previous run
 
   ! Output arrays. The 3 dimensions are 'radial grid', 'kthetarhos grid', 'number of modes'
   REAL(KIND=DBL) , DIMENSION(:), ALLOCATABLE :: krmmuITG,krmmuETG
@@ -193,6 +205,11 @@ PROGRAM qlk_standalone
 
   LOGICAL :: exist1, exist2, exist3, exist4, exist5 !used for checking for existence of files
 
+  !Binary restart state of the last run (run number, grid, sol and fdsol), read instead of the primitive .dat files
+  CHARACTER(len=*), PARAMETER :: restartfile = 'output/primitive/restart.bin'
+  INTEGER, PARAMETER :: restartver = 1 !Layout version of restartfile
+  REAL(KIND=DBL), PARAMETER :: restarttol = 1d-6 !Relative change of kthetarhos, x or rho above which the grid is considered changed
+
   !DEBUGGING
   CHARACTER(len=20) :: fmtx,fmtn,fmtion,fmtintion,fmtxrow,fmtecoef
   INTEGER :: i,j,k,l,stat,myunit
@@ -239,6 +256,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, epf_cmout=epf_cm,eef_cmout=eef_cm, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, ipf_cmout=ipf_cm,ief_cmout=ief_cm, ivf_cmout=ivf_cm, & !optional ion flux outputs
@@ -261,6 +279,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -286,6 +305,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -317,6 +337,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, epf_cmout=epf_cm,eef_cmout=eef_cm, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, ipf_cmout=ipf_cm,ief_cmout=ief_cm, ivf_cmout=ivf_cm, & !optional ion flux outputs
@@ -337,6 +358,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -360,6 +382,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -394,6 +417,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, epf_cmout=epf_cm,eef_cmout=eef_cm, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, ipf_cmout=ipf_cm,ief_cmout=ief_cm, ivf_cmout=ivf_cm, & !optional ion flux outputs
@@ -420,6 +444,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -457,6 +482,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -511,6 +537,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, epf_cmout=epf_cm,eef_cmout=eef_cm, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, ipf_cmout=ipf_cm,ief_cmout=ief_cm, ivf_cmout=ivf_cm, & !optional ion flux outputs
@@ -535,6 +562,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult,  & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -570,6 +598,7 @@ PROGRAM qlk_standalone
                 & Machtor, Autor, Machpar, Aupar, gammaE, & !rotation input
                 & maxruns, maxpts, relacc1, relacc2, timeout, ETGmult, collmult, & !code specific inputs
                 & epf_SI,eef_SI,ipf_SI,ief_SI, ivf_SI, & ! Non optional outputs
+                & sched_methin=sched_meth, sched_chunkin=sched_chunk, contchainin=contchain, nthreadsin=nthreads, tasktimein=tasktimeprev, tasktimeout=tasktime, newtonderivin=newtonderiv, localrefinein=localrefine, periodicquadin=periodicquad, solcachein=solcache, & !task scheduler and solver settings
                 & solflu_SIout=solflu_SI, solflu_GBout=solflu_GB, gam_SIout=gam_SI,gam_GBout=gam_GB,ome_SIout=ome_SI,ome_GBout=ome_GB, & !optional growth rate and frequency output
                 & epf_GBout=epf_GB,eef_GBout=eef_GB, dfe_SIout=dfe_SI,vte_SIout=vte_SI,vce_SIout=vce_SI,epf_cmout=epf_cm,eef_cmout=eef_cm, ckeout=cke, & !optional electron flux outputs
                 & ipf_GBout=ipf_GB,ief_GBout=ief_GB, ivf_GBout=ivf_GB, dfi_SIout=dfi_SI,vti_SIout=vti_SI,vri_SIout=vri_SI, vci_SIout=vci_SI,ipf_cmout=ipf_cm,ief_cmout=ief_cm,ivf_cmout=ivf_cm, ckiout=cki, & !optional ion flux outputs
@@ -629,7 +658,7 @@ PROGRAM qlk_standalone
 
   CALL MPI_Barrier(mpi_comm_world,ierror)
 
-  !WRITE(stdout,*) 'Z function was called ',weidcount,' times' 
+  !WRITE(stdout,*) 'Z function was called ',weidtotal,' times' 
   !WRITE(stdout,*)
   !WRITE(stdout,"(A,I0,A,I0)") '*** time: ',timetot, 'seconds, for rank = ',myrank 
   !WRITE(stdout,"(A,I0)") '*** End of job for rank ',myrank
@@ -658,7 +687,7 @@ CONTAINS
   SUBROUTINE data_init()
     !Parallel read data, allocate input and output arrays
     INTEGER, PARAMETER :: ktype = 1 ! BINARY FILES
-    INTEGER :: fileno,ierr
+    INTEGER :: fileno,ierr,restartstat,nrows,ncols
     REAL(kind=DBL) :: dummy !dummy variable for obtaining input. Must be real for readvar
 
     REAL(kind=DBL), DIMENSION(:), ALLOCATABLE :: dummyn
@@ -668,6 +697,8 @@ CONTAINS
 
     INTEGER :: dimxtmp,dimntmp,nionstmp,phys_methtmp,coll_flagtmp,rot_flagtmp,verbosetmp, write_primitmp
     INTEGER :: separatefluxtmp,numsolstmp,maxrunstmp,maxptstmp,el_typetmp,runcountertmp
+    INTEGER :: sched_methtmp,sched_chunktmp,contchaintmp,nthreadstmp,newtonderivtmp,localrefinetmp,periodicquadtmp,solcachetmp,output_formattmp
+    REAL(kind=DBL), DIMENSION(:,:), ALLOCATABLE :: dummyxn, tasktimeprevtmp
     REAL(kind=DBL) :: relacc1tmp,relacc2tmp,timeouttmp,R0tmp,ETGmulttmp,collmulttmp
     REAL(kind=DBL), DIMENSION(:), ALLOCATABLE :: kthetarhostmp 
     REAL(kind=DBL), DIMENSION(:), ALLOCATABLE :: xtmp,rhotmp,Rotmp,Rmintmp,Botmp,qxtmp,smagtmp,alphaxtmp
@@ -681,52 +712,59 @@ CONTAINS
 
     inputdir = 'input/'
 
+    ! Single-file input bundle if present. Every rank then holds all inputs and the
+    ! per-variable AllReduce below is skipped
+    CALL readbundle(inputdir // 'qlkinput.bin', myunit)
+
     fileno = 0
 
     ! p{1} Size of radial or scan arrays
     dimx = 0
-    IF (myrank == fileno) dimx = INT(readvar(inputdir // 'dimx.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) dimx = INT(readvar(inputdir // 'dimx.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{2} Size of wavenumber arrays
     dimn = 0
-    IF (myrank == fileno) dimn = INT(readvar(inputdir // 'dimn.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) dimn = INT(readvar(inputdir // 'dimn.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{3} Number of ions in system
     nions = 0
-    IF (myrank == fileno) nions = INT(readvar(inputdir // 'nions.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) nions = INT(readvar(inputdir // 'nions.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{9} Number of total saught after solutions
     numsols = 0
-    IF (myrank == fileno) numsols = INT(readvar(inputdir // 'numsols.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) numsols = INT(readvar(inputdir // 'numsols.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{12} Number of runs before runcounter resets
     maxruns = 0
-    IF (myrank == fileno) maxruns = INT(readvar(inputdir // 'maxruns.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) maxruns = INT(readvar(inputdir // 'maxruns.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
-    CALL MPI_Barrier(mpi_comm_world,ierror)
-    CALL MPI_AllReduce(dimx,dimxtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(dimn,dimntmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(nions,nionstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(numsols,numsolstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(maxruns,maxrunstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_Barrier(mpi_comm_world,ierror)
+    IF (.NOT. bundle_loaded) THEN
+       CALL MPI_Barrier(mpi_comm_world,ierror)
+       CALL MPI_AllReduce(dimx,dimxtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(dimn,dimntmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(nions,nionstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(numsols,numsolstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(maxruns,maxrunstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_Barrier(mpi_comm_world,ierror)
 
-    dimx=dimxtmp
-    dimn=dimntmp
-    nions=nionstmp
-    numsols=numsolstmp
-    maxruns=maxrunstmp !maxruns called before since it is needed for runcounter evaluation
+       dimx=dimxtmp
+       dimn=dimntmp
+       nions=nionstmp
+       numsols=numsolstmp
+       maxruns=maxrunstmp !maxruns called before since it is needed for runcounter evaluation
+    ENDIF
 
     ! ALLOCATE TEMP ARRAYS FOR ALLREDUCE
     ALLOCATE(dummyn(dimn))
     ALLOCATE(dummyx(dimx))
     ALLOCATE(dummyxnions(dimx,nions))
     ALLOCATE(dummyxnnumsol(dimx,dimn,numsols))
+    ALLOCATE(dummyxn(dimx,dimn))
 
     ALLOCATE(kthetarhostmp(dimn))
     ALLOCATE(xtmp(dimx))
@@ -764,123 +802,123 @@ CONTAINS
 
     ! p{4} Flag for calculating decomposition of particle and heat transport into diffusive and convective components
     phys_meth = 0
-    IF (myrank == fileno) phys_meth = INT(readvar(inputdir // 'phys_meth.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) phys_meth = INT(readvar(inputdir // 'phys_meth.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{5} Flag for including collisions
     coll_flag = 0
-    IF (myrank == fileno) coll_flag = INT(readvar(inputdir // 'coll_flag.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) coll_flag = INT(readvar(inputdir // 'coll_flag.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     write_primi = 0
-    IF (myrank == fileno) write_primi = INT(readvar(inputdir // 'write_primi.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) write_primi = INT(readvar(inputdir // 'write_primi.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{6} Flag for including rotation
     rot_flag = 0
-    IF (myrank == fileno) rot_flag = INT(readvar(inputdir // 'rot_flag.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) rot_flag = INT(readvar(inputdir // 'rot_flag.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{7} Flag for verbose output
     verbose = 0
-    IF (myrank == fileno) verbose = INT(readvar(inputdir // 'verbose.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) verbose = INT(readvar(inputdir // 'verbose.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{8} Flag for separate mode flux output
     separateflux = 0
-    IF (myrank == fileno) separateflux = INT(readvar(inputdir // 'separateflux.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) separateflux = INT(readvar(inputdir // 'separateflux.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{10} 1D integral accuracy
     relacc1 = 0
-    IF (myrank == fileno) relacc1 = readvar(inputdir // 'relacc1.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) relacc1 = readvar(inputdir // 'relacc1.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{11} 2D integral accuracy
     relacc2 = 0
-    IF (myrank == fileno) relacc2 = readvar(inputdir // 'relacc2.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) relacc2 = readvar(inputdir // 'relacc2.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{13} Maximum number of integrand evaluations in 2D integration routine
     maxpts = 0
-    IF (myrank == fileno) maxpts = INT(readvar(inputdir // 'maxpts.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) maxpts = INT(readvar(inputdir // 'maxpts.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{14} Timeout seconds for a given solution search
     timeout = 0
-    IF (myrank == fileno) timeout = readvar(inputdir // 'timeout.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) timeout = readvar(inputdir // 'timeout.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{15} Multiplier for ETG saturation rule (default 1. Mostly for testing)
     ETGmult = 0
-    IF (myrank == fileno) ETGmult = readvar(inputdir // 'ETGmult.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) ETGmult = readvar(inputdir // 'ETGmult.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{16} Multiplier for collisionality (default 1. Mostly for testing)
     collmult = 0
-    IF (myrank == fileno) collmult = readvar(inputdir // 'collmult.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) collmult = readvar(inputdir // 'collmult.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{17} R0 geometric major radius (for normalizations)
     R0 = 0
-    IF (myrank == fileno) R0 = readvar(inputdir // 'R0.bin', dummy, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) R0 = readvar(inputdir // 'R0.bin', dummy, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{18} Toroidal wave-number grid
     ALLOCATE(kthetarhos(dimn)); kthetarhos = 0 
-    IF (myrank == fileno) kthetarhos = readvar(inputdir // 'kthetarhos.bin', dummyn, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) kthetarhos = readvar(inputdir // 'kthetarhos.bin', dummyn, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{19} Normalised radial coordinate (midplane radius)
     ALLOCATE(x(dimx)); x=0
-    IF (myrank == fileno) x = readvar(inputdir // 'x.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) x = readvar(inputdir // 'x.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{20} Normalised radial coordinate (midplane radius)
     ALLOCATE(rho(dimx)); rho=0
-    IF (myrank == fileno) rho = readvar(inputdir // 'rho.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) rho = readvar(inputdir // 'rho.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{21} <Ro> major radius
     ALLOCATE(Ro(dimx)); Ro=0
-    IF (myrank == fileno) Ro = readvar(inputdir // 'Ro.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Ro = readvar(inputdir // 'Ro.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{22} <a> minor radius
     ALLOCATE(Rmin(dimx)); Rmin=0
-    IF (myrank == fileno) Rmin = readvar(inputdir // 'Rmin.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Rmin = readvar(inputdir // 'Rmin.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{23} B(rho) magnetic field
     ALLOCATE(Bo(dimx)); Bo=0
-    IF (myrank == fileno) Bo = readvar(inputdir // 'Bo.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Bo = readvar(inputdir // 'Bo.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{24} q(rho) profile
     ALLOCATE(qx(dimx)); qx=0
-    IF (myrank == fileno) qx = readvar(inputdir // 'q.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) qx = readvar(inputdir // 'q.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{25} s(rho) profile
     ALLOCATE(smag(dimx)); smag=0
-    IF (myrank == fileno) smag = readvar(inputdir // 'smag.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) smag = readvar(inputdir // 'smag.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{26} alpha(rho) profile
     ALLOCATE(alphax(dimx)); alphax=0
-    IF (myrank == fileno) alphax = readvar(inputdir // 'alpha.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) alphax = readvar(inputdir // 'alpha.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{27} Machtor(rho) profile
     ALLOCATE(Machtor(dimx)); Machtor=0
-    IF (myrank == fileno) Machtor = readvar(inputdir // 'Machtor.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Machtor = readvar(inputdir // 'Machtor.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
 !!$    WHERE(ABS(Machtor) < epsD) Machtor = epsD
 
     ! p{28} Autor(rho) profile
     ALLOCATE(Autor(dimx)); Autor=0
-    IF (myrank == fileno) THEN 
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN 
        Autor = readvar(inputdir // 'Autor.bin', dummyx, ktype, myunit)
        WHERE(ABS(Autor) < epsD) Autor = epsD
     ENDIF
@@ -888,13 +926,13 @@ CONTAINS
 
     ! p{29} Machpar(rho) profile
     ALLOCATE(Machpar(dimx)); Machpar=0
-    IF (myrank == fileno) Machpar = readvar(inputdir // 'Machpar.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Machpar = readvar(inputdir // 'Machpar.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 !!$    WHERE(ABS(Machpar) < epsD) Machpar = epsD
 
     ! p{30} Aupar(rho) profile
     ALLOCATE(Aupar(dimx)); Aupar=0
-    IF (myrank == fileno) THEN
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
        Aupar = readvar(inputdir // 'Aupar.bin', dummyx, ktype, myunit)
        WHERE(ABS(Aupar) < epsD) Aupar = epsD
     ENDIF
@@ -902,7 +940,7 @@ CONTAINS
 
     ! p{31} gammaE(rho) profile
     ALLOCATE(gammaE(dimx)); gammaE=0
-    IF (myrank == fileno) THEN
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
        gammaE = readvar(inputdir // 'gammaE.bin', dummyx, ktype, myunit)
        WHERE(ABS(gammaE) < epsD) gammaE = epsD
     ENDIF
@@ -910,17 +948,17 @@ CONTAINS
 
     ! p{32} Te(rho) profile
     ALLOCATE(Tex(dimx)); Tex=0
-    IF (myrank == fileno) Tex = readvar(inputdir // 'Te.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Tex = readvar(inputdir // 'Te.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{33} ne(rho) profile
     ALLOCATE(Nex(dimx)); Nex=0
-    IF (myrank == fileno) Nex = readvar(inputdir // 'ne.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Nex = readvar(inputdir // 'ne.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{34} R/LTe(rho) profile
     ALLOCATE(Ate(dimx)); Ate=0
-    IF (myrank == fileno) THEN 
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN 
        Ate = readvar(inputdir // 'Ate.bin', dummyx, ktype, myunit)
        WHERE(ABS(Ate) < epsD) Ate = epsD
     ENDIF
@@ -928,7 +966,7 @@ CONTAINS
 
     ! p{35} R/Lne(rho) profile
     ALLOCATE(Ane(dimx)); Ane=0
-    IF (myrank == fileno) THEN 
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN 
        Ane = readvar(inputdir // 'Ane.bin', dummyx, ktype, myunit)
        WHERE(ABS(Ane) < epsD) Ane = epsD
        WHERE(Ane+Ate < epsD) Ane = Ane+epsD
@@ -937,17 +975,17 @@ CONTAINS
 
     ! p{36} Flag for adiabatic electrons
     el_type = 0
-    IF (myrank == fileno) el_type = INT(readvar(inputdir // 'typee.bin', dummy, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) el_type = INT(readvar(inputdir // 'typee.bin', dummy, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{37} Species temp anisotropy at LFS. Zero is electrons
     ALLOCATE(anise(dimx)); anise=0
-    IF (myrank == fileno) anise = readvar(inputdir // 'anise.bin', dummyx, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) anise = readvar(inputdir // 'anise.bin', dummyx, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{38} Species temp anisotropy at LFS. Zero is electrons
     ALLOCATE(danisedr(dimx)); danisedr=0
-    IF (myrank == fileno)  THEN
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
        danisedr = readvar(inputdir // 'danisdre.bin', dummyx, ktype, myunit)
        WHERE(ABS(danisedr) < epsD) danisedr = epsD
     ENDIF
@@ -955,17 +993,17 @@ CONTAINS
 
     ! p{39} Ti(rho) profiles
     ALLOCATE(Tix(dimx,nions)); Tix=0
-    IF (myrank == fileno) Tix = readvar(inputdir // 'Ti.bin', dummyxnions, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Tix = readvar(inputdir // 'Ti.bin', dummyxnions, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{40} ni/ne (rho) profiles
     ALLOCATE(ninorm(dimx,nions)); ninorm=0
-    IF (myrank == fileno) ninorm = readvar(inputdir // 'normni.bin', dummyxnions, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) ninorm = readvar(inputdir // 'normni.bin', dummyxnions, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{41} R/LTi(rho) profiles
     ALLOCATE(Ati(dimx,nions)); Ati=0
-    IF (myrank == fileno) THEN
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
        Ati = readvar(inputdir // 'Ati.bin', dummyxnions, ktype, myunit)
        WHERE(ABS(Ati) < epsD) Ati = epsD
     ENDIF
@@ -973,7 +1011,7 @@ CONTAINS
 
     ! p{42} R/Lni(rho) profiles
     ALLOCATE(Ani(dimx,nions)); Ani=0
-    IF (myrank == fileno) THEN 
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN 
        Ani = readvar(inputdir // 'Ani.bin', dummyxnions, ktype, myunit)
        WHERE(ABS(Ani) < epsD) Ani = epsD
        WHERE(Ani+Ati < epsD) Ani = Ani+epsD
@@ -982,17 +1020,17 @@ CONTAINS
 
     ! p{43} Ion types
     ALLOCATE(ion_type(dimx,nions)); ion_type=0
-    IF (myrank == fileno) ion_type = INT(readvar(inputdir // 'typei.bin', dummyxnions, ktype, myunit))
+    IF ((myrank == fileno) .OR. bundle_loaded) ion_type = INT(readvar(inputdir // 'typei.bin', dummyxnions, ktype, myunit))
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{44} Species temp anisotropy at LFS. Zero is electrons
     ALLOCATE(anis(dimx,1:nions)); anis=0
-    IF (myrank == fileno) anis = readvar(inputdir // 'anisi.bin', dummyxnions, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) anis = readvar(inputdir // 'anisi.bin', dummyxnions, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{45} Species temp anisotropy at LFS. Zero is electrons
     ALLOCATE(danisdr(dimx,1:nions)); danisdr=0
-    IF (myrank == fileno) THEN 
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN 
        danisdr = readvar(inputdir // 'danisdri.bin', dummyxnions, ktype, myunit)
        WHERE(ABS(danisdr) < epsD) danisdr = epsD
     ENDIF
@@ -1000,16 +1038,87 @@ CONTAINS
 
     ! p{46} Main ion mass
     ALLOCATE(Ai(dimx,nions)); Ai=0
-    IF (myrank == fileno) Ai = readvar(inputdir // 'Ai.bin', dummyxnions, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Ai = readvar(inputdir // 'Ai.bin', dummyxnions, ktype, myunit)
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     ! p{47} Main ion charge
     ALLOCATE(Zi(dimx,nions)); Zi=0
-    IF (myrank == fileno) Zi = readvar(inputdir // 'Zi.bin', dummyxnions, ktype, myunit)
+    IF ((myrank == fileno) .OR. bundle_loaded) Zi = readvar(inputdir // 'Zi.bin', dummyxnions, ktype, myunit)
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    ! Optional task scheduler settings. The single task master/slave loop if absent
+    sched_meth = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'sched_meth.bin')
+       IF (exist1) sched_meth = INT(readvar(inputdir // 'sched_meth.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    sched_chunk = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'sched_chunk.bin')
+       IF (exist1) sched_chunk = INT(readvar(inputdir // 'sched_chunk.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    ! Optional warm started chains along kthetarhos. Off if absent
+    contchain = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'contchain.bin')
+       IF (exist1) contchain = INT(readvar(inputdir // 'contchain.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    nthreads = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'nthreads.bin')
+       IF (exist1) THEN
+          nthreads = INT(readvar(inputdir // 'nthreads.bin', dummy, ktype, myunit))
+       ELSE
+          nthreads = 1
+       ENDIF
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    ! Optional integrated Newton Jacobian. ndif differences if absent
+    newtonderiv = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'newtonderiv.bin')
+       IF (exist1) newtonderiv = INT(readvar(inputdir // 'newtonderiv.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    ! Optional local contour refinement and periodic quadrature. Off if absent
+    localrefine = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'localrefine.bin')
+       IF (exist1) localrefine = INT(readvar(inputdir // 'localrefine.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    periodicquad = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'periodicquad.bin')
+       IF (exist1) periodicquad = INT(readvar(inputdir // 'periodicquad.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    solcache = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'solcache.bin')
+       IF (exist1) solcache = INT(readvar(inputdir // 'solcache.bin', dummy, ktype, myunit))
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0 
+
+    output_format = 0
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
+       exist1 = input_exists(inputdir // 'output_format.bin')
+       IF (exist1) output_format = INT(readvar(inputdir // 'output_format.bin', dummy, ktype, myunit))
+    ENDIF
     fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
     runcounter = 0
-    IF (myrank == fileno) THEN
+    IF ((myrank == fileno) .OR. bundle_loaded) THEN
        ! Read and write runcounter input to decide course of action in calcroutines (full solution or start from previous solution)
        INQUIRE(file="runcounter.dat", EXIST=exist1)
        INQUIRE(file="output/primitive/rsol.dat", EXIST=exist2)
@@ -1032,153 +1141,205 @@ CONTAINS
 
     WRITE(fmtn,'(A,I0, A)') '(',dimn,'G16.7)'
 
-    CALL MPI_Barrier(mpi_comm_world,ierror)
+    IF (.NOT. bundle_loaded) THEN
+       CALL MPI_Barrier(mpi_comm_world,ierror)
 
-    !Now do MPIAllReduce to inputs. We need runcounter for potential next stage, so
-    !the reduce operations are split
-
-    CALL MPI_AllReduce(phys_meth,phys_methtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(coll_flag,coll_flagtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(write_primi,write_primitmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(rot_flag,rot_flagtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(verbose,verbosetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(separateflux,separatefluxtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(numsols,numsolstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(maxpts,maxptstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(el_type,el_typetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(runcounter,runcountertmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-
-    CALL MPI_AllReduce(relacc1,relacc1tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(relacc2,relacc2tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(timeout,timeouttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ETGmult,ETGmulttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(collmult,collmulttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(R0,R0tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(kthetarhos,kthetarhostmp,dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(x,xtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(rho,rhotmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ro,Rotmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Rmin,Rmintmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Bo,Botmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(qx,qxtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(smag,smagtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(alphax,alphaxtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Machtor,Machtortmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Autor,Autortmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Machpar,Machpartmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Aupar,Aupartmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(gammaE,gammaEtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Tex,Textmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Nex,Nextmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ate,Atetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ane,Anetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(anise,anisetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(danisedr,danisedrtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Tix,Tixtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ninorm,ninormtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ati,Atitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ani,Anitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(anis,anistmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(danisdr,danisdrtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(ion_type,ion_typetmp,dimx*nions,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Ai,Aitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
-    CALL MPI_AllReduce(Zi,Zitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       !Now do MPIAllReduce to inputs. We need runcounter for potential next stage, so
+       !the reduce operations are split
+
+       CALL MPI_AllReduce(phys_meth,phys_methtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(coll_flag,coll_flagtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(write_primi,write_primitmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(rot_flag,rot_flagtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(verbose,verbosetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(separateflux,separatefluxtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(numsols,numsolstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(maxpts,maxptstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(el_type,el_typetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(runcounter,runcountertmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(sched_meth,sched_methtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(sched_chunk,sched_chunktmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(contchain,contchaintmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(nthreads,nthreadstmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(newtonderiv,newtonderivtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(localrefine,localrefinetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(periodicquad,periodicquadtmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(solcache,solcachetmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(output_format,output_formattmp,1,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+
+       CALL MPI_AllReduce(relacc1,relacc1tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(relacc2,relacc2tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(timeout,timeouttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(ETGmult,ETGmulttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(collmult,collmulttmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(R0,R0tmp,1,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(kthetarhos,kthetarhostmp,dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(x,xtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(rho,rhotmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ro,Rotmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Rmin,Rmintmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Bo,Botmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(qx,qxtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(smag,smagtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(alphax,alphaxtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Machtor,Machtortmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Autor,Autortmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Machpar,Machpartmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Aupar,Aupartmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(gammaE,gammaEtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Tex,Textmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Nex,Nextmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ate,Atetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ane,Anetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(anise,anisetmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(danisedr,danisedrtmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Tix,Tixtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(ninorm,ninormtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ati,Atitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ani,Anitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(anis,anistmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(danisdr,danisdrtmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(ion_type,ion_typetmp,dimx*nions,MPI_INTEGER,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Ai,Aitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+       CALL MPI_AllReduce(Zi,Zitmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
 
-    CALL MPI_Barrier(mpi_comm_world,ierror)
+       CALL MPI_Barrier(mpi_comm_world,ierror)
+
+       phys_meth=phys_methtmp
+       coll_flag=coll_flagtmp
+       write_primi=write_primitmp
+       rot_flag=rot_flagtmp
+       verbose=verbosetmp
+       separateflux=separatefluxtmp
+
+       maxpts=maxptstmp
+       runcounter=runcountertmp
+       sched_meth=sched_methtmp
+       sched_chunk=sched_chunktmp
+       contchain=contchaintmp
+       nthreads=nthreadstmp
+       newtonderiv=newtonderivtmp
+       localrefine=localrefinetmp
+       periodicquad=periodicquadtmp
+       solcache=solcachetmp
+       output_format=output_formattmp
+       el_type=el_typetmp
+       relacc1=relacc1tmp
+       relacc2=relacc2tmp
+       timeout=timeouttmp
+       ETGmult=ETGmulttmp
+       collmult=collmulttmp
+       R0=R0tmp
+       kthetarhos=kthetarhostmp
+       x=xtmp
+       rho=rhotmp
+       Ro=Rotmp
+       Rmin=Rmintmp
+       Bo=Botmp
+       qx=qxtmp
+       smag=smagtmp
+       alphax=alphaxtmp
+       Machtor=Machtortmp
+       Autor=Autortmp
+       Machpar=Machpartmp
+       Aupar=Aupartmp
+       gammaE=gammaEtmp
+       Tex=Textmp
+       Nex=Nextmp
+       Ate=Atetmp
+       Ane=Anetmp
+       anise=anisetmp
+       danisedr=danisedrtmp
+       Tix=Tixtmp
+       ninorm=ninormtmp
+       Ati=Atitmp
+       Ani=Anitmp
+       anis=anistmp
+       danisdr=danisdrtmp
+       ion_type=ion_typetmp
+       Ai=Aitmp
+       Zi=Zitmp
+    ENDIF
+    CALL freebundle()
 
-    phys_meth=phys_methtmp
-    coll_flag=coll_flagtmp
-    write_primi=write_primitmp
-    rot_flag=rot_flagtmp
-    verbose=verbosetmp
-    separateflux=separatefluxtmp
-
-    maxpts=maxptstmp
-    runcounter=runcountertmp
-    el_type=el_typetmp
-    relacc1=relacc1tmp
-    relacc2=relacc2tmp
-    timeout=timeouttmp
-    ETGmult=ETGmulttmp
-    collmult=collmulttmp
-    R0=R0tmp
-    kthetarhos=kthetarhostmp
-    x=xtmp
-    rho=rhotmp
-    Ro=Rotmp
-    Rmin=Rmintmp
-    Bo=Botmp
-    qx=qxtmp
-    smag=smagtmp
-    alphax=alphaxtmp
-    Machtor=Machtortmp
-    Autor=Autortmp
-    Machpar=Machpartmp
-    Aupar=Aupartmp
-    gammaE=gammaEtmp
-    Tex=Textmp
-    Nex=Nextmp
-    Ate=Atetmp
-    Ane=Anetmp
-    anise=anisetmp
-    danisedr=danisedrtmp
-    Tix=Tixtmp
-    ninorm=ninormtmp
-    Ati=Atitmp
-    Ani=Anitmp
-    anis=anistmp
-    danisdr=danisdrtmp
-    ion_type=ion_typetmp
-    Ai=Aitmp
-    Zi=Zitmp
-
-    IF (runcounter /= 0) THEN !load old rsol and isol if we're not doing a reset run
-       ALLOCATE( oldrsol (dimx, dimn, numsols) ); oldrsol = 0
-       ALLOCATE( oldisol (dimx, dimn, numsols) ); oldisol = 0
-       ALLOCATE( oldrfdsol (dimx, dimn, numsols) ) ; oldrfdsol = 0
-       ALLOCATE( oldifdsol (dimx, dimn, numsols) ); oldifdsol = 0
+    ! Task wall times of the previous run, used to order the tasks longest-first. Cost model only if absent
+    ALLOCATE(tasktimeprev(dimx,dimn)); tasktimeprev = 0
+    ALLOCATE(tasktimeprevtmp(dimx,dimn))
+    IF (myrank == fileno) THEN
+       INQUIRE(file="output/primitive/tasktime.dat", EXIST=exist1)
+       IF (exist1) THEN !Ignored if left over from a run on another (dimx,dimn) grid
+          CALL txtshape("output/primitive/tasktime.dat", myunit, nrows, ncols)
+          IF ((nrows == dimx) .AND. (ncols == dimn)) THEN
+             tasktimeprev = readvar_2d_txt("output/primitive/tasktime.dat", dummyxn, ktype, myunit)
+          ELSE
+             WRITE(stdout,"(A)") 'output/primitive/tasktime.dat does not match dimx and dimn: not used to order the tasks'
+          ENDIF
+       ENDIF
+    ENDIF
+    fileno=fileno+1; IF (fileno==nproc) fileno=0
+    CALL MPI_AllReduce(tasktimeprev,tasktimeprevtmp,dimx*dimn,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierr)
+    tasktimeprev = tasktimeprevtmp
+    DEALLOCATE(tasktimeprevtmp)
+
+    IF (runcounter /= 0) THEN !load old sol and fdsol if we're not doing a reset run
        ALLOCATE( oldsol (dimx, dimn, numsols) ); oldsol = 0
        ALLOCATE( oldfdsol (dimx, dimn, numsols) ); oldfdsol = 0
 
-       primitivedir = "output/primitive/"
-       myfmt = 'G16.7E3'
-       IF (myrank == fileno) THEN
-           oldrsol = readvar(primitivedir // 'rsol.dat', dummyxnnumsol, ktype, myunit)
-           CALL writevar(primitivedir // 'rsol_old.dat', oldrsol, myfmt, myunit)
-       ENDIF
-       fileno=fileno+1; IF (fileno==nproc) fileno=0 
+       ! One binary read on rank 0 and a broadcast. The .dat files are only read if the restart file is absent or was
+       ! not written by the previous run, and a full run is done if the grid changed
+       IF (myrank == 0) restartstat = readrestart()
+       CALL MPI_Bcast(restartstat,1,MPI_INTEGER,0,mpi_comm_world,ierr)
+       IF (restartstat == 1) THEN
+          CALL MPI_Bcast(oldsol,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,0,mpi_comm_world,ierr)
+          CALL MPI_Bcast(oldfdsol,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,0,mpi_comm_world,ierr)
+       ELSEIF (restartstat == -1) THEN
+          runcounter = 0
+       ELSE
+          ALLOCATE( oldrsol (dimx, dimn, numsols) ); oldrsol = 0
+          ALLOCATE( oldisol (dimx, dimn, numsols) ); oldisol = 0
+          ALLOCATE( oldrfdsol (dimx, dimn, numsols) ) ; oldrfdsol = 0
+          ALLOCATE( oldifdsol (dimx, dimn, numsols) ); oldifdsol = 0
+
+          primitivedir = "output/primitive/"
+          myfmt = 'G16.7E3'
+          IF (myrank == fileno) THEN
+              oldrsol = readvar(primitivedir // 'rsol.dat', dummyxnnumsol, ktype, myunit)
+              CALL writevar(primitivedir // 'rsol_old.dat', oldrsol, myfmt, myunit, dimnames='dimx,dimn,numsols')
+          ENDIF
+          fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
-       IF (myrank == fileno) THEN
-           oldisol = readvar(primitivedir // 'isol.dat', dummyxnnumsol, ktype, myunit)
-       ENDIF
-       fileno=fileno+1; IF (fileno==nproc) fileno=0 
+          IF (myrank == fileno) THEN
+              oldisol = readvar(primitivedir // 'isol.dat', dummyxnnumsol, ktype, myunit)
+          ENDIF
+          fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
-       IF (myrank == fileno) THEN
-           oldrfdsol = readvar(primitivedir // 'rfdsol.dat', dummyxnnumsol, ktype, myunit)
-       ENDIF
-       fileno=fileno+1; IF (fileno==nproc) fileno=0 
+          IF (myrank == fileno) THEN
+              oldrfdsol = readvar(primitivedir // 'rfdsol.dat', dummyxnnumsol, ktype, myunit)
+          ENDIF
+          fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
-       IF (myrank == fileno) THEN
-           oldifdsol = readvar(primitivedir // 'ifdsol.dat', dummyxnnumsol, ktype, myunit)
-       ENDIF
-       fileno=fileno+1; IF (fileno==nproc) fileno=0 
+          IF (myrank == fileno) THEN
+              oldifdsol = readvar(primitivedir // 'ifdsol.dat', dummyxnnumsol, ktype, myunit)
+          ENDIF
+          fileno=fileno+1; IF (fileno==nproc) fileno=0 
 
-       oldsol = CMPLX(oldrsol,oldisol)
-       oldfdsol = CMPLX(oldrfdsol,oldifdsol)
+          oldsol = CMPLX(oldrsol,oldisol)
+          oldfdsol = CMPLX(oldrfdsol,oldifdsol)
 
-       DEALLOCATE( oldrsol )
-       DEALLOCATE( oldisol )
-       DEALLOCATE( oldrfdsol )
-       DEALLOCATE( oldifdsol )
+          DEALLOCATE( oldrsol )
+          DEALLOCATE( oldisol )
+          DEALLOCATE( oldrfdsol )
+          DEALLOCATE( oldifdsol )
 
-       CALL MPI_Barrier(mpi_comm_world,ierror)
-       CALL MPI_AllReduce(oldsol,oldsoltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_AllReduce(oldfdsol,oldfdsoltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
-       CALL MPI_Barrier(mpi_comm_world,ierror)
+          CALL MPI_Barrier(mpi_comm_world,ierror)
+          CALL MPI_AllReduce(oldsol,oldsoltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
+          CALL MPI_AllReduce(oldfdsol,oldfdsoltmp,dimx*dimn*numsols,MPI_DOUBLE_COMPLEX,MPI_SUM,mpi_comm_world,ierr)
+          CALL MPI_Barrier(mpi_comm_world,ierror)
 
-       oldsol=oldsoltmp;
-       oldfdsol=oldfdsoltmp;
+          oldsol=oldsoltmp;
+          oldfdsol=oldfdsoltmp;
 
+       ENDIF
     ENDIF
 
     CALL MPI_Barrier(mpi_comm_world,ierror)
@@ -1213,59 +1374,59 @@ CONTAINS
     fileno=fileno+1
     CALL writevar(debugdir // 'numsols.dat', numsols, myfmt, fileno)
     fileno=fileno+1
-    CALL writevar(debugdir // 'kthetarhos.dat', kthetarhos, myfmt, fileno)
+    CALL writevar(debugdir // 'kthetarhos.dat', kthetarhos, myfmt, fileno, dimnames='dimn')
     fileno=fileno+1
-    CALL writevar(debugdir // 'x.dat', x, myfmt, fileno)
+    CALL writevar(debugdir // 'x.dat', x, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'rho.dat', rho, myfmt, fileno)
+    CALL writevar(debugdir // 'rho.dat', rho, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ro.dat', Ro, myfmt, fileno)
+    CALL writevar(debugdir // 'Ro.dat', Ro, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
     CALL writevar(debugdir // 'R0.dat', R0, myfmt, fileno)
     fileno=fileno+1
-    CALL writevar(debugdir // 'Rmin.dat', Rmin, myfmt, fileno)
+    CALL writevar(debugdir // 'Rmin.dat', Rmin, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Bo.dat', Bo, myfmt, fileno)
+    CALL writevar(debugdir // 'Bo.dat', Bo, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'q.dat', qx, myfmt, fileno)
+    CALL writevar(debugdir // 'q.dat', qx, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'smag.dat', smag, myfmt, fileno)
+    CALL writevar(debugdir // 'smag.dat', smag, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'alpha.dat', alphax, myfmt, fileno)
+    CALL writevar(debugdir // 'alpha.dat', alphax, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Machtor.dat', Machtor, myfmt, fileno)
+    CALL writevar(debugdir // 'Machtor.dat', Machtor, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Autor.dat', Autor, myfmt, fileno)
+    CALL writevar(debugdir // 'Autor.dat', Autor, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Machpar.dat', Machpar, myfmt, fileno)
+    CALL writevar(debugdir // 'Machpar.dat', Machpar, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Aupar.dat', Aupar, myfmt, fileno)
+    CALL writevar(debugdir // 'Aupar.dat', Aupar, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'gammaE.dat', gammaE, myfmt, fileno)
+    CALL writevar(debugdir // 'gammaE.dat', gammaE, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Te.dat', Tex, myfmt, fileno)
+    CALL writevar(debugdir // 'Te.dat', Tex, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'ne.dat', Nex, myfmt, fileno)
+    CALL writevar(debugdir // 'ne.dat', Nex, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ate.dat', Ate, myfmt, fileno)
+    CALL writevar(debugdir // 'Ate.dat', Ate, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ane.dat', Ane, myfmt, fileno)
+    CALL writevar(debugdir // 'Ane.dat', Ane, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
     CALL writevar(debugdir // 'typee.dat', el_type, myfmt, fileno)
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ai.dat', Ai, myfmt, fileno)
+    CALL writevar(debugdir // 'Ai.dat', Ai, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Zi.dat', Zi, myfmt, fileno)
+    CALL writevar(debugdir // 'Zi.dat', Zi, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ti.dat', Tix, myfmt, fileno)
+    CALL writevar(debugdir // 'Ti.dat', Tix, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'normni.dat', ninorm, myfmt, fileno)
+    CALL writevar(debugdir // 'normni.dat', ninorm, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ati.dat', Ati, myfmt, fileno)
+    CALL writevar(debugdir // 'Ati.dat', Ati, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'Ani.dat', Ani, myfmt, fileno)
+    CALL writevar(debugdir // 'Ani.dat', Ani, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(debugdir // 'typei.dat', ion_type, myint, fileno)
+    CALL writevar(debugdir // 'typei.dat', ion_type, myint, fileno, dimnames='dimx,nions')
     fileno=fileno+1
     CALL writevar(debugdir // 'maxpts.dat', maxpts, myfmt, fileno)
     fileno=fileno+1
@@ -1466,6 +1627,7 @@ CONTAINS
     ALLOCATE( modewidth (dimx, dimn) )
     ALLOCATE( modeshift (dimx, dimn) )
     ALLOCATE( distan (dimx, dimn) )
+    ALLOCATE( tasktime (dimx, dimn) )
     ALLOCATE(solflu (dimx, dimn))
 
     ALLOCATE( ntor (dimx, dimn) )
@@ -1731,6 +1893,8 @@ CONTAINS
     DEALLOCATE(Nustar)
     DEALLOCATE(Zeffx)
     DEALLOCATE(distan)
+    DEALLOCATE(tasktime)
+    DEALLOCATE(tasktimeprev)
     DEALLOCATE(ntor)
     DEALLOCATE(solflu)
 
@@ -1796,457 +1960,535 @@ CONTAINS
     CHARACTER(len=20) :: fmtxrow,fmtecoef,fmtcftrans
     INTEGER :: i,j,k,l, fileno
     DOUBLE PRECISION :: time5
+    LOGICAL :: h5open, asciiout
 
     WRITE(fmtxrow,'(A,I0,A)') '(',dimx,'G15.7)'
     WRITE(fmtecoef,'(A,I0, A)') '(',numecoefs,'G15.7)'
     WRITE(fmtcftrans,'(A)') '(7G15.7)'
 
+    ! With output_format 1 or 2 every writevar below also goes to one HDF5 file.
+    ! All ranks hold the collected output, so rank 0 writes the whole container
+    ! with serial HDF5 (see mod_hdf5out.f90); the other ranks only write .dat files
+    h5open = .FALSE.
+    IF ((output_format /= 0) .AND. (myrank == 0)) THEN
+       CALL h5out_setdim('dimx', dimx)
+       CALL h5out_setdim('dimn', dimn)
+       CALL h5out_setdim('nions', nions)
+       CALL h5out_setdim('numsols', numsols)
+       CALL h5out_setdim('ntheta', ntheta)
+       CALL h5out_setdim('numecoefs', numecoefs)
+       CALL h5out_open('output/qlkrun.h5')
+       h5open = h5out_isopen()
+    ENDIF
+    CALL MPI_Bcast(h5open,1,MPI_LOGICAL,0,mpi_comm_world,ierror)
+    ! Fall back to the .dat files if the container could not be written
+    asciiout = (output_format /= 1) .OR. (.NOT. h5open)
+    write_ascii = asciiout
+
     fileno = 0
     IF (write_primi == 1) THEN
       primitivedir='output/primitive/'
       myfmt='G16.7E3'
-      CALL writevar(primitivedir // 'solflu.dat', solflu, myfmt, fileno)
+      CALL writevar(primitivedir // 'solflu.dat', solflu, myfmt, fileno, dimnames='dimx,dimn')
       !WRITE(stdout,"(A,I10,A,I10)") 'rank: ', myrank, '01.dat ', (time5-omp_get_wtime())
       fileno=fileno+1
-      CALL writevar(primitivedir // 'kymaxITG.dat', krmmuITG, myfmt, fileno)
+      CALL writevar(primitivedir // 'kymaxITG.dat', krmmuITG, myfmt, fileno, dimnames='dimx')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'kymaxETG.dat', krmmuETG, myfmt, fileno)
+      CALL writevar(primitivedir // 'kymaxETG.dat', krmmuETG, myfmt, fileno, dimnames='dimx')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'distan.dat', distan, myfmt, fileno)
+      CALL writevar(primitivedir // 'distan.dat', distan, myfmt, fileno, dimnames='dimx,dimn')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'kperp2.dat', kperp2, myfmt, fileno)
+      CALL writevar(primitivedir // 'kperp2.dat', kperp2, myfmt, fileno, dimnames='dimx,dimn')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'modewidth.dat', modewidth, myfmt, fileno)
+      CALL writevar(primitivedir // 'modewidth.dat', modewidth, myfmt, fileno, dimnames='dimx,dimn')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'modeshift.dat', modeshift, myfmt, fileno)
+      CALL writevar(primitivedir // 'modeshift.dat', modeshift, myfmt, fileno, dimnames='dimx,dimn')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'ntor.dat', ntor, myfmt, fileno)
+      CALL writevar(primitivedir // 'ntor.dat', ntor, myfmt, fileno, dimnames='dimx,dimn')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'sol.dat', sol, myfmt, fileno)
+      ! Read back by the next run, so also kept as .dat for output_format 1
+      write_ascii = .TRUE.
+      CALL writevar(primitivedir // 'sol.dat', sol, myfmt, fileno, dimnames='dimx,dimn,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'fdsol.dat', fdsol, myfmt, fileno)
+      CALL writevar(primitivedir // 'fdsol.dat', fdsol, myfmt, fileno, dimnames='dimx,dimn,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lcirce.dat', Lcirce, myfmt, fileno)
+      IF (MOD(fileno,nproc) == myrank) CALL writerestart()
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lpiege.dat', Lpiege, myfmt, fileno)
+      write_ascii = asciiout
+      CALL writevar(primitivedir // 'Lcirce.dat', Lcirce, myfmt, fileno, dimnames='dimx,dimn,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lecirce.dat', Lecirce, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lpiege.dat', Lpiege, myfmt, fileno, dimnames='dimx,dimn,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lepiege.dat', Lepiege, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lecirce.dat', Lecirce, myfmt, fileno, dimnames='dimx,dimn,numsols')
+      fileno=fileno+1
+      CALL writevar(primitivedir // 'Lepiege.dat', Lepiege, myfmt, fileno, dimnames='dimx,dimn,numsols')
       fileno=fileno+1
 
       IF (phys_meth /= 0) THEN
-         CALL writevar(primitivedir // 'Lcircgne.dat', Lcircgne, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircgne.dat', Lcircgne, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpieggne.dat', Lpieggne, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpieggne.dat', Lpieggne, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lcircgte.dat', Lcircgte, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircgte.dat', Lcircgte, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpieggte.dat', Lpieggte, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpieggte.dat', Lpieggte, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lcircce.dat', Lcircce, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircce.dat', Lcircce, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpiegce.dat', Lpiegce, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpiegce.dat', Lpiegce, myfmt, fileno, dimnames='dimx,dimn,numsols')
          fileno=fileno+1
 
          IF (phys_meth == 2) THEN
-            CALL writevar(primitivedir // 'Lecircgne.dat', Lecircgne, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircgne.dat', Lecircgne, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepieggne.dat', Lepieggne, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepieggne.dat', Lepieggne, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lecircgte.dat', Lecircgte, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircgte.dat', Lecircgte, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepieggte.dat', Lepieggte, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepieggte.dat', Lepieggte, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lecircce.dat', Lecircce, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircce.dat', Lecircce, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepiegce.dat', Lepiegce, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepiegce.dat', Lepiegce, myfmt, fileno, dimnames='dimx,dimn,numsols')
             fileno=fileno+1
          ENDIF
       ENDIF
 
-      CALL writevar(primitivedir // 'Lcirci.dat', Lcirci, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lcirci.dat', Lcirci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lpiegi.dat', Lpiegi, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lpiegi.dat', Lpiegi, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lcirci.dat', Lcirci, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lcirci.dat', Lcirci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lpiegi.dat', Lpiegi, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lpiegi.dat', Lpiegi, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lecirci.dat', Lecirci, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lecirci.dat', Lecirci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lepiegi.dat', Lepiegi, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lepiegi.dat', Lepiegi, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lvcirci.dat', Lvcirci, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lvcirci.dat', Lvcirci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
-      CALL writevar(primitivedir // 'Lvpiegi.dat', Lvpiegi, myfmt, fileno)
+      CALL writevar(primitivedir // 'Lvpiegi.dat', Lvpiegi, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
       fileno=fileno+1
 
       IF (phys_meth /= 0) THEN
-         CALL writevar(primitivedir // 'Lcircgni.dat', Lcircgni, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircgni.dat', Lcircgni, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpieggni.dat', Lpieggni, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpieggni.dat', Lpieggni, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lcircgui.dat', Lcircgui, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircgui.dat', Lcircgui, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpieggui.dat', Lpieggui, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpieggui.dat', Lpieggui, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lcircgti.dat', Lcircgti, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircgti.dat', Lcircgti, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpieggti.dat', Lpieggti, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpieggti.dat', Lpieggti, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lcircci.dat', Lcircci, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lcircci.dat', Lcircci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
-         CALL writevar(primitivedir // 'Lpiegci.dat', Lpiegci, myfmt, fileno)
+         CALL writevar(primitivedir // 'Lpiegci.dat', Lpiegci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
          fileno=fileno+1
 
          IF (phys_meth == 2) THEN
-            CALL writevar(primitivedir // 'Lecircgni.dat', Lecircgni, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircgni.dat', Lecircgni, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepieggni.dat', Lepieggni, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepieggni.dat', Lepieggni, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lecircgui.dat', Lecircgui, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircgui.dat', Lecircgui, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepieggui.dat', Lepieggui, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepieggui.dat', Lepieggui, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lecircgti.dat', Lecircgti, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircgti.dat', Lecircgti, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepieggti.dat', Lepieggti, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepieggti.dat', Lepieggti, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lecircci.dat', Lecircci, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lecircci.dat', Lecircci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
-            CALL writevar(primitivedir // 'Lepiegci.dat', Lepiegci, myfmt, fileno)
+            CALL writevar(primitivedir // 'Lepiegci.dat', Lepiegci, myfmt, fileno, dimnames='dimx,dimn,nions,numsols')
             fileno=fileno+1
          ENDIF
       ENDIF
     ENDIF
 
+    ! Always written: read back by the next run to order the tasks
+    myfmt='G16.7E3'
+    write_ascii = .TRUE.
+    CALL writevar('output/primitive/tasktime.dat', tasktime, myfmt, fileno, dimnames='dimx,dimn')
+    fileno=fileno+1
+    write_ascii = asciiout
+
     outputdir = 'debug/'
 
-    CALL writevar(outputdir // 'modeflag.dat', modeflag, myfmt, fileno)
+    CALL writevar(outputdir // 'modeflag.dat', modeflag, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'phi.dat', TRANSPOSE(phi), myfmt, fileno)
+    CALL writevar(outputdir // 'phi.dat', TRANSPOSE(phi), myfmt, fileno, dimnames='ntheta,dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'Nustar.dat', Nustar, myfmt, fileno)
+    CALL writevar(outputdir // 'Nustar.dat', Nustar, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'Zeff.dat', Zeffx, myfmt, fileno)
+    CALL writevar(outputdir // 'Zeff.dat', Zeffx, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
 
     outputdir = 'output/'
 
-    CALL writevar(outputdir // 'npol.dat', npol, myfmt, fileno)
+    CALL writevar(outputdir // 'npol.dat', npol, myfmt, fileno, dimnames='dimx,ntheta,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'ecoefs.dat', ecoefs, myfmt, fileno)
+    CALL writevar(outputdir // 'ecoefs.dat', ecoefs, myfmt, fileno, dimnames='dimx,nions1,numecoefs')
     fileno=fileno+1
-    CALL writevar(outputdir // 'cftrans.dat', cftrans, myfmt, fileno)
+    CALL writevar(outputdir // 'cftrans.dat', cftrans, myfmt, fileno, dimnames='dimx,nions,numicoefs')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'gam_GB.dat', gam_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'gam_GB.dat', gam_GB, myfmt, fileno, dimnames='dimx,dimn,numsols')
     fileno=fileno+1
-    CALL writevar(outputdir // 'ome_GB.dat', ome_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'ome_GB.dat', ome_GB, myfmt, fileno, dimnames='dimx,dimn,numsols')
     fileno=fileno+1
-    CALL writevar(outputdir // 'gam_SI.dat', gam_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'gam_SI.dat', gam_SI, myfmt, fileno, dimnames='dimx,dimn,numsols')
     fileno=fileno+1
-    CALL writevar(outputdir // 'ome_SI.dat', ome_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'ome_SI.dat', ome_SI, myfmt, fileno, dimnames='dimx,dimn,numsols')
     fileno=fileno+1
 
     IF (phys_meth /= 0) THEN
-       CALL writevar(outputdir // 'cke.dat', cke, myfmt, fileno)
+       CALL writevar(outputdir // 'cke.dat', cke, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
 
-       CALL writevar(outputdir // 'dfe_SI.dat', dfe_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'dfe_SI.dat', dfe_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vte_SI.dat', vte_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vte_SI.dat', vte_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vce_SI.dat', vce_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vce_SI.dat', vce_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
 
-       CALL writevar(outputdir // 'dfe_GB.dat', dfe_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'dfe_GB.dat', dfe_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vte_GB.dat', vte_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vte_GB.dat', vte_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vce_GB.dat', vce_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vce_GB.dat', vce_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
 
        IF (separateflux == 1) THEN
-          CALL writevar(outputdir // 'dfeITG_SI.dat', dfeITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'dfeITG_SI.dat', dfeITG_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vteITG_SI.dat', vteITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vteITG_SI.dat', vteITG_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vceITG_SI.dat', vceITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vceITG_SI.dat', vceITG_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'dfeTEM_SI.dat', dfeTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'dfeTEM_SI.dat', dfeTEM_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vteTEM_SI.dat', vteTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vteTEM_SI.dat', vteTEM_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vceTEM_SI.dat', vceTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vceTEM_SI.dat', vceTEM_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'dfeITG_GB.dat', dfeITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'dfeITG_GB.dat', dfeITG_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vteITG_GB.dat', vteITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vteITG_GB.dat', vteITG_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vceITG_GB.dat', vceITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vceITG_GB.dat', vceITG_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'dfeTEM_GB.dat', dfeTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'dfeTEM_GB.dat', dfeTEM_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vteTEM_GB.dat', vteTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vteTEM_GB.dat', vteTEM_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vceTEM_GB.dat', vceTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vceTEM_GB.dat', vceTEM_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
 
 
        ENDIF
 
-       CALL writevar(outputdir // 'cki.dat', cki, myfmt, fileno)
+       CALL writevar(outputdir // 'cki.dat', cki, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'dfi_SI.dat', dfi_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'dfi_SI.dat', dfi_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vti_SI.dat', vti_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vti_SI.dat', vti_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vri_SI.dat', vri_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vri_SI.dat', vri_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vci_SI.dat', vci_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vci_SI.dat', vci_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'dfi_GB.dat', dfi_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'dfi_GB.dat', dfi_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vti_GB.dat', vti_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vti_GB.dat', vti_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vri_GB.dat', vri_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vri_GB.dat', vri_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vci_GB.dat', vci_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vci_GB.dat', vci_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
 
        IF (separateflux == 1) THEN
-          CALL writevar(outputdir // 'dfiITG_SI.dat', dfiITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'dfiITG_SI.dat', dfiITG_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vtiITG_SI.dat', vtiITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vtiITG_SI.dat', vtiITG_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vciITG_SI.dat', vciITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vciITG_SI.dat', vciITG_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vriITG_SI.dat', vriITG_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vriITG_SI.dat', vriITG_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'dfiTEM_SI.dat', dfiTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'dfiTEM_SI.dat', dfiTEM_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vtiTEM_SI.dat', vtiTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vtiTEM_SI.dat', vtiTEM_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vciTEM_SI.dat', vciTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vciTEM_SI.dat', vciTEM_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vriTEM_SI.dat', vriTEM_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vriTEM_SI.dat', vriTEM_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
 
-          CALL writevar(outputdir // 'dfiITG_GB.dat', dfiITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'dfiITG_GB.dat', dfiITG_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vtiITG_GB.dat', vtiITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vtiITG_GB.dat', vtiITG_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vciITG_GB.dat', vciITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vciITG_GB.dat', vciITG_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vriITG_GB.dat', vriITG_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vriITG_GB.dat', vriITG_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'dfiTEM_GB.dat', dfiTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'dfiTEM_GB.dat', dfiTEM_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vtiTEM_GB.dat', vtiTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vtiTEM_GB.dat', vtiTEM_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vciTEM_GB.dat', vciTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vciTEM_GB.dat', vciTEM_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vriTEM_GB.dat', vriTEM_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vriTEM_GB.dat', vriTEM_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
        ENDIF
 
        IF (phys_meth == 2) THEN
-          CALL writevar(outputdir // 'ceke.dat', ceke, myfmt, fileno)
+          CALL writevar(outputdir // 'ceke.dat', ceke, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'ceki.dat', ceki, myfmt, fileno)
+          CALL writevar(outputdir // 'ceki.dat', ceki, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vene_SI.dat', vene_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vene_SI.dat', vene_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'chiee_SI.dat', chiee_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'chiee_SI.dat', chiee_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vece_SI.dat', vece_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'vece_SI.dat', vece_SI, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veni_SI.dat', veni_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'veni_SI.dat', veni_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veri_SI.dat', veri_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'veri_SI.dat', veri_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'chiei_SI.dat', chiei_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'chiei_SI.dat', chiei_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veci_SI.dat', veci_SI, myfmt, fileno)
+          CALL writevar(outputdir // 'veci_SI.dat', veci_SI, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vene_GB.dat', vene_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vene_GB.dat', vene_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'chiee_GB.dat', chiee_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'chiee_GB.dat', chiee_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'vece_GB.dat', vece_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'vece_GB.dat', vece_GB, myfmt, fileno, dimnames='dimx')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veni_GB.dat', veni_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'veni_GB.dat', veni_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veri_GB.dat', veri_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'veri_GB.dat', veri_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'chiei_GB.dat', chiei_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'chiei_GB.dat', chiei_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
-          CALL writevar(outputdir // 'veci_GB.dat', veci_GB, myfmt, fileno)
+          CALL writevar(outputdir // 'veci_GB.dat', veci_GB, myfmt, fileno, dimnames='dimx,nions')
           fileno=fileno+1
 
           IF (separateflux == 1) THEN
-             CALL writevar(outputdir // 'chieiITG_SI.dat', chieiITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'chieiITG_SI.dat', chieiITG_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veniITG_SI.dat', veniITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veniITG_SI.dat', veniITG_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veciITG_SI.dat', veciITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veciITG_SI.dat', veciITG_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veriITG_SI.dat', veriITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veriITG_SI.dat', veriITG_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieiTEM_SI.dat', chieiTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'chieiTEM_SI.dat', chieiTEM_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veniTEM_SI.dat', veniTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veniTEM_SI.dat', veniTEM_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veciTEM_SI.dat', veciTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veciTEM_SI.dat', veciTEM_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veriTEM_SI.dat', veriTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veriTEM_SI.dat', veriTEM_SI, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
 
-             CALL writevar(outputdir // 'chieiITG_GB.dat', chieiITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'chieiITG_GB.dat', chieiITG_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veniITG_GB.dat', veniITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veniITG_GB.dat', veniITG_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veciITG_GB.dat', veciITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veciITG_GB.dat', veciITG_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veriITG_GB.dat', veriITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veriITG_GB.dat', veriITG_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieiTEM_GB.dat', chieiTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'chieiTEM_GB.dat', chieiTEM_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veniTEM_GB.dat', veniTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veniTEM_GB.dat', veniTEM_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veciTEM_GB.dat', veciTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veciTEM_GB.dat', veciTEM_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veriTEM_GB.dat', veriTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veriTEM_GB.dat', veriTEM_GB, myfmt, fileno, dimnames='dimx,nions')
              fileno=fileno+1
 
-             CALL writevar(outputdir // 'chieeETG_SI.dat', chieeETG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeETG_SI.dat', chieeETG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneETG_SI.dat', veneETG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veneETG_SI.dat', veneETG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceETG_SI.dat', veceETG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veceETG_SI.dat', veceETG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieeETG_GB.dat', chieeETG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeETG_GB.dat', chieeETG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneETG_GB.dat', veneETG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veneETG_GB.dat', veneETG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceETG_GB.dat', veceETG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veceETG_GB.dat', veceETG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieeTEM_SI.dat', chieeTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeTEM_SI.dat', chieeTEM_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneTEM_SI.dat', veneTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veneTEM_SI.dat', veneTEM_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceTEM_SI.dat', veceTEM_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veceTEM_SI.dat', veceTEM_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieeTEM_GB.dat', chieeTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeTEM_GB.dat', chieeTEM_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneTEM_GB.dat', veneTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veneTEM_GB.dat', veneTEM_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceTEM_GB.dat', veceTEM_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veceTEM_GB.dat', veceTEM_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieeITG_SI.dat', chieeITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeITG_SI.dat', chieeITG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneITG_SI.dat', veneITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veneITG_SI.dat', veneITG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceITG_SI.dat', veceITG_SI, myfmt, fileno)
+             CALL writevar(outputdir // 'veceITG_SI.dat', veceITG_SI, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'chieeITG_GB.dat', chieeITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'chieeITG_GB.dat', chieeITG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veneITG_GB.dat', veneITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veneITG_GB.dat', veneITG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
-             CALL writevar(outputdir // 'veceITG_GB.dat', veceITG_GB, myfmt, fileno)
+             CALL writevar(outputdir // 'veceITG_GB.dat', veceITG_GB, myfmt, fileno, dimnames='dimx')
              fileno=fileno+1
           ENDIF
        ENDIF
     ENDIF
 
-    CALL writevar(outputdir // 'pfe_SI.dat', epf_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'pfe_SI.dat', epf_SI, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'pfe_GB.dat', epf_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'pfe_GB.dat', epf_GB, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'pfe_cm.dat', epf_cm, myfmt, fileno)
+    CALL writevar(outputdir // 'pfe_cm.dat', epf_cm, myfmt, fileno, dimnames='dimx,dimn')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'efe_SI.dat', eef_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'efe_SI.dat', eef_SI, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'efe_GB.dat', eef_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'efe_GB.dat', eef_GB, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'efe_cm.dat', eef_cm, myfmt, fileno)
+    CALL writevar(outputdir // 'efe_cm.dat', eef_cm, myfmt, fileno, dimnames='dimx,dimn')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'efeETG_SI.dat', eefETG_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'efeETG_SI.dat', eefETG_SI, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
-    CALL writevar(outputdir // 'efeETG_GB.dat', eefETG_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'efeETG_GB.dat', eefETG_GB, myfmt, fileno, dimnames='dimx')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'pfi_SI.dat', ipf_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'pfi_SI.dat', ipf_SI, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'pfi_GB.dat', ipf_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'pfi_GB.dat', ipf_GB, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'pfi_cm.dat', ipf_cm, myfmt, fileno)
+    CALL writevar(outputdir // 'pfi_cm.dat', ipf_cm, myfmt, fileno, dimnames='dimx,dimn,nions')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'efi_SI.dat', ief_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'efi_SI.dat', ief_SI, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'efi_GB.dat', ief_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'efi_GB.dat', ief_GB, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'efi_cm.dat', ief_cm, myfmt, fileno)
+    CALL writevar(outputdir // 'efi_cm.dat', ief_cm, myfmt, fileno, dimnames='dimx,dimn,nions')
     fileno=fileno+1
 
-    CALL writevar(outputdir // 'vfi_SI.dat', ivf_SI, myfmt, fileno)
+    CALL writevar(outputdir // 'vfi_SI.dat', ivf_SI, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'vfi_GB.dat', ivf_GB, myfmt, fileno)
+    CALL writevar(outputdir // 'vfi_GB.dat', ivf_GB, myfmt, fileno, dimnames='dimx,nions')
     fileno=fileno+1
-    CALL writevar(outputdir // 'vfi_cm.dat', ivf_cm, myfmt, fileno)
+    CALL writevar(outputdir // 'vfi_cm.dat', ivf_cm, myfmt, fileno, dimnames='dimx,dimn,nions')
     fileno=fileno+1
 
     IF (separateflux==1) THEN
-       CALL writevar(outputdir // 'efiITG_SI.dat', iefITG_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'efiITG_SI.dat', iefITG_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'efiTEM_SI.dat', iefTEM_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'efiTEM_SI.dat', iefTEM_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfiITG_SI.dat', ipfITG_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'pfiITG_SI.dat', ipfITG_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfiTEM_SI.dat', ipfTEM_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'pfiTEM_SI.dat', ipfTEM_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vfiITG_SI.dat', ivfITG_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vfiITG_SI.dat', ivfITG_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vfiTEM_SI.dat', ivfTEM_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'vfiTEM_SI.dat', ivfTEM_SI, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
 
-       CALL writevar(outputdir // 'efiITG_GB.dat', iefITG_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'efiITG_GB.dat', iefITG_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'efiTEM_GB.dat', iefTEM_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'efiTEM_GB.dat', iefTEM_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfiITG_GB.dat', ipfITG_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'pfiITG_GB.dat', ipfITG_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfiTEM_GB.dat', ipfTEM_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'pfiTEM_GB.dat', ipfTEM_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vfiITG_GB.dat', ivfITG_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vfiITG_GB.dat', ivfITG_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
-       CALL writevar(outputdir // 'vfiTEM_GB.dat', ivfTEM_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'vfiTEM_GB.dat', ivfTEM_GB, myfmt, fileno, dimnames='dimx,nions')
        fileno=fileno+1
 
-       CALL writevar(outputdir // 'efeITG_SI.dat', eefITG_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'efeITG_SI.dat', eefITG_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'efeTEM_SI.dat', eefTEM_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'efeTEM_SI.dat', eefTEM_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfeITG_SI.dat', epfITG_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'pfeITG_SI.dat', epfITG_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfeTEM_SI.dat', epfTEM_SI, myfmt, fileno)
+       CALL writevar(outputdir // 'pfeTEM_SI.dat', epfTEM_SI, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'efeITG_GB.dat', eefITG_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'efeITG_GB.dat', eefITG_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'efeTEM_GB.dat', eefTEM_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'efeTEM_GB.dat', eefTEM_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfeITG_GB.dat', epfITG_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'pfeITG_GB.dat', epfITG_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
-       CALL writevar(outputdir // 'pfeTEM_GB.dat', epfTEM_GB, myfmt, fileno)
+       CALL writevar(outputdir // 'pfeTEM_GB.dat', epfTEM_GB, myfmt, fileno, dimnames='dimx')
        fileno=fileno+1
 
     ENDIF
 
+    CALL h5out_close()
+    write_ascii = .TRUE.
+
   END SUBROUTINE outputascii
 
+  INTEGER FUNCTION readrestart()
+    !Reads oldsol and oldfdsol from restartfile. Returns 1 if read, -1 if the grid differs from the present one,
+    !and 0 if the file is absent, unreadable or not written by the previous run (runcounter.dat mismatch)
+    INTEGER :: ver,runs,dimxr,dimnr,numsolsr,ios
+    REAL(KIND=DBL), DIMENSION(dimn) :: kthetarhosr
+    REAL(KIND=DBL), DIMENSION(dimx) :: xr,rhor
+    LOGICAL :: found
+
+    readrestart = 0
+    INQUIRE(file=restartfile, EXIST=found)
+    IF (.NOT. found) RETURN
+    OPEN(myunit, file=restartfile, status='old', action='read', access='stream', form='unformatted', iostat=ios)
+    IF (ios /= 0) RETURN
+
+    READ(myunit, iostat=ios) ver,runs,dimxr,dimnr,numsolsr
+    IF ((ios == 0) .AND. (ver == restartver) .AND. (runs == runcounter)) THEN
+       readrestart = -1
+       IF ((dimxr == dimx) .AND. (dimnr == dimn) .AND. (numsolsr == numsols)) THEN
+          READ(myunit, iostat=ios) kthetarhosr,xr,rhor
+          IF (ios /= 0) THEN
+             readrestart = 0
+          ELSEIF (ALL(ABS(kthetarhosr-kthetarhos) <= restarttol*MAXVAL(ABS(kthetarhos))) .AND. &
+               &  ALL(ABS(xr-x) <= restarttol*MAXVAL(ABS(x))) .AND. ALL(ABS(rhor-rho) <= restarttol*MAXVAL(ABS(rho)))) THEN
+             READ(myunit, iostat=ios) oldsol,oldfdsol
+             readrestart = 1
+             IF (ios /= 0) readrestart = 0
+          ENDIF
+       ENDIF
+    ENDIF
+    CLOSE(myunit)
+
+    IF (readrestart == -1) WRITE(stdout,"(A)") 'Grid changed since the previous run: restart state not used, full run'
+  END FUNCTION readrestart
+
+  SUBROUTINE writerestart()
+    !Writes the restart state read by readrestart in the next run
+    OPEN(myunit, file=restartfile, status='replace', action='write', access='stream', form='unformatted')
+    WRITE(myunit) restartver,runcounter+1,dimx,dimn,numsols
+    WRITE(myunit) kthetarhos,x,rho
+    WRITE(myunit) sol,fdsol
+    CLOSE(myunit)
+  END SUBROUTINE writerestart
+
 END PROGRAM qlk_standalone
@@ -34,6 +34,7 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
      &Lepiegceout, Lecircgtiout, Lepieggtiout, Lecircgniout, Lepieggniout, Lecircguiout, Lepiegguiout, Lecircciout, Lepiegciout,&
      oldsolin, oldfdsolin, runcounterin,&
      rhominin,rhomaxin,&
+     sched_methin,sched_chunkin,contchainin,nthreadsin,tasktimein,tasktimeout,newtonderivin,localrefinein,periodicquadin,solcachein,&
      & eefTEM_SIout,epfTEM_SIout,dfeTEM_SIout,vteTEM_SIout,vceTEM_SIout,& !optional outputs from separation of fluxes
      & eefTEM_GBout,epfTEM_GBout,dfeTEM_GBout,vteTEM_GBout,vceTEM_GBout,&
      & eefITG_SIout,epfITG_SIout,dfeITG_SIout,vteITG_SIout,vceITG_SIout,&
@@ -46,7 +47,8 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
      & veneITG_SIout,chieeITG_SIout,veceITG_SIout,veneITG_GBout,chieeITG_GBout,veceITG_GBout, &
      & veneTEM_SIout,chieeTEM_SIout,veceTEM_SIout,veneTEM_GBout,chieeTEM_GBout,veceTEM_GBout, &
      & veniITG_SIout,chieiITG_SIout,veriITG_SIout,veciITG_SIout,veniITG_GBout,chieiITG_GBout,veriITG_GBout,veciITG_GBout, &
-     & veniTEM_SIout,chieiTEM_SIout,veriTEM_SIout,veciTEM_SIout,veniTEM_GBout,chieiTEM_GBout,veriTEM_GBout,veciTEM_GBout)
+     & veniTEM_SIout,chieiTEM_SIout,veriTEM_SIout,veciTEM_SIout,veniTEM_GBout,chieiTEM_GBout,veriTEM_GBout,veciTEM_GBout, &
+     & commin)
 
   !BRIEF EXPLANATION OF MODULES
   !
@@ -66,6 +68,7 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   USE calcroutines  
   USE asymmetry
   USE mod_saturation
+  USE trapints
 
   IMPLICIT NONE
 
@@ -81,8 +84,12 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   !TotTask: Total number of Tasks (radial*wavenumber coordinates)
   INTEGER,DIMENSION(MPI_STATUS_SIZE) :: status
   INTEGER, DIMENSION(:), ALLOCATABLE :: wavenum,radcoord
+  INTEGER, DIMENSION(:), ALLOCATABLE :: taskorder !Order in which the tasks (or chains of tasks) are handed out
+  INTEGER :: nsep
+  INTEGER, DIMENSION(2) :: cachecount, cachecounttot
+  REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: sepbuf,sepbuftmp !packed separated flux outputs
 
-  INTEGER :: i,j,k,ierror,nproc,irank,TotTask, myrank
+  INTEGER :: i,j,k,ierror,nproc,irank,TotTask,TotUnit, myrank, cacheunit
 
   ! List of input variables
   INTEGER, INTENT(IN) :: dimxin, dimnin, nionsin, numsolsin, phys_methin, coll_flagin, rot_flagin,verbosein,separatefluxin, el_typein
@@ -96,6 +103,14 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   INTEGER, INTENT(IN) :: maxrunsin, maxptsin
   REAL(kind=DBL), INTENT(IN) :: relacc1in, relacc2in, timeoutin, ETGmultin, collmultin
   REAL(kind=DBL), OPTIONAL, INTENT(IN) :: rhominin,rhomaxin
+  INTEGER, OPTIONAL, INTENT(IN) :: sched_methin,sched_chunkin !Task scheduler (see datmat) and grant size. Default DistriTask (0)
+  INTEGER, OPTIONAL, INTENT(IN) :: contchainin !Warm started chains along kthetarhos (see contchain in datmat). Default off (0)
+  INTEGER, OPTIONAL, INTENT(IN) :: nthreadsin !OpenMP threads per rank for the (p,nu) tasks. Default 1
+  INTEGER, OPTIONAL, INTENT(IN) :: newtonderivin !1 for the integrated Newton Jacobian (see newtonderiv in datmat). Default ndif differences (0)
+  INTEGER, OPTIONAL, INTENT(IN) :: localrefinein,periodicquadin !1 for the local contour refinement and the periodic quadrature (see datmat). Default off (0)
+  INTEGER, OPTIONAL, INTENT(IN) :: solcachein !1 for the persistent solution cache in solcachedir (see solcache in datmat). Default off (0)
+  INTEGER, OPTIONAL, INTENT(IN) :: commin !MPI communicator to run on, e.g. a sub-communicator per concurrent QuaLiKiz instance
+  REAL(KIND=DBL), DIMENSION(dimxin,dimnin), OPTIONAL, INTENT(IN) :: tasktimein !task wall times of a previous run, for the task cost model
 
   ! List of output variables: 
 
@@ -120,22 +135,6 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   REAL(KIND=DBL), DIMENSION(dimxin,nionsin), OPTIONAL, INTENT(OUT) :: iefITG_SIout,iefITG_GBout,ipfITG_SIout,ipfITG_GBout,ivfITG_SIout,ivfITG_GBout
   REAL(KIND=DBL), DIMENSION(dimxin,nionsin), OPTIONAL, INTENT(OUT) :: dfiITG_SIout,vtiITG_SIout,vciITG_SIout,vriITG_SIout,dfiITG_GBout,vtiITG_GBout,vciITG_GBout,vriITG_GBout
   REAL(KIND=DBL), DIMENSION(dimxin,nionsin), OPTIONAL, INTENT(OUT) :: chieiITG_SIout,veniITG_SIout,veciITG_SIout,veriITG_SIout,chieiITG_GBout,veniITG_GBout,veciITG_GBout,veriITG_GBout
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: eefETG_SIouttmp,eefETG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: chieeETG_SIouttmp,veneETG_SIouttmp,veceETG_SIouttmp,chieeETG_GBouttmp,veneETG_GBouttmp,veceETG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: eefTEM_SIouttmp,epfTEM_SIouttmp,eefTEM_GBouttmp,epfTEM_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: dfeTEM_SIouttmp,vteTEM_SIouttmp,vceTEM_SIouttmp,dfeTEM_GBouttmp,vteTEM_GBouttmp,vceTEM_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: chieeTEM_SIouttmp,veneTEM_SIouttmp,veceTEM_SIouttmp,chieeTEM_GBouttmp,veneTEM_GBouttmp,veceTEM_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: eefITG_SIouttmp,epfITG_SIouttmp,eefITG_GBouttmp,epfITG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: dfeITG_SIouttmp,vteITG_SIouttmp,vceITG_SIouttmp,dfeITG_GBouttmp,vteITG_GBouttmp,vceITG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:) :: chieeITG_SIouttmp,veneITG_SIouttmp,veceITG_SIouttmp,chieeITG_GBouttmp,veneITG_GBouttmp,veceITG_GBouttmp
-
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: iefTEM_SIouttmp,iefTEM_GBouttmp,ipfTEM_SIouttmp,ipfTEM_GBouttmp,ivfTEM_SIouttmp,ivfTEM_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: dfiTEM_SIouttmp,vtiTEM_SIouttmp,vciTEM_SIouttmp,dfiTEM_GBouttmp,vtiTEM_GBouttmp,vciTEM_GBouttmp,vriTEM_SIouttmp,vriTEM_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: chieiTEM_SIouttmp,veniTEM_SIouttmp,veciTEM_SIouttmp,chieiTEM_GBouttmp,veniTEM_GBouttmp,veciTEM_GBouttmp,veriTEM_SIouttmp,veriTEM_GBouttmp
-
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: iefITG_SIouttmp,iefITG_GBouttmp,ipfITG_SIouttmp,ipfITG_GBouttmp,ivfITG_SIouttmp,ivfITG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: dfiITG_SIouttmp,vtiITG_SIouttmp,vciITG_SIouttmp,vriITG_SIouttmp,dfiITG_GBouttmp,vtiITG_GBouttmp,vciITG_GBouttmp,vriITG_GBouttmp
-  REAL(KIND=DBL), ALLOCATABLE, DIMENSION(:,:) :: chieiITG_SIouttmp,veniITG_SIouttmp,veciITG_SIouttmp,chieiITG_GBouttmp,veniITG_GBouttmp,veciITG_GBouttmp,veriITG_SIouttmp,veriITG_GBouttmp
 
   REAL(KIND=DBL), DIMENSION(dimxin), OPTIONAL, INTENT(OUT)  :: epf_GBout,eef_GBout, dfe_SIout, vte_SIout, vce_SIout, dfe_GBout, vte_GBout, vce_GBout, ckeout, modeflagout, Nustarout, Zeffxout
   REAL(KIND=DBL), DIMENSION(dimxin), OPTIONAL, INTENT(OUT)  :: vene_SIout, chiee_SIout, vece_SIout, vene_GBout, chiee_GBout, vece_GBout, cekeout
@@ -148,6 +147,8 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   REAL(KIND=DBL), DIMENSION(dimxin,0:nionsin,numecoefs), OPTIONAL, INTENT(OUT)  ::  ecoefsout
   REAL(KIND=DBL), DIMENSION(dimxin,nionsin,numicoefs), OPTIONAL, INTENT(OUT)  ::  cftransout
 
+  REAL(KIND=DBL), DIMENSION(dimxin,dimnin), OPTIONAL, INTENT(OUT) :: tasktimeout
+
   ! optional output arrays from which the saturation rule can be calculated without rerunning dispersion relation solver
   REAL(KIND=DBL) , DIMENSION(dimxin), OPTIONAL, INTENT(OUT)  :: krmmuITGout,krmmuETGout
   REAL(KIND=DBL) , DIMENSION(dimxin,dimnin), OPTIONAL, INTENT(OUT)  :: distanout,ntorout,kperp2out
@@ -169,8 +170,13 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   CHARACTER(len=20) :: fmtn
 
   ! -- MPI Initialisation -- !
-  CALL mpi_comm_size(mpi_comm_world,nproc,ierror)
-  CALL mpi_comm_rank(mpi_comm_world,myrank,ierror)
+  IF (PRESENT(commin)) THEN
+     qlkcomm=commin
+  ELSE
+     qlkcomm=mpi_comm_world
+  ENDIF
+  CALL mpi_comm_size(qlkcomm,nproc,ierror)
+  CALL mpi_comm_rank(qlkcomm,myrank,ierror)
 
   CALL SYSTEM_CLOCK(time1)
 
@@ -206,22 +212,116 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   ELSE
      rhomax=1.
   ENDIF
+  IF (PRESENT(sched_methin)) THEN
+     sched_meth=sched_methin
+  ELSE
+     sched_meth=0
+  ENDIF
+  IF (PRESENT(sched_chunkin)) THEN
+     sched_chunk=sched_chunkin
+  ELSE
+     sched_chunk=0
+  ENDIF
+  IF (PRESENT(contchainin)) THEN
+     contchain=contchainin
+  ELSE
+     contchain=0
+  ENDIF
+  IF (PRESENT(nthreadsin)) THEN
+     nthreads=nthreadsin
+  ELSE
+     nthreads=1
+  ENDIF
+  IF (PRESENT(newtonderivin)) THEN
+     newtonderiv = (newtonderivin == 1)
+  ELSE
+     newtonderiv = .FALSE.
+  ENDIF
+  IF (PRESENT(localrefinein)) THEN
+     localrefine = (localrefinein == 1)
+  ELSE
+     localrefine = .FALSE.
+  ENDIF
+  IF (PRESENT(periodicquadin)) THEN
+     periodicquad = (periodicquadin == 1)
+  ELSE
+     periodicquad = .FALSE.
+  ENDIF
+  IF (PRESENT(solcachein)) THEN
+     solcache = (solcachein == 1)
+  ELSE
+     solcache = .FALSE.
+  ENDIF
 
   !Check sanity of input (these can be much expanded)
   IF ( (onlyion .EQV. .TRUE.) .AND. (onlyelec .EQV. .TRUE.) ) THEN
      WRITE(stderr,*) 'onlyion and onlyelec both set to true! Abandon ship...'
-     CALL mpi_abort(mpi_comm_world,-1)
+     CALL mpi_abort(qlkcomm,-1)
   ENDIF
 
   IF ( (rot_flag < 0) .OR. (rot_flag > 2) ) THEN
      WRITE(stderr,*) 'rot_flag must be between 0 and 2! Abandon ship...'
-     CALL mpi_abort(mpi_comm_world,-1)
+     CALL mpi_abort(qlkcomm,-1)
   ENDIF
 
+  IF ( (sched_meth < 0) .OR. (sched_meth > 2) .OR. (sched_chunk < 0) ) THEN
+     WRITE(stderr,*) 'sched_meth must be between 0 and 2 and sched_chunk non-negative! Abandon ship...'
+     CALL mpi_abort(qlkcomm,-1)
+  ENDIF
+
+  IF (contchain < 0) THEN
+     WRITE(stderr,*) 'contchain must be non-negative! Abandon ship...'
+     CALL mpi_abort(qlkcomm,-1)
+  ENDIF
+
+  IF (nthreads < 1) THEN
+     WRITE(stderr,*) 'nthreads must be at least 1! Abandon ship...'
+     CALL mpi_abort(qlkcomm,-1)
+  ENDIF
+
+  IF (PRESENT(newtonderivin)) THEN
+     IF ( (newtonderivin /= 0) .AND. (newtonderivin /= 1) ) THEN
+        WRITE(stderr,*) 'newtonderiv must be 0 or 1! Abandon ship...'
+        CALL mpi_abort(qlkcomm,-1)
+     ENDIF
+  ENDIF
+
+  IF (PRESENT(localrefinein)) THEN
+     IF ( (localrefinein /= 0) .AND. (localrefinein /= 1) ) THEN
+        WRITE(stderr,*) 'localrefine must be 0 or 1! Abandon ship...'
+        CALL mpi_abort(qlkcomm,-1)
+     ENDIF
+  ENDIF
+
+  IF (PRESENT(periodicquadin)) THEN
+     IF ( (periodicquadin /= 0) .AND. (periodicquadin /= 1) ) THEN
+        WRITE(stderr,*) 'periodicquad must be 0 or 1! Abandon ship...'
+        CALL mpi_abort(qlkcomm,-1)
+     ENDIF
+  ENDIF
+
+  IF (PRESENT(solcachein)) THEN
+     IF ( (solcachein /= 0) .AND. (solcachein /= 1) ) THEN
+        WRITE(stderr,*) 'solcache must be 0 or 1! Abandon ship...'
+        CALL mpi_abort(qlkcomm,-1)
+     ENDIF
+  ENDIF
+
+  !Threads with no task to compute are lent to the contours and contour points of the
+  !running tasks (see contourthreads). These nested teams under the task loop of the
+  !scheduler make up to three active levels, within nthreads threads in total
+  ntaskbusy=0
+  nthrfree=0
+  IF (nthreads > 1) CALL OMP_SET_MAX_ACTIVE_LEVELS(3)
+
+  !Warm started chains along kthetarhos need the chunked schedulers, where a chain runs on a single thread
+  chaining = (contchain > 0) .AND. (sched_meth /= 0)
+
 
   !Allocation and initialization of calculated arrays (named "output")
   CALL allocate_output() !subroutine found in mod_make_io
   CALL init_asym() !subroutine in datcal. Initializes variables used for Fried-Conte function asymptotic expansions
+  CALL init_elltab() !subroutine in trapints. Tabulates the elliptic integrals used in the trapped particle integrands
 
 
   CALL calcphi() !calculate poloidal density asymmetries due to rotation and temp anisotropy
@@ -229,8 +329,9 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
   CALL calccoefs() !calculate e# LFS to FSA transport coefficients, FSA R/Ln, FSA n, asym factor, and also 2D R/Ln for all ion species
   !The poloidal asymmetry terms take around 10ms to calculate
 
-  weidcount = 0 !Initialize dispersion relation function call counter. Used for debugging purposes
+  weidcount = 0; weidtotal = 0 !Initialize dispersion relation function call counters. Used for debugging purposes
   Nsolrat = 0   !Initializes count of failed solutions (see calcroutines). Rarely occurs.
+  ncachehit = 0; ncachemiss = 0 !fonct cache counters (see calcfonct)
 
   !Total number of jobs to run
   TotTask=dimx*dimn
@@ -241,12 +342,39 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
      IF(ALLOCATED(radcoord) .EQV. .FALSE.) ALLOCATE(radcoord(TotTask))
   END IF
 
-  CALL MPI_Barrier(mpi_comm_world,ierror)
+  !Order in which the tasks are handed out. Identical on all ranks
+  !With chaining, the units handed out are the chains of the radial points
+  IF (chaining) THEN
+     TotUnit=dimx
+  ELSE
+     TotUnit=TotTask
+  ENDIF
+  ALLOCATE(taskorder(TotUnit))
+  CALL ordertasks(TotUnit,taskorder)
+
+  !The directory of the solution cache (see calc) must exist and be writable before any task reads or writes an entry.
+  !Checked with a probe file, since Fortran cannot inquire about directories
+  IF (solcache .AND. (runcounter == 0) .AND. (myrank == 0)) THEN
+     OPEN(NEWUNIT=cacheunit, file=solcachedir//'probe.tmp', status='replace', action='write', iostat=ierror)
+     IF (ierror /= 0) THEN
+        WRITE(stderr,"(A,A,A)") 'solcache is on but the directory ',solcachedir,' does not exist or is not writable! Abandon ship...'
+        CALL mpi_abort(qlkcomm,-1)
+     ENDIF
+     CLOSE(cacheunit,status='delete')
+  ENDIF
+
+  CALL MPI_Barrier(qlkcomm,ierror)
 
-  !! NOW THE MAGIC HAPPENS!! This subroutine is contained below
+  !! NOW THE MAGIC HAPPENS!! These subroutines are contained below
   !! Distributes tasks to all processors and calculates output
 
-  CALL DistriTask(TotTask,nproc,myrank)
+  IF (sched_meth == 0) THEN
+     CALL DistriTask(TotTask,nproc,myrank)
+  ELSE
+     CALL DistriChunks(TotUnit,nproc,myrank)
+  ENDIF
+  DEALLOCATE(taskorder)
+  weidtotal = weidtotal + weidcount !calls made by this thread outside the task threads
 
   IF (myrank==0) THEN
      IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A)") '*** Collecting output'
@@ -257,11 +385,17 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
      IF (myrank==0) CALL SYSTEM_CLOCK(time3)
      CALL collectarrays()
   ENDIF
-  CALL MPI_Barrier(mpi_comm_world,ierror)
+  CALL MPI_Barrier(qlkcomm,ierror)
+
+  !fonct cache hits and misses of all ranks, for the profiling output
+  IF (verbose .EQV. .TRUE.) THEN
+     cachecount = (/ ncachehit, ncachemiss /)
+     CALL MPI_Reduce(cachecount,cachecounttot,2,MPI_INTEGER,MPI_SUM,0,qlkcomm,ierror)
+  ENDIF
 
   CALL allocate_endoutput()
 
-  !If rank0, then carry out the saturation rules and output final results. This will soon be parallelized too. Trivial over dimx
+  !Carry out the saturation rules on all ranks. Radial positions are distributed over ranks and OpenMP threads, and reduced once in reduceoutput
   IF (myrank==0) THEN 
      CALL SYSTEM_CLOCK(time4)
      CALL SYSTEM_CLOCK(count_rate=freq)
@@ -275,6 +409,7 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
      timetot = REAL(time2-time1) / REAL(freq)
      IF (verbose .EQV. .TRUE.) WRITE(stdout,*)
      IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A,F11.3,A)") 'Profiling: Hurrah! All eigenmodes calculated! Time = ',timetot,' s'  !final write
+     IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A,I0,A,I0)") 'Profiling: fonct cache hits = ',cachecounttot(1),', misses = ',cachecounttot(2)
 
      IF (verbose .EQV. .TRUE.) WRITE(stdout,*)     
      IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A)") '*** Calculating nonlinear saturation rule'
@@ -287,109 +422,90 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
         IF (verbose .EQV. .TRUE.) WRITE(stdout,"(A)") '*** separateflux=T ,  NL saturation rule for separate modes also calculated'
         IF (verbose .EQV. .TRUE.) WRITE(stdout,*)     
      ENDIF
-     CALL saturation(1) !set 0 for including all modes, 1 for only ITG, 2 for only TEM, 3 for only ETG
-     IF (PRESENT(eefITG_SIout))   eefITG_SIout=eef_SI; 
-     IF (PRESENT(eefITG_GBout))   eefITG_GBout=eef_GB; 
-     IF (PRESENT(epfITG_SIout))   epfITG_SIout=epf_SI; 
-     IF (PRESENT(epfITG_GBout))   epfITG_GBout=epf_GB; 
-
-     IF (PRESENT(dfeITG_SIout))   dfeITG_SIout=dfe_SI; 
-     IF (PRESENT(vteITG_SIout))  vteITG_SIout=vte_SI; 
-     IF (PRESENT(vceITG_SIout))  vceITG_SIout=vce_SI; 
-
-     IF (PRESENT(dfeITG_GBout))   dfeITG_GBout=dfe_GB; 
-     IF (PRESENT(vteITG_GBout))  vteITG_GBout=vte_GB; 
-     IF (PRESENT(vceITG_GBout))  vceITG_GBout=vce_GB; 
-
-     IF (PRESENT(chieeITG_SIout))   chieeITG_SIout=chiee_SI; 
-     IF (PRESENT(veneITG_SIout))  veneITG_SIout=vene_SI; 
-     IF (PRESENT(veceITG_SIout))  veceITG_SIout=vece_SI; 
-
-     IF (PRESENT(chieeITG_GBout))   chieeITG_GBout=chiee_GB; 
-     IF (PRESENT(veneITG_GBout))  veneITG_GBout=vene_GB; 
-     IF (PRESENT(veceITG_GBout))  veceITG_GBout=vece_GB; 
-
-     IF (PRESENT(iefITG_SIout))   iefITG_SIout=ief_SI; 
-     IF (PRESENT(ipfITG_SIout))   ipfITG_SIout=ipf_SI; 
-     IF (PRESENT(ivfITG_SIout))   ivfITG_SIout=ivf_SI; 
-
-     IF (PRESENT(iefITG_GBout))   iefITG_GBout=ief_GB; 
-     IF (PRESENT(ipfITG_GBout))   ipfITG_GBout=ipf_GB; 
-     IF (PRESENT(ivfITG_GBout))   ivfITG_GBout=ivf_GB; 
-
-     IF (PRESENT(dfiITG_SIout))   dfiITG_SIout=dfi_SI; 
-     IF (PRESENT(vtiITG_SIout))  vtiITG_SIout=vti_SI; 
-     IF (PRESENT(vciITG_SIout))  vciITG_SIout=vci_SI; 
-     IF (PRESENT(vriITG_SIout))  vriITG_SIout=vri_SI; 
-
-     IF (PRESENT(dfiITG_GBout))   dfiITG_GBout=dfi_GB; 
-     IF (PRESENT(vtiITG_GBout))  vtiITG_GBout=vti_GB; 
-     IF (PRESENT(vciITG_GBout))  vciITG_GBout=vci_GB; 
-     IF (PRESENT(vriITG_GBout))  vriITG_GBout=vri_GB; 
-
-     IF (PRESENT(chieiITG_SIout))   chieiITG_SIout=chiei_SI; 
-     IF (PRESENT(veniITG_SIout))  veniITG_SIout=veni_SI; 
-     IF (PRESENT(veciITG_SIout))  veciITG_SIout=veci_SI; 
-     IF (PRESENT(veriITG_SIout))  veriITG_SIout=veri_SI; 
-
-     IF (PRESENT(chieiITG_GBout))   chieiITG_GBout=chiei_GB; 
-     IF (PRESENT(veniITG_GBout))  veniITG_GBout=veni_GB; 
-     IF (PRESENT(veciITG_GBout))  veciITG_GBout=veci_GB; 
-     IF (PRESENT(veriITG_GBout))  veriITG_GBout=veri_GB; 
-
-     CALL saturation(2) !set 0 for including all modes, 1 for only ITG, 2 for only TEM, 3 for only ETG
-     IF (PRESENT(eefTEM_SIout))   eefTEM_SIout=eef_SI; 
-     IF (PRESENT(eefTEM_GBout))   eefTEM_GBout=eef_GB; 
-     IF (PRESENT(epfTEM_SIout))   epfTEM_SIout=epf_SI; 
-     IF (PRESENT(epfTEM_GBout))   epfTEM_GBout=epf_GB; 
-
-     IF (PRESENT(dfeTEM_SIout))   dfeTEM_SIout=dfe_SI; 
-     IF (PRESENT(vteTEM_SIout))  vteTEM_SIout=vte_SI; 
-     IF (PRESENT(vceTEM_SIout))  vceTEM_SIout=vce_SI; 
-
-     IF (PRESENT(dfeTEM_GBout))   dfeTEM_GBout=dfe_GB; 
-     IF (PRESENT(vteTEM_GBout))  vteTEM_GBout=vte_GB; 
-     IF (PRESENT(vceTEM_GBout))  vceTEM_GBout=vce_GB; 
-
-     IF (PRESENT(chieeTEM_SIout))   chieeTEM_SIout=chiee_SI; 
-     IF (PRESENT(veneTEM_SIout))  veneTEM_SIout=vene_SI; 
-     IF (PRESENT(veceTEM_SIout))  veceTEM_SIout=vece_SI; 
-
-     IF (PRESENT(chieeTEM_GBout))   chieeTEM_GBout=chiee_GB; 
-     IF (PRESENT(veneTEM_GBout))  veneTEM_GBout=vene_GB; 
-     IF (PRESENT(veceTEM_GBout))  veceTEM_GBout=vece_GB; 
-
-     IF (PRESENT(iefTEM_SIout))   iefTEM_SIout=ief_SI; 
-     IF (PRESENT(ipfTEM_SIout))   ipfTEM_SIout=ipf_SI; 
-     IF (PRESENT(ivfTEM_SIout))   ivfTEM_SIout=ivf_SI; 
-
-     IF (PRESENT(iefTEM_GBout))   iefTEM_GBout=ief_GB; 
-     IF (PRESENT(ipfTEM_GBout))   ipfTEM_GBout=ipf_GB; 
-     IF (PRESENT(ivfTEM_GBout))   ivfTEM_GBout=ivf_GB; 
-
-     IF (PRESENT(dfiTEM_SIout))   dfiTEM_SIout=dfi_SI; 
-     IF (PRESENT(vtiTEM_SIout))  vtiTEM_SIout=vti_SI; 
-     IF (PRESENT(vciTEM_SIout))  vciTEM_SIout=vci_SI; 
-     IF (PRESENT(vriTEM_SIout))  vriTEM_SIout=vri_SI; 
-
-     IF (PRESENT(dfiTEM_GBout))  dfiTEM_GBout=dfi_GB; 
-     IF (PRESENT(vtiTEM_GBout))  vtiTEM_GBout=vti_GB; 
-     IF (PRESENT(vciTEM_GBout))  vciTEM_GBout=vci_GB; 
-     IF (PRESENT(vriTEM_GBout))  vriTEM_GBout=vri_GB; 
-
-     IF (PRESENT(chieiTEM_SIout))   chieiTEM_SIout=chiei_SI;
-     IF (PRESENT(veniTEM_SIout))  veniTEM_SIout=veni_SI; 
-     IF (PRESENT(veciTEM_SIout))  veciTEM_SIout=veci_SI; 
-     IF (PRESENT(veriTEM_SIout))  veriTEM_SIout=veri_SI; 
-
-     IF (PRESENT(chieiTEM_GBout))  chieiTEM_GBout=chiei_GB; 
-     IF (PRESENT(veniTEM_GBout))  veniTEM_GBout=veni_GB; 
-     IF (PRESENT(veciTEM_GBout))  veciTEM_GBout=veci_GB; 
-     IF (PRESENT(veriTEM_GBout))  veriTEM_GBout=veri_GB; 
-
   ENDIF
 
-  CALL saturation(0) !set 0 for including all modes, 1 for only ITG, 2 for only TEM
+  CALL saturation(0) !set 0 for including all modes, 1 for only ITG, 2 for only TEM. With separateflux, ITG and TEM only are saved in the same call
+
+  !ITG-only and TEM-only fluxes were saved in the same saturation sweep
+  IF (separateflux .EQV. .TRUE.) THEN
+     IF (PRESENT(eefITG_SIout)) eefITG_SIout=eefITG_SI
+     IF (PRESENT(eefITG_GBout)) eefITG_GBout=eefITG_GB
+     IF (PRESENT(epfITG_SIout)) epfITG_SIout=epfITG_SI
+     IF (PRESENT(epfITG_GBout)) epfITG_GBout=epfITG_GB
+     IF (PRESENT(dfeITG_SIout)) dfeITG_SIout=dfeITG_SI
+     IF (PRESENT(vteITG_SIout)) vteITG_SIout=vteITG_SI
+     IF (PRESENT(vceITG_SIout)) vceITG_SIout=vceITG_SI
+     IF (PRESENT(dfeITG_GBout)) dfeITG_GBout=dfeITG_GB
+     IF (PRESENT(vteITG_GBout)) vteITG_GBout=vteITG_GB
+     IF (PRESENT(vceITG_GBout)) vceITG_GBout=vceITG_GB
+     IF (PRESENT(chieeITG_SIout)) chieeITG_SIout=chieeITG_SI
+     IF (PRESENT(veneITG_SIout)) veneITG_SIout=veneITG_SI
+     IF (PRESENT(veceITG_SIout)) veceITG_SIout=veceITG_SI
+     IF (PRESENT(chieeITG_GBout)) chieeITG_GBout=chieeITG_GB
+     IF (PRESENT(veneITG_GBout)) veneITG_GBout=veneITG_GB
+     IF (PRESENT(veceITG_GBout)) veceITG_GBout=veceITG_GB
+     IF (PRESENT(iefITG_SIout)) iefITG_SIout=iefITG_SI
+     IF (PRESENT(ipfITG_SIout)) ipfITG_SIout=ipfITG_SI
+     IF (PRESENT(ivfITG_SIout)) ivfITG_SIout=ivfITG_SI
+     IF (PRESENT(iefITG_GBout)) iefITG_GBout=iefITG_GB
+     IF (PRESENT(ipfITG_GBout)) ipfITG_GBout=ipfITG_GB
+     IF (PRESENT(ivfITG_GBout)) ivfITG_GBout=ivfITG_GB
+     IF (PRESENT(dfiITG_SIout)) dfiITG_SIout=dfiITG_SI
+     IF (PRESENT(vtiITG_SIout)) vtiITG_SIout=vtiITG_SI
+     IF (PRESENT(vciITG_SIout)) vciITG_SIout=vciITG_SI
+     IF (PRESENT(vriITG_SIout)) vriITG_SIout=vriITG_SI
+     IF (PRESENT(dfiITG_GBout)) dfiITG_GBout=dfiITG_GB
+     IF (PRESENT(vtiITG_GBout)) vtiITG_GBout=vtiITG_GB
+     IF (PRESENT(vciITG_GBout)) vciITG_GBout=vciITG_GB
+     IF (PRESENT(vriITG_GBout)) vriITG_GBout=vriITG_GB
+     IF (PRESENT(chieiITG_SIout)) chieiITG_SIout=chieiITG_SI
+     IF (PRESENT(veniITG_SIout)) veniITG_SIout=veniITG_SI
+     IF (PRESENT(veciITG_SIout)) veciITG_SIout=veciITG_SI
+     IF (PRESENT(veriITG_SIout)) veriITG_SIout=veriITG_SI
+     IF (PRESENT(chieiITG_GBout)) chieiITG_GBout=chieiITG_GB
+     IF (PRESENT(veniITG_GBout)) veniITG_GBout=veniITG_GB
+     IF (PRESENT(veciITG_GBout)) veciITG_GBout=veciITG_GB
+     IF (PRESENT(veriITG_GBout)) veriITG_GBout=veriITG_GB
+
+     IF (PRESENT(eefTEM_SIout)) eefTEM_SIout=eefTEM_SI
+     IF (PRESENT(eefTEM_GBout)) eefTEM_GBout=eefTEM_GB
+     IF (PRESENT(epfTEM_SIout)) epfTEM_SIout=epfTEM_SI
+     IF (PRESENT(epfTEM_GBout)) epfTEM_GBout=epfTEM_GB
+     IF (PRESENT(dfeTEM_SIout)) dfeTEM_SIout=dfeTEM_SI
+     IF (PRESENT(vteTEM_SIout)) vteTEM_SIout=vteTEM_SI
+     IF (PRESENT(vceTEM_SIout)) vceTEM_SIout=vceTEM_SI
+     IF (PRESENT(dfeTEM_GBout)) dfeTEM_GBout=dfeTEM_GB
+     IF (PRESENT(vteTEM_GBout)) vteTEM_GBout=vteTEM_GB
+     IF (PRESENT(vceTEM_GBout)) vceTEM_GBout=vceTEM_GB
+     IF (PRESENT(chieeTEM_SIout)) chieeTEM_SIout=chieeTEM_SI
+     IF (PRESENT(veneTEM_SIout)) veneTEM_SIout=veneTEM_SI
+     IF (PRESENT(veceTEM_SIout)) veceTEM_SIout=veceTEM_SI
+     IF (PRESENT(chieeTEM_GBout)) chieeTEM_GBout=chieeTEM_GB
+     IF (PRESENT(veneTEM_GBout)) veneTEM_GBout=veneTEM_GB
+     IF (PRESENT(veceTEM_GBout)) veceTEM_GBout=veceTEM_GB
+     IF (PRESENT(iefTEM_SIout)) iefTEM_SIout=iefTEM_SI
+     IF (PRESENT(ipfTEM_SIout)) ipfTEM_SIout=ipfTEM_SI
+     IF (PRESENT(ivfTEM_SIout)) ivfTEM_SIout=ivfTEM_SI
+     IF (PRESENT(iefTEM_GBout)) iefTEM_GBout=iefTEM_GB
+     IF (PRESENT(ipfTEM_GBout)) ipfTEM_GBout=ipfTEM_GB
+     IF (PRESENT(ivfTEM_GBout)) ivfTEM_GBout=ivfTEM_GB
+     IF (PRESENT(dfiTEM_SIout)) dfiTEM_SIout=dfiTEM_SI
+     IF (PRESENT(vtiTEM_SIout)) vtiTEM_SIout=vtiTEM_SI
+     IF (PRESENT(vciTEM_SIout)) vciTEM_SIout=vciTEM_SI
+     IF (PRESENT(vriTEM_SIout)) vriTEM_SIout=vriTEM_SI
+     IF (PRESENT(dfiTEM_GBout)) dfiTEM_GBout=dfiTEM_GB
+     IF (PRESENT(vtiTEM_GBout)) vtiTEM_GBout=vtiTEM_GB
+     IF (PRESENT(vciTEM_GBout)) vciTEM_GBout=vciTEM_GB
+     IF (PRESENT(vriTEM_GBout)) vriTEM_GBout=vriTEM_GB
+     IF (PRESENT(chieiTEM_SIout)) chieiTEM_SIout=chieiTEM_SI
+     IF (PRESENT(veniTEM_SIout)) veniTEM_SIout=veniTEM_SI
+     IF (PRESENT(veciTEM_SIout)) veciTEM_SIout=veciTEM_SI
+     IF (PRESENT(veriTEM_SIout)) veriTEM_SIout=veriTEM_SI
+     IF (PRESENT(chieiTEM_GBout)) chieiTEM_GBout=chieiTEM_GB
+     IF (PRESENT(veniTEM_GBout)) veniTEM_GBout=veniTEM_GB
+     IF (PRESENT(veciTEM_GBout)) veciTEM_GBout=veciTEM_GB
+     IF (PRESENT(veriTEM_GBout)) veriTEM_GBout=veriTEM_GB
+  ENDIF
 
   IF (myrank==0) THEN
      CALL SYSTEM_CLOCK(time2)
@@ -435,395 +551,16 @@ SUBROUTINE qualikiz(dimxin, rhoin, dimnin, nionsin, numsolsin, phys_methin, coll
 
   CALL setoutput() !set all standard output
 
-  !messy setting separated flux output if they exist
-
-  IF (PRESENT(eefITG_SIout))   ALLOCATE(eefITG_SIouttmp(dimx))
-  IF (PRESENT(epfITG_SIout))  ALLOCATE(epfITG_SIouttmp(dimx))
-  IF (PRESENT(dfeITG_SIout))  ALLOCATE(dfeITG_SIouttmp(dimx))
-  IF (PRESENT(vteITG_SIout))  ALLOCATE(vteITG_SIouttmp(dimx))
-  IF (PRESENT(vceITG_SIout))  ALLOCATE(vceITG_SIouttmp(dimx))
-  IF (PRESENT(chieeITG_SIout)) ALLOCATE(chieeITG_SIouttmp(dimx))
-  IF (PRESENT(veneITG_SIout)) ALLOCATE(veneITG_SIouttmp(dimx))
-  IF (PRESENT(veceITG_SIout)) ALLOCATE(veceITG_SIouttmp(dimx))
-
-  IF (PRESENT(iefITG_SIout))  ALLOCATE(iefITG_SIouttmp(dimx,nions))
-  IF (PRESENT(ivfITG_SIout))  ALLOCATE(ivfITG_SIouttmp(dimx,nions))
-  IF (PRESENT(ipfITG_SIout))  ALLOCATE(ipfITG_SIouttmp(dimx,nions))
-  IF (PRESENT(dfiITG_SIout))  ALLOCATE(dfiITG_SIouttmp(dimx,nions))
-  IF (PRESENT(vtiITG_SIout))  ALLOCATE(vtiITG_SIouttmp(dimx,nions))
-  IF (PRESENT(vciITG_SIout))  ALLOCATE(vciITG_SIouttmp(dimx,nions))
-  IF (PRESENT(vriITG_SIout))  ALLOCATE(vriITG_SIouttmp(dimx,nions))
-  IF (PRESENT(chieiITG_SIout)) ALLOCATE(chieiITG_SIouttmp(dimx,nions))
-  IF (PRESENT(veniITG_SIout)) ALLOCATE(veniITG_SIouttmp(dimx,nions))
-  IF (PRESENT(veciITG_SIout)) ALLOCATE(veciITG_SIouttmp(dimx,nions))
-  IF (PRESENT(veriITG_SIout)) ALLOCATE(veriITG_SIouttmp(dimx,nions))
-
-  IF (PRESENT(eefTEM_SIout))   ALLOCATE(eefTEM_SIouttmp(dimx))
-  IF (PRESENT(epfTEM_SIout))  ALLOCATE(epfTEM_SIouttmp(dimx))
-  IF (PRESENT(dfeTEM_SIout))  ALLOCATE(dfeTEM_SIouttmp(dimx))
-  IF (PRESENT(vteTEM_SIout))  ALLOCATE(vteTEM_SIouttmp(dimx))
-  IF (PRESENT(vceTEM_SIout))  ALLOCATE(vceTEM_SIouttmp(dimx))
-  IF (PRESENT(chieeTEM_SIout)) ALLOCATE(chieeTEM_SIouttmp(dimx))
-  IF (PRESENT(veneTEM_SIout)) ALLOCATE(veneTEM_SIouttmp(dimx))
-  IF (PRESENT(veceTEM_SIout)) ALLOCATE(veceTEM_SIouttmp(dimx))
-
-  IF (PRESENT(iefTEM_SIout))  ALLOCATE(iefTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(ivfTEM_SIout))  ALLOCATE(ivfTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(ipfTEM_SIout))  ALLOCATE(ipfTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(dfiTEM_SIout))  ALLOCATE(dfiTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(vtiTEM_SIout))  ALLOCATE(vtiTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(vciTEM_SIout))  ALLOCATE(vciTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(vriTEM_SIout))  ALLOCATE(vriTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(chieiTEM_SIout)) ALLOCATE(chieiTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(veniTEM_SIout)) ALLOCATE(veniTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(veciTEM_SIout)) ALLOCATE(veciTEM_SIouttmp(dimx,nions))
-  IF (PRESENT(veriTEM_SIout)) ALLOCATE(veriTEM_SIouttmp(dimx,nions))
-
-  IF (PRESENT(eefETG_SIout))  ALLOCATE(eefETG_SIouttmp(dimx))
-  IF (PRESENT(chieeETG_SIout)) ALLOCATE(chieeETG_SIouttmp(dimx))
-  IF (PRESENT(veneETG_SIout)) ALLOCATE(veneETG_SIouttmp(dimx))
-  IF (PRESENT(veceETG_SIout)) ALLOCATE(veceETG_SIouttmp(dimx))
-
-  !
-  IF (PRESENT(eefITG_GBout))   ALLOCATE(eefITG_GBouttmp(dimx))
-  IF (PRESENT(epfITG_GBout))  ALLOCATE(epfITG_GBouttmp(dimx))
-  IF (PRESENT(dfeITG_GBout))  ALLOCATE(dfeITG_GBouttmp(dimx))
-  IF (PRESENT(vteITG_GBout))  ALLOCATE(vteITG_GBouttmp(dimx))
-  IF (PRESENT(vceITG_GBout))  ALLOCATE(vceITG_GBouttmp(dimx))
-  IF (PRESENT(chieeITG_GBout)) ALLOCATE(chieeITG_GBouttmp(dimx))
-  IF (PRESENT(veneITG_GBout)) ALLOCATE(veneITG_GBouttmp(dimx))
-  IF (PRESENT(veceITG_GBout)) ALLOCATE(veceITG_GBouttmp(dimx))
-
-  IF (PRESENT(iefITG_GBout))  ALLOCATE(iefITG_GBouttmp(dimx,nions))
-  IF (PRESENT(ivfITG_GBout))  ALLOCATE(ivfITG_GBouttmp(dimx,nions))
-  IF (PRESENT(ipfITG_GBout))  ALLOCATE(ipfITG_GBouttmp(dimx,nions))
-  IF (PRESENT(dfiITG_GBout))  ALLOCATE(dfiITG_GBouttmp(dimx,nions))
-  IF (PRESENT(vtiITG_GBout))  ALLOCATE(vtiITG_GBouttmp(dimx,nions))
-  IF (PRESENT(vciITG_GBout))  ALLOCATE(vciITG_GBouttmp(dimx,nions))
-  IF (PRESENT(vriITG_GBout))  ALLOCATE(vriITG_GBouttmp(dimx,nions))
-  IF (PRESENT(chieiITG_GBout)) ALLOCATE(chieiITG_GBouttmp(dimx,nions))
-  IF (PRESENT(veniITG_GBout)) ALLOCATE(veniITG_GBouttmp(dimx,nions))
-  IF (PRESENT(veciITG_GBout)) ALLOCATE(veciITG_GBouttmp(dimx,nions))
-  IF (PRESENT(veriITG_GBout)) ALLOCATE(veriITG_GBouttmp(dimx,nions))
-
-  IF (PRESENT(eefTEM_GBout))   ALLOCATE(eefTEM_GBouttmp(dimx))
-  IF (PRESENT(epfTEM_GBout))  ALLOCATE(epfTEM_GBouttmp(dimx))
-  IF (PRESENT(dfeTEM_GBout))  ALLOCATE(dfeTEM_GBouttmp(dimx))
-  IF (PRESENT(vteTEM_GBout))  ALLOCATE(vteTEM_GBouttmp(dimx))
-  IF (PRESENT(vceTEM_GBout))  ALLOCATE(vceTEM_GBouttmp(dimx))
-  IF (PRESENT(chieeTEM_GBout)) ALLOCATE(chieeTEM_GBouttmp(dimx))
-  IF (PRESENT(veneTEM_GBout)) ALLOCATE(veneTEM_GBouttmp(dimx))
-  IF (PRESENT(veceTEM_GBout)) ALLOCATE(veceTEM_GBouttmp(dimx))
-
-  IF (PRESENT(iefTEM_GBout))  ALLOCATE(iefTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(ivfTEM_GBout))  ALLOCATE(ivfTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(ipfTEM_GBout))  ALLOCATE(ipfTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(dfiTEM_GBout))  ALLOCATE(dfiTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(vtiTEM_GBout))  ALLOCATE(vtiTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(vciTEM_GBout))  ALLOCATE(vciTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(vriTEM_GBout))  ALLOCATE(vriTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(chieiTEM_GBout)) ALLOCATE(chieiTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(veniTEM_GBout)) ALLOCATE(veniTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(veciTEM_GBout)) ALLOCATE(veciTEM_GBouttmp(dimx,nions))
-  IF (PRESENT(veriTEM_GBout)) ALLOCATE(veriTEM_GBouttmp(dimx,nions))
-
-  IF (PRESENT(eefETG_GBout))  ALLOCATE(eefETG_GBouttmp(dimx))
-  IF (PRESENT(chieeETG_GBout)) ALLOCATE(chieeETG_GBouttmp(dimx))
-  IF (PRESENT(veneETG_GBout)) ALLOCATE(veneETG_GBouttmp(dimx))
-  IF (PRESENT(veceETG_GBout)) ALLOCATE(veceETG_GBouttmp(dimx))
-
-
-  IF (PRESENT(eefITG_SIout))   CALL MPI_AllReduce(eefITG_SIout,eefITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(epfITG_SIout))   CALL MPI_AllReduce(epfITG_SIout,epfITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfeITG_SIout))   CALL MPI_AllReduce(dfeITG_SIout,dfeITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vteITG_SIout))  CALL MPI_AllReduce(vteITG_SIout,vteITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vceITG_SIout))  CALL MPI_AllReduce(vceITG_SIout,vceITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeITG_SIout))   CALL MPI_AllReduce(chieeITG_SIout,chieeITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneITG_SIout))  CALL MPI_AllReduce(veneITG_SIout,veneITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceITG_SIout))  CALL MPI_AllReduce(veceITG_SIout,veceITG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(iefITG_SIout))  CALL MPI_AllReduce(iefITG_SIout,iefITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ivfITG_SIout))  CALL MPI_AllReduce(ivfITG_SIout,ivfITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ipfITG_SIout))  CALL MPI_AllReduce(ipfITG_SIout,ipfITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfiITG_SIout))  CALL MPI_AllReduce(dfiITG_SIout,dfiITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vtiITG_SIout))  CALL MPI_AllReduce(vtiITG_SIout,vtiITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vciITG_SIout))  CALL MPI_AllReduce(vciITG_SIout,vciITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vriITG_SIout))  CALL MPI_AllReduce(vriITG_SIout,vriITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieiITG_SIout))  CALL MPI_AllReduce(chieiITG_SIout,chieiITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veniITG_SIout))  CALL MPI_AllReduce(veniITG_SIout,veniITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veciITG_SIout))  CALL MPI_AllReduce(veciITG_SIout,veciITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veriITG_SIout))  CALL MPI_AllReduce(veriITG_SIout,veriITG_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefTEM_SIout))  CALL MPI_AllReduce(eefTEM_SIout,eefTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(epfTEM_SIout))  CALL MPI_AllReduce(epfTEM_SIout,epfTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfeTEM_SIout))  CALL MPI_AllReduce(dfeTEM_SIout,dfeTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vteTEM_SIout))  CALL MPI_AllReduce(vteTEM_SIout,vteTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vceTEM_SIout))  CALL MPI_AllReduce(vceTEM_SIout,vceTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeTEM_SIout))   CALL MPI_AllReduce(chieeTEM_SIout,chieeTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneTEM_SIout))  CALL MPI_AllReduce(veneTEM_SIout,veneTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceTEM_SIout))  CALL MPI_AllReduce(veceTEM_SIout,veceTEM_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(iefTEM_SIout))  CALL MPI_AllReduce(iefTEM_SIout,iefTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ivfTEM_SIout))  CALL MPI_AllReduce(ivfTEM_SIout,ivfTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ipfTEM_SIout))  CALL MPI_AllReduce(ipfTEM_SIout,ipfTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfiTEM_SIout))  CALL MPI_AllReduce(dfiTEM_SIout,dfiTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vtiTEM_SIout))  CALL MPI_AllReduce(vtiTEM_SIout,vtiTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vciTEM_SIout))  CALL MPI_AllReduce(vciTEM_SIout,vciTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vriTEM_SIout))  CALL MPI_AllReduce(vriTEM_SIout,vriTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieiTEM_SIout))  CALL MPI_AllReduce(chieiTEM_SIout,chieiTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veniTEM_SIout))  CALL MPI_AllReduce(veniTEM_SIout,veniTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veciTEM_SIout))  CALL MPI_AllReduce(veciTEM_SIout,veciTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veriTEM_SIout))  CALL MPI_AllReduce(veriTEM_SIout,veriTEM_SIouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefETG_SIout))  CALL MPI_AllReduce(eefETG_SIout,eefETG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeETG_SIout))   CALL MPI_AllReduce(chieeETG_SIout,chieeETG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneETG_SIout))  CALL MPI_AllReduce(veneETG_SIout,veneETG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceETG_SIout))  CALL MPI_AllReduce(veceETG_SIout,veceETG_SIouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefITG_GBout))   CALL MPI_AllReduce(eefITG_GBout,eefITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(epfITG_GBout))   CALL MPI_AllReduce(epfITG_GBout,epfITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfeITG_GBout))   CALL MPI_AllReduce(dfeITG_GBout,dfeITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vteITG_GBout))   CALL MPI_AllReduce(vteITG_GBout,vteITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vceITG_GBout))   CALL MPI_AllReduce(vceITG_GBout,vceITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeITG_GBout)) CALL MPI_AllReduce(chieeITG_GBout,chieeITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneITG_GBout))  CALL MPI_AllReduce(veneITG_GBout,veneITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceITG_GBout))  CALL MPI_AllReduce(veceITG_GBout,veceITG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(iefITG_GBout))   CALL MPI_AllReduce(iefITG_GBout,iefITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ipfITG_GBout))   CALL MPI_AllReduce(ipfITG_GBout,ipfITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ivfITG_GBout))   CALL MPI_AllReduce(ivfITG_GBout,ivfITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfiITG_GBout))   CALL MPI_AllReduce(dfiITG_GBout,dfiITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vtiITG_GBout))   CALL MPI_AllReduce(vtiITG_GBout,vtiITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vciITG_GBout))   CALL MPI_AllReduce(vciITG_GBout,vciITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vriITG_GBout))   CALL MPI_AllReduce(vriITG_GBout,vriITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieiITG_GBout)) CALL MPI_AllReduce(chieiITG_GBout,chieiITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veniITG_GBout))  CALL MPI_AllReduce(veniITG_GBout,veniITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veciITG_GBout))  CALL MPI_AllReduce(veciITG_GBout,veciITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veriITG_GBout))  CALL MPI_AllReduce(veriITG_GBout,veriITG_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefTEM_GBout))   CALL MPI_AllReduce(eefTEM_GBout,eefTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(epfTEM_GBout))   CALL MPI_AllReduce(epfTEM_GBout,epfTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfeTEM_GBout))   CALL MPI_AllReduce(dfeTEM_GBout,dfeTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vteTEM_GBout))   CALL MPI_AllReduce(vteTEM_GBout,vteTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vceTEM_GBout))   CALL MPI_AllReduce(vceTEM_GBout,vceTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeTEM_GBout)) CALL MPI_AllReduce(chieeTEM_GBout,chieeTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneTEM_GBout))  CALL MPI_AllReduce(veneTEM_GBout,veneTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceTEM_GBout))  CALL MPI_AllReduce(veceTEM_GBout,veceTEM_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(iefTEM_GBout))   CALL MPI_AllReduce(iefTEM_GBout,iefTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ipfTEM_GBout))   CALL MPI_AllReduce(ipfTEM_GBout,ipfTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(ivfTEM_GBout))   CALL MPI_AllReduce(ivfTEM_GBout,ivfTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(dfiTEM_GBout))   CALL MPI_AllReduce(dfiTEM_GBout,dfiTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vtiTEM_GBout))   CALL MPI_AllReduce(vtiTEM_GBout,vtiTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vciTEM_GBout))   CALL MPI_AllReduce(vciTEM_GBout,vciTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(vriTEM_GBout))   CALL MPI_AllReduce(vriTEM_GBout,vriTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieiTEM_GBout)) CALL MPI_AllReduce(chieiTEM_GBout,chieiTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veniTEM_GBout))  CALL MPI_AllReduce(veniTEM_GBout,veniTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veciTEM_GBout))  CALL MPI_AllReduce(veciTEM_GBout,veciTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veriTEM_GBout))  CALL MPI_AllReduce(veriTEM_GBout,veriTEM_GBouttmp,dimx*nions,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefETG_GBout))  CALL MPI_AllReduce(eefETG_GBout,eefETG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(chieeETG_GBout)) CALL MPI_AllReduce(chieeETG_GBout,chieeETG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veneETG_GBout))  CALL MPI_AllReduce(veneETG_GBout,veneETG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-  IF (PRESENT(veceETG_GBout))  CALL MPI_AllReduce(veceETG_GBout,veceETG_GBouttmp,dimx,MPI_DOUBLE_PRECISION,MPI_SUM,mpi_comm_world,ierror)
-
-  IF (PRESENT(eefITG_SIout))  eefITG_SIout=eefITG_SIouttmp
-  IF (PRESENT(epfITG_SIout))  epfITG_SIout=epfITG_SIouttmp
-  IF (PRESENT(dfeITG_SIout))  dfeITG_SIout=dfeITG_SIouttmp
-  IF (PRESENT(vteITG_SIout))  vteITG_SIout=vteITG_SIouttmp
-  IF (PRESENT(vceITG_SIout))  vceITG_SIout=vceITG_SIouttmp
-  IF (PRESENT(chieeITG_SIout)) chieeITG_SIout=chieeITG_SIouttmp
-  IF (PRESENT(veneITG_SIout))  veneITG_SIout=veneITG_SIouttmp
-  IF (PRESENT(veceITG_SIout))  veceITG_SIout=veceITG_SIouttmp
-
-  IF (PRESENT(iefITG_SIout))  iefITG_SIout=iefITG_SIouttmp
-  IF (PRESENT(ipfITG_SIout))  ipfITG_SIout=ipfITG_SIouttmp
-  IF (PRESENT(ivfITG_SIout))  ivfITG_SIout=ivfITG_SIouttmp
-
-  IF (PRESENT(dfiITG_SIout))  dfiITG_SIout=dfiITG_SIouttmp
-  IF (PRESENT(vtiITG_SIout))  vtiITG_SIout=vtiITG_SIouttmp
-  IF (PRESENT(vciITG_SIout))  vciITG_SIout=vciITG_SIouttmp
-  IF (PRESENT(vriITG_SIout))  vriITG_SIout=vriITG_SIouttmp
-  IF (PRESENT(chieiITG_SIout))   chieiITG_SIout=chieiITG_SIouttmp
-  IF (PRESENT(veniITG_SIout))  veniITG_SIout=veniITG_SIouttmp
-  IF (PRESENT(veciITG_SIout))  veciITG_SIout=veciITG_SIouttmp
-  IF (PRESENT(veriITG_SIout))  veriITG_SIout=veriITG_SIouttmp
-
-  IF (PRESENT(eefTEM_SIout))  eefTEM_SIout=eefTEM_SIouttmp
-  IF (PRESENT(epfTEM_SIout))  epfTEM_SIout=epfTEM_SIouttmp
-  IF (PRESENT(dfeTEM_SIout))  dfeTEM_SIout=dfeTEM_SIouttmp
-  IF (PRESENT(vteTEM_SIout))  vteTEM_SIout=vteTEM_SIouttmp
-  IF (PRESENT(vceTEM_SIout))  vceTEM_SIout=vceTEM_SIouttmp
-  IF (PRESENT(chieeTEM_SIout))   chieeTEM_SIout=chieeTEM_SIouttmp
-  IF (PRESENT(veneTEM_SIout))  veneTEM_SIout=veneTEM_SIouttmp
-  IF (PRESENT(veceTEM_SIout))  veceTEM_SIout=veceTEM_SIouttmp
-
-  IF (PRESENT(iefTEM_SIout))  iefTEM_SIout=iefTEM_SIouttmp
-  IF (PRESENT(ipfTEM_SIout))  ipfTEM_SIout=ipfTEM_SIouttmp
-  IF (PRESENT(ivfTEM_SIout))  ivfTEM_SIout=ivfTEM_SIouttmp
-
-  IF (PRESENT(dfiTEM_SIout))  dfiTEM_SIout=dfiTEM_SIouttmp
-  IF (PRESENT(vtiTEM_SIout))  vtiTEM_SIout=vtiTEM_SIouttmp
-  IF (PRESENT(vciTEM_SIout))  vciTEM_SIout=vciTEM_SIouttmp
-  IF (PRESENT(vriTEM_SIout))  vriTEM_SIout=vriTEM_SIouttmp
-  IF (PRESENT(chieiTEM_SIout))   chieiTEM_SIout=chieiTEM_SIouttmp
-  IF (PRESENT(veniTEM_SIout))  veniTEM_SIout=veniTEM_SIouttmp
-  IF (PRESENT(veciTEM_SIout))  veciTEM_SIout=veciTEM_SIouttmp
-  IF (PRESENT(veriTEM_SIout))  veriTEM_SIout=veriTEM_SIouttmp
-
-  IF (PRESENT(eefETG_SIout))   eefETG_SIout=eefETG_SIouttmp
-  IF (PRESENT(chieeETG_SIout)) chieeETG_SIout=chieeETG_SIouttmp
-  IF (PRESENT(veneETG_SIout))  veneETG_SIout=veneETG_SIouttmp
-  IF (PRESENT(veceETG_SIout))  veceETG_SIout=veceETG_SIouttmp
-
-  IF (PRESENT(eefITG_SIout))   DEALLOCATE(eefITG_SIouttmp)
-  IF (PRESENT(epfITG_SIout))   DEALLOCATE(epfITG_SIouttmp)
-  IF (PRESENT(dfeITG_SIout))   DEALLOCATE(dfeITG_SIouttmp)
-  IF (PRESENT(vteITG_SIout))   DEALLOCATE(vteITG_SIouttmp)
-  IF (PRESENT(vceITG_SIout))   DEALLOCATE(vceITG_SIouttmp)
-  IF (PRESENT(chieeITG_SIout)) DEALLOCATE(chieeITG_SIouttmp)
-  IF (PRESENT(veneITG_SIout))  DEALLOCATE(veneITG_SIouttmp)
-  IF (PRESENT(veceITG_SIout))  DEALLOCATE(veceITG_SIouttmp)
-
-  IF (PRESENT(iefITG_SIout))   DEALLOCATE(iefITG_SIouttmp)
-  IF (PRESENT(ipfITG_SIout))   DEALLOCATE(ipfITG_SIouttmp)
-  IF (PRESENT(ivfITG_SIout))   DEALLOCATE(ivfITG_SIouttmp)
-
-  IF (PRESENT(dfiITG_SIout))   DEALLOCATE(dfiITG_SIouttmp)
-  IF (PRESENT(vtiITG_SIout))   DEALLOCATE(vtiITG_SIouttmp)
-  IF (PRESENT(vciITG_SIout))   DEALLOCATE(vciITG_SIouttmp)
-  IF (PRESENT(vriITG_SIout))   DEALLOCATE(vriITG_SIouttmp)
-  IF (PRESENT(chieiITG_SIout)) DEALLOCATE(chieiITG_SIouttmp)
-  IF (PRESENT(veniITG_SIout))  DEALLOCATE(veniITG_SIouttmp)
-  IF (PRESENT(veciITG_SIout))  DEALLOCATE(veciITG_SIouttmp)
-  IF (PRESENT(veriITG_SIout))  DEALLOCATE(veriITG_SIouttmp)
-
-  IF (PRESENT(eefTEM_SIout))   DEALLOCATE(eefTEM_SIouttmp)
-  IF (PRESENT(epfTEM_SIout))   DEALLOCATE(epfTEM_SIouttmp)
-  IF (PRESENT(dfeTEM_SIout))   DEALLOCATE(dfeTEM_SIouttmp)
-  IF (PRESENT(vteTEM_SIout))   DEALLOCATE(vteTEM_SIouttmp)
-  IF (PRESENT(vceTEM_SIout))   DEALLOCATE(vceTEM_SIouttmp)
-  IF (PRESENT(chieeTEM_SIout)) DEALLOCATE(chieeTEM_SIouttmp)
-  IF (PRESENT(veneTEM_SIout))  DEALLOCATE(veneTEM_SIouttmp)
-  IF (PRESENT(veceTEM_SIout))  DEALLOCATE(veceTEM_SIouttmp)
-
-  IF (PRESENT(iefTEM_SIout))   DEALLOCATE(iefTEM_SIouttmp)
-  IF (PRESENT(ipfTEM_SIout))   DEALLOCATE(ipfTEM_SIouttmp)
-  IF (PRESENT(ivfTEM_SIout))   DEALLOCATE(ivfTEM_SIouttmp)
-
-  IF (PRESENT(dfiTEM_SIout))   DEALLOCATE(dfiTEM_SIouttmp)
-  IF (PRESENT(vtiTEM_SIout))   DEALLOCATE(vtiTEM_SIouttmp)
-  IF (PRESENT(vciTEM_SIout))   DEALLOCATE(vciTEM_SIouttmp)
-  IF (PRESENT(vriTEM_SIout))   DEALLOCATE(vriTEM_SIouttmp)
-  IF (PRESENT(chieiTEM_SIout)) DEALLOCATE(chieiTEM_SIouttmp)
-  IF (PRESENT(veniTEM_SIout))  DEALLOCATE(veniTEM_SIouttmp)
-  IF (PRESENT(veciTEM_SIout))  DEALLOCATE(veciTEM_SIouttmp)
-  IF (PRESENT(veriTEM_SIout))  DEALLOCATE(veriTEM_SIouttmp)
-
-  IF (PRESENT(eefETG_SIout))   DEALLOCATE(eefETG_SIouttmp)
-  IF (PRESENT(chieeETG_SIout)) DEALLOCATE(chieeETG_SIouttmp)
-  IF (PRESENT(veneETG_SIout))  DEALLOCATE(veneETG_SIouttmp)
-  IF (PRESENT(veceETG_SIout))  DEALLOCATE(veceETG_SIouttmp)
-
-  !!
-
-  IF (PRESENT(eefITG_GBout))  eefITG_GBout=eefITG_GBouttmp
-  IF (PRESENT(epfITG_GBout))  epfITG_GBout=epfITG_GBouttmp
-  IF (PRESENT(dfeITG_GBout))  dfeITG_GBout=dfeITG_GBouttmp
-  IF (PRESENT(vteITG_GBout))  vteITG_GBout=vteITG_GBouttmp
-  IF (PRESENT(vceITG_GBout))  vceITG_GBout=vceITG_GBouttmp
-  IF (PRESENT(chieeITG_GBout)) chieeITG_GBout=chieeITG_GBouttmp
-  IF (PRESENT(veneITG_GBout))  veneITG_GBout=veneITG_GBouttmp
-  IF (PRESENT(veceITG_GBout))  veceITG_GBout=veceITG_GBouttmp
-
-  IF (PRESENT(iefITG_GBout))  iefITG_GBout=iefITG_GBouttmp
-  IF (PRESENT(ipfITG_GBout))  ipfITG_GBout=ipfITG_GBouttmp
-  IF (PRESENT(ivfITG_GBout))  ivfITG_GBout=ivfITG_GBouttmp
-
-  IF (PRESENT(dfiITG_GBout))  dfiITG_GBout=dfiITG_GBouttmp
-  IF (PRESENT(vtiITG_GBout))  vtiITG_GBout=vtiITG_GBouttmp
-  IF (PRESENT(vciITG_GBout))  vciITG_GBout=vciITG_GBouttmp
-  IF (PRESENT(vriITG_GBout))  vriITG_GBout=vriITG_GBouttmp
-  IF (PRESENT(chieiITG_GBout))   chieiITG_GBout=chieiITG_GBouttmp
-  IF (PRESENT(veniITG_GBout))  veniITG_GBout=veniITG_GBouttmp
-  IF (PRESENT(veciITG_GBout))  veciITG_GBout=veciITG_GBouttmp
-  IF (PRESENT(veriITG_GBout))  veriITG_GBout=veriITG_GBouttmp
-
-  IF (PRESENT(eefTEM_GBout))  eefTEM_GBout=eefTEM_GBouttmp
-  IF (PRESENT(epfTEM_GBout))  epfTEM_GBout=epfTEM_GBouttmp
-  IF (PRESENT(dfeTEM_GBout))  dfeTEM_GBout=dfeTEM_GBouttmp
-  IF (PRESENT(vteTEM_GBout))  vteTEM_GBout=vteTEM_GBouttmp
-  IF (PRESENT(vceTEM_GBout))  vceTEM_GBout=vceTEM_GBouttmp
-  IF (PRESENT(chieeTEM_GBout))   chieeTEM_GBout=chieeTEM_GBouttmp
-  IF (PRESENT(veneTEM_GBout))  veneTEM_GBout=veneTEM_GBouttmp
-  IF (PRESENT(veceTEM_GBout))  veceTEM_GBout=veceTEM_GBouttmp
-
-  IF (PRESENT(iefTEM_GBout))  iefTEM_GBout=iefTEM_GBouttmp
-  IF (PRESENT(ipfTEM_GBout))  ipfTEM_GBout=ipfTEM_GBouttmp
-  IF (PRESENT(ivfTEM_GBout))  ivfTEM_GBout=ivfTEM_GBouttmp
-
-  IF (PRESENT(dfiTEM_GBout))  dfiTEM_GBout=dfiTEM_GBouttmp
-  IF (PRESENT(vtiTEM_GBout))  vtiTEM_GBout=vtiTEM_GBouttmp
-  IF (PRESENT(vciTEM_GBout))  vciTEM_GBout=vciTEM_GBouttmp
-  IF (PRESENT(vriTEM_GBout))  vriTEM_GBout=vriTEM_GBouttmp
-  IF (PRESENT(chieiTEM_GBout))   chieiTEM_GBout=chieiTEM_GBouttmp
-  IF (PRESENT(veniTEM_GBout))  veniTEM_GBout=veniTEM_GBouttmp
-  IF (PRESENT(veciTEM_GBout))  veciTEM_GBout=veciTEM_GBouttmp
-  IF (PRESENT(veriTEM_GBout))  veriTEM_GBout=veriTEM_GBouttmp
-
-  IF (PRESENT(eefETG_GBout))   eefETG_GBout=eefETG_GBouttmp
-  IF (PRESENT(chieeETG_GBout)) chieeETG_GBout=chieeETG_GBouttmp
-  IF (PRESENT(veneETG_GBout))  veneETG_GBout=veneETG_GBouttmp
-  IF (PRESENT(veceETG_GBout))  veceETG_GBout=veceETG_GBouttmp
-
-  IF (PRESENT(eefITG_GBout))   DEALLOCATE(eefITG_GBouttmp)
-  IF (PRESENT(epfITG_GBout))   DEALLOCATE(epfITG_GBouttmp)
-  IF (PRESENT(dfeITG_GBout))   DEALLOCATE(dfeITG_GBouttmp)
-  IF (PRESENT(vteITG_GBout))   DEALLOCATE(vteITG_GBouttmp)
-  IF (PRESENT(vceITG_GBout))   DEALLOCATE(vceITG_GBouttmp)
-  IF (PRESENT(chieeITG_GBout)) DEALLOCATE(chieeITG_GBouttmp)
-  IF (PRESENT(veneITG_GBout))  DEALLOCATE(veneITG_GBouttmp)
-  IF (PRESENT(veceITG_GBout))  DEALLOCATE(veceITG_GBouttmp)
-
-  IF (PRESENT(iefITG_GBout))   DEALLOCATE(iefITG_GBouttmp)
-  IF (PRESENT(ipfITG_GBout))   DEALLOCATE(ipfITG_GBouttmp)
-  IF (PRESENT(ivfITG_GBout))   DEALLOCATE(ivfITG_GBouttmp)
-
-  IF (PRESENT(dfiITG_GBout))   DEALLOCATE(dfiITG_GBouttmp)
-  IF (PRESENT(vtiITG_GBout))   DEALLOCATE(vtiITG_GBouttmp)
-  IF (PRESENT(vciITG_GBout))   DEALLOCATE(vciITG_GBouttmp)
-  IF (PRESENT(vriITG_GBout))   DEALLOCATE(vriITG_GBouttmp)
-  IF (PRESENT(chieiITG_GBout)) DEALLOCATE(chieiITG_GBouttmp)
-  IF (PRESENT(veniITG_GBout))  DEALLOCATE(veniITG_GBouttmp)
-  IF (PRESENT(veciITG_GBout))  DEALLOCATE(veciITG_GBouttmp)
-  IF (PRESENT(veriITG_GBout))  DEALLOCATE(veriITG_GBouttmp)
-
-  IF (PRESENT(eefTEM_GBout))   DEALLOCATE(eefTEM_GBouttmp)
-  IF (PRESENT(epfTEM_GBout))   DEALLOCATE(epfTEM_GBouttmp)
-  IF (PRESENT(dfeTEM_GBout))   DEALLOCATE(dfeTEM_GBouttmp)
-  IF (PRESENT(vteTEM_GBout))   DEALLOCATE(vteTEM_GBouttmp)
-  IF (PRESENT(vceTEM_GBout))   DEALLOCATE(vceTEM_GBouttmp)
-  IF (PRESENT(chieeTEM_GBout)) DEALLOCATE(chieeTEM_GBouttmp)
-  IF (PRESENT(veneTEM_GBout))  DEALLOCATE(veneTEM_GBouttmp)
-  IF (PRESENT(veceTEM_GBout))  DEALLOCATE(veceTEM_GBouttmp)
-
-  IF (PRESENT(iefTEM_GBout))   DEALLOCATE(iefTEM_GBouttmp)
-  IF (PRESENT(ipfTEM_GBout))   DEALLOCATE(ipfTEM_GBouttmp)
-  IF (PRESENT(ivfTEM_GBout))   DEALLOCATE(ivfTEM_GBouttmp)
-
-  IF (PRESENT(dfiTEM_GBout))   DEALLOCATE(dfiTEM_GBouttmp)
-  IF (PRESENT(vtiTEM_GBout))   DEALLOCATE(vtiTEM_GBouttmp)
-  IF (PRESENT(vciTEM_GBout))   DEALLOCATE(vciTEM_GBouttmp)
-  IF (PRESENT(vriTEM_GBout))   DEALLOCATE(vriTEM_GBouttmp)
-  IF (PRESENT(chieiTEM_GBout)) DEALLOCATE(chieiTEM_GBouttmp)
-  IF (PRESENT(veniTEM_GBout))  DEALLOCATE(veniTEM_GBouttmp)
-  IF (PRESENT(veciTEM_GBout))  DEALLOCATE(veciTEM_GBouttmp)
-  IF (PRESENT(veriTEM_GBout))  DEALLOCATE(veriTEM_GBouttmp)
-
-  IF (PRESENT(eefETG_GBout))   DEALLOCATE(eefETG_GBouttmp)
-  IF (PRESENT(chieeETG_GBout)) DEALLOCATE(chieeETG_GBouttmp)
-  IF (PRESENT(veneETG_GBout))  DEALLOCATE(veneETG_GBouttmp)
-  IF (PRESENT(veceETG_GBout))  DEALLOCATE(veceETG_GBouttmp)
+  !Sum the separated flux outputs over the ranks in a single packed reduction
+  ALLOCATE(sepbuf(2*(2*(8+11*nions)+4)*dimx))
+  ALLOCATE(sepbuftmp(2*(2*(8+11*nions)+4)*dimx))
+  nsep=0
+  CALL sepfluxbuffer(sepbuf,nsep,.TRUE.)
+  IF (nsep > 0) CALL MPI_AllReduce(sepbuf,sepbuftmp,nsep,MPI_DOUBLE_PRECISION,MPI_SUM,qlkcomm,ierror)
+  nsep=0
+  CALL sepfluxbuffer(sepbuftmp,nsep,.FALSE.)
+  DEALLOCATE(sepbuf)
+  DEALLOCATE(sepbuftmp)
 
   IF (myrank==0) THEN 
      CALL SYSTEM_CLOCK(time4)
@@ -851,7 +588,7 @@ CONTAINS
     INTEGER,DIMENSION(:),ALLOCATABLE :: Request,OK,Finish
     INTEGER,INTENT(IN) :: NumTasks,numprocs,rank
     REAL(kind=DBL) :: tps
-    INTEGER :: iradcoord,iwavenum, Task, NoTask, iloop, ierr
+    INTEGER :: iradcoord,iwavenum, Task, NoTask, iloop, ierr, nthr
     INTEGER :: one=1, minusone=-1
     LOGICAL :: Complete = .FALSE.
     LOGICAL :: Complete0 = .FALSE.
@@ -862,6 +599,13 @@ CONTAINS
     Task = 0
     NoTask = 0
     tpstot=0 !initialize time
+    !One thread of each rank computes the tasks, on rank 0 next to the distributor thread.
+    !The other threads of nthreads are lent to its contours (see contourthreads)
+    IF (rank==0) THEN
+       nthrfree = MAX(0,nthreads-2)
+    ELSE
+       nthrfree = nthreads-1
+    ENDIF
 
     ! Code for Master processor
     IF (rank==0) THEN
@@ -873,11 +617,16 @@ CONTAINS
        IF(ALLOCATED(Finish) .EQV. .FALSE.) ALLOCATE(Finish(0:numprocs-1))
        Finish(:) = 0
        resready(:)=.FALSE.
+       !Complete0 is saved (initialized in its declaration) and left .TRUE. by the previous call. The distributor
+       !must wait for the worker thread to start, else the first task it hands out is overwritten and never computed
+       Complete0 = .FALSE.
        ! Initialize OMP
        CALL OMP_SET_DYNAMIC(.FALSE.) 
        CALL OMP_SET_NUM_THREADS(2)
        !       WRITE(*,*) 'threads=',omp_get_num_threads()
-       !$OMP PARALLEL
+       !The worker section may run on the 2nd thread, which needs its own copy of the task state in datmat
+       nthr = 2
+       INCLUDE 'taskregion.inc'
        !$OMP SECTIONS
 
        !$OMP SECTION
@@ -887,7 +636,7 @@ CONTAINS
        ! Master receives an integer "1" from each of the slaves in an unblocked receive.
        ! This sign of life from the slaves is checked in the while loop below
        DO iloop=1,numprocs-1
-          CALL MPI_Irecv(OK(iloop),1,MPI_INTEGER,iloop,100+iloop,MPI_COMM_WORLD,Request(iloop),ierr)
+          CALL MPI_Irecv(OK(iloop),1,MPI_INTEGER,iloop,100+iloop,qlkcomm,Request(iloop),ierr)
        ENDDO
 
        !This loop distributes tasks to slaves. The +numprocs is necessary since Task will
@@ -908,14 +657,14 @@ CONTAINS
                    resready(iloop)=.TRUE. !results will now be saved before next distribution
                    IF (Task<=NumTasks) THEN
                       !A valid task number is sent from the Master to the slave
-                      CALL MPI_SSend(Task,1,MPI_INTEGER,iloop,100+iloop,MPI_COMM_WORLD,ierr)
+                      CALL MPI_SSend(Task,1,MPI_INTEGER,iloop,100+iloop,qlkcomm,ierr)
                       !Following MPI_Irecv, when the task is completed, 
                       !the next MPI_Test will provide Complete=.TRUE. for iloop
-                      CALL MPI_Irecv(OK(iloop),1,MPI_INTEGER,iloop,100+iloop,MPI_COMM_WORLD,Request(iloop),ierr)
-                      wavenum(Task)=(Task-1)/(dimx) + 1
-                      radcoord(Task)=MOD((Task-1),dimx) + 1                
+                      CALL MPI_Irecv(OK(iloop),1,MPI_INTEGER,iloop,100+iloop,qlkcomm,Request(iloop),ierr)
+                      wavenum(Task)=(taskorder(Task)-1)/(dimx) + 1
+                      radcoord(Task)=MOD((taskorder(Task)-1),dimx) + 1                
                    ELSE ! No more tasks. Send "-1" to slave, signalling that the tasks are done
-                      CALL MPI_SSend(minusone,1,MPI_INTEGER,iloop,100+iloop,MPI_COMM_WORLD,ierr)
+                      CALL MPI_SSend(minusone,1,MPI_INTEGER,iloop,100+iloop,qlkcomm,ierr)
                       Finish(iloop) = 1
                    ENDIF
                 ENDIF
@@ -954,12 +703,18 @@ CONTAINS
              tps=MPI_Wtime()
              calltimeinit=MPI_Wtime() ! for timing inside routines
              timeoutflag = .FALSE.
-             iwavenum=(NoTask-1)/(dimx) + 1
-             iradcoord=MOD((NoTask-1),dimx) + 1
+             iwavenum=(taskorder(NoTask)-1)/(dimx) + 1
+             iradcoord=MOD((taskorder(NoTask)-1),dimx) + 1
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy+1
              CALL calc(iradcoord,iwavenum)
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy-1
              IF ( (timeoutflag .EQV. .TRUE.) .AND. (verbose .EQV. .TRUE.)) WRITE(stdout,'(A,I7,A,I3)') 'Timeout recorded at (p,nu)=',iradcoord,',',iwavenum
              tps=MPI_Wtime()-tps
              tpstot=tpstot+tps  
+             tasktime(iradcoord,iwavenum)=tps
+             taskdone(iradcoord,iwavenum)=.TRUE.
              IF (verbose .EQV. .TRUE.) THEN
                 WRITE(stdout,300) rank,NoTask,tps,tpstot,iradcoord,iwavenum
              ENDIF
@@ -968,7 +723,7 @@ CONTAINS
           ENDIF
        ENDDO
        !$OMP END SECTIONS
-       !$OMP END PARALLEL
+       INCLUDE 'taskregion_end.inc'
     ELSE
 
        !********************
@@ -978,25 +733,31 @@ CONTAINS
        !The slaves run tasks until they receive NoTask=-1 from the coordinating Master
        DO WHILE (NoTask /= -1)
           !The slaves notify the Master that they are ready for a new task
-          CALL MPI_SSend(one,1,MPI_INTEGER,0,100+rank,MPI_COMM_WORLD,ierr)
+          CALL MPI_SSend(one,1,MPI_INTEGER,0,100+rank,qlkcomm,ierr)
           IF (ressend) THEN
              ! CALL sendresults(iradcoord,iwavenum,rank) !copy over output to rank0 which will have full arrays for later             
           ENDIF
           !The slaves receive their task number back from the Master.
-          CALL MPI_Recv(NoTask,1,MPI_INTEGER,0,100+rank,MPI_COMM_WORLD,status,ierr)
+          CALL MPI_Recv(NoTask,1,MPI_INTEGER,0,100+rank,qlkcomm,status,ierr)
           IF (NoTask /= -1) THEN
              !If a task is assigned, the slaves compute the task. The specific task to
              !be carried out (i.e. wavenumber and 'radius') depends on the value of NoTask.
              tps=MPI_Wtime()
              calltimeinit=MPI_Wtime() ! for timing inside routines
              timeoutflag = .FALSE.
-             iwavenum=(NoTask-1)/(dimx) + 1
-             iradcoord=MOD((NoTask-1),dimx) + 1
+             iwavenum=(taskorder(NoTask)-1)/(dimx) + 1
+             iradcoord=MOD((taskorder(NoTask)-1),dimx) + 1
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy+1
              CALL calc(iradcoord,iwavenum)
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy-1
              IF ((timeoutflag .EQV. .TRUE.) .AND. (verbose .EQV. .TRUE.)) WRITE(stdout,'(A,I7,A,I3)') 'Timeout recorded at (p,nu)=',iradcoord,',',iwavenum
              ressend=.TRUE.
              tps=MPI_Wtime()-tps
              tpstot=tpstot+tps
+             tasktime(iradcoord,iwavenum)=tps
+             taskdone(iradcoord,iwavenum)=.TRUE.
              IF (verbose .EQV. .TRUE.) THEN
                 WRITE(stdout,301) rank,NoTask,tps,tpstot,iradcoord,iwavenum
              ENDIF
@@ -1006,6 +767,295 @@ CONTAINS
     ENDIF
   END SUBROUTINE DistriTask
 
+  SUBROUTINE DistriChunks(NumTasks,numprocs,rank)
+    !Chunked self-scheduling without a master loop. The position in the task
+    !order is split into queues (one shared queue for sched_meth=1, one per rank
+    !for sched_meth=2). Each queue has a counter in an MPI window on its home rank,
+    !and a rank grants itself the next chunk of a queue with an atomic MPI_Fetch_and_op.
+    !Queue q holds the positions q+1, q+1+nq, q+1+2*nq ... of the task order, so with
+    !per-rank queues every rank starts with a comparable mix of cheap and expensive tasks.
+    !A rank whose own queue is empty steals chunks from the queues of the other ranks.
+    !The grant size is sched_chunk, or if 0 sized from the measured average task time
+    !such that a grant holds about grantime seconds of work. It is capped at a fraction
+    !of the work left in the queue, to keep the tail at the end of the run short.
+    !The tasks of a grant are shared by nthreads OpenMP threads. Only the master thread
+    !makes MPI calls, so MPI_THREAD_FUNNELED is sufficient.
+    !With chaining, the units in the queues are radial points, and a thread runs all
+    !kthetarhos of a radial point in increasing order (see contchain in datmat).
+    IMPLICIT NONE
+    INTEGER,INTENT(IN) :: NumTasks,numprocs,rank
+    INTEGER, DIMENSION(:), ALLOCATABLE :: qlen, qseen
+    INTEGER, DIMENSION(1) :: qcount
+    INTEGER(KIND=MPI_ADDRESS_KIND) :: winsize, disp
+    REAL(kind=DBL) :: tps
+    INTEGER :: iradcoord,iwavenum, NoTask, ierr, win, intsize
+    INTEGER :: nq, q, first, last, chunk, ndone, nempty, k, kk, nchain, nthr
+    REAL(kind=DBL) :: tpsnow
+
+    IF (sched_meth == 2) THEN
+       nq = numprocs
+    ELSE
+       nq = 1
+    ENDIF
+    ALLOCATE(qlen(0:nq-1)); ALLOCATE(qseen(0:nq-1))
+    DO q=0,nq-1
+       qlen(q) = MAX(0,(NumTasks-q-1)/nq + 1)
+    ENDDO
+    qseen(:) = 0
+    IF (chaining) THEN
+       nchain = dimn
+    ELSE
+       nchain = 1
+    ENDIF
+
+    !Each rank exposes the counter of its own queue. Only the first nq ranks are queue homes
+    qcount(1) = 0
+    CALL MPI_Type_size(MPI_INTEGER,intsize,ierr)
+    winsize = intsize
+    CALL MPI_Win_create(qcount,winsize,intsize,MPI_INFO_NULL,qlkcomm,win,ierr)
+    CALL MPI_Win_lock_all(0,win,ierr)
+
+    tpstot=0 !initialize time
+    ndone=0
+    nempty=0
+    disp=0
+    q=MOD(rank,nq) !start with own queue
+    DO
+       IF (sched_chunk > 0) THEN
+          chunk = sched_chunk
+       ELSEIF (ndone == 0) THEN
+          chunk = nthreads
+       ELSE
+          !tpstot sums the task times of all threads of this rank
+          chunk = MAX(nthreads,INT(MIN(REAL(NumTasks,DBL),nthreads*grantime*ndone/MAX(tpstot,epsD))))
+       ENDIF
+       chunk = MIN(chunk,MAX(nthreads,(qlen(q)-qseen(q))*nq/(2*numprocs)))
+
+       CALL MPI_Fetch_and_op(chunk,first,MPI_INTEGER,q,disp,MPI_SUM,win,ierr)
+       CALL MPI_Win_flush(q,win,ierr)
+       qseen(q) = MIN(first+chunk,qlen(q))
+
+       IF (first >= qlen(q)) THEN
+          !Queue empty. Counters only increase, so it never needs to be visited again
+          nempty = nempty+1
+          IF (nempty >= nq) EXIT
+          q = MOD(q+1,nq)
+          CYCLE
+       ENDIF
+
+       last = MIN(first+chunk,qlen(q))-1
+       nthr = nthreads
+       nthrfree = 0
+       INCLUDE 'taskregion.inc'
+       !$OMP DO SCHEDULE(DYNAMIC) PRIVATE(NoTask,tps,tpsnow,iradcoord,iwavenum,kk)
+       DO k=first,last
+          DO kk=1,nchain
+             IF (chaining) THEN
+                iradcoord=taskorder(q+1+k*nq)
+                iwavenum=kk
+                NoTask=(iwavenum-1)*dimx + iradcoord
+             ELSE
+                NoTask = taskorder(q+1+k*nq)
+                iwavenum=(NoTask-1)/(dimx) + 1
+                iradcoord=MOD((NoTask-1),dimx) + 1
+             ENDIF
+             tps=MPI_Wtime()
+             calltimeinit=MPI_Wtime() ! for timing inside routines
+             timeoutflag = .FALSE.
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy+1
+             CALL calc(iradcoord,iwavenum)
+             !$OMP ATOMIC
+             ntaskbusy=ntaskbusy-1
+             IF ((timeoutflag .EQV. .TRUE.) .AND. (verbose .EQV. .TRUE.)) WRITE(stdout,'(A,I7,A,I3)') 'Timeout recorded at (p,nu)=',iradcoord,',',iwavenum
+             tps=MPI_Wtime()-tps
+             !$OMP ATOMIC CAPTURE
+             tpstot=tpstot+tps
+             tpsnow=tpstot
+             !$OMP END ATOMIC
+             tasktime(iradcoord,iwavenum)=tps
+             taskdone(iradcoord,iwavenum)=.TRUE.
+             IF (verbose .EQV. .TRUE.) THEN
+                WRITE(stdout,302) rank,NoTask,tps,tpsnow,iradcoord,iwavenum
+             ENDIF
+302          FORMAT(1x,'rank ',I5,' NoTask ',I7,' time ',F10.3,', total time ',F10.3,' (p,nu)=(',I7,',',I3,')')
+          ENDDO
+          !$OMP ATOMIC
+          ndone=ndone+1
+       ENDDO
+       !$OMP END DO NOWAIT
+       !No task of the grant is left for this thread, which now waits at the end of the region.
+       !Until then it is lent to the contours of the tasks still running
+       CALL freethreads(1)
+       INCLUDE 'taskregion_end.inc'
+    ENDDO
+
+    CALL MPI_Win_unlock_all(win,ierr)
+    CALL MPI_Win_free(win,ierr)
+    DEALLOCATE(qlen); DEALLOCATE(qseen)
+
+  END SUBROUTINE DistriChunks
+
+  SUBROUTINE ordertasks(NumTasks,order)
+    !Task numbers (Task-1 = (nu-1)*dimx + p-1) in the order they are handed out:
+    !longest first, so that the expensive tasks do not end up in the tail of the run.
+    !The task cost is estimated from the wall times of a previous run (tasktimein)
+    !where available. Otherwise a crude model is used: the cost grows with kthetarhos
+    !(ETG scale modes), with the analytical fluid growth rate (unstable modes need
+    !the Newton refinement and the QL integrals) and with collisionality.
+    !Tasks without previous timings are put on the same scale as the timed ones.
+    !With chaining, the radial points are ordered by the summed cost of their chain
+    IMPLICIT NONE
+    INTEGER, INTENT(IN) :: NumTasks
+    INTEGER, DIMENSION(NumTasks), INTENT(OUT) :: order
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: cost, model, taskind !heap, not stack: dimx*dimn can be ~1e6
+    LOGICAL, DIMENSION(:), ALLOCATABLE :: timed
+    REAL(KIND=DBL), DIMENSION(:), ALLOCATABLE :: chaincost, chainind
+    REAL(KIND=DBL) :: ana_gamma, collfac
+    INTEGER :: i,p,nu
+
+    ALLOCATE(cost(dimx*dimn), model(dimx*dimn), taskind(dimx*dimn), timed(dimx*dimn))
+
+    DO nu=1,dimn
+       DO p=1,dimx
+          i=(nu-1)*dimx+p
+          CALL ana_fluidsol(p,nu,ana_gamma)
+          IF (coll_flag > 0) THEN
+             collfac = 1. + MIN(Nustar(p),1._DBL)
+          ELSE
+             collfac = 1.
+          ENDIF
+          model(i) = (1. + kthetarhos(nu)) * (1. + MAX(ana_gamma,0._DBL)) * collfac
+          taskind(i) = REAL(i,DBL)
+       ENDDO
+    ENDDO
+
+    timed(:) = .FALSE.
+    IF (PRESENT(tasktimein)) timed = RESHAPE(tasktimein,(/dimx*dimn/)) > 0.
+
+    IF (ANY(timed)) THEN
+       cost = RESHAPE(tasktimein,(/dimx*dimn/))
+       WHERE (.NOT. timed) cost = model * SUM(cost,MASK=timed) / SUM(model,MASK=timed)
+    ELSE
+       cost = model
+    ENDIF
+
+    IF (chaining) THEN
+       ALLOCATE(chaincost(dimx), chainind(dimx))
+       DO p=1,dimx
+          chaincost(p) = SUM(cost(p:dimx*dimn:dimx))
+          chainind(p) = REAL(p,DBL)
+       ENDDO
+       CALL dsort(chaincost,chainind,dimx,-2)
+       order = NINT(chainind)
+       DEALLOCATE(chaincost, chainind)
+    ELSE
+       !Sort by decreasing cost. dsort (SLATEC) carries the task numbers along
+       CALL dsort(cost,taskind,NumTasks,-2)
+       order = NINT(taskind)
+    ENDIF
+
+    DEALLOCATE(cost, model, taskind, timed)
+
+  END SUBROUTINE ordertasks
+
+  SUBROUTINE sepfluxbuffer(buf,pos,topack)
+    ! Packs (topack=T) or unpacks (topack=F) all present separated flux outputs at buf(pos+1:). Advances pos
+    REAL(KIND=DBL), DIMENSION(:), INTENT(INOUT) :: buf
+    INTEGER, INTENT(INOUT) :: pos
+    LOGICAL, INTENT(IN) :: topack
+
+    IF (PRESENT(eefITG_SIout)) CALL moveslice(eefITG_SIout,buf,pos,topack)
+    IF (PRESENT(epfITG_SIout)) CALL moveslice(epfITG_SIout,buf,pos,topack)
+    IF (PRESENT(dfeITG_SIout)) CALL moveslice(dfeITG_SIout,buf,pos,topack)
+    IF (PRESENT(vteITG_SIout)) CALL moveslice(vteITG_SIout,buf,pos,topack)
+    IF (PRESENT(vceITG_SIout)) CALL moveslice(vceITG_SIout,buf,pos,topack)
+    IF (PRESENT(chieeITG_SIout)) CALL moveslice(chieeITG_SIout,buf,pos,topack)
+    IF (PRESENT(veneITG_SIout)) CALL moveslice(veneITG_SIout,buf,pos,topack)
+    IF (PRESENT(veceITG_SIout)) CALL moveslice(veceITG_SIout,buf,pos,topack)
+    IF (PRESENT(iefITG_SIout)) CALL moveslice(iefITG_SIout,buf,pos,topack)
+    IF (PRESENT(ipfITG_SIout)) CALL moveslice(ipfITG_SIout,buf,pos,topack)
+    IF (PRESENT(ivfITG_SIout)) CALL moveslice(ivfITG_SIout,buf,pos,topack)
+    IF (PRESENT(dfiITG_SIout)) CALL moveslice(dfiITG_SIout,buf,pos,topack)
+    IF (PRESENT(vtiITG_SIout)) CALL moveslice(vtiITG_SIout,buf,pos,topack)
+    IF (PRESENT(vciITG_SIout)) CALL moveslice(vciITG_SIout,buf,pos,topack)
+    IF (PRESENT(vriITG_SIout)) CALL moveslice(vriITG_SIout,buf,pos,topack)
+    IF (PRESENT(chieiITG_SIout)) CALL moveslice(chieiITG_SIout,buf,pos,topack)
+    IF (PRESENT(veniITG_SIout)) CALL moveslice(veniITG_SIout,buf,pos,topack)
+    IF (PRESENT(veciITG_SIout)) CALL moveslice(veciITG_SIout,buf,pos,topack)
+    IF (PRESENT(veriITG_SIout)) CALL moveslice(veriITG_SIout,buf,pos,topack)
+
+    IF (PRESENT(eefTEM_SIout)) CALL moveslice(eefTEM_SIout,buf,pos,topack)
+    IF (PRESENT(epfTEM_SIout)) CALL moveslice(epfTEM_SIout,buf,pos,topack)
+    IF (PRESENT(dfeTEM_SIout)) CALL moveslice(dfeTEM_SIout,buf,pos,topack)
+    IF (PRESENT(vteTEM_SIout)) CALL moveslice(vteTEM_SIout,buf,pos,topack)
+    IF (PRESENT(vceTEM_SIout)) CALL moveslice(vceTEM_SIout,buf,pos,topack)
+    IF (PRESENT(chieeTEM_SIout)) CALL moveslice(chieeTEM_SIout,buf,pos,topack)
+    IF (PRESENT(veneTEM_SIout)) CALL moveslice(veneTEM_SIout,buf,pos,topack)
+    IF (PRESENT(veceTEM_SIout)) CALL moveslice(veceTEM_SIout,buf,pos,topack)
+    IF (PRESENT(iefTEM_SIout)) CALL moveslice(iefTEM_SIout,buf,pos,topack)
+    IF (PRESENT(ipfTEM_SIout)) CALL moveslice(ipfTEM_SIout,buf,pos,topack)
+    IF (PRESENT(ivfTEM_SIout)) CALL moveslice(ivfTEM_SIout,buf,pos,topack)
+    IF (PRESENT(dfiTEM_SIout)) CALL moveslice(dfiTEM_SIout,buf,pos,topack)
+    IF (PRESENT(vtiTEM_SIout)) CALL moveslice(vtiTEM_SIout,buf,pos,topack)
+    IF (PRESENT(vciTEM_SIout)) CALL moveslice(vciTEM_SIout,buf,pos,topack)
+    IF (PRESENT(vriTEM_SIout)) CALL moveslice(vriTEM_SIout,buf,pos,topack)
+    IF (PRESENT(chieiTEM_SIout)) CALL moveslice(chieiTEM_SIout,buf,pos,topack)
+    IF (PRESENT(veniTEM_SIout)) CALL moveslice(veniTEM_SIout,buf,pos,topack)
+    IF (PRESENT(veciTEM_SIout)) CALL moveslice(veciTEM_SIout,buf,pos,topack)
+    IF (PRESENT(veriTEM_SIout)) CALL moveslice(veriTEM_SIout,buf,pos,topack)
+
+    IF (PRESENT(eefETG_SIout)) CALL moveslice(eefETG_SIout,buf,pos,topack)
+    IF (PRESENT(chieeETG_SIout)) CALL moveslice(chieeETG_SIout,buf,pos,topack)
+    IF (PRESENT(veneETG_SIout)) CALL moveslice(veneETG_SIout,buf,pos,topack)
+    IF (PRESENT(veceETG_SIout)) CALL moveslice(veceETG_SIout,buf,pos,topack)
+
+    IF (PRESENT(eefITG_GBout)) CALL moveslice(eefITG_GBout,buf,pos,topack)
+    IF (PRESENT(epfITG_GBout)) CALL moveslice(epfITG_GBout,buf,pos,topack)
+    IF (PRESENT(dfeITG_GBout)) CALL moveslice(dfeITG_GBout,buf,pos,topack)
+    IF (PRESENT(vteITG_GBout)) CALL moveslice(vteITG_GBout,buf,pos,topack)
+    IF (PRESENT(vceITG_GBout)) CALL moveslice(vceITG_GBout,buf,pos,topack)
+    IF (PRESENT(chieeITG_GBout)) CALL moveslice(chieeITG_GBout,buf,pos,topack)
+    IF (PRESENT(veneITG_GBout)) CALL moveslice(veneITG_GBout,buf,pos,topack)
+    IF (PRESENT(veceITG_GBout)) CALL moveslice(veceITG_GBout,buf,pos,topack)
+    IF (PRESENT(iefITG_GBout)) CALL moveslice(iefITG_GBout,buf,pos,topack)
+    IF (PRESENT(ipfITG_GBout)) CALL moveslice(ipfITG_GBout,buf,pos,topack)
+    IF (PRESENT(ivfITG_GBout)) CALL moveslice(ivfITG_GBout,buf,pos,topack)
+    IF (PRESENT(dfiITG_GBout)) CALL moveslice(dfiITG_GBout,buf,pos,topack)
+    IF (PRESENT(vtiITG_GBout)) CALL moveslice(vtiITG_GBout,buf,pos,topack)
+    IF (PRESENT(vciITG_GBout)) CALL moveslice(vciITG_GBout,buf,pos,topack)
+    IF (PRESENT(vriITG_GBout)) CALL moveslice(vriITG_GBout,buf,pos,topack)
+    IF (PRESENT(chieiITG_GBout)) CALL moveslice(chieiITG_GBout,buf,pos,topack)
+    IF (PRESENT(veniITG_GBout)) CALL moveslice(veniITG_GBout,buf,pos,topack)
+    IF (PRESENT(veciITG_GBout)) CALL moveslice(veciITG_GBout,buf,pos,topack)
+    IF (PRESENT(veriITG_GBout)) CALL moveslice(veriITG_GBout,buf,pos,topack)
+
+    IF (PRESENT(eefTEM_GBout)) CALL moveslice(eefTEM_GBout,buf,pos,topack)
+    IF (PRESENT(epfTEM_GBout)) CALL moveslice(epfTEM_GBout,buf,pos,topack)
+    IF (PRESENT(dfeTEM_GBout)) CALL moveslice(dfeTEM_GBout,buf,pos,topack)
+    IF (PRESENT(vteTEM_GBout)) CALL moveslice(vteTEM_GBout,buf,pos,topack)
+    IF (PRESENT(vceTEM_GBout)) CALL moveslice(vceTEM_GBout,buf,pos,topack)
+    IF (PRESENT(chieeTEM_GBout)) CALL moveslice(chieeTEM_GBout,buf,pos,topack)
+    IF (PRESENT(veneTEM_GBout)) CALL moveslice(veneTEM_GBout,buf,pos,topack)
+    IF (PRESENT(veceTEM_GBout)) CALL moveslice(veceTEM_GBout,buf,pos,topack)
+    IF (PRESENT(iefTEM_GBout)) CALL moveslice(iefTEM_GBout,buf,pos,topack)
+    IF (PRESENT(ipfTEM_GBout)) CALL moveslice(ipfTEM_GBout,buf,pos,topack)
+    IF (PRESENT(ivfTEM_GBout)) CALL moveslice(ivfTEM_GBout,buf,pos,topack)
+    IF (PRESENT(dfiTEM_GBout)) CALL moveslice(dfiTEM_GBout,buf,pos,topack)
+    IF (PRESENT(vtiTEM_GBout)) CALL moveslice(vtiTEM_GBout,buf,pos,topack)
+    IF (PRESENT(vciTEM_GBout)) CALL moveslice(vciTEM_GBout,buf,pos,topack)
+    IF (PRESENT(vriTEM_GBout)) CALL moveslice(vriTEM_GBout,buf,pos,topack)
+    IF (PRESENT(chieiTEM_GBout)) CALL moveslice(chieiTEM_GBout,buf,pos,topack)
+    IF (PRESENT(veniTEM_GBout)) CALL moveslice(veniTEM_GBout,buf,pos,topack)
+    IF (PRESENT(veciTEM_GBout)) CALL moveslice(veciTEM_GBout,buf,pos,topack)
+    IF (PRESENT(veriTEM_GBout)) CALL moveslice(veriTEM_GBout,buf,pos,topack)
+
+    IF (PRESENT(eefETG_GBout)) CALL moveslice(eefETG_GBout,buf,pos,topack)
+    IF (PRESENT(chieeETG_GBout)) CALL moveslice(chieeETG_GBout,buf,pos,topack)
+    IF (PRESENT(veneETG_GBout)) CALL moveslice(veneETG_GBout,buf,pos,topack)
+    IF (PRESENT(veceETG_GBout)) CALL moveslice(veceETG_GBout,buf,pos,topack)
+  END SUBROUTINE sepfluxbuffer
+
   SUBROUTINE setoutput()
 
     epf_SIout = epf_SI
@@ -1053,6 +1103,7 @@ CONTAINS
     IF (PRESENT(modewidthout))  modewidthout = modewidth
     IF (PRESENT(modeshiftout))  modeshiftout = modeshift
     IF (PRESENT(distanout))     distanout = distan
+    IF (PRESENT(tasktimeout))   tasktimeout = tasktime
     IF (PRESENT(ntorout))       ntorout = ntor
     IF (PRESENT(solout))        solout = sol
     IF (PRESENT(fdsolout))      fdsolout = fdsol
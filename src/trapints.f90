@@ -7,6 +7,62 @@ MODULE trapints
   IMPLICIT NONE
 
 CONTAINS
+  SUBROUTINE init_elltab()
+    !---------------------------------------------------------------------
+    ! Tabulate the complete elliptic integrals K(kappa), E(kappa) and their
+    ! kappa derivatives on a uniform grid in [0,kkelltab]. These only depend
+    ! on kappa, so the table is built once and reused for all radii and
+    ! all omega evaluations of the trapped particle integrands
+    !---------------------------------------------------------------------
+    INTEGER :: j
+    REAL(KIND=DBL) :: kk, k2
+
+    DO j=0,nelltab
+       kk = kkelltab*REAL(j)/REAL(nelltab)
+       k2 = kk*kk
+       Kgtab(j) = ceik(1.-k2)
+       Egtab(j) = ceie(1.-k2)
+       IF (j == 0) THEN
+          dKgtab(j) = 0.
+          dEgtab(j) = 0.
+       ELSE
+          dKgtab(j) = Egtab(j)/(kk*(1.-k2)) - Kgtab(j)/kk
+          dEgtab(j) = (Egtab(j)-Kgtab(j))/kk
+       ENDIF
+    ENDDO
+  END SUBROUTINE init_elltab
+
+  SUBROUTINE ellipkappa(kk,Kg,Eg)
+    !---------------------------------------------------------------------
+    ! Complete elliptic integrals of the first (Kg) and second (Eg) kind
+    ! with modulus kk. Cubic Hermite interpolation in the table from
+    ! init_elltab, with direct evaluation close to the kappa=1 singularity
+    !---------------------------------------------------------------------
+    REAL(KIND=DBL), INTENT(IN) :: kk
+    REAL(KIND=DBL), INTENT(OUT) :: Kg, Eg
+    REAL(KIND=DBL) :: h, t, h00, h01, h10, h11
+    INTEGER :: j
+
+    IF (kk >= kkelltab) THEN
+       Kg = ceik(1.-kk*kk)
+       Eg = ceie(1.-kk*kk)
+       RETURN
+    ENDIF
+
+    h = kkelltab/REAL(nelltab)
+    t = kk/h
+    j = MIN(INT(t),nelltab-1)
+    t = t-REAL(j)
+
+    h00 = (1.+2.*t)*(1.-t)**2
+    h01 = t*t*(3.-2.*t)
+    h10 = t*(1.-t)**2*h
+    h11 = t*t*(t-1.)*h
+
+    Kg = h00*Kgtab(j) + h01*Kgtab(j+1) + h10*dKgtab(j) + h11*dKgtab(j+1)
+    Eg = h00*Egtab(j) + h01*Egtab(j+1) + h10*dEgtab(j) + h11*dEgtab(j+1)
+  END SUBROUTINE ellipkappa
+
   COMPLEX(KIND=DBL) FUNCTION FFki(kk,caseflag,nion)
     !---------------------------------------------------------------------
     ! Integrand for trapped ions
@@ -27,16 +83,14 @@ CONTAINS
     COMPLEX(KIND=DBL) :: bbip, ddip, ddip2, Vmip, Vpip
     COMPLEX(KIND=DBL) :: zik2, Zgik
     COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz
-    REAL(KIND=DBL)    :: ya, k2, nwgi
+    REAL(KIND=DBL)    :: k2, nwgi
     REAL(KIND=DBL)    :: fki, Eg, Kg
     INTEGER :: ifailloc
 
     k2 = kk*kk
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-    Kg = ceik(ya)
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
          &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
 
@@ -121,6 +175,189 @@ CONTAINS
 
   END FUNCTION FFki
 
+  FUNCTION FFki_all(kk,nion)
+    !---------------------------------------------------------------------
+    ! Integrand for trapped ions for all caseflags of FFki in one pass,
+    ! for the batched QL integrals. Only the cases set in QLcase are calculated,
+    ! the others are returned as 0. The elliptic integrals and the plasma
+    ! dispersion function are shared between the cases
+    !---------------------------------------------------------------------  
+    REAL(KIND=DBL), INTENT(IN) :: kk
+    INTEGER, INTENT(IN) :: nion
+    COMPLEX(KIND=DBL), DIMENSION(8) :: FFki_all
+    COMPLEX(KIND=DBL) :: Fik, Fik1, zik, fk
+    COMPLEX(KIND=DBL) :: bbip, ddip, ddip2, Vmip, Vpip
+    COMPLEX(KIND=DBL) :: zik2, Zgik
+    COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz, Z1d, Z2d, Z3d
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
+    REAL(KIND=DBL)    :: k2, nwgi
+    REAL(KIND=DBL)    :: fki, Eg, Kg
+    INTEGER :: caseflag
+
+    FFki_all(:) = 0.
+
+    k2 = kk*kk
+    CALL ellipkappa(kk,Kg,Eg)
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+
+    fk = CMPLX(fki,0)
+
+    zik2 = omFFk * (-Zi(pFFk,nion)/Tix(pFFk,nion))/fk
+
+    zik  = SQRT(zik2) 
+    IF (AIMAG(zik)<0.) zik = -zik
+
+    Zgik = ci * sqrtpi * wofzweid(zik)
+
+    Aiz = 1. + zik * Zgik !Z1/z 
+    Biz = 0.5 + zik2 * Aiz  !Z2/z              
+    Ciz =  0.75 + zik2 * Biz !Z3/z
+
+    IF (traporder1 .EQV. .TRUE.) THEN
+       nwgi = nwg*(-Tix(pFFk,nion)/Zi(pFFk,nion))
+       bbip = CMPLX(cthi(pFFk,nion)*omega2bar/(Kg*fki*nwgi*qx(pFFk)*Ro(pFFk)),0.)
+       ddip2 = bbip**2 + 4.*zik2
+       ddip =SQRT(ddip2)
+       Vmip = (- bbip - ddip)/2.
+       Vpip = (- bbip + ddip)/2.
+       CALL Zfriedv(2,(/Vpip,Vmip/),Z1v,Z2v,Z3v)
+       Z1d = (Z1v(1)-Z1v(2))/(Vpip-Vmip)
+       Z2d = (Z2v(1)-Z2v(2))/(Vpip-Vmip)
+       Z3d = (Z3v(1)-Z3v(2))/(Vpip-Vmip)
+    ENDIF
+
+    DO caseflag = 1,8
+       IF (QLcase(caseflag) .EQV. .FALSE.) CYCLE
+       SELECT CASE (caseflag)
+       CASE (1)
+          Fik = 2.*((-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*Aiz + Ati(pFFk,nion)/fk*Biz)
+       CASE (2)
+          Fik = 2.*( (-1.5/fk) * Aiz + 1./fk*Biz)
+       CASE (3)
+          Fik = 2.*(1./fk) * Aiz
+       CASE (4)
+          Fik = -2.* zik2 * Aiz
+       CASE (5) !Energy integral
+          Fik = 2.*((-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*Biz + Ati(pFFk,nion)/fk*Ciz)
+       CASE (6)
+          Fik = 2.*( (-1.5/fk) * Biz + 1./fk*Ciz)
+       CASE (7)
+          Fik = 2.*(1./fk) * Biz
+       CASE (8)
+          Fik = -2.* zik2 * Biz
+       END SELECT
+
+       IF (traporder1 .EQV. .TRUE.) THEN
+          SELECT CASE (caseflag)
+          CASE (1)
+             Fik1 = 2.*(-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*Z1d + Ati(pFFk,nion)/fk*Z2d
+          CASE (2)
+             Fik1 = -3./fk*Z1d + 1./fk*Z2d
+          CASE (3)
+             Fik1 = 2./fk*Z1d
+          CASE (4)
+             Fik1 = -2.*zik2*Z1d
+          CASE (5)
+             Fik1 = 2.*(-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*Z2d + Ati(pFFk,nion)/fk*Z3d
+          CASE (6)
+             Fik1 = -3./fk*Z2d + 1./fk*Z3d
+          CASE (7)
+             Fik1 = 2./fk*Z2d
+          CASE (8)
+             Fik1 = -2.*zik2*Z2d
+          END SELECT
+       ELSE
+          Fik1 = 0.
+       ENDIF
+
+       IF (caseflag < 5) THEN
+          FFki_all(caseflag) = kk * Kg * ft(pFFk) *  coefi(pFFk,nion) * (Fik  * Joi2p(nion) + Fik1 * J1i2p(nion)) 
+       ELSE
+          FFki_all(caseflag) = kk * Kg * ft(pFFk) *  coefi(pFFk,nion) * Tix(pFFk,nion) * (Fik  * Joi2p(nion) + Fik1 * J1i2p(nion)) 
+       ENDIF
+       IF (ABS(FFki_all(caseflag)) < SQRT(epsD)) FFki_all(caseflag)=0.
+    ENDDO
+
+  END FUNCTION FFki_all
+
+  FUNCTION FFki_d(kk,nion)
+    !---------------------------------------------------------------------
+    ! Trapped ion integrand (caseflag 1 of FFki, traporder1 off) and its
+    ! derivative with respect to omega, for the Newton solver.
+    ! dA/dz2 = (Z - 2zA)/(2z) follows from Z' = -2(1+zZ)
+    !---------------------------------------------------------------------  
+    REAL(KIND=DBL), INTENT(IN) :: kk
+    INTEGER, INTENT(IN) :: nion
+    COMPLEX(KIND=DBL), DIMENSION(2) :: FFki_d
+    COMPLEX(KIND=DBL) :: Fik, dFik, zik, fk
+    COMPLEX(KIND=DBL) :: zik2, dzik2, Zgik
+    COMPLEX(KIND=DBL) :: Aiz, Biz, dAiz, dBiz
+    REAL(KIND=DBL)    :: k2, prefac
+    REAL(KIND=DBL)    :: fki, Eg, Kg
+
+    k2 = kk*kk
+    CALL ellipkappa(kk,Kg,Eg)
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+
+    fk = CMPLX(fki,0)
+
+    zik2 = omFFk * (-Zi(pFFk,nion)/Tix(pFFk,nion))/fk
+    dzik2 = (-Zi(pFFk,nion)/Tix(pFFk,nion))/fk
+
+    zik  = SQRT(zik2) 
+    IF (AIMAG(zik)<0.) zik = -zik
+
+    Zgik = ci * sqrtpi * wofzweid(zik)
+
+    Aiz = 1. + zik * Zgik
+    Biz = 0.5 + zik2 * Aiz
+    dAiz = dAzdz2(zik,Zgik,Aiz) * dzik2
+    dBiz = dzik2 * Aiz + zik2 * dAiz
+
+    Fik = 2.*((-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*Aiz + Ati(pFFk,nion)/fk*Biz)
+    dFik = 2.*(-dzik2*Aiz + (-zik2 - 1.5 * Ati(pFFk,nion)/fk+Ani(pFFk,nion)/fk)*dAiz + Ati(pFFk,nion)/fk*dBiz)
+
+    prefac = kk * Kg * ft(pFFk) *  coefi(pFFk,nion) * Joi2p(nion)
+    FFki_d(1) = prefac * Fik
+    FFki_d(2) = prefac * dFik
+    IF (ABS(FFki_d(1)) < SQRT(epsD)) FFki_d(:)=0.
+
+  END FUNCTION FFki_d
+
+  COMPLEX(KIND=DBL) FUNCTION dAzdz2(zz,Zg,Az)
+    !---------------------------------------------------------------------
+    ! Derivative of Az = 1+zZ(z) with respect to z^2, (Z-2zAz)/(2z).
+    ! For large z, Z-2zAz cancels to O(z^-3) and the Weideman error is
+    ! amplified by z^2, so the derivative of the asymptotic expansion
+    ! Az = -sum(pduittab(i)/z^2i) is used instead (accurate above |z|=10)
+    !---------------------------------------------------------------------  
+    COMPLEX(KIND=DBL), INTENT(IN) :: zz, Zg, Az
+    REAL(KIND=DBL), PARAMETER :: zasym = 10.
+    COMPLEX(KIND=DBL) :: zz2, zpuiss
+    INTEGER :: i
+
+    IF (ABS(zz) < epsD) THEN
+       dAzdz2 = 0.
+    ELSEIF (ABS(zz) < zasym) THEN
+       dAzdz2 = (Zg - 2.*zz*Az)/(2.*zz)
+    ELSE
+       zz2 = zz*zz
+       zpuiss = zz2
+       dAzdz2 = 0.
+       DO i = 1,nerr
+          zpuiss = zpuiss*zz2
+          dAzdz2 = dAzdz2 + i * pduittab(i) / zpuiss
+       ENDDO
+    ENDIF
+
+  END FUNCTION dAzdz2
+
 !***********************************************************************************
 ! add FFki with finite rotation FFkirot, C. Bourdelle, from P. Cottier's QLK version
 !***********************************************************************************
@@ -149,16 +386,14 @@ CONTAINS
     COMPLEX(KIND=DBL) :: zik2, Zgik
     COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz
     COMPLEX(KIND=DBL) :: ompFFk
-    REAL(KIND=DBL)    :: ya, k2, nwgi, nwe,vpar2
+    REAL(KIND=DBL)    :: k2, nwgi, nwe,vpar2
     REAL(KIND=DBL)    :: fki, Eg, E2g, Kg, gau2mshift
     INTEGER :: ifailloc
 
     k2 = kk*kk
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-    Kg = ceik(ya)
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     E2g = 1./kk * (Eg - Kg*(1.-k2)) !Specialized form of incomplete 2nd elliptic integral. Used for bounce average of Vpar^2
 
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
@@ -262,7 +497,7 @@ CONTAINS
     COMPLEX(KIND=DBL) :: Fekv, Fekv1, fk
     COMPLEX(KIND=DBL) :: Aez, Bez, Bez1, Bez2, zek2, zek, Zgek, bbe
     REAL(KIND=DBL)    :: v, v2, v3, v4, v5
-    REAL(KIND=DBL)    :: ya, k2, kk, nwge
+    REAL(KIND=DBL)    :: k2, kk, nwge
     REAL(KIND=DBL)    :: fki, Eg, Kg, delta, Anuen, Anuent
 
     kk = kv(1)
@@ -271,11 +506,7 @@ CONTAINS
 
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-
-    Kg = ceik(ya)
-
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
 
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
          &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
@@ -336,6 +567,158 @@ CONTAINS
     IF (ABS(FFke) < SQRT(epsD)) FFke=0.
   END FUNCTION FFke
 
+  FUNCTION FFke_all(ndim, kv)
+    !---------------------------------------------------------------------
+    ! Trapped electron integrand (kappa and v, with collisions) for all caseflags
+    ! of FFke in one pass, for the batched QL integrals. Only the cases set in QLcase
+    ! are calculated, the others are returned as 0
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL), DIMENSION(ndim), INTENT(IN) :: kv
+    COMPLEX(KIND=DBL), DIMENSION(8) :: FFke_all
+
+    COMPLEX(KIND=DBL) :: Fekv, Fekv1, fk
+    COMPLEX(KIND=DBL) :: Aez, Bez, Bez1, Bez2, zek2, bbe
+    REAL(KIND=DBL)    :: v, v2, v3, v4, v5
+    REAL(KIND=DBL)    :: k2, kk, nwge
+    REAL(KIND=DBL)    :: fki, Eg, Kg, delta, Anuen, Anuent
+    INTEGER :: caseflag
+
+    FFke_all(:) = 0.
+
+    kk = kv(1)
+    v = kv(2)
+    k2 = kk*kk
+
+    CALL ellipkappa(kk,Kg,Eg)
+
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+
+    fk = CMPLX(fki,0)
+
+    v2 = v*v 
+    v3 = v2*v 
+    v4 = v3*v
+    v5 = v4*v
+
+    Anuen = Anue(pFFk) * (-Ze) / (Tex(pFFk)*nwg)
+
+    ! Krook operator for collisions
+    delta = ( ABS(omFFk) * nwg / (Anue(pFFk) * 37.2))**(1./3.)
+    Anuent = Anuen / ((2.*k2 -1.)**2) * (0.111 * delta +1.31) / (11.79 * delta + 1.) 
+    
+    IF ( ABS(Anuent) < epsD ) THEN
+       Anuent = epsD
+    ENDIF
+
+    zek2 = omFFk * (-Ze/Tex(pFFk))
+    nwge = nwg*(-Tex(pFFk)/Ze)
+
+    bbe = CMPLX(cthe(pFFk)*omega2bar/(Kg*nwge*qx(pFFk)*Ro(pFFk)),0.)
+
+    Bez =  zek2 * v3 - v5*fk + ci * Anuent
+    Bez1 =  zek2*v3  - bbe*v4 - v5*fk + ci * Anuent       
+    Bez2 =  zek2*v3  + bbe*v4 - v5*fk + ci * Anuent 
+
+    DO caseflag = 1,8
+       IF (QLcase(caseflag) .EQV. .FALSE.) CYCLE
+       SELECT CASE (MOD(caseflag-1,4)+1)
+       CASE (1)
+          Aez = (zek2 + 1.5 * Ate(pFFk) - Ane(pFFk)) * v3 - Ate(pFFk) * v5  
+       CASE (2)
+          Aez =  1.5 * v3 - v5  
+       CASE (3)
+          Aez = -v3
+       CASE (4)
+          Aez = zek2*v3
+       END SELECT
+
+       Fekv = 4. / sqrtpi * v2 * EXP(-v2) * Aez / Bez
+       IF (traporder1 .EQV. .TRUE.) THEN
+          Fekv1 = 2. / sqrtpi * v2 * EXP(-v2) * (Aez / Bez1 + Aez / Bez2)
+       ELSE
+          Fekv1=0.
+       ENDIF
+
+       IF (caseflag < 5) THEN
+          FFke_all(caseflag) = kk * Kg * ft(pFFk) *  Nex(pFFk) * (Fekv  * Joe2p +Fekv1 * J1e2p) 
+       ELSE
+          FFke_all(caseflag) = kk * Kg * ft(pFFk) *  Nex(pFFk) * Tex(pFFk) * v2 * (Fekv  * Joe2p + Fekv1 * J1e2p) 
+       ENDIF
+       IF (ABS(FFke_all(caseflag)) < SQRT(epsD)) FFke_all(caseflag)=0.
+    ENDDO
+  END FUNCTION FFke_all
+
+  FUNCTION FFke_d(ndim, kv)
+    !---------------------------------------------------------------------
+    ! Collisional trapped electron integrand (caseflag 1 of FFke, traporder1
+    ! off) and its derivatives, for the Newton solver. The Krook frequency
+    ! depends on |omega|, so the integrand is not analytic: returns
+    ! (/ F, dF/domega, dF/d|omega| /)
+    !---------------------------------------------------------------------  
+    INTEGER, INTENT(IN) :: ndim
+    REAL(KIND=DBL), DIMENSION(ndim), INTENT(IN) :: kv
+    COMPLEX(KIND=DBL), DIMENSION(3) :: FFke_d
+
+    COMPLEX(KIND=DBL) :: Fekv, dFekv, aFekv, fk
+    COMPLEX(KIND=DBL) :: Aez, Bez, dAez, dBez, zek2, dzek2
+    REAL(KIND=DBL)    :: v, v2, v3, v5, pref, prefac
+    REAL(KIND=DBL)    :: k2, kk
+    REAL(KIND=DBL)    :: fki, Eg, Kg, delta, Anuen, Anuent, dAnuent
+
+    kk = kv(1)
+    v = kv(2)
+    k2 = kk*kk
+
+    CALL ellipkappa(kk,Kg,Eg)
+
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+
+    fk = CMPLX(fki,0)
+
+    v2 = v*v 
+    v3 = v2*v 
+    v5 = v3*v2
+
+    Anuen = Anue(pFFk) * (-Ze) / (Tex(pFFk)*nwg)
+
+    delta = ( ABS(omFFk) * nwg / (Anue(pFFk) * 37.2))**(1./3.)
+    Anuent = Anuen / ((2.*k2 -1.)**2) * (0.111 * delta +1.31) / (11.79 * delta + 1.) 
+    !d(Anuent)/d|omega|, with d(delta)/d|omega| = delta/(3|omega|)
+    dAnuent = Anuen / ((2.*k2 -1.)**2) * (0.111 - 11.79*1.31) / (11.79 * delta + 1.)**2 &
+         &  * delta / (3.*MAX(ABS(omFFk),epsD))
+
+    IF ( ABS(Anuent) < epsD ) THEN
+       Anuent = epsD
+       dAnuent = 0.
+    ENDIF
+
+    zek2 = omFFk * (-Ze/Tex(pFFk))
+    dzek2 = -Ze/Tex(pFFk)
+
+    Aez = (zek2 + 1.5 * Ate(pFFk) - Ane(pFFk)) * v3 - Ate(pFFk) * v5  
+    Bez =  zek2 * v3 - v5*fk + ci * Anuent
+    dAez = dzek2 * v3
+    dBez = dzek2 * v3
+
+    pref = 4. / sqrtpi * v2 * EXP(-v2)
+    Fekv = pref * Aez / Bez
+    dFekv = pref * (dAez - Aez * dBez / Bez) / Bez
+    aFekv = -pref * Aez * ci * dAnuent / Bez**2
+
+    prefac = kk * Kg * ft(pFFk) *  Nex(pFFk) * Joe2p
+    FFke_d(1) = prefac * Fekv
+    FFke_d(2) = prefac * dFekv
+    FFke_d(3) = prefac * aFekv
+    IF (ABS(FFke_d(1)) < SQRT(epsD)) FFke_d(:)=0.
+  END FUNCTION FFke_d
+
   COMPLEX(KIND=DBL) FUNCTION FFke_nocoll(kk,caseflag)
     !---------------------------------------------------------------------
     ! Integrand for trapped electrons when no collisionality is included
@@ -356,16 +739,14 @@ CONTAINS
     COMPLEX(KIND=DBL) :: bbip, ddip, ddip2, Vmip, Vpip
     COMPLEX(KIND=DBL) :: zik2, Zgik
     COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz
-    REAL(KIND=DBL)    :: ya, k2, nwge
+    REAL(KIND=DBL)    :: k2, nwge
     REAL(KIND=DBL)    :: fki, Eg, Kg
     INTEGER :: ifailloc
 
     k2 = kk*kk
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-    Kg = ceik(ya)
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
          &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
     fk = CMPLX(fki,0)
@@ -446,6 +827,151 @@ CONTAINS
     IF (ABS(FFke_nocoll) < SQRT(epsD)) FFke_nocoll=0.
   END FUNCTION FFke_nocoll
 
+  FUNCTION FFke_nocoll_all(kk)
+    !---------------------------------------------------------------------
+    ! Integrand for trapped electrons without collisions for all caseflags of
+    ! FFke_nocoll in one pass, for the batched QL integrals. Only the cases set
+    ! in QLcase are calculated, the others are returned as 0
+    !---------------------------------------------------------------------  
+    REAL(KIND=DBL), INTENT(IN) :: kk
+    COMPLEX(KIND=DBL), DIMENSION(8) :: FFke_nocoll_all
+    COMPLEX(KIND=DBL) :: Fik, Fik1, zik, fk
+    COMPLEX(KIND=DBL) :: bbip, ddip, ddip2, Vmip, Vpip
+    COMPLEX(KIND=DBL) :: zik2, Zgik
+    COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz, Z1d, Z2d, Z3d
+    COMPLEX(KIND=DBL), DIMENSION(2) :: Z1v, Z2v, Z3v
+    REAL(KIND=DBL)    :: k2, nwge
+    REAL(KIND=DBL)    :: fki, Eg, Kg
+    INTEGER :: caseflag
+
+    FFke_nocoll_all(:) = 0.
+
+    k2 = kk*kk
+    CALL ellipkappa(kk,Kg,Eg)
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+    fk = CMPLX(fki,0)
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+    zik2 = omFFk * (1./Tex(pFFk))/fk
+
+    zik  = SQRT(zik2) 
+    IF (AIMAG(zik)<0.) zik = -zik
+
+    Zgik = ci * sqrtpi * wofzweid(zik)
+
+    Aiz = 1. + zik * Zgik !Z1
+    Biz = 0.5 + zik2 * Aiz  !Z2              
+    Ciz =  0.75 + zik2 * Biz
+
+    IF (traporder1 .EQV. .TRUE.) THEN
+       nwge = nwg*Tex(pFFk)
+       bbip = CMPLX(cthe(pFFk)*omega2bar/(Kg*fki*nwge*qx(pFFk)*Ro(pFFk)),0.)
+       ddip2 = bbip**2 + 4.*zik2
+       ddip =SQRT(ddip2)
+       Vmip = (- bbip - ddip)/2.
+       Vpip = (- bbip + ddip)/2.
+       CALL Zfriedv(2,(/Vpip,Vmip/),Z1v,Z2v,Z3v)
+       Z1d = (Z1v(1)-Z1v(2))/(Vpip-Vmip)
+       Z2d = (Z2v(1)-Z2v(2))/(Vpip-Vmip)
+       Z3d = (Z3v(1)-Z3v(2))/(Vpip-Vmip)
+    ENDIF
+
+    DO caseflag = 1,8
+       IF (QLcase(caseflag) .EQV. .FALSE.) CYCLE
+       SELECT CASE (caseflag)
+       CASE (1)
+          Fik = 2.*((-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*Aiz + Ate(pFFk)/fk*Biz)
+       CASE (2)
+          Fik = 2.*( (-1.5/fk) * Aiz + 1./fk*Biz)
+       CASE (3)
+          Fik = 2.*(1./fk) * Aiz
+       CASE (4)
+          Fik = -2.* zik2 * Aiz
+       CASE (5) !Energy integral
+          Fik = 2.*((-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*Biz + Ate(pFFk)/fk*Ciz)
+       CASE (6)
+          Fik = 2.*( (-1.5/fk) * Biz + 1./fk*Ciz)
+       CASE (7)
+          Fik = 2.*(1./fk) * Biz
+       CASE (8)
+          Fik = -2.* zik2 * Biz
+       END SELECT
+
+       IF (traporder1 .EQV. .TRUE.) THEN
+          SELECT CASE (caseflag)
+          CASE (1)
+             Fik1 = 2.*(-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*Z1d + Ate(pFFk)/fk*Z2d
+          CASE (2)
+             Fik1 = -3./fk*Z1d + 1./fk*Z2d
+          CASE (3)
+             Fik1 = 2./fk*Z1d
+          CASE (4)
+             Fik1 = -2.*zik2*Z1d
+          CASE (5)
+             Fik1 = 2.*(-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*Z2d + Ate(pFFk)/fk*Z3d
+          CASE (6)
+             Fik1 = -3./fk*Z2d + 1./fk*Z3d
+          CASE (7)
+             Fik1 = 2./fk*Z2d
+          CASE (8)
+             Fik1 = -2.*zik2*Z2d
+          END SELECT
+       ELSE
+          Fik1 = 0.
+       ENDIF
+
+       IF (caseflag < 5) THEN
+          FFke_nocoll_all(caseflag) = kk * Kg * ft(pFFk) *  Nex(pFFk) * (Fik  * Joe2p + Fik1 * J1e2p) 
+       ELSE
+          FFke_nocoll_all(caseflag) = kk * Kg * ft(pFFk) *  Nex(pFFk) * Tex(pFFk) * (Fik  * Joe2p + Fik1 * J1e2p) 
+       ENDIF
+       IF (ABS(FFke_nocoll_all(caseflag)) < SQRT(epsD)) FFke_nocoll_all(caseflag)=0.
+    ENDDO
+  END FUNCTION FFke_nocoll_all
+
+  FUNCTION FFke_nocoll_d(kk)
+    !---------------------------------------------------------------------
+    ! Collisionless trapped electron integrand (caseflag 1 of FFke_nocoll,
+    ! traporder1 off) and its derivative with respect to omega
+    !---------------------------------------------------------------------  
+    REAL(KIND=DBL), INTENT(IN) :: kk
+    COMPLEX(KIND=DBL), DIMENSION(2) :: FFke_nocoll_d
+    COMPLEX(KIND=DBL) :: Fik, dFik, zik, fk
+    COMPLEX(KIND=DBL) :: zik2, dzik2, Zgik
+    COMPLEX(KIND=DBL) :: Aiz, Biz, dAiz, dBiz
+    REAL(KIND=DBL)    :: k2, prefac
+    REAL(KIND=DBL)    :: fki, Eg, Kg
+
+    k2 = kk*kk
+    CALL ellipkappa(kk,Kg,Eg)
+    fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
+         &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
+    !as in FFke_nocoll, fk is taken before the minfki clamp
+    fk = CMPLX(fki,0)
+    IF (ABS(fki) < minfki)  fki=SIGN(minfki,fki)
+
+    zik2 = omFFk * (1./Tex(pFFk))/fk
+    dzik2 = (1./Tex(pFFk))/fk
+
+    zik  = SQRT(zik2) 
+    IF (AIMAG(zik)<0.) zik = -zik
+
+    Zgik = ci * sqrtpi * wofzweid(zik)
+
+    Aiz = 1. + zik * Zgik
+    Biz = 0.5 + zik2 * Aiz
+    dAiz = dAzdz2(zik,Zgik,Aiz) * dzik2
+    dBiz = dzik2 * Aiz + zik2 * dAiz
+
+    Fik = 2.*((-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*Aiz + Ate(pFFk)/fk*Biz)
+    dFik = 2.*(-dzik2*Aiz + (-zik2 - 1.5 * Ate(pFFk)/fk+Ane(pFFk)/fk)*dAiz + Ate(pFFk)/fk*dBiz)
+
+    prefac = kk * Kg * ft(pFFk) *  Nex(pFFk) * Joe2p
+    FFke_nocoll_d(1) = prefac * Fik
+    FFke_nocoll_d(2) = prefac * dFik
+    IF (ABS(FFke_nocoll_d(1)) < SQRT(epsD)) FFke_nocoll_d(:)=0.
+  END FUNCTION FFke_nocoll_d
+
 !*************************************************************************************
 
 !***********************************************************************************
@@ -480,7 +1006,7 @@ CONTAINS
     COMPLEX(KIND=DBL) :: Fekv, Fekv1, fk, ompFFk
     COMPLEX(KIND=DBL) :: Aez, Bez, Bez1, Bez2, zek2, zek, Zgek
     REAL(KIND=DBL)    :: v, v2, v3, v4, v5,gau2mshift
-    REAL(KIND=DBL)    :: ya, k2, kk, nwge, nwe
+    REAL(KIND=DBL)    :: k2, kk, nwge, nwe
     REAL(KIND=DBL)    :: fki, Eg, E2g, Kg, delta, Anuen, Anuent,vpar2
 
     kk = kv(1)
@@ -489,11 +1015,7 @@ CONTAINS
 
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-
-    Kg = ceik(ya)
-
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     E2g = 1./kk * (Eg - Kg*(1.-k2)) !Specialized form of incomplete 2nd elliptic integral. Used for bounce average of Vpar^2
 
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
@@ -586,7 +1108,7 @@ CONTAINS
     COMPLEX(KIND=DBL) :: Fekv, Fekv1, fk, ompFFk
     COMPLEX(KIND=DBL) :: Aez, Bez, Bez1, Bez2, zek2, zek, Zgek
     REAL(KIND=DBL)    :: v, v2, v3, v4, v5,gau2mshift
-    REAL(KIND=DBL)    :: ya, k2, kk, nwge, nwe
+    REAL(KIND=DBL)    :: k2, kk, nwge, nwe
     REAL(KIND=DBL)    :: fki, Eg, E2g, Kg, delta, Anuen, Anuent,vpar2
 
     kk = kv(1)
@@ -595,11 +1117,7 @@ CONTAINS
 
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-
-    Kg = ceik(ya)
-
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     E2g = 1./kk * (Eg - Kg*(1.-k2)) !Specialized form of incomplete 2nd elliptic integral. Used for bounce average of Vpar^2
 
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
@@ -690,16 +1208,14 @@ CONTAINS
     COMPLEX(KIND=DBL) :: zik2, Zgik
     COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz
     COMPLEX(KIND=DBL) :: ompFFk
-    REAL(KIND=DBL)    :: ya, k2, nwge, nwe
+    REAL(KIND=DBL)    :: k2, nwge, nwe
     REAL(KIND=DBL)    :: fki, Eg, E2g, Kg, gau2mshift,vpar2
     INTEGER :: ifailloc
 
     k2 = kk*kk
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-    Kg = ceik(ya)
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     E2g = 1./kk * (Eg - Kg*(1.-k2)) !Specialized form of incomplete 2nd elliptic integral. Used for bounce average of Vpar^2
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
          &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))
@@ -804,16 +1320,14 @@ CONTAINS
     COMPLEX(KIND=DBL) :: zik2, Zgik
     COMPLEX(KIND=DBL) :: Aiz, Biz, Ciz
     COMPLEX(KIND=DBL) :: ompFFk
-    REAL(KIND=DBL)    :: ya, k2, nwge, nwe
+    REAL(KIND=DBL)    :: k2, nwge, nwe
     REAL(KIND=DBL)    :: fki, Eg, E2g, Kg, gau2mshift,vpar2
     INTEGER :: ifailloc
 
     k2 = kk*kk
     ! The term weighting the vertical drift of the trapped (fk) is calculated 
     ! The formulation with elliptic integrals is used
-    ya = 1.-k2
-    Kg = ceik(ya)
-    Eg = ceie(ya)
+    CALL ellipkappa(kk,Kg,Eg)
     E2g = 1./kk * (Eg - Kg*(1.-k2)) !Specialized form of incomplete 2nd elliptic integral. Used for bounce average of Vpar^2
     fki = -1. + (smag(pFFk)*4. + 4./3. * alphax(pFFk)) * &
          &     (k2-1.+Eg/Kg) + 2.*Eg/Kg *(1-4./3. * k2 * alphax(pFFk))